@@ -3,8 +3,10 @@ Master Agent - Handles user onboarding and topic management
 """
 from typing import List, Dict, Tuple
 from sqlalchemy.orm import Session
-from app.models import User, Topic, UserInterest, user_topics
+from app.models import User, Topic, UserInterest
 from app.schemas import TopicResponse
+from app.subscriptions import link_user_topic, unlink_user_topic
+from app.topics import find_matching_topic, normalize_topic_name
 from app.utils.claude_client import get_claude_client
 from app.utils.helpers import validate_topic_name
 
@@ -64,19 +66,19 @@ class MasterAgent:
                 print(f"⚠️ Invalid topic name: {topic_name}")
                 continue
             
-            # Check if topic already exists
-            existing_topic = self.db.query(Topic).filter(
-                Topic.topic_name == topic_name
-            ).first()
+            # Check if topic (or a near-identical one) already exists
+            match = find_matching_topic(self.db, topic_name, "feed", "internet")
+            existing_topic = match[0] if match else None
             
             if existing_topic:
                 # Topic exists, just link to user
                 topic = existing_topic
-                print(f"✅ Existing topic: {topic_name}")
+                print(f"✅ Existing topic: {topic.topic_name}")
             else:
                 # Create new topic
                 topic = Topic(
                     topic_name=topic_name,
+                    normalized_name=normalize_topic_name(topic_name),
                     description=topic_description,
                     agent_config=self._create_agent_config(topic_name, topic_description)
                 )
@@ -87,17 +89,7 @@ class MasterAgent:
                 print(f"✨ Created new topic: {topic_name}")
             
             # Link topic to user (if not already linked)
-            existing_link = self.db.query(user_topics).filter(
-                user_topics.c.user_id == user_id,
-                user_topics.c.topic_id == topic.id
-            ).first()
-            
-            if not existing_link:
-                stmt = user_topics.insert().values(
-                    user_id=user_id,
-                    topic_id=topic.id
-                )
-                self.db.execute(stmt)
+            if link_user_topic(self.db, user_id, topic.id):
                 self.db.commit()
                 topics_linked.append(topic_name)
                 print(f"🔗 Linked {topic_name} to user {user_id}")
@@ -152,21 +144,10 @@ class MasterAgent:
         Returns:
             True if successful, False otherwise
         """
-        # Check if link already exists
-        existing_link = self.db.query(user_topics).filter(
-            user_topics.c.user_id == user_id,
-            user_topics.c.topic_id == topic_id
-        ).first()
-        
-        if existing_link:
+        # Create link (False if it already exists)
+        if not link_user_topic(self.db, user_id, topic_id):
             return False
         
-        # Create link
-        stmt = user_topics.insert().values(
-            user_id=user_id,
-            topic_id=topic_id
-        )
-        self.db.execute(stmt)
         self.db.commit()
         return True
     
@@ -181,10 +162,6 @@ class MasterAgent:
         Returns:
             True if successful, False otherwise
         """
-        stmt = user_topics.delete().where(
-            (user_topics.c.user_id == user_id) & 
-            (user_topics.c.topic_id == topic_id)
-        )
-        result = self.db.execute(stmt)
+        removed = unlink_user_topic(self.db, user_id, topic_id)
         self.db.commit()
-        return result.rowcount > 0
\ No newline at end of file
+        return removed
\ No newline at end of file
@@ -1,229 +1,535 @@
 """
 Worker Agent - Fetches and curates content for topics
+
+A fetch runs in three phases so no database session is held across the
+(20-60s) Claude call:
+1. Read  - snapshot the topic into plain data in a short session
+2. Fetch - call Claude with no session open, build an IngestBatch
+3. Write - persist the batch in one short transaction
 """
-from typing import List, Optional, Dict
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Tuple, Any
 from datetime import datetime
 from sqlalchemy.orm import Session
+from app import config
+from app.database import SessionLocal, session_scope
 from app.models import Topic, ContentPool
 from app.schemas import ContentResponse
-from app.utils.claude_client import get_claude_client
+from app.ingest.batch import IngestBatch
+from app.ingest.writer import write_batch
+from app.feed.cache import get_feed_cache
+from app.learning.claims import claim_lessons, held_claims, release_claims
+from app.learning.curriculum import (
+    day_plan, get_curricula, lesson_history, merge_outline, normalize_outline, plan_window,
+    rolling_summary, save_curriculum, window_planned,
+)
+from app.learning.lessons import active_learners, deliver_lessons, missing_lessons, plan_days, touch_learner
+from app.retention import apply_retention
+from app.utils import metrics
+from app.utils.claude_client import ClaudeClient, ContentParseError, get_claude_client
+from app.scheduler.retry_queue import record_failure
+import asyncio
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 
 
+class TopicFetchError(Exception):
+    """
+    Raised when a topic fetch fails
+    The failure has already been recorded on the retry queue.
+    """
+    
+    def __init__(self, topic_id: int, error_kind: str, dead_lettered: bool, message: str):
+        super().__init__(message)
+        self.topic_id = topic_id
+        self.error_kind = error_kind
+        self.dead_lettered = dead_lettered
+    
+    @property
+    def timed_out(self) -> bool:
+        """True if the fetch hit a client timeout or the per-topic deadline"""
+        return self.error_kind == "timeout"
+
+
+@dataclass(frozen=True)
+class TopicSnapshot:
+    """Plain copy of the Topic columns a fetch needs - usable with no session open"""
+    id: int
+    topic_name: str
+    description: Optional[str]
+    feed_source: str
+    topic_type: str
+    learning_period_days: Optional[int]
+    current_day: Optional[int]
+    is_completed: bool
+    curriculum_version: int = 1
+    agent_config: Dict[str, Any] = field(default_factory=dict)
+    
+    @classmethod
+    def from_model(cls, topic: Topic) -> "TopicSnapshot":
+        return cls(
+            id=topic.id,
+            topic_name=topic.topic_name,
+            description=topic.description,
+            feed_source=topic.feed_source or "internet",
+            topic_type=topic.topic_type or "feed",
+            learning_period_days=topic.learning_period_days,
+            current_day=topic.current_day,
+            is_completed=bool(topic.is_completed),
+            curriculum_version=topic.curriculum_version or 1,
+            agent_config=dict(topic.agent_config or {})
+        )
+
+
 class WorkerAgent:
     """
     Worker Agent fetches content for a specific topic
     Supports two modes: Internet (articles) and AI (generated content)
+    
+    The database work runs in short sync sessions; from async code it goes
+    through asyncio.to_thread so a fetch never blocks the event loop (build
+    workers there with WorkerAgent.create).
     """
     
-    def __init__(self, db: Session, topic_id: int):
-        self.db = db
+    def __init__(self, topic_id: int, session_factory=None):
         self.topic_id = topic_id
-        self.claude_client = get_claude_client()
+        self.session_factory = session_factory or SessionLocal
+        self._claude_client = None  # resolved on the event loop that uses it (see claude_client)
+        
+        # Learning topics: lessons this fetch claimed for generation, and the ones other fetches hold
+        self.claim_owner = uuid.uuid4().hex
+        self._claimed: List[Tuple[int, int]] = []
+        self._awaited: List[Tuple[int, int]] = []
         
-        # Load topic from database
-        self.topic = self.db.query(Topic).filter(Topic.id == topic_id).first()
-        if not self.topic:
-            raise ValueError(f"Topic with ID {topic_id} not found")
+        # Read phase: snapshot the topic in a short session
+        with session_scope(self.session_factory) as db:
+            topic = db.query(Topic).filter(Topic.id == topic_id).first()
+            if not topic:
+                raise ValueError(f"Topic with ID {topic_id} not found")
+            
+            self.topic = TopicSnapshot.from_model(topic)
     
-    async def fetch_content(self, max_items: int = 5) -> List[ContentResponse]:  # Changed from 5 to 15
+    @property
+    def claude_client(self) -> ClaudeClient:
+        """
+        Claude client of the running event loop, resolved on first use
+        Not in __init__: WorkerAgent.create builds workers in a thread, where
+        get_claude_client() would hand out the process-wide client and share
+        one HTTP pool across event loops.
+        """
+        if self._claude_client is None:
+            self._claude_client = get_claude_client()
+        return self._claude_client
+    
+    @claude_client.setter
+    def claude_client(self, client):
+        self._claude_client = client
+    
+    @classmethod
+    async def create(cls, topic_id: int, session_factory=None) -> "WorkerAgent":
+        """Build a worker from async code (the topic snapshot is read off the event loop)"""
+        return await asyncio.to_thread(cls, topic_id, session_factory)
+    
+    async def fetch_content(self, max_items: int = 5, learner_id: Optional[int] = None) -> List[ContentResponse]:  # Changed from 5 to 15
         """
         Fetch fresh content for this topic
         Routes to appropriate method based on feed_source and topic_type
+        
+        Args:
+            max_items: Articles to request (internet topics)
+            learner_id: Learning topics - serve only this learner's next lesson
+                (default: every learner of the topic)
+        
+        Returns:
+            The stored items (for learning topics, the lessons delivered)
+        
+        Raises:
+            TopicFetchError: If the fetch failed or missed its deadline
         """
-        feed_source = getattr(self.topic, 'feed_source', 'internet')
-        topic_type = getattr(self.topic, 'topic_type', 'feed')
+        if self.topic.topic_type == 'learning' and self.topic.is_completed:
+            logger.info(f"✓ Learning plan already completed")
+            return await asyncio.to_thread(self.get_recent_content, limit=10)
+        
+        try:
+            # Fetch phase: API calls only, bounded by the per-topic deadline.
+            # Nothing has been written yet, so cancellation needs no cleanup.
+            async with asyncio.timeout(config.TOPIC_FETCH_TIMEOUT_SECONDS):
+                batch = await self._fetch_batch(max_items, learner_id)
+            
+            # Write phase: one short transaction (group-committed by the ingest writer)
+            items = await self._write_batch(batch) if batch else []
+            if self.topic.topic_type == 'learning':
+                # Lessons go to each learner from the store, new or not -
+                # including the ones other fetches were generating meanwhile
+                await self._release_claims()
+                await self._await_lessons()
+                items = await self._deliver_lessons(learner_id)
+        except TimeoutError as e:
+            logger.error(f"⏱️ {self.topic.topic_name} exceeded {config.TOPIC_FETCH_TIMEOUT_SECONDS}s deadline")
+            await self._handle_failure(e)
+        except Exception as e:
+            logger.error(f"❌ Error fetching content for {self.topic.topic_name}: {e}")
+            await self._handle_failure(e)
+        finally:
+            await self._release_claims()  # a failed fetch lets the others take its days over
         
-        if topic_type == 'learning':
-            return await self._fetch_learning_content()
-        elif feed_source == 'ai':
+        metrics.incr("topic_fetch.succeeded")
+        return items
+    
+    async def _fetch_batch(self, max_items: int, learner_id: Optional[int] = None) -> Optional[IngestBatch]:
+        """Route to the fetch method for this topic's type and source"""
+        if self.topic.topic_type == 'learning':
+            return await self._fetch_learning_content(learner_id)
+        elif self.topic.feed_source == 'ai':
             return await self._fetch_ai_content(max_items)
         else:
             return await self._fetch_internet_content(max_items)
     
-    async def _fetch_internet_content(self, max_items: int = 5) -> List[ContentResponse]:  # Changed from 5 to 15
+    async def _fetch_internet_content(self, max_items: int = 5) -> IngestBatch:  # Changed from 5 to 15
         """Fetch content from internet - returns multiple articles with URLs"""
         logger.info(f"🌐 Fetching INTERNET content for: {self.topic.topic_name}")
         
-        try:
-            content_items = await self.claude_client.fetch_content_for_topic(
-                topic_name=self.topic.topic_name,
-                description=self.topic.description or "",
-                max_items=max_items
-            )
-            
-            stored_count = 0
-            for item in content_items:
-                content_entry = ContentPool(
-                    topic_id=self.topic_id,
-                    title=item.get("title", ""),
-                    summary=item.get("summary", ""),
-                    content=item.get("content", ""),
-                    url=item.get("url", ""),
-                    image_url=item.get("image_url"),
-                    source=item.get("source", ""),
-                    fetched_at=datetime.now()
-                )
-                self.db.add(content_entry)
-                stored_count += 1
-            
-            self.db.commit()
-            self.topic.last_fetched = datetime.now()
-            self.db.commit()
-            
-            logger.info(f"✅ Stored {stored_count} internet items for {self.topic.topic_name}")
-            return self.get_recent_content(limit=stored_count)
-            
-        except Exception as e:
-            logger.error(f"❌ Error fetching internet content: {e}")
-            self.db.rollback()
-            self.topic.last_fetched = datetime.now()
-            self.db.commit()
-            return []
+        content_items = await self.claude_client.fetch_content_for_topic(
+            topic_name=self.topic.topic_name,
+            description=self.topic.description or "",
+            max_items=max_items
+        )
+        
+        now = datetime.now()
+        items = [
+            {
+                "title": item.get("title", ""),
+                "summary": item.get("summary", ""),
+                "content": item.get("content", ""),
+                "url": item.get("url", ""),
+                "image_url": item.get("image_url"),
+                "source": item.get("source", ""),
+                "fetched_at": now
+            }
+            for item in content_items
+        ]
+        
+        logger.info(f"✅ Fetched {len(items)} internet items for {self.topic.topic_name}")
+        return IngestBatch(topic_id=self.topic_id, items=items, topic_updates={"last_fetched": now})
     
-    async def _fetch_ai_content(self, max_items: int = 1) -> List[ContentResponse]:
+    async def _fetch_ai_content(self, max_items: int = 1) -> Optional[IngestBatch]:
         """Generate AI content for Feed topics (like astrology, analysis)"""
         logger.info(f"🤖 Generating AI content for: {self.topic.topic_name}")
         
-        try:
-            time_period = self._get_time_period()
-            
-            ai_response = await self.claude_client.generate_ai_content(
-                topic_name=self.topic.topic_name,
-                description=self.topic.description or "",
-                time_period=time_period,
-                current_date=datetime.now().strftime("%Y-%m-%d")
-            )
-            
-            if not ai_response:
-                logger.warning(f"⚠️ No AI content generated")
-                return []
-            
-            content_entry = ContentPool(
-                topic_id=self.topic_id,
-                title=ai_response.get("title", f"{self.topic.topic_name} - {time_period}"),
-                summary=ai_response.get("summary", "")[:500],
-                content=ai_response.get("content", ""),
-                url=None,
-                image_url=None,
-                source="AI Generated",
-                fetched_at=datetime.now()
-            )
-            self.db.add(content_entry)
-            self.db.commit()
-            
-            self.topic.last_fetched = datetime.now()
-            self.db.commit()
-            
-            logger.info(f"✅ Stored AI-generated content")
-            return self.get_recent_content(limit=1)
-            
-        except Exception as e:
-            logger.error(f"❌ Error generating AI content: {e}")
-            import traceback
-            traceback.print_exc()
-            self.db.rollback()
-            self.topic.last_fetched = datetime.now()
-            self.db.commit()
-            return []
-    
-    async def _fetch_learning_content(self) -> List[ContentResponse]:
+        time_period = self._get_time_period()
+        
+        ai_response = await self.claude_client.generate_ai_content(
+            topic_name=self.topic.topic_name,
+            description=self.topic.description or "",
+            time_period=time_period,
+            current_date=datetime.now().strftime("%Y-%m-%d")
+        )
+        
+        if not ai_response:
+            logger.warning(f"⚠️ No AI content generated")
+            return None
+        
+        now = datetime.now()
+        item = {
+            "title": ai_response.get("title", f"{self.topic.topic_name} - {time_period}"),
+            "summary": ai_response.get("summary", "")[:500],
+            "content": ai_response.get("content", ""),
+            "url": None,
+            "image_url": None,
+            "source": "AI Generated",
+            "fetched_at": now
+        }
+        
+        logger.info(f"✅ Generated AI content")
+        return IngestBatch(topic_id=self.topic_id, items=[item], topic_updates={"last_fetched": now})
+    
+    async def _fetch_learning_content(self, learner_id: Optional[int] = None) -> Optional[IngestBatch]:
         """
-        Generate structured learning content - day-by-day curriculum
-        This is for LEARNING agents with progressive lessons
+        Generate the lessons learners are waiting for that aren't stored yet
+        Each (curriculum version, day) is generated once and shared by every
+        learner who reaches it (see app/learning/lessons.py).
         """
-        logger.info(f"📚 Generating LEARNING content for: {self.topic.topic_name}")
+        def claim():
+            with session_scope(self.session_factory) as db:
+                learners = active_learners(db, self.topic_id, learner_id)
+                missing = missing_lessons(db, self.topic_id, learners)[:config.LEARNING_LESSONS_PER_FETCH]
+                # Each day is generated by the one fetch that claims it (see app/learning/claims.py)
+                claimed = claim_lessons(db, self.topic_id, missing, self.claim_owner) if missing else []
+            return learners, missing, claimed
         
-        # Check if completed
-        if self.topic.is_completed:
-            logger.info(f"✓ Learning plan already completed")
-            return self.get_recent_content(limit=10)
+        learners, missing, self._claimed = await asyncio.to_thread(claim)
+        self._awaited = [key for key in missing if key not in self._claimed]
         
-        current_day = self.topic.current_day or 1
-        total_days = self.topic.learning_period_days or 30
+        if not self._claimed:
+            logger.info(f"📚 {len(learners)} learners of {self.topic.topic_name} served from stored lessons")
+            return None
+        return await self._generate_lessons(self._claimed)
+    
+    async def _generate_lessons(self, missing: List[Tuple[int, int]], prefetch: bool = False) -> Optional[IngestBatch]:
+        """
+        Generate lessons for (curriculum version, day) keys from their entries
+        in the curriculum outline (see app/learning/curriculum.py)
+        A prefetch leaves last_fetched alone: nothing has been delivered yet.
+        """
+        # Read phase: the curricula the days belong to, and the lessons already stored
+        versions = {version for version, _ in missing}
         
-        logger.info(f"📖 Generating Day {current_day} of {total_days}")
+        def read():
+            with session_scope(self.session_factory) as db:
+                curricula = {
+                    version: (curriculum.total_days, curriculum.outline)
+                    for version, curriculum in get_curricula(db, self.topic_id, versions).items()
+                }
+                return curricula, {version: lesson_history(db, self.topic_id, version) for version in versions}
         
-        try:
-            # Get previous days' content for context
-            previous_content = self._get_previous_learning_context()
-            
-            # Generate structured learning content
-            learning_response = await self.claude_client.generate_learning_content(
+        curricula, history = await asyncio.to_thread(read)
+        
+        # One planning call per outline window, the first time one of its days is needed
+        failed = set()
+        for version, day in missing:
+            total_days, outline = curricula.get(version, (plan_days(self.topic.learning_period_days), []))
+            curricula[version] = (total_days, outline)
+            window = (version, plan_window(day, total_days))
+            if window_planned(outline, day, total_days) or window in failed:
+                continue
+            try:
+                curricula[version] = await self._plan_curriculum(version, total_days, day, outline)
+            except Exception as e:
+                # The lessons are still generated, from the stored lessons' titles
+                failed.add(window)
+                logger.warning(f"⚠️ Planning day {day} of {self.topic.topic_name} failed, generating without an outline: {e}")
+                metrics.incr("learning.plan_failed")
+        
+        # Each prompt: the day's outline entry and a summary of the days before it
+        contexts = {
+            (version, day): (
+                rolling_summary(merge_outline(curricula[version][1], history[version]), day),
+                day_plan(curricula[version][1], day)
+            )
+            for version, day in missing
+        }
+        
+        logger.info(f"📚 Generating LEARNING content for: {self.topic.topic_name} (days {[day for _, day in missing]})")
+        
+        # Each prompt needs only the outline, so the days are generated in parallel
+        responses = await asyncio.gather(*(
+            self.claude_client.generate_learning_content(
                 topic_name=self.topic.topic_name,
                 description=self.topic.description or "",
-                current_day=current_day,
-                total_days=total_days,
-                previous_context=previous_content
+                current_day=day,
+                total_days=curricula[version][0],
+                previous_context=contexts[(version, day)][0],
+                day_plan=contexts[(version, day)][1]
             )
-            
+            for version, day in missing
+        ))
+        
+        now = datetime.now()
+        items, keys = [], []
+        for (version, day), learning_response in zip(missing, responses):
             if not learning_response:
-                logger.warning(f"⚠️ No learning content generated")
-                return []
-            
-            # Store the day's lesson
-            content_entry = ContentPool(
-                topic_id=self.topic_id,
-                title=learning_response.get("title", f"Day {current_day}: {self.topic.topic_name}"),
-                summary=learning_response.get("summary", ""),
-                content=learning_response.get("content", ""),
-                url=None,
-                image_url=None,
-                source=f"Learning Day {current_day}/{total_days}",
-                fetched_at=datetime.now()
-            )
-            self.db.add(content_entry)
-            self.db.commit()
-            
-            # Update progress
-            self.topic.current_day = current_day + 1
-            self.topic.last_fetched = datetime.now()
-            
-            # Check if completed
-            if current_day >= total_days:
-                self.topic.is_completed = True
-                logger.info(f"🎓 Learning plan completed!")
-            
-            self.db.commit()
-            
-            logger.info(f"✅ Stored Day {current_day} learning content")
-            return self.get_recent_content(limit=1)
-            
-        except Exception as e:
-            logger.error(f"❌ Error generating learning content: {e}")
-            import traceback
-            traceback.print_exc()
-            self.db.rollback()
-            self.topic.last_fetched = datetime.now()
-            self.db.commit()
-            return []
-    
-    def _get_previous_learning_context(self) -> str:
-        """Get summary of previous days' lessons for context"""
-        previous_content = (
-            self.db.query(ContentPool)
-            .filter(ContentPool.topic_id == self.topic_id)
-            .order_by(ContentPool.fetched_at.desc())
-            .limit(3)  # Last 3 days
-            .all()
+                logger.warning(f"⚠️ No learning content generated for Day {day}")
+                continue
+            items.append({
+                "title": learning_response.get("title", f"Day {day}: {self.topic.topic_name}"),
+                "summary": learning_response.get("summary", ""),
+                "content": learning_response.get("content", ""),
+                "url": None,
+                "image_url": None,
+                "source": f"Learning Day {day}/{curricula[version][0]}",
+                "fetched_at": now
+            })
+            keys.append((version, day))
+        
+        if not items:
+            return None
+        
+        # topics.current_day: next day to generate for the topic's own curriculum
+        generated = [day for version, day in keys if version == self.topic.curriculum_version]
+        topic_updates = {} if prefetch else {"last_fetched": now}
+        if generated and max(generated) >= (self.topic.current_day or 1):
+            topic_updates["current_day"] = max(generated) + 1
+        
+        metrics.incr("learning.lessons_generated", len(items))
+        logger.info(f"✅ Generated {len(items)} learning lessons")
+        return IngestBatch(topic_id=self.topic_id, items=items, topic_updates=topic_updates, lessons=keys)
+    
+    async def prefetch_lessons(self, keys: List[Tuple[int, int]]) -> int:
+        """
+        Generate lessons ahead of the learners who will need them (the
+        low-priority lane, see app/learning/prefetch.py); nothing is delivered
+        Failures are only logged - the regular fetch generates whatever is
+        still missing when a learner gets there.
+        
+        Returns:
+            Number of lessons stored
+        """
+        stored = 0
+        for start in range(0, len(keys), config.LEARNING_LESSONS_PER_FETCH):
+            chunk = keys[start:start + config.LEARNING_LESSONS_PER_FETCH]
+            try:
+                # Days a fetch is generating right now are left to it
+                self._claimed = await asyncio.to_thread(self._claim, chunk)
+                if not self._claimed:
+                    continue
+                async with asyncio.timeout(config.TOPIC_FETCH_TIMEOUT_SECONDS):
+                    batch = await self._generate_lessons(self._claimed, prefetch=True)
+                if batch:
+                    stored += len(await write_batch(batch, self.session_factory))
+            except Exception as e:
+                logger.warning(f"⚠️ Prefetching days {[day for _, day in chunk]} of {self.topic.topic_name} failed: {e}")
+                metrics.incr("learning.prefetch_failed")
+                break
+            finally:
+                await self._release_claims()
+        
+        metrics.incr("learning.lessons_prefetched", stored)
+        return stored
+    
+    async def _plan_curriculum(self, version: int, total_days: int, day: int, outline: list) -> Tuple[int, list]:
+        """
+        Plan and store the outline window a day belongs to
+        
+        Returns:
+            The version's (total_days, outline) with the window added
+        
+        Raises:
+            ContentParseError: If the outline came back without any day of the window
+        """
+        first_day, last_day = plan_window(day, total_days)
+        logger.info(f"🗺️ Planning days {first_day}-{last_day} of the {total_days}-day curriculum for: {self.topic.topic_name}")
+        raw = await self.claude_client.plan_curriculum(
+            topic_name=self.topic.topic_name,
+            description=self.topic.description or "",
+            total_days=total_days,
+            first_day=first_day,
+            last_day=last_day,
+            covered=rolling_summary(outline, first_day)
         )
+        window = normalize_outline(raw, total_days, first_day, last_day)
+        if not window:
+            raise ContentParseError(f"No outline entries for days {first_day}-{last_day}")
+        def save():
+            with session_scope(self.session_factory) as db:
+                curriculum = save_curriculum(db, self.topic_id, version, total_days, window)
+                return curriculum.total_days, curriculum.outline
+        
+        planned = await asyncio.to_thread(save)
+        metrics.incr("learning.curricula_planned")
+        return planned
+    
+    def _claim(self, keys: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Claim lessons for this fetch in a short session (runs in a worker thread)"""
+        with session_scope(self.session_factory) as db:
+            return claim_lessons(db, self.topic_id, keys, self.claim_owner)
+    
+    async def _release_claims(self):
+        """Give up this fetch's lesson claims (once its lessons are written, or it failed)"""
+        if not self._claimed:
+            return
+        
+        def release():
+            with session_scope(self.session_factory) as db:
+                release_claims(db, self.topic_id, self.claim_owner)
+        
+        await asyncio.to_thread(release)
+        self._claimed = []
+    
+    async def _await_lessons(self):
+        """
+        Wait for the lessons other fetches claimed to be stored, until their
+        claims are released or their leases run out
+        """
+        def held(keys):
+            with session_scope(self.session_factory) as db:
+                return held_claims(db, self.topic_id, keys)
+        
+        waiting = self._awaited
+        while waiting:
+            waiting = await asyncio.to_thread(held, waiting)
+            if waiting:
+                await asyncio.sleep(config.LEARNING_CLAIM_POLL_SECONDS)
+        if self._awaited:
+            metrics.incr("learning.lessons_awaited", len(self._awaited))
+            logger.info(f"⏳ Waited for days {[day for _, day in self._awaited]} of {self.topic.topic_name} generated by another fetch")
+        self._awaited = []
+    
+    async def _deliver_lessons(self, learner_id: Optional[int] = None) -> List[ContentResponse]:
+        """Hand learners their next stored lesson and return the lessons delivered"""
+        def deliver():
+            with session_scope(self.session_factory) as db:
+                if learner_id is not None:
+                    touch_learner(db, learner_id, self.topic_id)
+                delivered = deliver_lessons(db, self.topic_id, [learner_id] if learner_id is not None else None)
+                content_ids = {content_id for _, content_id in delivered}
+                stored = db.query(ContentPool).filter(ContentPool.id.in_(content_ids)).all() if content_ids else []
+                return delivered, [ContentResponse.model_validate(item) for item in stored]
+        
+        delivered, items = await asyncio.to_thread(deliver)
+        
+        if delivered:
+            get_feed_cache().invalidate_topic(self.topic_id)
+            metrics.incr("learning.lessons_delivered", len(delivered))
+            logger.info(f"📖 Delivered {len(delivered)} lessons of {self.topic.topic_name}")
+        return items
+    
+    async def _write_batch(self, batch: IngestBatch) -> List[ContentResponse]:
+        """Persist a fetched batch and return the stored items"""
+        ids = await write_batch(batch, self.session_factory)
+        
+        def read_back():
+            with session_scope(self.session_factory) as db:
+                stored = (
+                    db.query(ContentPool)
+                    .filter(ContentPool.id.in_(ids))
+                    .order_by(ContentPool.fetched_at.desc())
+                    .all()
+                )
+                return [ContentResponse.model_validate(item) for item in stored]
+        
+        items = await asyncio.to_thread(read_back)
+        
+        logger.info(f"✅ Stored {len(items)} items for {self.topic.topic_name}")
+        return items
+    
+    async def _handle_failure(self, error: Exception):
+        """
+        Put the topic on the retry queue
+        last_fetched is left untouched so the topic is not considered fresh.
+        
+        Raises:
+            TopicFetchError: Always, carrying the classified error kind
+        """
+        def record():
+            with session_scope(self.session_factory) as db:
+                retry = record_failure(db, self.topic_id, error)
+                return retry.error_kind, retry.status, retry.attempts, retry.next_attempt_at
+        
+        error_kind, status, attempts, next_attempt_at = await asyncio.to_thread(record)
         
-        if not previous_content:
-            return "This is the first day of learning."
+        if status == "dead":
+            logger.error(f"☠️ {self.topic.topic_name} dead-lettered after {attempts} attempts ({error_kind})")
+        else:
+            logger.warning(f"🔁 {self.topic.topic_name} retry #{attempts} ({error_kind}) at {next_attempt_at}")
         
-        context = "Previous lessons covered:\n"
-        for item in reversed(previous_content):
-            context += f"- {item.title}: {item.summary[:200]}\n"
+        metrics.incr("topic_fetch.failed")
+        if error_kind == "timeout":
+            metrics.incr("topic_fetch.timed_out")
         
-        return context
+        raise TopicFetchError(
+            topic_id=self.topic_id,
+            error_kind=error_kind,
+            dead_lettered=status == "dead",
+            message=str(error)
+        ) from error
     
     def _get_time_period(self) -> str:
         """Determine the time period string based on schedule"""
         now = datetime.now()
-        config = self.topic.agent_config or {}
-        schedule = config.get("fetch_frequency", "daily")
+        agent_config = self.topic.agent_config or {}
+        schedule = agent_config.get("fetch_frequency", "daily")
         
         if schedule == "daily":
             return f"Daily - {now.strftime('%B %d, %Y')}"
@@ -237,15 +543,16 @@ class WorkerAgent:
     
     def get_recent_content(self, limit: int = 10) -> List[ContentResponse]:
         """Get recently fetched content for this topic"""
-        content_items = (
-            self.db.query(ContentPool)
-            .filter(ContentPool.topic_id == self.topic_id)
-            .order_by(ContentPool.fetched_at.desc())
-            .limit(limit)
-            .all()
-        )
-        
-        return [ContentResponse.model_validate(item) for item in content_items]
+        with session_scope(self.session_factory) as db:
+            content_items = (
+                db.query(ContentPool)
+                .filter(ContentPool.topic_id == self.topic_id)
+                .order_by(ContentPool.fetched_at.desc())
+                .limit(limit)
+                .all()
+            )
+            
+            return [ContentResponse.model_validate(item) for item in content_items]
     
     def get_todays_content(self) -> List[ContentResponse]:
         """Get content fetched today for this topic"""
@@ -254,67 +561,50 @@ class WorkerAgent:
         today_start = get_today_start()
         today_end = get_today_end()
         
-        content_items = (
-            self.db.query(ContentPool)
-            .filter(
-                ContentPool.topic_id == self.topic_id,
-                ContentPool.fetched_at >= today_start,
-                ContentPool.fetched_at <= today_end
+        with session_scope(self.session_factory) as db:
+            content_items = (
+                db.query(ContentPool)
+                .filter(
+                    ContentPool.topic_id == self.topic_id,
+                    ContentPool.fetched_at >= today_start,
+                    ContentPool.fetched_at <= today_end
+                )
+                .order_by(ContentPool.fetched_at.desc())
+                .all()
             )
-            .order_by(ContentPool.fetched_at.desc())
-            .all()
-        )
-        
-        return [ContentResponse.model_validate(item) for item in content_items]
+            
+            return [ContentResponse.model_validate(item) for item in content_items]
     
-    def cleanup_old_content(self, days_to_keep: int = 7):
-        """Remove content older than specified days"""
-        from datetime import timedelta
-        
-        cutoff_date = datetime.now() - timedelta(days=days_to_keep)
-        
-        deleted = (
-            self.db.query(ContentPool)
-            .filter(
-                ContentPool.topic_id == self.topic_id,
-                ContentPool.fetched_at < cutoff_date
-            )
-            .delete()
-        )
-        
-        self.db.commit()
-        logger.info(f"🗑️ Cleaned up {deleted} old items")
+    def cleanup_old_content(self, days_to_keep: Optional[int] = None) -> Dict[str, int]:
+        """
+        Apply the retention policies to this topic's content (see app/retention.py);
+        days_to_keep overrides RETENTION_FEED_DAYS
+        """
+        return apply_retention(self.session_factory, feed_days=days_to_keep, topic_ids=[self.topic_id])
 
 
 class WorkerAgentManager:
-    """Manages multiple worker agents (one per topic)"""
+    """
+    Manages multiple worker agents (one per topic)
+    Topics are fetched concurrently; FETCH_CONCURRENCY bounds in-flight API calls.
+    """
     
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory or SessionLocal
     
     async def fetch_all_topics(self, max_items_per_topic: int = 5) -> dict:  # Changed from 5 to 15
         """Fetch content for all topics in database"""
-        topics = self.db.query(Topic).all()
-        results = {}
+        def read():
+            with session_scope(self.session_factory) as db:
+                return [topic_id for (topic_id,) in db.query(Topic.id).all()]
+        
+        topic_ids = await asyncio.to_thread(read)
         
         logger.info(f"\n{'='*60}")
-        logger.info(f"Starting content fetch for {len(topics)} topics")
+        logger.info(f"Starting content fetch for {len(topic_ids)} topics")
         logger.info(f"{'='*60}\n")
         
-        for topic in topics:
-            try:
-                worker = WorkerAgent(self.db, topic.id)
-                content = await worker.fetch_content(max_items=max_items_per_topic)
-                results[topic.topic_name] = {
-                    "success": True,
-                    "items_fetched": len(content)
-                }
-            except Exception as e:
-                logger.error(f"❌ Failed to fetch for {topic.topic_name}: {e}")
-                results[topic.topic_name] = {
-                    "success": False,
-                    "error": str(e)
-                }
+        results = await self.fetch_topics(topic_ids, max_items_per_topic)
         
         logger.info(f"\n{'='*60}")
         logger.info("Content fetch complete!")
@@ -322,23 +612,95 @@ class WorkerAgentManager:
         
         return results
     
+    async def fetch_topics(
+        self,
+        topic_ids: List[int],
+        max_items_per_topic: int = 5,
+        learner_id: Optional[int] = None
+    ) -> Dict[str, dict]:
+        """
+        Fetch content for the given topics with bounded concurrency
+        With learner_id (a user's manual refresh), learning topics only serve
+        that user's next lesson.
+        
+        Returns:
+            Dictionary of topic name -> result ({"success", "items_fetched"} or error details)
+        """
+        semaphore = asyncio.Semaphore(config.FETCH_CONCURRENCY)
+        
+        async def run(topic_id: int) -> Tuple[str, dict]:
+            async with semaphore:
+                return await self._fetch_one(topic_id, max_items_per_topic, learner_id)
+        
+        outcomes = await asyncio.gather(*(run(topic_id) for topic_id in topic_ids))
+        return dict(outcomes)
+    
+    async def _fetch_one(self, topic_id: int, max_items: int, learner_id: Optional[int] = None) -> Tuple[str, dict]:
+        """Fetch one topic and turn the outcome into a result entry"""
+        topic_name = f"topic {topic_id}"
+        try:
+            worker = await WorkerAgent.create(topic_id, self.session_factory)
+            topic_name = worker.topic.topic_name
+            content = await worker.fetch_content(max_items=max_items, learner_id=learner_id)
+            return topic_name, {
+                "success": True,
+                "items_fetched": len(content)
+            }
+        except TopicFetchError as e:
+            logger.error(f"❌ Failed to fetch for {topic_name}: {e}")
+            return topic_name, {
+                "success": False,
+                "error": str(e),
+                "error_kind": e.error_kind,
+                "timed_out": e.timed_out,
+                "dead_lettered": e.dead_lettered
+            }
+        except Exception as e:
+            logger.error(f"❌ Failed to fetch for {topic_name}: {e}")
+            return topic_name, {
+                "success": False,
+                "error": str(e)
+            }
+    
+    async def prefetch_lessons(self, plan: Dict[int, List[Tuple[int, int]]]) -> Dict[str, int]:
+        """
+        Generate lessons ahead of learners (see app/learning/prefetch.py),
+        LEARNING_PREFETCH_CONCURRENCY topics at a time
+        
+        Returns:
+            Dictionary of topic name -> lessons stored
+        """
+        semaphore = asyncio.Semaphore(config.LEARNING_PREFETCH_CONCURRENCY)
+        
+        async def run(topic_id: int, keys: List[Tuple[int, int]]) -> Tuple[str, int]:
+            async with semaphore:
+                try:
+                    worker = await WorkerAgent.create(topic_id, self.session_factory)
+                except ValueError:
+                    return f"topic {topic_id}", 0  # deleted since the plan was made
+                return worker.topic.topic_name, await worker.prefetch_lessons(keys)
+        
+        outcomes = await asyncio.gather(*(run(topic_id, keys) for topic_id, keys in plan.items()))
+        return dict(outcomes)
+    
     async def fetch_topic_by_name(self, topic_name: str, max_items: int = 5) -> Optional[List[ContentResponse]]:  # Changed from 5 to 15
         """Fetch content for a specific topic by name"""
-        topic = self.db.query(Topic).filter(Topic.topic_name == topic_name).first()
+        def read():
+            with session_scope(self.session_factory) as db:
+                topic = db.query(Topic).filter(Topic.topic_name == topic_name).first()
+                return topic.id if topic else None
         
-        if not topic:
+        topic_id = await asyncio.to_thread(read)
+        if topic_id is None:
             logger.error(f"❌ Topic '{topic_name}' not found")
             return None
         
-        worker = WorkerAgent(self.db, topic.id)
+        worker = await WorkerAgent.create(topic_id, self.session_factory)
         return await worker.fetch_content(max_items=max_items)
     
-    def cleanup_all_old_content(self, days_to_keep: int = 7):
-        """Cleanup old content for all topics"""
-        topics = self.db.query(Topic).all()
-        
-        logger.info(f"\n🗑️ Cleaning up content older than {days_to_keep} days...")
-        
-        for topic in topics:
-            worker = WorkerAgent(self.db, topic.id)
-            worker.cleanup_old_content(days_to_keep)
\ No newline at end of file
+    def cleanup_all_old_content(self, days_to_keep: Optional[int] = None) -> Dict[str, int]:
+        """
+        Apply the retention policies to all content, in chunks (see app/retention.py);
+        days_to_keep overrides RETENTION_FEED_DAYS
+        """
+        return apply_retention(self.session_factory, feed_days=days_to_keep)
@@ -0,0 +1,208 @@
+"""
+Response compression middleware
+Compresses JSON / text responses with the best encoding the client accepts:
+brotli or zstd when their modules are installed, gzip always. Learning and
+AI-generated bodies are long markdown, so feed payloads shrink several-fold.
+
+Rules:
+- only complete (non-streaming) 200 responses of a compressible content type
+- nothing below COMPRESSION_MIN_BYTES, nothing already encoded
+- a result that isn't smaller than the original is sent uncompressed
+
+Responses with an ETag (the cached feed) keep their compressed bodies in a
+byte-capped LRU keyed by (path, ETag, encoding), so reloading an unchanged
+feed doesn't compress it again. Bytes in/out, compression time and cache
+hits are counted in app.utils.metrics (GET /api/scheduler/metrics).
+"""
+import gzip
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app import config
+from app.utils import metrics
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def available_encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """Encoders this process can use, in server preference order"""
+    encoders = {}
+    if brotli is not None:
+        encoders["br"] = lambda body: brotli.compress(body, quality=config.COMPRESSION_BROTLI_QUALITY)
+    if zstandard is not None:
+        encoders["zstd"] = lambda body: zstandard.ZstdCompressor(level=config.COMPRESSION_ZSTD_LEVEL).compress(body)
+    encoders["gzip"] = lambda body: gzip.compress(body, compresslevel=config.COMPRESSION_GZIP_LEVEL, mtime=0)
+    return encoders
+
+
+def negotiate(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """
+    Pick an encoding from an Accept-Encoding header
+    Highest q-value wins; ties go to the server's preference order.
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name.strip().lower()] = q
+    
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+class CompressedBodyCache:
+    """Byte-capped LRU of compressed bodies keyed by (path, etag, encoding)"""
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+    
+    def put(self, key, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = body
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+            metrics.set_gauge("compression.cache_bytes", self._bytes)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete responses (see module docstring)"""
+    
+    def __init__(self, app, minimum_size: int = None, cache_max_bytes: int = None, encoders: Dict[str, Callable] = None):
+        self.app = app
+        self.minimum_size = config.COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+        self.encoders = encoders or available_encoders()
+        if cache_max_bytes is None:
+            cache_max_bytes = int(config.COMPRESSION_CACHE_MAX_MB * 1024 * 1024)
+        self.cache = CompressedBodyCache(cache_max_bytes) if cache_max_bytes > 0 else None
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), list(self.encoders))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message = None
+        passthrough = False
+        
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            
+            # First body message: decide once, for the whole response
+            body = message.get("body", b"")
+            if message.get("more_body", False) or not self._should_compress(start_message, body):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            
+            headers = MutableHeaders(raw=start_message["headers"])
+            compressed = self._compress(scope, headers.get("etag"), encoding, body)
+            headers.add_vary_header("Accept-Encoding")
+            if len(compressed) < len(body):
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(compressed))
+                body = compressed
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+        
+        await self.app(scope, receive, send_compressed)
+    
+    def _should_compress(self, start_message, body: bytes) -> bool:
+        headers = Headers(raw=start_message["headers"])
+        return (
+            start_message["status"] == 200
+            and len(body) >= self.minimum_size
+            and "content-encoding" not in headers
+            and is_compressible(headers.get("content-type", ""))
+        )
+    
+    def _compress(self, scope, etag: Optional[str], encoding: str, body: bytes) -> bytes:
+        key = None
+        if self.cache is not None and etag:
+            key = (scope["path"] + "?" + scope.get("query_string", b"").decode("latin-1"), etag, encoding)
+            cached = self.cache.get(key)
+            if cached is not None:
+                metrics.incr("compression.cache_hits")
+                self._count(encoding, len(body), len(cached))
+                return cached
+        
+        started = time.perf_counter()
+        compressed = self.encoders[encoding](body)
+        metrics.incr("compression.cpu_ms", (time.perf_counter() - started) * 1000)
+        self._count(encoding, len(body), len(compressed))
+        if key is not None:
+            self.cache.put(key, compressed)
+        return compressed
+    
+    @staticmethod
+    def _count(encoding: str, size_in: int, size_out: int):
+        metrics.incr(f"compression.{encoding}.responses")
+        metrics.incr("compression.bytes_in", size_in)
+        metrics.incr("compression.bytes_out", min(size_in, size_out))
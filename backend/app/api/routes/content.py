@@ -0,0 +1,61 @@
+"""
+Content routes - Full content items
+List endpoints with ?view=summary leave out the body; cards load it here.
+"""
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_read_db
+from app.models import ContentPool, Topic
+from app.schemas import ContentResponse, RelatedContentResponse
+from app.search.vectors import get_vector_index, vectorize
+from app.api.views import content_columns, validate_content_rows
+
+router = APIRouter(prefix="/content", tags=["content"])
+
+
+@router.get("/{content_id}", response_model=ContentResponse)
+async def get_content(content_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Get one content item including its full body
+    """
+    content = await db.get(ContentPool, content_id)
+    if not content:
+        raise HTTPException(status_code=404, detail="Content not found")
+    return content
+
+
+@router.get("/{content_id}/related", response_model=RelatedContentResponse)
+async def get_related_content(
+    content_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Items similar to this one, from any topic (local vector index, no API calls)
+    """
+    content = await db.get(ContentPool, content_id)
+    if not content:
+        raise HTTPException(status_code=404, detail="Content not found")
+    
+    # Not indexed yet (e.g. just ingested by another process): embed it on the fly
+    fallback = {content_id: vectorize(content.title, content.summary, content.content)}
+    # Over-fetch: content deleted since it was indexed is dropped below
+    matches = (await asyncio.to_thread(get_vector_index().related, [content_id], limit + 10, fallback))[content_id]
+    scores = dict(matches)
+    
+    rows = (await db.execute(
+        select(*content_columns("summary"), Topic.topic_name)
+        .join(Topic, Topic.id == ContentPool.topic_id)
+        .where(ContentPool.id.in_(scores))
+    )).mappings().all()
+    rows = sorted(rows, key=lambda row: scores[row["id"]], reverse=True)[:limit]
+    items = validate_content_rows(rows, "summary")
+    for row, item in zip(rows, items):
+        item.update(topic_name=row["topic_name"], score=round(scores[row["id"]], 4))
+    
+    return ORJSONResponse({"content_id": content_id, "items": items})
@@ -1,30 +1,54 @@
 """
 Feed routes - Get curated content for users
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from datetime import datetime
-import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
 
-from app.database import get_db
-from app.models import User, Topic, ContentPool, user_topics
-from app.schemas import FeedResponse, TopicFeed, ContentResponse
-from app.utils.helpers import is_today
+from app.database import get_async_db
+from app.db_routing import get_async_replica_db, record_user_write
+from app.feed.cache import changed_at, compute_validators, get_feed_cache
+from app.feed.changes import read_changes
+from app.api.views import ContentView, content_columns, content_view, render_feed, validate_content_rows
+from app.models import User, Topic, ContentPool, UserFeedEntry, user_topics
+from app.schemas import FeedResponse, FeedChangesResponse, FeedHistoryResponse, TopicFeed, ContentResponse
+from app.utils import metrics
+from app.utils.pagination import before_cursor, encode_cursor
 
 router = APIRouter(prefix="/feed", tags=["feed"])
 
+FEED_ITEMS_PER_TOPIC = 10
+
+
+async def _get_user_topics(db: AsyncSession, user_id: int):
+    """User's subscribed topics (explicit query; lazy loads don't work on AsyncSession)"""
+    result = await db.execute(
+        select(Topic)
+        .join(user_topics, user_topics.c.topic_id == Topic.id)
+        .where(user_topics.c.user_id == user_id)
+    )
+    return result.scalars().all()
+
 
 @router.get("/{user_id}", response_model=FeedResponse)
-def get_user_feed(
+async def get_user_feed(
     user_id: int,
     date: str = Query(None, description="Date in YYYY-MM-DD format (default: today)"),
-    db: Session = Depends(get_db)
+    if_none_match: str = Header(None),
+    if_modified_since: str = Header(None),
+    view: ContentView = Depends(content_view),
+    db: AsyncSession = Depends(get_async_replica_db)
 ):
     """
-    Get curated feed for a user
+    Get curated feed for a user (?view=summary leaves out the full bodies)
+    Conditional requests (If-None-Match / If-Modified-Since) get a 304 while
+    none of the user's topics has been fetched since; otherwise the payload
+    comes from the feed cache when it is still current.
     """
     # Verify user exists
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -37,62 +61,176 @@ def get_user_feed(
     else:
         target_date = datetime.now()
     
-    # Get user's topics
-    user_topics_list = user.topics
+    # Validators: the feed only changes when a topic is fetched or expires content,
+    # the topic set changes or the user's saves re-rank it
+    topic_rows = [
+        (topic_id, changed_at(last_fetched, content_removed_at))
+        for topic_id, last_fetched, content_removed_at in (await db.execute(
+            select(Topic.id, Topic.last_fetched, Topic.content_removed_at)
+            .join(user_topics, user_topics.c.topic_id == Topic.id)
+            .where(user_topics.c.user_id == user_id)
+        )).all()
+    ]
+    cache_key = (user_id, f"{target_date.strftime('%Y-%m-%d')}/{view}")
+    validators = compute_validators(user_id, cache_key[1], topic_rows, user.feed_changed_at)
+    headers = validators.headers()
     
-    if not user_topics_list:
-        return FeedResponse(
-            user_id=user_id,
-            date=target_date,
-            topics=[]
+    if validators.not_modified(if_none_match, if_modified_since):
+        metrics.incr("feed_cache.not_modified")
+        return Response(status_code=304, headers=headers)
+    
+    cache = get_feed_cache()
+    body = cache.get(cache_key, validators) if cache.enabled else None
+    if body is None:
+        body = await _render_feed(db, user_id, target_date, view)
+        cache.put(cache_key, body, validators)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _render_feed(db: AsyncSession, user_id: int, target_date: datetime, view: ContentView) -> bytes:
+    """Render one day of a user's feed from the materialized entries"""
+    # One range scan over the user's materialized feed; best-scored items per topic
+    entries = (
+        select(
+            UserFeedEntry.content_id,
+            UserFeedEntry.topic_id,
+            UserFeedEntry.score,
+            func.row_number().over(
+                partition_by=UserFeedEntry.topic_id,
+                order_by=(UserFeedEntry.score.desc(), UserFeedEntry.fetched_at.desc())
+            ).label("rank")
         )
+        .where(
+            UserFeedEntry.user_id == user_id,
+            UserFeedEntry.fetched_at >= target_date.replace(hour=0, minute=0, second=0),
+            UserFeedEntry.fetched_at <= target_date.replace(hour=23, minute=59, second=59)
+        )
+        .subquery()
+    )
+    rows = (await db.execute(
+        select(*content_columns(view), Topic.topic_name)
+        .join(entries, entries.c.content_id == ContentPool.id)
+        .join(Topic, Topic.id == entries.c.topic_id)
+        .where(entries.c.rank <= FEED_ITEMS_PER_TOPIC)
+        .order_by(entries.c.score.desc())
+    )).mappings().all()
+    
+    # Grouped by topic (topics with the best-ranked content first), repeated URLs dropped
+    return render_feed(user_id, target_date, rows, view)
+
+
+@router.get("/{user_id}/history", response_model=FeedHistoryResponse)
+async def get_feed_history(
+    user_id: int,
+    days: int = Query(7, ge=1, le=90, description="How many days back"),
+    cursor: str = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    view: ContentView = Depends(content_view),
+    db: AsyncSession = Depends(get_async_replica_db)
+):
+    """
+    Multi-day feed history, newest first, one page at a time
+    Keyset pages on (fetched_at, id) of the materialized feed, content and
+    topic joined in the same query.
+    """
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    try:
+        after_cursor = before_cursor(UserFeedEntry.fetched_at, UserFeedEntry.id, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Get content for each topic
-    topic_feeds = []
-    for topic in user_topics_list:
-        # Query content for this topic from target date
-        content_items = (
-            db.query(ContentPool)
-            .filter(
-                ContentPool.topic_id == topic.id,
-                ContentPool.fetched_at >= target_date.replace(hour=0, minute=0, second=0),
-                ContentPool.fetched_at <= target_date.replace(hour=23, minute=59, second=59)
-            )
-            .order_by(ContentPool.fetched_at.desc())
-            .limit(10)
-            .all()
+    since = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+    stmt = (
+        select(
+            UserFeedEntry.id.label("entry_id"),
+            UserFeedEntry.fetched_at.label("entry_fetched_at"),
+            *content_columns(view),
+            Topic.topic_name
         )
-        
-        if content_items:
-            topic_feed = TopicFeed(
-                topic_name=topic.topic_name,
-                topic_id=topic.id,
-                items=[ContentResponse.model_validate(item) for item in content_items]
-            )
-            topic_feeds.append(topic_feed)
-    
-    return FeedResponse(
+        .join(ContentPool, ContentPool.id == UserFeedEntry.content_id)
+        .join(Topic, Topic.id == UserFeedEntry.topic_id)
+        .where(UserFeedEntry.user_id == user_id, UserFeedEntry.fetched_at >= since)
+        .order_by(UserFeedEntry.fetched_at.desc(), UserFeedEntry.id.desc())
+        .limit(limit + 1)
+    )
+    if after_cursor is not None:
+        stmt = stmt.where(after_cursor)
+    rows = (await db.execute(stmt)).mappings().all()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = validate_content_rows(rows, view)
+    for row, item in zip(rows, items):
+        item["topic_name"] = row["topic_name"]
+    
+    last = rows[-1] if has_more else None
+    return ORJSONResponse({
+        "user_id": user_id,
+        "days": days,
+        "items": items,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(last["entry_fetched_at"], last["entry_id"]) if last else None
+    })
+
+
+@router.get("/{user_id}/changes", response_model=FeedChangesResponse)
+async def get_feed_changes(
+    user_id: int,
+    since: str = Query(None, description="Cursor from the previous call (omit to get the current one)"),
+    limit: int = Query(200, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_replica_db)
+):
+    """
+    Delta sync: items added to and removed from the user's feed since a cursor
+    Without `since` (or with an expired cursor) returns reset=true and the
+    current cursor; load the full feed with GET /api/feed/{user_id} first.
+    """
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    try:
+        changes = await db.run_sync(read_changes, user_id, since, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    topic_feeds = {}
+    for item, topic_name in changes.items:
+        topic_feed = topic_feeds.get(item.topic_id)
+        if topic_feed is None:
+            topic_feed = topic_feeds[item.topic_id] = TopicFeed(topic_name=topic_name, topic_id=item.topic_id, items=[])
+        topic_feed.items.append(ContentResponse.model_validate(item))
+    
+    return FeedChangesResponse(
         user_id=user_id,
-        date=target_date,
-        topics=topic_feeds
+        cursor=changes.cursor.encode(),
+        reset=changes.reset,
+        has_more=changes.has_more,
+        topics=list(topic_feeds.values()),
+        removed_items=changes.removed_items,
+        removed_topics=changes.removed_topics
     )
 
 
 @router.post("/refresh/{user_id}")
-async def refresh_user_feed(user_id: int, db: Session = Depends(get_db)):
+async def refresh_user_feed(user_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Manually trigger feed refresh for ALL user topics
-    Includes rate limit protection with delays between topic fetches
+    Includes rate limit protection via bounded fetch concurrency
     """
     from app.agents.worker_agent import WorkerAgentManager
     
     # Verify user exists
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Get user's topics
-    user_topics_list = user.topics
+    user_topics_list = await _get_user_topics(db, user_id)
     
     if not user_topics_list:
         return {
@@ -100,34 +238,23 @@ async def refresh_user_feed(user_id: int, db: Session = Depends(get_db)):
             "topics_refreshed": 0
         }
     
-    # Refresh content for user's topics with delays to avoid rate limits
-    manager = WorkerAgentManager(db)
-    results = {}
+    # Release the DB connection before the long API calls; each worker
+    # opens its own short write transaction
+    topic_ids = [topic.id for topic in user_topics_list]
+    await db.close()
     
-    for i, topic in enumerate(user_topics_list):
-        # Add 10-second delay between requests (except for first topic)
-        if i > 0:
-            print(f"⏳ Waiting 10 seconds before fetching next topic...")
-            await asyncio.sleep(10)
-        
-        try:
-            content = await manager.fetch_topic_by_name(topic.topic_name, max_items=5)
-            results[topic.topic_name] = {
-                "success": True,
-                "items_fetched": len(content) if content else 0
-            }
-        except Exception as e:
-            results[topic.topic_name] = {
-                "success": False,
-                "error": str(e)
-            }
+    # Refresh content for user's topics (bounded concurrency, failures go to the retry queue)
+    manager = WorkerAgentManager()
+    results = await manager.fetch_topics(topic_ids, max_items_per_topic=5, learner_id=user_id)
+    record_user_write(user_id)  # the user's next feed read should see the new content
     
     successful = sum(1 for r in results.values() if r.get("success", False))
     total_items = sum(r.get("items_fetched", 0) for r in results.values())
     
     return {
-        "message": f"Feed refresh complete: {successful}/{len(user_topics_list)} topics updated",
+        "message": f"Feed refresh complete: {successful}/{len(topic_ids)} topics updated",
         "total_items_fetched": total_items,
+        "timed_out": [name for name, r in results.items() if r.get("timed_out", False)],
         "results": results
     }
 
@@ -136,34 +263,48 @@ async def refresh_user_feed(user_id: int, db: Session = Depends(get_db)):
 async def refresh_topic_feed(
     user_id: int,
     topic_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Refresh feed for a SPECIFIC topic only (NEW)
     """
-    from app.agents.worker_agent import WorkerAgent
+    from app.agents.worker_agent import WorkerAgent, TopicFetchError
     
     # Verify user exists
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Verify topic exists
-    topic = db.query(Topic).filter(Topic.id == topic_id).first()
+    topic = await db.get(Topic, topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Topic not found")
     
     # Check if user has access to this topic
-    user_topic_link = db.query(user_topics).filter(
-        user_topics.c.user_id == user_id,
-        user_topics.c.topic_id == topic_id
-    ).first()
+    user_topic_link = (await db.execute(
+        select(user_topics).where(
+            user_topics.c.user_id == user_id,
+            user_topics.c.topic_id == topic_id
+        )
+    )).first()
     
     if not user_topic_link:
         raise HTTPException(status_code=403, detail="User does not have access to this topic")
     
-    # Fetch content for THIS topic only
-    worker = WorkerAgent(db, topic_id)
-    await worker.fetch_content()
+    # Release the DB connection before the long API call
+    topic_name = topic.topic_name
+    await db.close()
+    
+    # Fetch content for THIS topic only (a learning topic serves this user's next lesson)
+    worker = await WorkerAgent.create(topic_id)
+    try:
+        await worker.fetch_content(learner_id=user_id)
+    except TopicFetchError as e:
+        status = "dead-lettered" if e.dead_lettered else "queued for retry"
+        raise HTTPException(
+            status_code=502,
+            detail=f"Fetching {topic_name} failed ({e.error_kind}); topic {status}"
+        )
+    record_user_write(user_id)
     
-    return {"message": f"Successfully refreshed feed for {topic.topic_name}"}
\ No newline at end of file
+    return {"message": f"Successfully refreshed feed for {topic_name}"}
\ No newline at end of file
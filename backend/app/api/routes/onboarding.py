@@ -2,18 +2,24 @@
 Onboarding routes - Process user interests
 """
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import Dict
 
 from app.database import get_db
-from app.models import User, Topic, user_topics
+from app.db_routing import get_replica_db, record_user_write
+from app.config import LEARNING_MAX_DAYS
+from app.learning.lessons import progress_by_topic, valid_plan_days
+from app.subscriptions import link_user_topic
+from app.topics import find_matching_topic, normalize_topic_name
+from app.models import User, Topic
 from app.schemas import OnboardingRequest, OnboardingResponse, TopicResponse
 
 router = APIRouter(prefix="/onboarding", tags=["onboarding"])
 
 
 @router.post("/", response_model=OnboardingResponse)
-async def process_onboarding(
+def process_onboarding(
     request: OnboardingRequest,
     db: Session = Depends(get_db)
 ):
@@ -53,8 +59,14 @@ async def process_onboarding(
             if "Learning Period:" in part:
                 period_str = part.split("Learning Period:")[1].strip()
                 # Extract number from "30 days" or just "30"
-                learning_period = int(''.join(filter(str.isdigit, period_str)))
+                digits = ''.join(filter(str.isdigit, period_str))
+                learning_period = int(digits) if digits else None
                 break
+        if learning_period is not None and not valid_plan_days(learning_period):
+            raise HTTPException(
+                status_code=422,
+                detail=f"Learning period must be between 1 and {LEARNING_MAX_DAYS} days"
+            )
     
     # Extract details (everything between topic name and metadata)
     details_parts = []
@@ -63,10 +75,9 @@ async def process_onboarding(
             details_parts.append(part)
     details = '. '.join(details_parts).strip()
     
-    # Check if topic already exists
-    existing_topic = db.query(Topic).filter(
-        Topic.topic_name == topic_name
-    ).first()
+    # Check if the topic (or a near-identical one, e.g. "ai news" for "AI News") already exists
+    match = find_matching_topic(db, topic_name, topic_type, feed_source, learning_period)
+    existing_topic = match[0] if match else None
     
     if existing_topic:
         # Topic exists, just link to user
@@ -75,6 +86,7 @@ async def process_onboarding(
         # Create new topic
         topic = Topic(
             topic_name=topic_name,
+            normalized_name=normalize_topic_name(topic_name),
             description=details,
             feed_source=feed_source,
             topic_type=topic_type,
@@ -84,28 +96,32 @@ async def process_onboarding(
             agent_config=_create_agent_config(topic_name, details, feed_source, topic_type, learning_period)
         )
         db.add(topic)
-        db.commit()
-        db.refresh(topic)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Created concurrently under the same canonical name and kind: use that one
+            db.rollback()
+            match = find_matching_topic(db, topic_name, topic_type, feed_source, learning_period)
+            topic = existing_topic = match[0] if match else None
+            if topic is None:
+                raise HTTPException(status_code=409, detail="Topic name already taken")
+        else:
+            db.refresh(topic)
     
     # Link topic to user (if not already linked)
-    existing_link = db.query(user_topics).filter(
-        user_topics.c.user_id == request.user_id,
-        user_topics.c.topic_id == topic.id
-    ).first()
-    
-    if not existing_link:
-        stmt = user_topics.insert().values(
-            user_id=request.user_id,
-            topic_id=topic.id
-        )
-        db.execute(stmt)
+    if link_user_topic(db, request.user_id, topic.id):
         db.commit()
+        record_user_write(request.user_id)
     
     # Return response
+    if existing_topic:
+        message = f"Linked existing {topic.topic_type} topic: {topic.topic_name}"
+    else:
+        message = f"Successfully created {topic_type} topic: {topic_name}"
     return OnboardingResponse(
-        message=f"Successfully created {topic_type} topic: {topic_name}",
+        message=message,
         topics_added=[TopicResponse.model_validate(topic)] if not existing_topic else [],
-        topics_linked=[topic_name]
+        topics_linked=[topic.topic_name]
     )
 
 
@@ -137,13 +153,20 @@ def _create_agent_config(
 
 
 @router.get("/{user_id}/topics")
-async def get_user_topics(user_id: int, db: Session = Depends(get_db)):
-    """Get all topics for a user"""
+def get_user_topics(user_id: int, db: Session = Depends(get_replica_db)):
+    """Get all topics for a user (learning topics show the user's own progress)"""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    topics = [TopicResponse.model_validate(topic) for topic in user.topics]
+    progress = progress_by_topic(db, user_id)
+    topics = []
+    for topic in user.topics:
+        response = TopicResponse.model_validate(topic)
+        if topic.id in progress:
+            current_day, is_completed = progress[topic.id]
+            response = response.model_copy(update={"current_day": current_day, "is_completed": is_completed})
+        topics.append(response)
     
     return {
         "user_id": user_id,
@@ -1,36 +1,45 @@
 """
 Saved content routes - Bookmark management
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.database import get_db
+from app.database import get_async_db
+from app.db_routing import get_async_replica_db, record_user_write
 from app.models import User, ContentPool, SavedContent
+from app.feed.cache import get_feed_cache
+from app.api.views import ContentView, content_columns, content_view, validate_content_rows
+from app.saves import record_save
 from app.schemas import SaveContentRequest, SavedContentResponse, ContentResponse
+from app.utils.pagination import before_cursor, encode_cursor
 
 router = APIRouter(prefix="/saved", tags=["saved"])
 
 
 @router.post("/", status_code=201)
-def save_content(request: SaveContentRequest, db: Session = Depends(get_db)):
+async def save_content(request: SaveContentRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Save/bookmark content for a user
     """
     # Verify user and content exist
-    user = db.query(User).filter(User.id == request.user_id).first()
+    user = await db.get(User, request.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    content = db.query(ContentPool).filter(ContentPool.id == request.content_id).first()
+    content = await db.get(ContentPool, request.content_id)
     if not content:
         raise HTTPException(status_code=404, detail="Content not found")
     
     # Check if already saved
-    existing = db.query(SavedContent).filter(
-        SavedContent.user_id == request.user_id,
-        SavedContent.content_id == request.content_id
-    ).first()
+    existing = (await db.execute(
+        select(SavedContent.id).where(
+            SavedContent.user_id == request.user_id,
+            SavedContent.content_id == request.content_id
+        )
+    )).first()
     
     if existing:
         raise HTTPException(status_code=400, detail="Content already saved")
@@ -41,8 +50,10 @@ def save_content(request: SaveContentRequest, db: Session = Depends(get_db)):
         content_id=request.content_id
     )
     db.add(saved)
-    db.commit()
-    db.refresh(saved)
+    await db.run_sync(record_save, request.user_id, request.content_id, 1)
+    await db.commit()
+    record_user_write(request.user_id)
+    get_feed_cache().invalidate_user(request.user_id)  # the saver's feed is re-ranked
     
     return {
         "message": "Content saved successfully",
@@ -51,47 +62,71 @@ def save_content(request: SaveContentRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/{user_id}")
-def get_saved_content(user_id: int, db: Session = Depends(get_db)):
+async def get_saved_content(
+    user_id: int,
+    cursor: str = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    view: ContentView = Depends(content_view),
+    db: AsyncSession = Depends(get_async_replica_db)
+):
     """
-    Get all saved content for a user
+    Get saved content for a user, newest first, one page at a time
+    (?view=summary leaves out the full bodies)
     """
     # Verify user exists
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Get saved content
-    saved_items = (
-        db.query(SavedContent)
-        .filter(SavedContent.user_id == user_id)
-        .order_by(SavedContent.saved_at.desc())
-        .all()
+    try:
+        after_cursor = before_cursor(SavedContent.saved_at, SavedContent.id, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # One keyset range scan on (user_id, saved_at, id), content joined in the same query
+    stmt = (
+        select(SavedContent.id.label("saved_id"), SavedContent.saved_at, *content_columns(view))
+        .join(ContentPool, ContentPool.id == SavedContent.content_id)
+        .where(SavedContent.user_id == user_id)
+        .order_by(SavedContent.saved_at.desc(), SavedContent.id.desc())
+        .limit(limit + 1)
     )
+    if after_cursor is not None:
+        stmt = stmt.where(after_cursor)
+    rows = (await db.execute(stmt)).mappings().all()
     
+    has_more = len(rows) > limit
+    rows = rows[:limit]
     result = []
-    for saved in saved_items:
+    for row, content in zip(rows, validate_content_rows(rows, view)):
         result.append({
-            "id": saved.id,
-            "saved_at": saved.saved_at,
-            "content": ContentResponse.model_validate(saved.content)
+            "id": row["saved_id"],
+            "saved_at": row["saved_at"],
+            "content": content
         })
     
-    return {
+    last = rows[-1] if has_more else None
+    return ORJSONResponse({
         "user_id": user_id,
-        "total_saved": len(result),
-        "items": result
-    }
+        "total_saved": user.saved_count,
+        "items": result,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(last["saved_at"], last["saved_id"]) if last else None
+    })
 
 
 @router.delete("/{saved_id}", status_code=204)
-def unsave_content(saved_id: int, db: Session = Depends(get_db)):
+async def unsave_content(saved_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Remove saved content
     """
-    saved = db.query(SavedContent).filter(SavedContent.id == saved_id).first()
+    saved = await db.get(SavedContent, saved_id)
     if not saved:
         raise HTTPException(status_code=404, detail="Saved content not found")
     
-    db.delete(saved)
-    db.commit()
+    await db.delete(saved)
+    await db.run_sync(record_save, saved.user_id, saved.content_id, -1)
+    await db.commit()
+    record_user_write(saved.user_id)
+    get_feed_cache().invalidate_user(saved.user_id)
     return None
\ No newline at end of file
@@ -1,9 +1,17 @@
 """
 Scheduler management routes
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
 
+from app import config
+from app.database import get_db, get_read_db
 from app.scheduler.scheduler import get_scheduler
+from app.scheduler import retry_queue
+from app.scheduler.tiers import tier_distribution
+from app.schemas import FetchRetryResponse
+from app.utils import metrics
 
 router = APIRouter(prefix="/scheduler", tags=["scheduler"])
 
@@ -30,10 +38,35 @@ def get_scheduler_status():
     }
 
 
+@router.get("/metrics")
+def get_metrics():
+    """
+    Get fetch counters (succeeded / failed / timed out) and the last run summary
+    """
+    return metrics.snapshot()
+
+
+@router.get("/tiers")
+def get_fetch_tiers(db: Session = Depends(get_read_db)):
+    """
+    Fetch tier distribution: topics, subscribers, refresh interval and topics
+    due now for hot / warm / cold / orphaned
+    """
+    tiers = tier_distribution(db)
+    return {
+        "total_topics": sum(tier["topics"] for tier in tiers.values()),
+        "thresholds": {"hot": config.TIER_HOT_SUBSCRIBERS, "warm": config.TIER_WARM_SUBSCRIBERS},
+        "poll_minutes": config.FETCH_POLL_MINUTES,
+        "tiers": tiers
+    }
+
+
 @router.post("/trigger/fetch")
-async def trigger_fetch_now():
+def trigger_fetch_now():
     """
-    Manually trigger content fetch for all topics
+    Manually trigger content fetch for every topic with subscribers, due or not
+    Runs in the threadpool: the job starts its own event loop and hands its
+    writes to the ingest writer on the main loop.
     """
     scheduler = get_scheduler()
     
@@ -48,7 +81,7 @@ async def trigger_fetch_now():
 
 
 @router.post("/trigger/cleanup")
-async def trigger_cleanup_now():
+def trigger_cleanup_now():
     """
     Manually trigger cleanup of old content
     """
@@ -61,4 +94,57 @@ async def trigger_cleanup_now():
             "status": "completed"
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error triggering cleanup: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error triggering cleanup: {str(e)}")
+
+
+@router.get("/retries")
+def get_retry_queue(
+    status: Optional[str] = Query(None, pattern="^(pending|dead)$", description="Filter by status"),
+    db: Session = Depends(get_db)
+):
+    """
+    Inspect failed topic fetches (pending retries and dead-lettered topics)
+    """
+    retries = retry_queue.list_retries(db, status=status)
+    
+    return {
+        "total": len(retries),
+        "pending": sum(1 for r in retries if r.status == "pending"),
+        "dead": sum(1 for r in retries if r.status == "dead"),
+        "items": [FetchRetryResponse.model_validate(r) for r in retries]
+    }
+
+
+@router.post("/retries/{topic_id}/replay")
+def replay_retry(topic_id: int, db: Session = Depends(get_db)):
+    """
+    Requeue a failed (usually dead-lettered) topic for an immediate retry
+    The retry job picks it up on its next poll.
+    """
+    retry = retry_queue.replay(db, topic_id)
+    if not retry:
+        raise HTTPException(status_code=404, detail="Topic is not in the retry queue")
+    
+    db.commit()
+    db.refresh(retry)
+    
+    return {
+        "message": f"Topic {topic_id} requeued for retry",
+        "retry": FetchRetryResponse.model_validate(retry)
+    }
+
+
+@router.post("/retries/replay-dead")
+def replay_dead_letters(db: Session = Depends(get_db)):
+    """
+    Requeue every dead-lettered topic for an immediate retry
+    """
+    dead = retry_queue.list_retries(db, status="dead")
+    for retry in dead:
+        retry_queue.replay(db, retry.topic_id)
+    db.commit()
+    
+    return {
+        "message": f"Requeued {len(dead)} dead-lettered topics",
+        "topics_requeued": [r.topic_id for r in dead]
+    }
@@ -0,0 +1,47 @@
+"""
+Search routes - Full-text search over a user's content
+Covers the topics the user follows and everything they saved.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db_routing import get_async_replica_db
+from app.models import User
+from app.schemas import SearchResponse
+from app.search.index import search_content
+from app.api.views import validate_content_rows
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("", response_model=SearchResponse)
+async def search(
+    user_id: int,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search for"),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=1000),
+    db: AsyncSession = Depends(get_async_replica_db)
+):
+    """
+    Search the user's topics and saved items, best match first
+    Each hit carries a snippet with the matched terms in <mark> tags.
+    """
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    rows = await db.run_sync(search_content, user_id, q, limit + 1, offset)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = validate_content_rows(rows, "summary")
+    for row, item in zip(rows, items):
+        item.update(topic_name=row["topic_name"], snippet=row["snippet"], score=row["score"])
+    
+    return ORJSONResponse({
+        "user_id": user_id,
+        "query": q,
+        "items": items,
+        "has_more": has_more,
+        "next_offset": offset + limit if has_more else None
+    })
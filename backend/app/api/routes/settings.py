@@ -2,10 +2,11 @@
 User settings routes
 """
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import time
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User, UserSettings
 from app.schemas import UserSettingsUpdate, UserSettingsResponse
 
@@ -13,14 +14,16 @@ router = APIRouter(prefix="/settings", tags=["settings"])
 
 
 @router.get("/{user_id}", response_model=UserSettingsResponse)
-def get_user_settings(user_id: int, db: Session = Depends(get_db)):
+async def get_user_settings(user_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get user settings
     """
-    settings = db.query(UserSettings).filter(UserSettings.user_id == user_id).first()
+    settings = (await db.execute(
+        select(UserSettings).where(UserSettings.user_id == user_id)
+    )).scalar_one_or_none()
     if not settings:
         # Create default settings if not exist
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -31,26 +34,27 @@ def get_user_settings(user_id: int, db: Session = Depends(get_db)):
             delivery_time=time(6, 0)  # 6:00 AM default
         )
         db.add(settings)
-        db.commit()
-        db.refresh(settings)
+        await db.commit()
     
     return settings
 
 
 @router.put("/{user_id}", response_model=UserSettingsResponse)
-def update_user_settings(
+async def update_user_settings(
     user_id: int,
     settings_update: UserSettingsUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update user settings
     """
-    settings = db.query(UserSettings).filter(UserSettings.user_id == user_id).first()
+    settings = (await db.execute(
+        select(UserSettings).where(UserSettings.user_id == user_id)
+    )).scalar_one_or_none()
     
     if not settings:
         # Create if doesn't exist
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -67,7 +71,6 @@ def update_user_settings(
     settings.preferred_languages = settings_update.preferred_languages
     settings.delivery_time = settings_update.delivery_time
     
-    db.commit()
-    db.refresh(settings)
+    await db.commit()
     
     return settings
\ No newline at end of file
@@ -1,29 +1,49 @@
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import Table
-from app.database import get_db, Base
-from app.models import Topic, ContentPool
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import config
+from app.database import get_async_db
+from app.models import Topic, ContentPool, LearningCurriculum, LearningLesson, LearningLessonClaim, UserLearningProgress, user_topics
+from app.feed.cache import get_feed_cache
+from app.feed.entries import delete_topic_entries
+from app.learning.lessons import valid_plan_days
+from app.saves import unsave_topic
+from app.search.vectors import get_vector_index
+from app.topics import normalize_topic_name
 
 router = APIRouter()
 
 
 @router.delete("/{topic_id}")
-async def delete_topic(topic_id: int, db: Session = Depends(get_db)):
+async def delete_topic(topic_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a topic and all associated content"""
-    topic = db.query(Topic).filter(Topic.id == topic_id).first()
+    topic = await db.get(Topic, topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Topic not found")
     
-    # Delete associated content
-    db.query(ContentPool).filter(ContentPool.topic_id == topic_id).delete()
+    # Delete associated content (and its bookmarks and feed entries)
+    content_ids = (await db.execute(select(ContentPool.id).where(ContentPool.topic_id == topic_id))).scalars().all()
+    savers = await db.run_sync(unsave_topic, topic_id)
+    await db.run_sync(delete_topic_entries, topic_id)
+    await db.execute(delete(LearningLesson).where(LearningLesson.topic_id == topic_id))
+    await db.execute(delete(LearningCurriculum).where(LearningCurriculum.topic_id == topic_id))
+    await db.execute(delete(LearningLessonClaim).where(LearningLessonClaim.topic_id == topic_id))
+    await db.execute(delete(UserLearningProgress).where(UserLearningProgress.topic_id == topic_id))
+    await db.execute(delete(ContentPool).where(ContentPool.topic_id == topic_id))
     
-    # Delete user-topic associations using table name
-    user_topics = Table('user_topics', Base.metadata, autoload_with=db.get_bind())
-    db.execute(user_topics.delete().where(user_topics.c.topic_id == topic_id))
+    # Delete user-topic associations
+    await db.execute(user_topics.delete().where(user_topics.c.topic_id == topic_id))
     
     # Delete the topic
-    db.delete(topic)
-    db.commit()
+    await db.delete(topic)
+    await db.commit()
+    get_feed_cache().invalidate_topic(topic_id)
+    for user_id in savers:
+        get_feed_cache().invalidate_user(user_id)
+    await asyncio.to_thread(get_vector_index().remove, content_ids)
     
     return {"message": "Topic deleted successfully"}
 
@@ -32,17 +52,26 @@ async def delete_topic(topic_id: int, db: Session = Depends(get_db)):
 async def update_topic(
     topic_id: int,
     update_data: dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update an existing topic"""
     # Get the topic
-    topic = db.query(Topic).filter(Topic.id == topic_id).first()
+    topic = await db.get(Topic, topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Topic not found")
     
+    if update_data.get("learning_period_days") is not None and not valid_plan_days(update_data["learning_period_days"]):
+        raise HTTPException(
+            status_code=422,
+            detail=f"learning_period_days must be between 1 and {config.LEARNING_MAX_DAYS}"
+        )
+    
+    plan = (topic.description, topic.learning_period_days)
+    
     # Update fields
     if "topic_name" in update_data:
         topic.topic_name = update_data["topic_name"]
+        topic.normalized_name = normalize_topic_name(topic.topic_name)
     if "description" in update_data:
         topic.description = update_data["description"]
     if "feed_source" in update_data:
@@ -50,6 +79,12 @@ async def update_topic(
     if "learning_period_days" in update_data:
         topic.learning_period_days = update_data["learning_period_days"]
     
+    # A learning plan with new goals or length is a new curriculum: new learners
+    # get a freshly planned outline, current ones finish the version they started
+    if topic.topic_type == "learning" and (topic.description, topic.learning_period_days) != plan:
+        topic.curriculum_version = (topic.curriculum_version or 1) + 1
+        topic.current_day = 1
+    
     # Update agent_config
     if topic.agent_config:
         topic.agent_config["topic_name"] = topic.topic_name
@@ -58,7 +93,10 @@ async def update_topic(
         if topic.learning_period_days:
             topic.agent_config["learning_period_days"] = topic.learning_period_days
     
-    db.commit()
-    db.refresh(topic)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Another topic already has this name")
     
     return {"message": "Topic updated successfully", "topic_id": topic.id}
\ No newline at end of file
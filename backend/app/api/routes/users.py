@@ -6,9 +6,10 @@ from sqlalchemy.orm import Session
 from typing import List
 from datetime import time
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import User, UserSettings
 from app.schemas import UserCreate, UserResponse
+from app.subscriptions import unlink_all_topics
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -46,7 +47,7 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+def get_user(user_id: int, db: Session = Depends(get_read_db)):
     """
     Get user by ID
     """
@@ -57,7 +58,7 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/email/{email}", response_model=UserResponse)
-def get_user_by_email(email: str, db: Session = Depends(get_db)):
+def get_user_by_email(email: str, db: Session = Depends(get_read_db)):
     """
     Get user by email
     """
@@ -76,6 +77,8 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    # Unlink first so topic subscriber counts follow
+    unlink_all_topics(db, user_id)
     db.delete(user)
     db.commit()
     return None
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Content projections and the fast JSON path for list endpoints
+?view=full (default) ships every column; ?view=summary leaves
+content_pool.content - the 500+ word body of AI and learning items - out of
+the query and the payload. Cards fetch it from GET /api/content/{id} when
+expanded.
+
+List endpoints select plain columns (Core rows, no ORM objects), validate a
+page once with a list-level TypeAdapter over TypedDict row schemas, and
+serialize the dicts with orjson. That is one pass over the large text fields
+instead of per-row models plus jsonable_encoder plus stdlib json (see
+bench_serialization.py).
+"""
+from datetime import datetime
+from typing import Dict, List, Literal, Sequence
+
+import orjson
+from fastapi import Query
+from pydantic import TypeAdapter
+
+from app.models import ContentPool
+from app.schemas import ContentRow, ContentSummaryRow
+
+ContentView = Literal["full", "summary"]
+
+SUMMARY_COLUMNS = [
+    ContentPool.id,
+    ContentPool.topic_id,
+    ContentPool.title,
+    ContentPool.summary,
+    ContentPool.url,
+    ContentPool.image_url,
+    ContentPool.source,
+    ContentPool.fetched_at,
+]
+FULL_COLUMNS = SUMMARY_COLUMNS + [ContentPool.content]
+
+_ROW_ADAPTERS = {
+    "full": TypeAdapter(List[ContentRow]),
+    "summary": TypeAdapter(List[ContentSummaryRow]),
+}
+
+
+def content_view(
+    view: ContentView = Query("full", description="'summary' leaves out the full content body")
+) -> ContentView:
+    """Dependency for the ?view= query parameter"""
+    return view
+
+
+def content_columns(view: ContentView) -> list:
+    """ContentPool columns to select for this view"""
+    return SUMMARY_COLUMNS if view == "summary" else FULL_COLUMNS
+
+
+def validate_content_rows(rows: Sequence, view: ContentView) -> List[dict]:
+    """
+    Validate a page of row mappings as content items (one TypeAdapter call)
+    Extra columns in the rows (topic_name, saved_id, ...) are dropped.
+    """
+    return _ROW_ADAPTERS[view].validate_python(rows)
+
+
+def render_feed(user_id: int, date: datetime, rows: Sequence, view: ContentView) -> bytes:
+    """
+    Serialize a day's feed (FeedResponse shape) from rows ordered best first
+    Rows carry the content columns plus topic_name. An article that appears
+    more than once (same URL, e.g. under two topics) is kept where it ranks
+    highest.
+    """
+    topic_feeds: Dict[int, dict] = {}
+    seen_urls = set()
+    for row, item in zip(rows, validate_content_rows(rows, view)):
+        url = (item.get("url") or "").strip().rstrip("/")
+        if url:
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+        topic_feed = topic_feeds.get(item["topic_id"])
+        if topic_feed is None:
+            topic_feed = topic_feeds[item["topic_id"]] = {
+                "topic_name": row["topic_name"],
+                "topic_id": item["topic_id"],
+                "items": []
+            }
+        topic_feed["items"].append(item)
+    return orjson.dumps({"user_id": user_id, "date": date, "topics": list(topic_feeds.values())})
@@ -0,0 +1,234 @@
+"""
+Configuration for AI Sutra
+All tunables are read from environment variables (see .env)
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _int_env(name: str, default: int) -> int:
+    """Read an integer environment variable, falling back to default"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+def _float_env(name: str, default: float) -> float:
+    """Read a float environment variable, falling back to default"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return float(value)
+
+
+# ============= CLAUDE CLIENT =============
+
+# Seconds to establish a connection to the Anthropic API
+CLAUDE_CONNECT_TIMEOUT_SECONDS = _float_env("CLAUDE_CONNECT_TIMEOUT_SECONDS", 10.0)
+
+# Seconds to wait for response bytes (web search calls routinely take 20-60s)
+CLAUDE_READ_TIMEOUT_SECONDS = _float_env("CLAUDE_READ_TIMEOUT_SECONDS", 90.0)
+
+# Retries done by the SDK itself before the error reaches the retry queue
+CLAUDE_MAX_RETRIES = _int_env("CLAUDE_MAX_RETRIES", 1)
+
+
+# ============= TOPIC FETCH =============
+
+# Overall deadline for one topic (all API calls plus DB writes)
+TOPIC_FETCH_TIMEOUT_SECONDS = _float_env("TOPIC_FETCH_TIMEOUT_SECONDS", 180.0)
+
+# Topics fetched at the same time - bounded by API rate limits, not DB connections
+FETCH_CONCURRENCY = _int_env("FETCH_CONCURRENCY", 2)
+
+
+# ============= FETCH TIERS =============
+
+# How often the scheduler looks for topics due a refresh (see app/scheduler/tiers.py)
+FETCH_POLL_MINUTES = _int_env("FETCH_POLL_MINUTES", 30)
+
+# Subscribers needed for the hot / warm tiers (below warm: cold; none: orphaned, never fetched)
+TIER_HOT_SUBSCRIBERS = _int_env("TIER_HOT_SUBSCRIBERS", 25)
+TIER_WARM_SUBSCRIBERS = _int_env("TIER_WARM_SUBSCRIBERS", 3)
+
+# Refresh interval per tier
+TIER_HOT_INTERVAL_HOURS = _float_env("TIER_HOT_INTERVAL_HOURS", 4.0)
+TIER_WARM_INTERVAL_HOURS = _float_env("TIER_WARM_INTERVAL_HOURS", 12.0)
+TIER_COLD_INTERVAL_HOURS = _float_env("TIER_COLD_INTERVAL_HOURS", 24.0)
+
+
+# ============= ADAPTIVE REFRESH =============
+
+# Weight of the latest fetch in a topic's novelty average (share of new URLs, see app/scheduler/refresh.py)
+REFRESH_NOVELTY_ALPHA = _float_env("REFRESH_NOVELTY_ALPHA", 0.3)
+
+# Above HIGH the topic is fetched sooner, below LOW later
+REFRESH_NOVELTY_HIGH = _float_env("REFRESH_NOVELTY_HIGH", 0.7)
+REFRESH_NOVELTY_LOW = _float_env("REFRESH_NOVELTY_LOW", 0.3)
+
+# Multiplicative decrease / additive increase of the factor applied to the tier interval
+REFRESH_FACTOR_DECREASE = _float_env("REFRESH_FACTOR_DECREASE", 0.5)
+REFRESH_FACTOR_STEP = _float_env("REFRESH_FACTOR_STEP", 0.5)
+
+# Bounds of the factor (a cold topic at 24h: between 6h and 4 days)
+REFRESH_FACTOR_MIN = _float_env("REFRESH_FACTOR_MIN", 0.25)
+REFRESH_FACTOR_MAX = _float_env("REFRESH_FACTOR_MAX", 4.0)
+
+
+# ============= FETCH RETRY QUEUE =============
+
+# How often the scheduler polls for topics whose retry is due
+RETRY_POLL_MINUTES = _int_env("RETRY_POLL_MINUTES", 5)
+
+# Base delay (seconds) before the first retry; doubled on every attempt
+RETRY_BASE_DELAY_SECONDS = _int_env("RETRY_BASE_DELAY_SECONDS", 120)
+
+# Upper bound for a single backoff delay
+RETRY_MAX_DELAY_SECONDS = _int_env("RETRY_MAX_DELAY_SECONDS", 3 * 60 * 60)
+
+# Attempts allowed for transient errors (rate limits, overload, timeouts)
+RETRY_MAX_ATTEMPTS = _int_env("RETRY_MAX_ATTEMPTS", 6)
+
+# Attempts allowed when the model answered but the payload could not be parsed
+RETRY_PARSE_MAX_ATTEMPTS = _int_env("RETRY_PARSE_MAX_ATTEMPTS", 2)
+
+
+# ============= INGEST WRITER =============
+
+# "auto" (single writer for SQLite only), "on" or "off"
+INGEST_WRITER = os.getenv("INGEST_WRITER", "auto").strip().lower()
+
+# A group commit is flushed after this many milliseconds...
+INGEST_WRITER_FLUSH_MS = _float_env("INGEST_WRITER_FLUSH_MS", 20.0)
+
+# ...or as soon as it holds this many content rows
+INGEST_WRITER_MAX_ITEMS = _int_env("INGEST_WRITER_MAX_ITEMS", 200)
+
+
+# ============= READ REPLICAS =============
+
+# Comma-separated replica URLs for lag-tolerant reads (empty = read from the primary)
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+# After a user writes, their reads stay on the primary this long (max expected replica lag)
+REPLICA_STICKY_SECONDS = _float_env("REPLICA_STICKY_SECONDS", 10.0)
+
+
+# ============= FEED CACHE =============
+
+# Memory cap for cached feed payloads, in MB (0 disables the cache)
+FEED_CACHE_MAX_MB = _float_env("FEED_CACHE_MAX_MB", 64.0)
+
+
+# ============= FEED DELTA SYNC =============
+
+# GET /api/feed/{user_id}/changes: how long removal tombstones are kept;
+# clients with an older cursor are told to reload the full feed
+FEED_TOMBSTONE_DAYS = _int_env("FEED_TOMBSTONE_DAYS", 30)
+
+
+# ============= RESPONSE COMPRESSION =============
+
+# Responses smaller than this are sent uncompressed (headers would eat the gain)
+COMPRESSION_MIN_BYTES = _int_env("COMPRESSION_MIN_BYTES", 1024)
+
+# Levels: moderate settings, these payloads are compressed per request
+COMPRESSION_GZIP_LEVEL = _int_env("COMPRESSION_GZIP_LEVEL", 6)
+COMPRESSION_BROTLI_QUALITY = _int_env("COMPRESSION_BROTLI_QUALITY", 5)
+COMPRESSION_ZSTD_LEVEL = _int_env("COMPRESSION_ZSTD_LEVEL", 3)
+
+# Memory cap for compressed bodies of responses with an ETag, in MB (0 disables)
+COMPRESSION_CACHE_MAX_MB = _float_env("COMPRESSION_CACHE_MAX_MB", 32.0)
+
+
+# ============= RELATED CONTENT =============
+
+# Directory of the memory-mapped vector index (vectors.f32, ids.i64, meta.json)
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "./vector_index")
+
+# Hashed dimensions per item; the matrix takes items x dim x 4 bytes (64 -> 256 MB at 1M items)
+VECTOR_DIM = _int_env("VECTOR_DIM", 64)
+
+
+# ============= FEED RANKING =============
+
+# Recency: an item's score drops by ln(2) per half-life (see app/feed/ranking.py)
+RANK_HALF_LIFE_HOURS = _float_env("RANK_HALF_LIFE_HOURS", 24.0)
+
+# Weight of ln(1 + global saves) of an item
+RANK_ENGAGEMENT_WEIGHT = _float_env("RANK_ENGAGEMENT_WEIGHT", 1.0)
+
+# Weight of the source's log save-rate lift, smoothed with this many pseudo-items
+RANK_SOURCE_WEIGHT = _float_env("RANK_SOURCE_WEIGHT", 1.0)
+RANK_SOURCE_PRIOR_ITEMS = _int_env("RANK_SOURCE_PRIOR_ITEMS", 20)
+
+# Weight of ln(1 + the reader's own saves from the item's source)
+RANK_USER_WEIGHT = _float_env("RANK_USER_WEIGHT", 0.5)
+
+
+# ============= TOPIC CANONICALIZATION =============
+
+# Similarity (token sets / TF-IDF cosine, see app/topics.py) at which a new topic links to an existing one
+TOPIC_MATCH_THRESHOLD = _float_env("TOPIC_MATCH_THRESHOLD", 0.85)
+
+
+# ============= LEARNING LESSONS =============
+
+# Plan length used when a learning topic has none
+LEARNING_DEFAULT_DAYS = _int_env("LEARNING_DEFAULT_DAYS", 30)
+
+# Longest learning plan a topic can have (longer requests are cut to this)
+LEARNING_MAX_DAYS = _int_env("LEARNING_MAX_DAYS", 365)
+
+# Curriculum outlines are planned this many days at a time, so one planning response stays well under its token cap
+LEARNING_PLAN_WINDOW_DAYS = _int_env("LEARNING_PLAN_WINDOW_DAYS", 30)
+
+# Lessons generated (in parallel) per fetch of a learning topic; learners further apart wait for the next fetch
+LEARNING_LESSONS_PER_FETCH = _int_env("LEARNING_LESSONS_PER_FETCH", 3)
+
+# Lesson prompts list the last N planned days by title; earlier days are folded into one line of at most this many characters
+LEARNING_SUMMARY_DAYS = _int_env("LEARNING_SUMMARY_DAYS", 3)
+LEARNING_SUMMARY_CHARS = _int_env("LEARNING_SUMMARY_CHARS", 300)
+
+
+# ============= LESSON PREFETCH =============
+
+# Lessons kept generated ahead of each active learner (their next day included; 0 disables prefetching)
+LEARNING_PREFETCH_DAYS = _int_env("LEARNING_PREFETCH_DAYS", 2)
+
+# Off-peak hours (cron hour field, local time) when the prefetch job runs, once an hour
+LEARNING_PREFETCH_HOURS = os.getenv("LEARNING_PREFETCH_HOURS", "1-5")
+
+# Topics prefetched at the same time - kept below FETCH_CONCURRENCY so the regular fetch keeps the API
+LEARNING_PREFETCH_CONCURRENCY = _int_env("LEARNING_PREFETCH_CONCURRENCY", 1)
+
+# Lessons generated per prefetch run at most
+LEARNING_PREFETCH_MAX_LESSONS = _int_env("LEARNING_PREFETCH_MAX_LESSONS", 60)
+
+# Learners who haven't refreshed a plan for this many days get no lessons ahead
+LEARNING_INACTIVE_DAYS = _int_env("LEARNING_INACTIVE_DAYS", 7)
+
+
+# ============= LESSON CLAIMS =============
+
+# A fetch claims the lessons it generates for this long; other fetches wait for them and take over once it runs out
+LEARNING_CLAIM_LEASE_SECONDS = _float_env("LEARNING_CLAIM_LEASE_SECONDS", TOPIC_FETCH_TIMEOUT_SECONDS + 60)
+
+# How often a waiting fetch checks whether the claimed lessons are stored
+LEARNING_CLAIM_POLL_SECONDS = _float_env("LEARNING_CLAIM_POLL_SECONDS", 0.5)
+
+
+# ============= CONTENT RETENTION =============
+
+# Feed topics keep content this many days; learning lessons and saved items are kept (see app/retention.py)
+RETENTION_FEED_DAYS = _int_env("RETENTION_FEED_DAYS", 7)
+
+# Content rows deleted per transaction - small, so ingest never waits long for the write lock
+RETENTION_BATCH_SIZE = _int_env("RETENTION_BATCH_SIZE", 500)
+
+# SQLite: free pages returned to the OS after a run with PRAGMA incremental_vacuum
+# (0 = off; needs auto_vacuum = INCREMENTAL, otherwise freed pages are only reused)
+RETENTION_VACUUM_PAGES = _int_env("RETENTION_VACUUM_PAGES", 0)
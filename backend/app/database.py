@@ -1,28 +1,52 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
 import os
 from dotenv import load_dotenv
 
+from app.db_profiles import get_profile, build_engine, build_async_engine, is_sqlite_memory
+
 # Load environment variables
 load_dotenv()
 
 # Get database URL from environment
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ai_sutra.db")
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=True if os.getenv("DEBUG", "True") == "True" else False
+# Engine settings (pragmas, pool, timeouts, SQL logging) come from DB_PROFILE
+ENGINE_PROFILE = get_profile()
+
+# Create SQLAlchemy engine (writes)
+engine = build_engine(DATABASE_URL, ENGINE_PROFILE)
+
+# Read-only engine: its connections reject writes, so read paths can never
+# take SQLite's write lock (in-memory databases can't be shared, reuse engine)
+read_engine = (
+    engine if is_sqlite_memory(DATABASE_URL)
+    else build_engine(DATABASE_URL, ENGINE_PROFILE, read_only=True)
 )
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sessions for read-only request handlers
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Async engines (aiosqlite / asyncpg) for async request handlers
+async_engine = build_async_engine(DATABASE_URL, ENGINE_PROFILE)
+async_read_engine = (
+    async_engine if is_sqlite_memory(DATABASE_URL)
+    else build_async_engine(DATABASE_URL, ENGINE_PROFILE, read_only=True)
+)
+
+# expire_on_commit=False: attributes stay loaded after commit (no implicit IO)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -40,12 +64,150 @@ def get_db():
         db.close()
 
 
+# Dependency to get a read-only database session
+def get_read_db():
+    """
+    Dependency function to get a read-only database session.
+    Use for GET routes that never write.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency to get an async database session
+async def get_async_db():
+    """
+    Dependency function to get an async database session.
+    Use in `async def` routes so queries don't block the event loop.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependency to get an async read-only database session
+async def get_async_read_db():
+    """
+    Dependency function to get an async read-only database session.
+    """
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engines():
+    """Close pooled async connections (on shutdown)"""
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
+
+
+@contextmanager
+def session_scope(session_factory=None):
+    """
+    Short-lived session for a single unit of work.
+    Commits on success, rolls back on error, always closes.
+    Use this instead of holding a session across slow (API) calls.
+    """
+    db = (session_factory or SessionLocal)()
+    try:
+        yield db
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
 # Initialize database (create all tables)
+def _add_missing_columns() -> list:
+    """
+    Add columns introduced since a table was created (create_all skips existing tables)
+    Only for additive columns that are nullable or have a server default.
+    
+    Returns:
+        "table.column" names that were added
+    """
+    added = []
+    inspector = inspect(engine)
+    ddl = engine.dialect.ddl_compiler(engine.dialect, None)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                default = ddl.get_column_default_string(column)
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                    f"{column.type.compile(dialect=engine.dialect)}"
+                    + (f" DEFAULT {default}" if default is not None else "")
+                ))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
 def init_db():
     """
     Initialize database by creating all tables.
     Call this on application startup.
     """
     from app import models  # Import here to avoid circular imports
+    from app.feed.entries import rebuild as rebuild_feed_entries
+    from app.feed.ranking import rescore_all
+    from app.learning.lessons import adopt_legacy_lessons
+    
+    from app.saves import recount_saved
+    from app.search.index import ensure_search_index
+    from app.subscriptions import recount_subscribers
+    from app.topics import assign_normalized_names
+    
+    feed_entries_existed = inspect(engine).has_table("user_feed_entries")
+    learning_progress_existed = inspect(engine).has_table("user_learning_progress")
     Base.metadata.create_all(bind=engine)
+    added_columns = _add_missing_columns()
+    
+    # Indexes replaced since: topic names used to be unique across kinds (ix_topics_kind_normalized_name)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS ix_topics_normalized_name"))
+    # create_all skips existing tables; add indexes introduced since they were created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    # First start with the materialized feed: backfill it from existing content
+    if not feed_entries_existed:
+        with session_scope() as db:
+            rows = rebuild_feed_entries(db)
+        print(f"✅ Materialized feed built ({rows} entries)")
+    # Databases from before full-text search: create and backfill the index
+    if ensure_search_index(engine):
+        print("✅ Search index built")
+    if "users.saved_count" in added_columns:
+        with session_scope() as db:
+            recount_saved(db)
+        print("✅ Saved counters backfilled")
+    # Databases from before feed ranking: score existing content and feed entries
+    if "content_pool.rank_score" in added_columns:
+        with session_scope() as db:
+            scored = rescore_all(db)
+        print(f"✅ Feed ranking scores backfilled ({scored} items)")
+    # Databases from before topic canonicalization (see topic_report.py for near-duplicates)
+    if "topics.normalized_name" in added_columns:
+        with session_scope() as db:
+            named = assign_normalized_names(db)
+        print(f"✅ Topic names normalized ({named} topics)")
+    if "topics.subscriber_count" in added_columns:
+        with session_scope() as db:
+            recount_subscribers(db)
+        print("✅ Topic subscriber counts backfilled")
+    # Databases from before the lesson store: register existing lessons, one cursor per learner
+    if not learning_progress_existed:
+        with session_scope() as db:
+            adopted = adopt_legacy_lessons(db)
+        print(f"✅ Learning lessons registered ({adopted} lessons)")
     print("✅ Database initialized successfully!")
\ No newline at end of file
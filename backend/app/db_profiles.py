@@ -0,0 +1,218 @@
+"""
+Database engine profiles
+A profile bundles the engine settings for an environment: SQL logging,
+SQLite pragmas (journal mode, synchronous, cache, mmap), connection pool
+sizing and Postgres statement timeouts. Selected with DB_PROFILE.
+"""
+import os
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+@dataclass(frozen=True)
+class EngineProfile:
+    """Engine settings for one environment"""
+    name: str
+    echo: bool = False
+    
+    # SQLite pragmas, applied on every new connection
+    sqlite_journal_mode: Optional[str] = None  # "WAL", "DELETE", ... (None = SQLite default)
+    sqlite_synchronous: Optional[str] = None  # "NORMAL", "FULL", ...
+    sqlite_cache_size_kib: Optional[int] = None  # page cache per connection
+    sqlite_mmap_size_bytes: Optional[int] = None
+    sqlite_busy_timeout_ms: int = 5000
+    
+    # Connection pool (QueuePool)
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_pre_ping: bool = False
+    pool_recycle_seconds: int = -1
+    
+    # Postgres per-connection timeouts (0 = no limit)
+    pg_statement_timeout_ms: int = 0
+    pg_idle_in_transaction_timeout_ms: int = 0
+
+
+PROFILES: Dict[str, EngineProfile] = {
+    # Local development: SQLite defaults (rollback journal), small pool
+    "development": EngineProfile(name="development"),
+    
+    # Production: WAL so readers never block the writer, fsync only at
+    # checkpoints, bigger caches, pre-ping and bounded statements on Postgres
+    "production": EngineProfile(
+        name="production",
+        sqlite_journal_mode="WAL",
+        sqlite_synchronous="NORMAL",
+        sqlite_cache_size_kib=64 * 1024,
+        sqlite_mmap_size_bytes=256 * 1024 * 1024,
+        sqlite_busy_timeout_ms=10000,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+        pool_recycle_seconds=1800,
+        pg_statement_timeout_ms=15000,
+        pg_idle_in_transaction_timeout_ms=60000,
+    ),
+}
+
+
+def get_profile(name: Optional[str] = None) -> EngineProfile:
+    """
+    Resolve the engine profile from DB_PROFILE, with env overrides
+    
+    Overrides: SQL_ECHO, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_STATEMENT_TIMEOUT_MS
+    """
+    name = (name or os.getenv("DB_PROFILE", "development")).strip().lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{name}' (expected one of {sorted(PROFILES)})")
+    profile = PROFILES[name]
+    
+    overrides = {}
+    if os.getenv("SQL_ECHO"):
+        overrides["echo"] = os.getenv("SQL_ECHO").strip().lower() in ("1", "true", "yes", "on")
+    if os.getenv("DB_POOL_SIZE"):
+        overrides["pool_size"] = int(os.getenv("DB_POOL_SIZE"))
+    if os.getenv("DB_MAX_OVERFLOW"):
+        overrides["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW"))
+    if os.getenv("DB_STATEMENT_TIMEOUT_MS"):
+        overrides["pg_statement_timeout_ms"] = int(os.getenv("DB_STATEMENT_TIMEOUT_MS"))
+    
+    return replace(profile, **overrides) if overrides else profile
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def is_sqlite_memory(url: str) -> bool:
+    """In-memory SQLite databases cannot be shared between engines"""
+    return is_sqlite(url) and (url.rstrip("/") in ("sqlite:", "sqlite+pysqlite:") or ":memory:" in url)
+
+
+# Async driver for each sync dialect
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Map a sync database URL to its async driver
+    sqlite:///./ai_sutra.db -> sqlite+aiosqlite:///./ai_sutra.db
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def _sqlite_pragmas(profile: EngineProfile, read_only: bool):
+    """Build the connect listener applying the profile's pragmas"""
+    pragmas = [f"PRAGMA busy_timeout = {profile.sqlite_busy_timeout_ms}"]
+    if profile.sqlite_journal_mode:
+        pragmas.append(f"PRAGMA journal_mode = {profile.sqlite_journal_mode}")
+    if profile.sqlite_synchronous:
+        pragmas.append(f"PRAGMA synchronous = {profile.sqlite_synchronous}")
+    if profile.sqlite_cache_size_kib:
+        pragmas.append(f"PRAGMA cache_size = -{profile.sqlite_cache_size_kib}")  # negative = KiB
+    if profile.sqlite_mmap_size_bytes:
+        pragmas.append(f"PRAGMA mmap_size = {profile.sqlite_mmap_size_bytes}")
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+    
+    return on_connect
+
+
+def engine_kwargs(url: str, profile: EngineProfile, read_only: bool = False) -> dict:
+    """
+    create_engine() keyword arguments for a URL under a profile
+    Shared by the sync and async engines.
+    """
+    kwargs = {"echo": profile.echo, "pool_pre_ping": profile.pool_pre_ping}
+    
+    if is_sqlite(url):
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if not is_sqlite_memory(url):
+            kwargs["pool_size"] = profile.pool_size
+            kwargs["max_overflow"] = profile.max_overflow
+        return kwargs
+    
+    kwargs["pool_size"] = profile.pool_size
+    kwargs["max_overflow"] = profile.max_overflow
+    kwargs["pool_recycle"] = profile.pool_recycle_seconds
+    
+    if url.startswith("postgresql"):
+        options = []
+        if profile.pg_statement_timeout_ms:
+            options.append(f"-c statement_timeout={profile.pg_statement_timeout_ms}")
+        if profile.pg_idle_in_transaction_timeout_ms:
+            options.append(f"-c idle_in_transaction_session_timeout={profile.pg_idle_in_transaction_timeout_ms}")
+        if read_only:
+            options.append("-c default_transaction_read_only=on")
+        if options:
+            kwargs["connect_args"] = {"options": " ".join(options)}
+    
+    return kwargs
+
+
+def apply_profile_listeners(engine: Engine, url: str, profile: EngineProfile, read_only: bool = False) -> None:
+    """Register per-connection setup (SQLite pragmas) on an engine"""
+    if is_sqlite(url):
+        event.listen(engine, "connect", _sqlite_pragmas(profile, read_only))
+
+
+def build_engine(url: str, profile: EngineProfile, read_only: bool = False) -> Engine:
+    """
+    Create a sync engine for a URL under a profile
+    
+    Args:
+        url: Database URL
+        profile: Engine profile
+        read_only: Reject writes on this engine's connections
+    """
+    engine = create_engine(url, **engine_kwargs(url, profile, read_only))
+    apply_profile_listeners(engine, url, profile, read_only)
+    return engine
+
+
+def build_async_engine(url: str, profile: EngineProfile, read_only: bool = False) -> AsyncEngine:
+    """
+    Create an async engine (aiosqlite / asyncpg) for a sync URL under a profile
+    
+    Args:
+        url: Database URL (sync form; the async driver is substituted)
+        profile: Engine profile
+        read_only: Reject writes on this engine's connections
+    """
+    kwargs = engine_kwargs(url, profile, read_only)
+    
+    if is_sqlite(url):
+        if not is_sqlite_memory(url):
+            # aiosqlite defaults to NullPool; keep connections (and their pragmas) around
+            kwargs["poolclass"] = AsyncAdaptedQueuePool
+    else:
+        # asyncpg takes server settings instead of libpq "-c" options
+        kwargs.pop("connect_args", None)
+        server_settings = {}
+        if profile.pg_statement_timeout_ms:
+            server_settings["statement_timeout"] = str(profile.pg_statement_timeout_ms)
+        if profile.pg_idle_in_transaction_timeout_ms:
+            server_settings["idle_in_transaction_session_timeout"] = str(profile.pg_idle_in_transaction_timeout_ms)
+        if read_only:
+            server_settings["default_transaction_read_only"] = "on"
+        if server_settings:
+            kwargs["connect_args"] = {"server_settings": server_settings}
+    
+    engine = create_async_engine(to_async_url(url), **kwargs)
+    apply_profile_listeners(engine.sync_engine, url, profile, read_only)
+    return engine
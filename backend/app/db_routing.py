@@ -0,0 +1,150 @@
+"""
+Read-replica routing
+Writes always go to the primary. Lag-tolerant reads (feed, saved list, user
+topics) go to the replicas in DATABASE_REPLICA_URLS, except for a user who
+wrote within the last REPLICA_STICKY_SECONDS: their reads stay on the primary
+so they always see their own writes.
+
+Stickiness is tracked in-process. With several API processes, route a user's
+requests to the same process (or keep the window above the replica lag).
+"""
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app import config
+from app.database import ENGINE_PROFILE, AsyncReadSessionLocal, ReadSessionLocal
+from app.db_profiles import build_async_engine, build_engine
+from app.utils import metrics
+
+
+class ReplicaRouter:
+    """
+    Picks the session factory for a read: a replica (round robin) or,
+    for users with recent writes, the primary
+    """
+    
+    def __init__(
+        self,
+        primary: sessionmaker,
+        async_primary: async_sessionmaker,
+        replicas: List[sessionmaker] = None,
+        async_replicas: List[async_sessionmaker] = None,
+        sticky_seconds: float = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.primary = primary
+        self.async_primary = async_primary
+        self.replicas = replicas or []
+        self.async_replicas = async_replicas or []
+        self.sticky_seconds = sticky_seconds if sticky_seconds is not None else config.REPLICA_STICKY_SECONDS
+        self.clock = clock
+        self._last_write: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._next = itertools.count()
+    
+    def record_write(self, user_id: int):
+        """Pin a user's reads to the primary for the stickiness window"""
+        now = self.clock()
+        with self._lock:
+            self._last_write[user_id] = now
+            if len(self._last_write) > 10000:
+                self._prune(now)
+    
+    def is_sticky(self, user_id: Optional[int]) -> bool:
+        """Whether this user's reads must go to the primary"""
+        if user_id is None:
+            return False
+        with self._lock:
+            written_at = self._last_write.get(user_id)
+        return written_at is not None and self.clock() - written_at < self.sticky_seconds
+    
+    def _prune(self, now: float):
+        expired = [uid for uid, at in self._last_write.items() if now - at >= self.sticky_seconds]
+        for uid in expired:
+            del self._last_write[uid]
+    
+    def _pick(self, primary, replicas, user_id: Optional[int]):
+        if not replicas or self.is_sticky(user_id):
+            metrics.incr("db_routing.primary_reads")
+            return primary
+        metrics.incr("db_routing.replica_reads")
+        return replicas[next(self._next) % len(replicas)]
+    
+    def session_factory(self, user_id: Optional[int] = None) -> sessionmaker:
+        """Sync session factory for a lag-tolerant read"""
+        return self._pick(self.primary, self.replicas, user_id)
+    
+    def async_session_factory(self, user_id: Optional[int] = None) -> async_sessionmaker:
+        """Async session factory for a lag-tolerant read"""
+        return self._pick(self.async_primary, self.async_replicas, user_id)
+
+
+def build_replica_router(replica_urls: List[str] = None) -> ReplicaRouter:
+    """Router over the primary's read-only sessions and read-only replica engines"""
+    replica_urls = config.DATABASE_REPLICA_URLS if replica_urls is None else replica_urls
+    return ReplicaRouter(
+        primary=ReadSessionLocal,
+        async_primary=AsyncReadSessionLocal,
+        replicas=[
+            sessionmaker(autocommit=False, autoflush=False, bind=build_engine(url, ENGINE_PROFILE, read_only=True))
+            for url in replica_urls
+        ],
+        async_replicas=[
+            async_sessionmaker(build_async_engine(url, ENGINE_PROFILE, read_only=True),
+                               autoflush=False, expire_on_commit=False)
+            for url in replica_urls
+        ]
+    )
+
+
+# Process-wide router
+_router: Optional[ReplicaRouter] = None
+
+
+def get_replica_router() -> ReplicaRouter:
+    """Get the process-wide router (built on first use)"""
+    global _router
+    if _router is None:
+        _router = build_replica_router()
+    return _router
+
+
+def set_replica_router(router: Optional[ReplicaRouter]) -> Optional[ReplicaRouter]:
+    """Replace the process-wide router (tests, local replica setups); returns the previous one"""
+    global _router
+    previous, _router = _router, router
+    return previous
+
+
+def record_user_write(user_id: int):
+    """Call after committing a write the user will expect to read back"""
+    get_replica_router().record_write(user_id)
+
+
+# Dependency to get a lag-tolerant read session for a user's route
+def get_replica_db(user_id: int):
+    """
+    Dependency function to get a read session on a replica
+    (or on the primary if the user wrote recently).
+    `user_id` is taken from the route's path.
+    """
+    db = get_replica_router().session_factory(user_id)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Async dependency to get a lag-tolerant read session for a user's route
+async def get_async_replica_db(user_id: int):
+    """
+    Async dependency function to get a read session on a replica
+    (or on the primary if the user wrote recently).
+    """
+    async with get_replica_router().async_session_factory(user_id)() as db:
+        yield db
@@ -0,0 +1,4 @@
+"""
+Feed package for AI Sutra
+Materialized per-user feed entries
+"""
@@ -0,0 +1,223 @@
+"""
+In-process feed response cache
+Rendered GET /api/feed payloads keyed by (user_id, date), LRU-evicted under
+a memory cap (FEED_CACHE_MAX_MB).
+
+Every cached payload carries the ETag it was rendered for. The ETag is
+derived from the user's topic set, when each topic last changed (its
+last_fetched, or content_removed_at if retention deleted content since) and
+when the user's own saves last re-ranked it (users.feed_changed_at), so a hit
+is only served while it still matches what the database says - ingest
+elsewhere (another process) can never serve a stale feed. On top of that,
+entries are dropped as soon as one of the user's topics ingests content,
+the user's topic set changes or the user saves / unsaves, so memory isn't
+spent on dead payloads.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app import config
+from app.ingest.batch import IngestBatch
+from app.ingest.hooks import register_after_commit
+from app.utils import metrics
+
+CacheKey = Tuple[int, str]  # (user_id, "YYYY-MM-DD/view")
+
+
+@dataclass(frozen=True)
+class FeedValidators:
+    """HTTP validators for one user's feed on one date"""
+    etag: str
+    last_modified: Optional[datetime]
+    topic_ids: Tuple[int, ...]
+    
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = http_date(self.last_modified)
+        return headers
+    
+    def not_modified(self, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+        """Whether the client's cached copy is still current (RFC 9110 precedence)"""
+        if if_none_match:
+            candidates = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in candidates or any(_weak(tag) == _weak(self.etag) for tag in candidates)
+        if if_modified_since and self.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return _to_utc(self.last_modified).replace(microsecond=0) <= since
+        return False
+
+
+@dataclass
+class CachedFeed:
+    body: bytes
+    validators: FeedValidators
+
+
+def _weak(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _to_utc(value: datetime) -> datetime:
+    # Naive timestamps in this app are local time
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_to_utc(value), usegmt=True)
+
+
+def changed_at(last_fetched: Optional[datetime], content_removed_at: Optional[datetime]) -> Optional[datetime]:
+    """When a topic's content last changed: fetched, or expired by retention"""
+    stamps = [stamp for stamp in (last_fetched, content_removed_at) if stamp is not None]
+    return max(stamps) if stamps else None
+
+
+def compute_validators(
+    user_id: int,
+    date_key: str,
+    topics: Iterable[Tuple[int, Optional[datetime]]],
+    user_changed_at: Optional[datetime] = None
+) -> FeedValidators:
+    """
+    Build validators from the user's (topic_id, changed_at) pairs and their
+    feed_changed_at
+    Changes whenever a topic is fetched, loses content to retention, the
+    topic set changes, or the user's saves re-rank the feed.
+    """
+    topics = sorted(topics, key=lambda t: t[0])
+    fingerprint = f"{user_id}|{date_key}|" + ",".join(
+        f"{topic_id}@{last_fetched.isoformat() if last_fetched else '-'}" for topic_id, last_fetched in topics
+    )
+    if user_changed_at is not None:
+        fingerprint += f"|saves@{user_changed_at.isoformat()}"
+    fetched = [last_fetched for _, last_fetched in topics if last_fetched is not None]
+    if user_changed_at is not None:
+        fetched.append(user_changed_at)
+    return FeedValidators(
+        etag=f'W/"{hashlib.sha1(fingerprint.encode()).hexdigest()[:20]}"',
+        last_modified=max(fetched) if fetched else None,
+        topic_ids=tuple(topic_id for topic_id, _ in topics)
+    )
+
+
+class FeedCache:
+    """Byte-capped LRU of rendered feeds with per-user and per-topic invalidation"""
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, CachedFeed]" = OrderedDict()
+        self._bytes = 0
+        self._keys_by_user: Dict[int, Set[CacheKey]] = {}
+        self._users_by_topic: Dict[int, Set[int]] = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+    
+    def get(self, key: CacheKey, validators: FeedValidators) -> Optional[bytes]:
+        """Cached body for key, if it was rendered for the current validators"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.validators.etag == validators.etag:
+                self._entries.move_to_end(key)
+                metrics.incr("feed_cache.hits")
+                return entry.body
+            if entry is not None:
+                self._remove(key)  # rendered for an older state
+        metrics.incr("feed_cache.misses")
+        return None
+    
+    def put(self, key: CacheKey, body: bytes, validators: FeedValidators):
+        """Store a rendered feed, evicting least recently used ones over the cap"""
+        if not self.enabled or len(body) > self.max_bytes:
+            return
+        user_id = key[0]
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CachedFeed(body, validators)
+            self._bytes += len(body)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+            for topic_id in validators.topic_ids:
+                self._users_by_topic.setdefault(topic_id, set()).add(user_id)
+            
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                metrics.incr("feed_cache.evictions")
+            metrics.set_gauge("feed_cache.bytes", self._bytes)
+    
+    def invalidate_user(self, user_id: int) -> int:
+        """Drop every cached feed of a user (topic set changed, or a save re-ranked it)"""
+        with self._lock:
+            return self._invalidate_users([user_id])
+    
+    def invalidate_topic(self, topic_id: int) -> int:
+        """Drop the cached feeds of every user following a topic (content changed)"""
+        with self._lock:
+            return self._invalidate_users(list(self._users_by_topic.pop(topic_id, ())))
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self._users_by_topic.clear()
+            self._bytes = 0
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+    
+    def _invalidate_users(self, user_ids: List[int]) -> int:
+        dropped = 0
+        for user_id in user_ids:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+                dropped += 1
+        if dropped:
+            metrics.incr("feed_cache.invalidations", dropped)
+            metrics.set_gauge("feed_cache.bytes", self._bytes)
+        return dropped
+    
+    def _remove(self, key: CacheKey):
+        """Remove one entry and its index references (lock held)"""
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+        user_id = key[0]
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+                for topic_id in entry.validators.topic_ids:
+                    users = self._users_by_topic.get(topic_id)
+                    if users is not None:
+                        users.discard(user_id)
+                        if not users:
+                            del self._users_by_topic[topic_id]
+
+
+# Process-wide cache
+_cache = FeedCache(int(config.FEED_CACHE_MAX_MB * 1024 * 1024))
+
+
+def get_feed_cache() -> FeedCache:
+    return _cache
+
+
+def _invalidate_on_ingest(batch: IngestBatch, content_ids: List[int]):
+    if content_ids or batch.topic_updates:
+        _cache.invalidate_topic(batch.topic_id)
+
+
+register_after_commit(_invalidate_on_ingest)
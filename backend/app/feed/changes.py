@@ -0,0 +1,168 @@
+"""
+Feed delta sync
+GET /api/feed/{user_id}/changes returns what changed in a user's feed since
+an opaque cursor: entries added to user_feed_entries (new content, or a newly
+linked topic's backfill) and tombstones for removed items and topics.
+
+The cursor packs the last seen user_feed_entries.id and feed_tombstones.id
+(both only grow), so a poll is an index range scan on (user_id, id) plus the
+tombstones written since the previous poll - cost follows the delta, not the
+feed size. Clients apply removals before additions.
+
+Jumping the cursor to the highest id seen is only safe if ids become visible
+in id order: a row that commits after a poll with an id below the cursor
+would never be delivered. SQLite gives that for free (one writer at a time,
+ids drawn inside the write lock). On Postgres concurrent transactions draw
+ids from the sequence and can commit out of order, so every transaction that
+writes feed entries or tombstones takes lock_feed_writes() first: a
+transaction-level advisory lock, held from before its ids are drawn until it
+commits, so those writers commit one at a time, in id order.
+
+Tombstones are kept for FEED_TOMBSTONE_DAYS; an older cursor gets
+reset=True and the client reloads the full feed.
+"""
+import base64
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app import config
+from app.models import ContentPool, FeedTombstone, Topic, UserFeedEntry, user_topics
+
+CURSOR_VERSION = "v1"
+
+# pg_advisory_xact_lock key serializing feed entry / tombstone writers ("feed")
+FEED_WRITE_LOCK_KEY = 0x66656564
+
+
+@dataclass(frozen=True)
+class FeedCursor:
+    entry_id: int
+    tombstone_id: int
+    issued_at: int  # unix seconds
+    
+    def encode(self) -> str:
+        raw = f"{CURSOR_VERSION}.{self.entry_id}.{self.tombstone_id}.{self.issued_at}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+    
+    @classmethod
+    def decode(cls, token: str) -> "FeedCursor":
+        """Parse a cursor; raises ValueError if it isn't one of ours"""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+            version, entry_id, tombstone_id, issued_at = raw.split(".")
+            if version != CURSOR_VERSION:
+                raise ValueError(version)
+            return cls(int(entry_id), int(tombstone_id), int(issued_at))
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError(f"Invalid feed cursor: {token!r}") from e
+
+
+@dataclass
+class FeedChanges:
+    cursor: FeedCursor
+    reset: bool = False
+    has_more: bool = False
+    items: List[Tuple[ContentPool, str]] = field(default_factory=list)  # (content, topic_name)
+    removed_items: List[int] = field(default_factory=list)
+    removed_topics: List[int] = field(default_factory=list)
+
+
+def feed_write_lock(dialect_name: str):
+    """The statement that serializes feed writers on this dialect (None: writers are serialized already)"""
+    if dialect_name == "postgresql":
+        return select(func.pg_advisory_xact_lock(FEED_WRITE_LOCK_KEY))
+    return None
+
+
+def lock_feed_writes(db: Session):
+    """
+    Take the feed write lock before adding entries or tombstones, so their ids
+    commit in order (see the module docstring); released when the transaction ends
+    """
+    stmt = feed_write_lock(db.get_bind().dialect.name)
+    if stmt is not None:
+        db.execute(stmt)
+
+
+def _user_tombstones(user_id: int):
+    """The user's own tombstones plus per-topic ones for topics they follow"""
+    followed = select(user_topics.c.topic_id).where(user_topics.c.user_id == user_id)
+    return or_(
+        FeedTombstone.user_id == user_id,
+        FeedTombstone.user_id.is_(None) & FeedTombstone.topic_id.in_(followed)
+    )
+
+
+def head_cursor(db: Session, user_id: int) -> FeedCursor:
+    """Cursor positioned after everything currently in the user's feed"""
+    entry_id = db.execute(
+        select(func.max(UserFeedEntry.id)).where(UserFeedEntry.user_id == user_id)
+    ).scalar()
+    tombstone_id = db.execute(select(func.max(FeedTombstone.id))).scalar()
+    return FeedCursor(entry_id or 0, tombstone_id or 0, int(time.time()))
+
+
+def read_changes(db: Session, user_id: int, since: Optional[str], limit: int = 200) -> FeedChanges:
+    """
+    Changes in a user's feed after a cursor
+    
+    Args:
+        db: Database session
+        user_id: User ID
+        since: Cursor from a previous call; None to get the current head (reset)
+        limit: Max additions and max removals per call (has_more if either is hit)
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if since is None:
+        return FeedChanges(cursor=head_cursor(db, user_id), reset=True)
+    
+    cursor = FeedCursor.decode(since)
+    if time.time() - cursor.issued_at > config.FEED_TOMBSTONE_DAYS * 86400:
+        # Tombstones this cursor depends on may be pruned
+        return FeedChanges(cursor=head_cursor(db, user_id), reset=True)
+    
+    items = db.execute(
+        select(UserFeedEntry.id, ContentPool, Topic.topic_name)
+        .join(ContentPool, ContentPool.id == UserFeedEntry.content_id)
+        .join(Topic, Topic.id == UserFeedEntry.topic_id)
+        .where(UserFeedEntry.user_id == user_id, UserFeedEntry.id > cursor.entry_id)
+        .order_by(UserFeedEntry.id)
+        .limit(limit + 1)
+    ).all()
+    # Tombstones are shared by all users: bound the scan by the current head
+    # and move the cursor up to it, so later polls don't rescan other users' rows
+    tombstone_head = db.execute(select(func.max(FeedTombstone.id))).scalar() or 0
+    tombstones = db.execute(
+        select(FeedTombstone.id, FeedTombstone.topic_id, FeedTombstone.content_id)
+        .where(
+            FeedTombstone.id > cursor.tombstone_id,
+            FeedTombstone.id <= tombstone_head,
+            _user_tombstones(user_id)
+        )
+        .order_by(FeedTombstone.id)
+        .limit(limit + 1)
+    ).all()
+    
+    more_items, more_tombstones = len(items) > limit, len(tombstones) > limit
+    items, tombstones = items[:limit], tombstones[:limit]
+    changes = FeedChanges(
+        cursor=FeedCursor(
+            entry_id=items[-1].id if items else cursor.entry_id,
+            tombstone_id=tombstones[-1].id if more_tombstones else max(tombstone_head, cursor.tombstone_id),
+            issued_at=int(time.time())
+        ),
+        has_more=more_items or more_tombstones,
+        items=[(row.ContentPool, row.topic_name) for row in items]
+    )
+    for tombstone in tombstones:
+        if tombstone.content_id is None:
+            changes.removed_topics.append(tombstone.topic_id)
+        else:
+            changes.removed_items.append(tombstone.content_id)
+    return changes
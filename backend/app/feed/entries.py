@@ -0,0 +1,190 @@
+"""
+Materialized feed entries
+`user_feed_entries` holds one row per (user, content item) for every topic the
+user follows, so GET /api/feed is a single range scan on (user_id, fetched_at).
+Each entry carries its precomputed ranking score (see ranking.py).
+
+It is maintained incrementally, inside the writer's transaction:
+- ingest adds entries for new content (add_content_entries)
+- linking / unlinking a topic adds / removes that topic's entries
+- content cleanup and topic deletion remove entries
+- a learning lesson is added for each learner as it is delivered to them
+  (see app/learning/lessons.py), not to every subscriber at ingest
+Removals also write feed_tombstones, so delta sync clients (see changes.py)
+learn what to drop. Every write of either table takes lock_feed_writes()
+first, which keeps their ids committing in order for the delta sync cursor.
+
+check_consistency() compares the table with content_pool x user_topics;
+rebuild() recomputes it (see rebuild_feed.py).
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, delete, exists, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.feed.changes import lock_feed_writes
+from app.feed.ranking import affinity_join, entry_score
+from app.models import (
+    ContentPool, FeedTombstone, LearningLesson, UserFeedEntry, UserLearningProgress, UserSourceAffinity, user_topics
+)
+
+ENTRY_COLUMNS = ["user_id", "topic_id", "content_id", "fetched_at"]
+
+
+def _expected_entries():
+    """
+    What the table should contain: every content row x every subscriber of
+    its topic (lessons only for the learners they were delivered to)
+    """
+    return (
+        select(user_topics.c.user_id, ContentPool.topic_id, ContentPool.id, ContentPool.fetched_at)
+        .join(user_topics, user_topics.c.topic_id == ContentPool.topic_id)
+        .outerjoin(LearningLesson, LearningLesson.content_id == ContentPool.id)
+        .outerjoin(UserLearningProgress, and_(
+            UserLearningProgress.user_id == user_topics.c.user_id,
+            UserLearningProgress.topic_id == ContentPool.topic_id
+        ))
+        .where(or_(
+            LearningLesson.id.is_(None),
+            and_(
+                LearningLesson.curriculum_version == UserLearningProgress.curriculum_version,
+                LearningLesson.day < UserLearningProgress.current_day
+            )
+        ))
+    )
+
+
+def _scored(source):
+    """Add the entry score column (content rank + the reader's source affinity)"""
+    return source.add_columns(entry_score()).outerjoin(
+        UserSourceAffinity, affinity_join(user_topics.c.user_id)
+    )
+
+
+def _not_materialized():
+    """Filter for expected rows that don't have an entry yet"""
+    return ~exists().where(
+        UserFeedEntry.user_id == user_topics.c.user_id,
+        UserFeedEntry.content_id == ContentPool.id
+    )
+
+
+def _insert_from(db: Session, source) -> int:
+    lock_feed_writes(db)
+    result = db.execute(insert(UserFeedEntry).from_select(ENTRY_COLUMNS + ["score"], _scored(source)))
+    return result.rowcount
+
+
+def add_content_entries(db: Session, content_ids: List[int]) -> int:
+    """
+    Add entries for newly ingested content (after the flush that assigned IDs)
+    
+    Returns:
+        Number of entries added
+    """
+    if not content_ids:
+        return 0
+    return _insert_from(db, _expected_entries().where(ContentPool.id.in_(content_ids)))
+
+
+def link_topic_entries(db: Session, user_id: int, topic_id: int) -> int:
+    """Add a topic's existing content to a user's feed (after linking)"""
+    return _insert_from(db, _expected_entries().where(
+        user_topics.c.user_id == user_id,
+        ContentPool.topic_id == topic_id,
+        _not_materialized()
+    ))
+
+
+def unlink_topic_entries(db: Session, user_id: int, topic_id: int) -> int:
+    """Remove a topic's content from a user's feed (after unlinking)"""
+    lock_feed_writes(db)
+    db.execute(insert(FeedTombstone).values(user_id=user_id, topic_id=topic_id))
+    result = db.execute(delete(UserFeedEntry).where(
+        UserFeedEntry.user_id == user_id,
+        UserFeedEntry.topic_id == topic_id
+    ))
+    return result.rowcount
+
+
+def delete_topic_entries(db: Session, topic_id: int, before: Optional[datetime] = None) -> int:
+    """
+    Remove a topic's entries for every user
+    
+    Args:
+        db: Database session
+        topic_id: Topic ID
+        before: Only entries for content fetched before this time (content cleanup)
+    
+    Call before deleting the content rows (and, for a whole topic, the links):
+    tombstones are taken from them.
+    """
+    stmt = delete(UserFeedEntry).where(UserFeedEntry.topic_id == topic_id)
+    if before is not None:
+        stmt = stmt.where(UserFeedEntry.fetched_at < before)
+        tombstones = insert(FeedTombstone).from_select(
+            ["topic_id", "content_id"],
+            select(ContentPool.topic_id, ContentPool.id).where(
+                ContentPool.topic_id == topic_id,
+                ContentPool.fetched_at < before
+            )
+        )
+    else:
+        tombstones = insert(FeedTombstone).from_select(
+            ["user_id", "topic_id"],
+            select(user_topics.c.user_id, user_topics.c.topic_id).where(user_topics.c.topic_id == topic_id)
+        )
+    lock_feed_writes(db)
+    db.execute(tombstones)
+    return db.execute(stmt).rowcount
+
+
+def prune_tombstones(db: Session, topic_id: int, before: datetime) -> int:
+    """Drop a topic's tombstones older than the delta sync window"""
+    result = db.execute(delete(FeedTombstone).where(
+        FeedTombstone.topic_id == topic_id,
+        FeedTombstone.removed_at < before
+    ))
+    return result.rowcount
+
+
+def check_consistency(db: Session, user_id: Optional[int] = None) -> Dict[str, int]:
+    """
+    Compare the materialized table with what it should contain
+    
+    Returns:
+        {"expected", "actual", "missing", "stale"} row counts; consistent when
+        missing and stale are both 0 (stale includes rows with outdated fetched_at)
+    """
+    expected = _expected_entries()
+    actual = select(*[getattr(UserFeedEntry, column) for column in ENTRY_COLUMNS])
+    if user_id is not None:
+        expected = expected.where(user_topics.c.user_id == user_id)
+        actual = actual.where(UserFeedEntry.user_id == user_id)
+    
+    def count(stmt) -> int:
+        return db.execute(select(func.count()).select_from(stmt.subquery())).scalar()
+    
+    return {
+        "expected": count(expected),
+        "actual": count(actual),
+        "missing": count(expected.except_(actual)),
+        "stale": count(actual.except_(expected)),
+    }
+
+
+def rebuild(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recompute the materialized feed (all users, or one user)
+    
+    Returns:
+        Number of entries written
+    """
+    stmt = delete(UserFeedEntry)
+    source = _expected_entries()
+    if user_id is not None:
+        stmt = stmt.where(UserFeedEntry.user_id == user_id)
+        source = source.where(user_topics.c.user_id == user_id)
+    db.execute(stmt)
+    return _insert_from(db, source)
@@ -0,0 +1,243 @@
+"""
+Feed ranking
+Every content item is scored once, at ingest (content_pool.rank_score):
+
+    rank_score = (fetched_at - epoch) / tau              recency
+               + RANK_ENGAGEMENT_WEIGHT * ln(1 + saves)  global saves
+               + RANK_SOURCE_WEIGHT * source prior       smoothed save-rate lift of the source
+
+Decaying by exp(-(now - fetched_at) / tau) orders items exactly like
+fetched_at / tau does in log space, so scores never need refreshing as
+time passes. Feed entries add the reader's own history:
+
+    user_feed_entries.score = rank_score + RANK_USER_WEIGHT * ln(1 + reader's saves from that source)
+
+A save or unsave (apply_save) moves the item's score and all its feed
+entries by the same delta, and the saver's entries from that source by the
+change in their affinity, so the feed just orders a day's entries by score.
+Source priors come from source_stats at ingest time and are not
+back-applied to older items. rescore_all() recomputes everything from
+saved_content (backfill / repair). The saver's feed validators change with
+every save (users.feed_changed_at, see saves.py) and their cached feeds are
+dropped; other readers' cached payloads (feed/cache.py) pick up an item's
+new engagement score when one of their topics is next fetched.
+"""
+import math
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, case, delete, exists, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import config
+from app.models import ContentPool, SavedContent, SourceStats, UserFeedEntry, UserSourceAffinity
+
+EPOCH = datetime(2024, 1, 1).timestamp()
+
+
+def recency(fetched_at: Optional[datetime]) -> float:
+    """Log-space recency term: one unit per tau = half-life / ln 2"""
+    tau = config.RANK_HALF_LIFE_HOURS * 3600 / math.log(2)
+    return ((fetched_at or datetime.now()).timestamp() - EPOCH) / tau
+
+
+def engagement(saves: int) -> float:
+    return config.RANK_ENGAGEMENT_WEIGHT * math.log1p(max(saves, 0))
+
+
+def affinity(saves: int) -> float:
+    return config.RANK_USER_WEIGHT * math.log1p(max(saves, 0))
+
+
+def source_priors(db: Session, sources: Iterable[str]) -> Dict[str, float]:
+    """
+    Prior per source: log of its save rate over the global rate, shrunk
+    towards 0 with RANK_SOURCE_PRIOR_ITEMS pseudo-items (new sources get ~0)
+    """
+    sources = {source for source in sources if source}
+    if not sources:
+        return {}
+    items, saves = db.execute(
+        select(func.coalesce(func.sum(SourceStats.items), 0), func.coalesce(func.sum(SourceStats.saves), 0))
+    ).one()
+    global_rate = (saves + 1) / (items + 1)
+    m = config.RANK_SOURCE_PRIOR_ITEMS
+    stats = {
+        row.source: row for row in
+        db.execute(select(SourceStats).where(SourceStats.source.in_(sources))).scalars()
+    }
+    priors = {}
+    for source in sources:
+        row = stats.get(source)
+        rate = ((row.saves if row else 0) + m * global_rate) / ((row.items if row else 0) + m)
+        priors[source] = config.RANK_SOURCE_WEIGHT * math.log(rate / global_rate)
+    return priors
+
+
+def score_new_items(db: Session, items: List[dict]) -> List[float]:
+    """
+    rank_score for items about to be inserted (no saves yet), and count them
+    in source_stats
+    """
+    priors = source_priors(db, (item.get("source") for item in items))
+    counts: Dict[str, int] = {}
+    for item in items:
+        if item.get("source"):
+            counts[item["source"]] = counts.get(item["source"], 0) + 1
+    for source, n in counts.items():
+        _bump_source(db, source, items=n)
+    return [recency(item.get("fetched_at")) + priors.get(item.get("source"), 0.0) for item in items]
+
+
+def _upsert(db: Session, model):
+    """INSERT ... ON CONFLICT for this session's dialect (one atomic statement, no check-then-insert race)"""
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(model)
+
+
+def _bump_source(db: Session, source: str, items: int = 0, saves: int = 0):
+    """Add to a source's counters, creating its row on first use"""
+    db.execute(
+        _upsert(db, SourceStats)
+        .values(source=source, items=max(items, 0), saves=max(saves, 0))
+        .on_conflict_do_update(
+            index_elements=[SourceStats.source],
+            set_={"items": SourceStats.items + items, "saves": SourceStats.saves + saves}
+        )
+    )
+
+
+def entry_score():
+    """Column expression for a new feed entry's score (needs ContentPool and an outer join on affinity)"""
+    return ContentPool.rank_score + func.coalesce(UserSourceAffinity.weight, 0.0)
+
+
+def affinity_join(user_id_column):
+    """Outer-join condition from a user id column and ContentPool to user_source_affinity"""
+    return and_(UserSourceAffinity.user_id == user_id_column, UserSourceAffinity.source == ContentPool.source)
+
+
+def apply_save(db: Session, user_id: int, content_id: int, delta: int):
+    """
+    Refresh scores after a user saved (delta=1) or unsaved (delta=-1) an item
+    Run it in the save's transaction.
+    """
+    item = db.execute(
+        select(ContentPool.save_count, ContentPool.source).where(ContentPool.id == content_id)
+    ).one_or_none()
+    if item is None:
+        return
+    saves = max(item.save_count + delta, 0)
+    change = engagement(saves) - engagement(item.save_count)
+    db.execute(
+        update(ContentPool)
+        .where(ContentPool.id == content_id)
+        .values(save_count=saves, rank_score=ContentPool.rank_score + change)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(UserFeedEntry)
+        .where(UserFeedEntry.content_id == content_id)
+        .values(score=UserFeedEntry.score + change)
+        .execution_options(synchronize_session=False)
+    )
+    if not item.source:
+        return
+    
+    _bump_source(db, item.source, saves=delta)
+    # The upsert locks the reader's row (or creates it) and returns the weight it had
+    saves, old_weight = db.execute(
+        _upsert(db, UserSourceAffinity)
+        .values(user_id=user_id, source=item.source, saves=max(delta, 0), weight=0.0)
+        .on_conflict_do_update(
+            index_elements=[UserSourceAffinity.user_id, UserSourceAffinity.source],
+            set_={"saves": case((UserSourceAffinity.saves + delta > 0, UserSourceAffinity.saves + delta), else_=0)}
+        )
+        .returning(UserSourceAffinity.saves, UserSourceAffinity.weight)
+    ).one()
+    weight = affinity(saves)
+    db.execute(
+        update(UserSourceAffinity)
+        .where(UserSourceAffinity.user_id == user_id, UserSourceAffinity.source == item.source)
+        .values(weight=weight)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(UserFeedEntry)
+        .where(
+            UserFeedEntry.user_id == user_id,
+            exists().where(ContentPool.id == UserFeedEntry.content_id, ContentPool.source == item.source)
+        )
+        .values(score=UserFeedEntry.score + (weight - old_weight))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def rescore_all(db: Session, chunk: int = 5000) -> int:
+    """
+    Recompute save counts, source stats, affinities and every score from
+    saved_content and content_pool
+    
+    Returns:
+        Number of content items scored
+    """
+    db.execute(
+        update(ContentPool)
+        .values(save_count=select(func.count(SavedContent.id)).where(SavedContent.content_id == ContentPool.id).scalar_subquery())
+        .execution_options(synchronize_session=False)
+    )
+    
+    db.execute(delete(SourceStats))
+    db.execute(insert(SourceStats).from_select(
+        ["source", "items", "saves"],
+        select(ContentPool.source, func.count(ContentPool.id), func.sum(ContentPool.save_count))
+        .where(ContentPool.source.is_not(None), ContentPool.source != "")
+        .group_by(ContentPool.source)
+    ))
+    
+    db.execute(delete(UserSourceAffinity))
+    user_saves = db.execute(
+        select(SavedContent.user_id, ContentPool.source, func.count(SavedContent.id).label("saves"))
+        .join(ContentPool, ContentPool.id == SavedContent.content_id)
+        .where(ContentPool.source.is_not(None), ContentPool.source != "")
+        .group_by(SavedContent.user_id, ContentPool.source)
+    ).all()
+    if user_saves:
+        db.execute(insert(UserSourceAffinity), [
+            {"user_id": row.user_id, "source": row.source, "saves": row.saves, "weight": affinity(row.saves)}
+            for row in user_saves
+        ])
+    
+    # Priors from the full history (items scored at ingest only saw what came before them)
+    priors = source_priors(db, (source for (source,) in db.execute(select(SourceStats.source))))
+    scored, after = 0, 0
+    while True:
+        rows = db.execute(
+            select(ContentPool.id, ContentPool.fetched_at, ContentPool.save_count, ContentPool.source)
+            .where(ContentPool.id > after)
+            .order_by(ContentPool.id)
+            .limit(chunk)
+        ).all()
+        if not rows:
+            break
+        db.execute(update(ContentPool), [
+            {"id": row.id, "rank_score": recency(row.fetched_at) + engagement(row.save_count) + priors.get(row.source, 0.0)}
+            for row in rows
+        ])
+        scored += len(rows)
+        after = rows[-1].id
+    
+    weight = (
+        select(UserSourceAffinity.weight)
+        .join(ContentPool, ContentPool.source == UserSourceAffinity.source)
+        .where(ContentPool.id == UserFeedEntry.content_id, UserSourceAffinity.user_id == UserFeedEntry.user_id)
+        .scalar_subquery()
+    )
+    rank = select(ContentPool.rank_score).where(ContentPool.id == UserFeedEntry.content_id).scalar_subquery()
+    db.execute(
+        update(UserFeedEntry)
+        .values(score=rank + func.coalesce(weight, 0.0))
+        .execution_options(synchronize_session=False)
+    )
+    return scored
@@ -0,0 +1,4 @@
+"""
+Ingest package for AI Sutra
+Persists fetched content in short write transactions
+"""
@@ -0,0 +1,130 @@
+"""
+Ingest batches - the unit of work of the write phase
+A worker builds a batch without touching the database, then persists it
+in one short transaction.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Topic, ContentPool
+from app.scheduler.refresh import record_novelty
+from app.scheduler.retry_queue import clear_retry
+from app.feed.entries import add_content_entries
+from app.feed.ranking import score_new_items
+from app.learning.lessons import stage_lessons
+
+
+@dataclass
+class IngestBatch:
+    """Content fetched for one topic, plus the topic columns to update"""
+    topic_id: int
+    items: List[Dict[str, Any]] = field(default_factory=list)  # ContentPool column values
+    topic_updates: Dict[str, Any] = field(default_factory=dict)  # e.g. last_fetched, current_day
+    lessons: List[Tuple[int, int]] = field(default_factory=list)  # (curriculum_version, day) per item of a lesson batch
+
+
+def _url_key(url: Any) -> str:
+    """URL compared for duplicates (surrounding whitespace and trailing slash ignored)"""
+    return (url or "").strip().rstrip("/")
+
+
+def drop_known_urls(db: Session, batch: IngestBatch, staged_urls: Optional[Dict[int, Set[str]]] = None) -> int:
+    """
+    Remove items whose URL the topic already has (or that repeat within the
+    batch) - sources often return the same articles on every fetch
+    Items without a URL are kept. The batch is trimmed in place, so
+    after-commit hooks see the items that were actually inserted.
+
+    Args:
+        db: Database session
+        batch: Batch to trim
+        staged_urls: URL keys per topic staged earlier in this transaction
+            (not flushed, so the query can't see them); updated with this batch's
+
+    Returns:
+        Number of items dropped
+    """
+    keys = {_url_key(item.get("url")) for item in batch.items} - {""}
+    if not keys:
+        return 0
+    candidates = list(keys | {key + "/" for key in keys})
+    seen = set(staged_urls.get(batch.topic_id, ())) if staged_urls is not None else set()
+    for start in range(0, len(candidates), 500):
+        seen.update(_url_key(url) for (url,) in db.execute(
+            select(ContentPool.url).where(
+                ContentPool.topic_id == batch.topic_id,
+                ContentPool.url.in_(candidates[start:start + 500])
+            )
+        ))
+    kept = []
+    for item in batch.items:
+        key = _url_key(item.get("url"))
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(item)
+    dropped = len(batch.items) - len(kept)
+    batch.items = kept
+    if staged_urls is not None:
+        staged_urls[batch.topic_id] = seen
+    return dropped
+
+
+def stage_batch(db: Session, batch: IngestBatch, staged_urls: Optional[Dict[int, Set[str]]] = None) -> List[ContentPool]:
+    """
+    Add one batch to the session without flushing: content rows (known URLs
+    dropped, rank scores set) and their lesson keys, topic update (including its novelty and
+    refresh factor), and clearing the topic's retry entry
+    Used by the ingest writer to stage a whole group before a single flush;
+    it passes the same staged_urls for every batch of the group (see drop_known_urls).
+
+    Returns:
+        The pending ContentPool objects (IDs are assigned on flush)
+    """
+    linked = sum(1 for item in batch.items if _url_key(item.get("url")))
+    dropped = drop_known_urls(db, batch, staged_urls)
+    # Novelty of this fetch drives the topic's adaptive refresh interval
+    record_novelty(db, batch.topic_id, linked, linked - dropped)
+    scores = score_new_items(db, batch.items)
+    entries = [
+        ContentPool(topic_id=batch.topic_id, rank_score=score, **item)
+        for item, score in zip(batch.items, scores)
+    ]
+    db.add_all(entries)
+    if batch.lessons:
+        # Lessons have no URL, so none were dropped above: items and keys still line up
+        stage_lessons(db, batch.topic_id, batch.lessons, entries)
+
+    if batch.topic_updates:
+        db.query(Topic).filter(Topic.id == batch.topic_id).update(
+            batch.topic_updates, synchronize_session=False
+        )
+
+    # A successful fetch takes the topic off the retry queue
+    clear_retry(db, batch.topic_id)
+
+    return entries
+
+
+def persist_batch(db: Session, batch: IngestBatch) -> List[int]:
+    """
+    Write one batch: insert content rows, update the topic, clear its retry
+    entry and add the new rows to subscribers' feeds
+    Does not commit - the caller owns the transaction.
+
+    Args:
+        db: Database session
+        batch: Batch to persist
+
+    Returns:
+        IDs of the inserted ContentPool rows, in batch order
+    """
+    entries = stage_batch(db, batch)
+    db.flush()
+    ids = [entry.id for entry in entries]
+    add_content_entries(db, ids)
+    return ids
@@ -0,0 +1,33 @@
+"""
+After-commit ingest hooks
+Callbacks run once a batch's content rows are committed (through the single
+writer or directly), e.g. to invalidate caches derived from content.
+"""
+import logging
+from typing import Callable, List
+
+from app.ingest.batch import IngestBatch
+
+logger = logging.getLogger(__name__)
+
+AfterCommitHook = Callable[[IngestBatch, List[int]], None]
+
+_after_commit: List[AfterCommitHook] = []
+
+
+def register_after_commit(hook: AfterCommitHook):
+    """
+    Register a callback(batch, content_ids) to run after each committed batch
+    Hooks must be quick; they run on the ingesting task.
+    """
+    if hook not in _after_commit:
+        _after_commit.append(hook)
+
+
+def run_after_commit(batch: IngestBatch, content_ids: List[int]):
+    """Run every hook; a failing hook is logged and never fails the ingest"""
+    for hook in _after_commit:
+        try:
+            hook(batch, content_ids)
+        except Exception as e:
+            logger.warning(f"⚠️ After-commit hook {getattr(hook, '__name__', hook)} failed: {e}")
@@ -0,0 +1,241 @@
+"""
+Single-writer ingest queue
+With concurrent topic fetches, every worker committing its own ContentPool
+inserts makes SQLite writers collide ("database is locked"). Instead, workers
+hand their batches to one writer task, which group-commits everything queued
+within a short window in a single transaction.
+
+The writer lives on the application's event loop (started in the FastAPI
+lifespan). Scheduler jobs run in their own threads and loops, and their
+batches are handed over thread-safely. When no writer is running (scripts,
+tests, INGEST_WRITER=off) batches are written directly.
+"""
+import asyncio
+import logging
+from typing import List, Optional
+
+from app import config
+from app.database import DATABASE_URL, SessionLocal, session_scope
+from app.ingest.batch import IngestBatch, persist_batch, stage_batch
+from app.ingest.hooks import run_after_commit
+from app.feed.entries import add_content_entries
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def writer_enabled() -> bool:
+    """
+    Whether ingest should go through the single writer
+    "auto" enables it for SQLite only; Postgres handles concurrent writers fine.
+    """
+    mode = config.INGEST_WRITER
+    if mode == "on":
+        return True
+    if mode == "off":
+        return False
+    return DATABASE_URL.startswith("sqlite")
+
+
+class IngestWriter:
+    """
+    Dedicated writer task that group-commits ingest batches
+    A group is flushed after `flush_interval_ms` or once it holds `max_items` rows.
+    """
+    
+    def __init__(
+        self,
+        session_factory=None,
+        max_items: int = None,
+        flush_interval_ms: float = None
+    ):
+        self.session_factory = session_factory or SessionLocal
+        self.max_items = max_items or config.INGEST_WRITER_MAX_ITEMS
+        self.flush_interval = (flush_interval_ms if flush_interval_ms is not None
+                               else config.INGEST_WRITER_FLUSH_MS) / 1000
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    async def start(self):
+        """Start the writer task on the current event loop"""
+        if self.running:
+            return
+        self.loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(), name="ingest-writer")
+        logger.info("✍️ Ingest writer started")
+    
+    async def stop(self):
+        """Flush everything still queued, then stop the writer task"""
+        if not self.running:
+            return
+        await self._queue.put(None)  # sentinel: drain and exit
+        await self._task
+        self._task = None
+        logger.info("✍️ Ingest writer stopped")
+    
+    async def submit(self, batch: IngestBatch) -> List[int]:
+        """
+        Queue a batch and wait until it is committed
+        Safe to call from any event loop / thread.
+        
+        Returns:
+            IDs of the inserted ContentPool rows
+        """
+        if not self.running:
+            raise RuntimeError("Ingest writer is not running")
+        
+        if asyncio.get_running_loop() is self.loop:
+            future = self.loop.create_future()
+            await self._queue.put((batch, future))
+            return await future
+        
+        # Called from another loop (e.g. a scheduler job thread): hand over thread-safely
+        handoff = asyncio.run_coroutine_threadsafe(self.submit(batch), self.loop)
+        return await asyncio.wrap_future(handoff)
+    
+    async def _run(self):
+        """Collect queued batches into groups and commit each group once"""
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            
+            group = [first]
+            items = len(first[0].items)
+            deadline = self.loop.time() + self.flush_interval
+            
+            while items < self.max_items:
+                remaining = deadline - self.loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                group.append(entry)
+                items += len(entry[0].items)
+            
+            await self._flush(group)
+        
+        # Flush anything queued behind the sentinel
+        leftover = []
+        while not self._queue.empty():
+            entry = self._queue.get_nowait()
+            if entry is not None:
+                leftover.append(entry)
+        if leftover:
+            await self._flush(leftover)
+    
+    async def _flush(self, group: list):
+        """Commit a group off the event loop and resolve each caller's future"""
+        results = await asyncio.to_thread(self._commit_group, [batch for batch, _ in group])
+        
+        for (_, future), result in zip(group, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    def _commit_group(self, batches: List[IngestBatch]) -> List[object]:
+        """
+        Persist a group of batches in one transaction (runs in a worker thread)
+        If the group fails, each batch is retried on its own so one bad batch
+        only fails its own caller.
+        
+        Returns:
+            Per batch: list of inserted IDs, or the exception it failed with
+        """
+        # Staging trims known URLs from each batch in place; a failed attempt
+        # puts the fetched items back so a retry counts and dedups them afresh
+        fetched = [list(batch.items) for batch in batches]
+        try:
+            with session_scope(self.session_factory) as db:
+                staged_urls = {}  # batches of one topic dedup against each other too
+                staged = [stage_batch(db, batch, staged_urls) for batch in batches]
+                db.flush()  # one flush (and INSERT ... RETURNING) for the whole group
+                results = [[entry.id for entry in entries] for entries in staged]
+                add_content_entries(db, [i for ids in results for i in ids])
+            metrics.incr("ingest_writer.groups")
+            metrics.incr("ingest_writer.batches", len(batches))
+            metrics.incr("ingest_writer.rows", sum(len(ids) for ids in results))
+            return results
+        except Exception as e:
+            for batch, items in zip(batches, fetched):
+                batch.items = items
+            if len(batches) == 1:
+                return [e]
+            logger.warning(f"⚠️ Group commit of {len(batches)} batches failed ({e}), retrying one by one")
+        
+        results = []
+        for batch in batches:
+            results.extend(self._commit_group([batch]))
+        return results
+
+
+# Process-wide writer (started by the FastAPI lifespan)
+_writer: Optional[IngestWriter] = None
+
+
+def get_ingest_writer() -> Optional[IngestWriter]:
+    """Get the running writer, if any"""
+    return _writer if _writer is not None and _writer.running else None
+
+
+async def start_ingest_writer(session_factory=None) -> Optional[IngestWriter]:
+    """Start the process-wide writer if enabled for this database"""
+    global _writer
+    if not writer_enabled():
+        return None
+    if _writer is None:
+        _writer = IngestWriter(session_factory)
+    await _writer.start()
+    return _writer
+
+
+async def stop_ingest_writer():
+    """Flush and stop the process-wide writer"""
+    global _writer
+    if _writer is not None:
+        await _writer.stop()
+        _writer = None
+
+
+def _persist(batch: IngestBatch, session_factory=None) -> List[int]:
+    """Persist a batch in its own short transaction (runs in a worker thread)"""
+    with session_scope(session_factory) as db:
+        return persist_batch(db, batch)
+
+
+async def write_batch(batch: IngestBatch, session_factory=None) -> List[int]:
+    """
+    Persist a batch through the single writer when it is running,
+    otherwise directly in a short transaction (off the event loop), then
+    run after-commit hooks
+    
+    Args:
+        batch: Batch to persist
+        session_factory: Session factory for the direct path (ignored by the writer)
+    
+    Returns:
+        IDs of the inserted ContentPool rows
+    """
+    writer = get_ingest_writer()
+    if writer is not None and (session_factory is None or session_factory is writer.session_factory):
+        ids = await writer.submit(batch)
+    else:
+        ids = await asyncio.to_thread(_persist, batch, session_factory)
+    
+    run_after_commit(batch, ids)
+    return ids
@@ -0,0 +1,4 @@
+"""
+Learning package for AI Sutra
+Shared lesson store and per-learner progress
+"""
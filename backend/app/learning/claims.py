@@ -0,0 +1,90 @@
+"""
+Lesson generation claims
+Before generating a lesson a fetch claims its (topic, curriculum version,
+day) in learning_lesson_claims: an insert on the primary key, so of any
+number of concurrent fetches - the scheduler, a learner's refresh, the
+prefetch job - exactly one wins. The others wait for the winner to store the
+lesson (or give up its claim) and deliver it from the store; nobody pays for
+a second copy.
+
+A claim is a lease: it expires after LEARNING_CLAIM_LEASE_SECONDS, and an
+expired claim can be taken over with a compare and swap on its expiry, so a
+fetch that died mid-generation doesn't block the day forever. Winners
+release their claims once the lessons are written (or the fetch failed).
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import config
+from app.learning.lessons import LessonKey
+from app.models import LearningLesson, LearningLessonClaim
+
+
+def _key_filter(model, topic_id: int, key: LessonKey):
+    version, day = key
+    return and_(model.topic_id == topic_id, model.curriculum_version == version, model.day == day)
+
+
+def claim_lessons(db: Session, topic_id: int, keys: List[LessonKey], owner: str, now: Optional[datetime] = None) -> List[LessonKey]:
+    """
+    Claim lessons for generation
+    Keys another fetch holds a live claim on, or that are stored already, are
+    not claimed. Does not commit - the caller owns the transaction.
+    
+    Returns:
+        The keys this owner may generate
+    """
+    now = now or datetime.now()
+    expires_at = now + timedelta(seconds=config.LEARNING_CLAIM_LEASE_SECONDS)
+    claimed = []
+    for version, day in keys:
+        try:
+            with db.begin_nested():
+                db.execute(insert(LearningLessonClaim).values(
+                    topic_id=topic_id, curriculum_version=version, day=day, owner=owner, expires_at=expires_at
+                ))
+        except IntegrityError:
+            # Held by another fetch: take it over only if its lease ran out
+            taken = db.execute(
+                update(LearningLessonClaim)
+                .where(_key_filter(LearningLessonClaim, topic_id, (version, day)), LearningLessonClaim.expires_at < now)
+                .values(owner=owner, expires_at=expires_at)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not taken:
+                continue
+        claimed.append((version, day))
+    
+    # Checked after claiming: a winner that just finished has stored its lesson before releasing the claim
+    stored = [key for key in claimed if db.execute(
+        select(LearningLesson.id).where(_key_filter(LearningLesson, topic_id, key))
+    ).first() is not None]
+    if stored:
+        release_claims(db, topic_id, owner, stored)
+    return [key for key in claimed if key not in stored]
+
+
+def release_claims(db: Session, topic_id: int, owner: str, keys: Optional[List[LessonKey]] = None):
+    """Give up an owner's claims on a topic (or just the given keys); the caller owns the transaction"""
+    query = db.query(LearningLessonClaim).filter(
+        LearningLessonClaim.topic_id == topic_id,
+        LearningLessonClaim.owner == owner
+    )
+    if keys is not None:
+        query = query.filter(or_(*(_key_filter(LearningLessonClaim, topic_id, key) for key in keys)))
+    query.delete(synchronize_session=False)
+
+
+def held_claims(db: Session, topic_id: int, keys: List[LessonKey], now: Optional[datetime] = None) -> List[LessonKey]:
+    """The keys another fetch is still generating (claimed, lease not expired)"""
+    now = now or datetime.now()
+    return [key for key in keys if db.execute(
+        select(LearningLessonClaim.owner).where(
+            _key_filter(LearningLessonClaim, topic_id, key),
+            LearningLessonClaim.expires_at >= now
+        )
+    ).first() is not None]
@@ -0,0 +1,143 @@
+"""
+Curriculum outlines
+A learning topic's curriculum is planned once per curriculum version: a
+short outline (title and objectives) of every day, stored in
+learning_curricula. Long plans are outlined in windows of
+LEARNING_PLAN_WINDOW_DAYS days, each planned the first time one of its days
+is needed and added to the stored outline, so no planning call has to fit a
+whole year into one response. Each lesson is then generated from
+its own outline entry plus a compact rolling summary of the days before it,
+also taken from the outline. Lesson prompts stay the same size on day 30 as
+on day 2, every lesson follows one plan, and no lesson waits for the one
+before it - missing days are generated in parallel.
+
+If planning fails, the lesson is generated without its outline entry and
+its summary falls back to the titles of the lessons already stored
+(lesson_history); the window is planned again on the next fetch.
+
+Changing a topic's length or goals starts a new curriculum version (see
+the topics PUT route); learners finish the version they started on.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import config
+from app.models import ContentPool, LearningCurriculum, LearningLesson
+
+
+def plan_window(day: int, total_days: int) -> Tuple[int, int]:
+    """First and last day of the outline window a day belongs to"""
+    size = max(config.LEARNING_PLAN_WINDOW_DAYS, 1)
+    first_day = (day - 1) // size * size + 1
+    return first_day, min(first_day + size - 1, total_days)
+
+
+def window_planned(outline: List[Dict[str, Any]], day: int, total_days: int) -> bool:
+    """Whether the window a day belongs to has been outlined"""
+    first_day, last_day = plan_window(day, total_days)
+    return any(first_day <= entry["day"] <= last_day for entry in outline)
+
+
+def normalize_outline(raw: List[Any], total_days: int, first_day: int = 1, last_day: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Clean up a planned outline: one {"day", "title", "objectives"} entry per
+    day within the window, in day order (entries without a day number are
+    numbered by position from first_day)
+    """
+    last_day = last_day or total_days
+    outline = {}
+    for position, entry in enumerate(raw or [], start=first_day):
+        if not isinstance(entry, dict):
+            continue
+        try:
+            day = int(entry.get("day", position))
+        except (TypeError, ValueError):
+            day = position
+        if not first_day <= day <= last_day or day in outline:
+            continue
+        objectives = entry.get("objectives") or []
+        if isinstance(objectives, str):
+            objectives = [objectives]
+        outline[day] = {
+            "day": day,
+            "title": str(entry.get("title") or "").strip(),
+            "objectives": [str(objective).strip() for objective in objectives if objective][:4],
+        }
+    return [outline[day] for day in sorted(outline)]
+
+
+def get_curricula(db: Session, topic_id: int, versions) -> Dict[int, LearningCurriculum]:
+    """A topic's stored curricula for the given versions, by version"""
+    rows = db.query(LearningCurriculum).filter(
+        LearningCurriculum.topic_id == topic_id,
+        LearningCurriculum.curriculum_version.in_(list(versions))
+    ).all()
+    return {row.curriculum_version: row for row in rows}
+
+
+def save_curriculum(db: Session, topic_id: int, version: int, total_days: int, outline: List[Dict[str, Any]]) -> LearningCurriculum:
+    """
+    Add a planned window to a version's outline; days another fetch outlined
+    meanwhile are kept (and returned) so every lesson follows the same plan
+    """
+    curriculum = get_curricula(db, topic_id, [version]).get(version)
+    if curriculum is None:
+        curriculum = LearningCurriculum(topic_id=topic_id, curriculum_version=version, total_days=total_days, outline=[])
+        try:
+            with db.begin_nested():
+                db.add(curriculum)
+        except IntegrityError:
+            curriculum = get_curricula(db, topic_id, [version])[version]
+    
+    planned = {entry["day"] for entry in curriculum.outline}
+    added = [entry for entry in outline if entry["day"] not in planned]
+    if added:
+        curriculum.outline = sorted(curriculum.outline + added, key=lambda entry: entry["day"])
+    return curriculum
+
+
+def lesson_history(db: Session, topic_id: int, version: int) -> List[Dict[str, Any]]:
+    """Titles of a version's stored lessons as outline entries (for days the outline lacks)"""
+    rows = db.query(LearningLesson.day, ContentPool.title).join(
+        ContentPool, ContentPool.id == LearningLesson.content_id
+    ).filter(
+        LearningLesson.topic_id == topic_id,
+        LearningLesson.curriculum_version == version
+    ).order_by(LearningLesson.day).all()
+    return [{"day": day, "title": title or "", "objectives": []} for day, title in rows]
+
+
+def merge_outline(outline: List[Dict[str, Any]], history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The outline, with stored lesson titles filling the days it has no entry for"""
+    known = {entry["day"]: entry for entry in history}
+    known.update({entry["day"]: entry for entry in outline})
+    return [known[day] for day in sorted(known)]
+
+
+def day_plan(outline: List[Dict[str, Any]], day: int) -> Optional[Dict[str, Any]]:
+    """A day's outline entry"""
+    return next((entry for entry in outline if entry["day"] == day), None)
+
+
+def rolling_summary(outline: List[Dict[str, Any]], day: int) -> str:
+    """
+    What the course covered before a day, from the outline: the last
+    LEARNING_SUMMARY_DAYS days by title, earlier ones folded into one line
+    """
+    earlier = [entry for entry in outline if entry["day"] < day and entry["title"]]
+    if not earlier:
+        return "This is the first day of learning."
+    
+    recent = earlier[-config.LEARNING_SUMMARY_DAYS:]
+    older = earlier[:-len(recent)]
+    summary = "Previous lessons covered:\n"
+    if older:
+        titles = "; ".join(entry["title"] for entry in older)
+        if len(titles) > config.LEARNING_SUMMARY_CHARS:
+            titles = titles[:config.LEARNING_SUMMARY_CHARS].rsplit(";", 1)[0] + "; ..."
+        summary += f"- Days {older[0]['day']}-{older[-1]['day']}: {titles}\n"
+    for entry in recent:
+        summary += f"- Day {entry['day']}: {entry['title']}\n"
+    return summary
@@ -0,0 +1,259 @@
+"""
+Shared lesson store and per-learner progress
+A learning topic's lessons are generated once and kept in learning_lessons,
+addressed by (topic, curriculum version, day); the lesson body is an
+ordinary content_pool row. Each subscriber has their own cursor in
+user_learning_progress (current_day = next lesson to deliver), so someone
+who starts "Learn Python in 30 days" after others is served the stored
+lessons instead of paying for them again.
+
+A lesson reaches a learner's feed once it is delivered to them (its day is
+below their current_day, see feed/entries.py). Fetching a learning topic
+generates the days its active learners are waiting for that aren't stored
+yet, then delivers each learner's next lesson (deliver_lessons).
+
+Lessons follow the version's curriculum outline (see curriculum.py), whose
+length also decides when a learner is done. Learners are pinned to the
+curriculum version they started on.
+topics.current_day is the next day to generate for the topic's current
+version; topics.is_completed means no learner is still working through it.
+"""
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from app import config
+from app.feed.entries import link_topic_entries
+from app.models import ContentPool, LearningCurriculum, LearningLesson, Topic, UserLearningProgress, user_topics
+
+LessonKey = Tuple[int, int]  # (curriculum_version, day)
+
+LEGACY_SOURCE = re.compile(r"^Learning Day (\d+)/")
+
+
+def plan_days(total_days: Optional[int]) -> int:
+    """Length of a learning plan (at most LEARNING_MAX_DAYS)"""
+    return min(total_days or config.LEARNING_DEFAULT_DAYS, config.LEARNING_MAX_DAYS)
+
+
+def valid_plan_days(total_days) -> bool:
+    """Whether a requested plan length is a whole number of days within LEARNING_MAX_DAYS"""
+    return isinstance(total_days, int) and not isinstance(total_days, bool) and 1 <= total_days <= config.LEARNING_MAX_DAYS
+
+
+def active_learners(db: Session, topic_id: int, user_id: Optional[int] = None) -> list:
+    """(user_id, curriculum_version, current_day) of the topic's learners still in progress"""
+    stmt = select(
+        UserLearningProgress.user_id,
+        UserLearningProgress.curriculum_version,
+        UserLearningProgress.current_day
+    ).where(
+        UserLearningProgress.topic_id == topic_id,
+        UserLearningProgress.is_completed.is_(False)
+    )
+    if user_id is not None:
+        stmt = stmt.where(UserLearningProgress.user_id == user_id)
+    return db.execute(stmt.order_by(UserLearningProgress.current_day)).all()
+
+
+def missing_lessons(db: Session, topic_id: int, learners: Iterable) -> List[LessonKey]:
+    """Lessons the learners are waiting for that aren't stored yet, earliest first"""
+    wanted = {(learner.curriculum_version, learner.current_day) for learner in learners}
+    if not wanted:
+        return []
+    stored = set(db.execute(
+        select(LearningLesson.curriculum_version, LearningLesson.day).where(
+            LearningLesson.topic_id == topic_id,
+            LearningLesson.day.in_({day for _, day in wanted})
+        )
+    ).tuples())
+    return sorted(wanted - stored, key=lambda key: (key[1], key[0]))
+
+
+def stage_lessons(db: Session, topic_id: int, keys: List[LessonKey], entries: List[ContentPool]):
+    """
+    Register an ingest batch's content rows as the lessons for their keys
+    (in the ingest transaction, before the flush that assigns their IDs)
+    """
+    db.add_all([
+        LearningLesson(topic_id=topic_id, curriculum_version=version, day=day, content=entry)
+        for (version, day), entry in zip(keys, entries)
+    ])
+
+
+def start_learning(db: Session, user_id: int, topic_id: int) -> bool:
+    """
+    Put a new subscriber of a learning topic on day 1 of its current
+    curriculum (and hand them day 1 right away if it is stored)
+    Does not commit - the caller owns the transaction.
+    
+    Returns:
+        True if the learner was added
+    """
+    started = db.query(UserLearningProgress).filter(
+        UserLearningProgress.user_id == user_id,
+        UserLearningProgress.topic_id == topic_id
+    ).first()
+    if started is not None:
+        return False
+    
+    db.execute(insert(UserLearningProgress).from_select(
+        ["user_id", "topic_id", "curriculum_version", "current_day", "is_completed", "last_active_at"],
+        select(
+            literal(user_id), Topic.id, Topic.curriculum_version, literal(1), literal(False), literal(datetime.now())
+        ).where(Topic.id == topic_id)
+    ))
+    deliver_lessons(db, topic_id, [user_id])
+    return True
+
+
+def touch_learner(db: Session, user_id: int, topic_id: int):
+    """Record that a learner asked for their next lesson (see prefetch.py)"""
+    db.query(UserLearningProgress).filter(
+        UserLearningProgress.user_id == user_id,
+        UserLearningProgress.topic_id == topic_id
+    ).update({"last_active_at": datetime.now()}, synchronize_session=False)
+
+
+def stop_learning(db: Session, user_id: int, topic_ids: List[int]):
+    """Drop a learner's progress when they unsubscribe (caller owns the transaction)"""
+    if not topic_ids:
+        return
+    db.query(UserLearningProgress).filter(
+        UserLearningProgress.user_id == user_id,
+        UserLearningProgress.topic_id.in_(topic_ids)
+    ).delete(synchronize_session=False)
+    for topic_id in topic_ids:
+        refresh_completion(db, topic_id)
+
+
+def deliver_lessons(db: Session, topic_id: int, user_ids: Optional[List[int]] = None) -> List[Tuple[int, int]]:
+    """
+    Hand each active learner (or just the given ones) their next lesson if
+    it is stored: advance their day and add the lesson to their feed
+    A learner's day only moves from the value that was read (compare and
+    swap), so concurrent deliveries never skip a lesson.
+    Does not commit - the caller owns the transaction.
+    
+    Returns:
+        (user_id, content_id) of every lesson delivered
+    """
+    default_days = plan_days(db.query(Topic.learning_period_days).filter(Topic.id == topic_id).scalar())
+    total_days = dict(db.execute(
+        select(LearningCurriculum.curriculum_version, LearningCurriculum.total_days)
+        .where(LearningCurriculum.topic_id == topic_id)
+    ).all())
+    stmt = (
+        select(
+            UserLearningProgress.user_id,
+            UserLearningProgress.curriculum_version,
+            UserLearningProgress.current_day,
+            LearningLesson.content_id
+        )
+        .join(LearningLesson, and_(
+            LearningLesson.topic_id == UserLearningProgress.topic_id,
+            LearningLesson.curriculum_version == UserLearningProgress.curriculum_version,
+            LearningLesson.day == UserLearningProgress.current_day
+        ))
+        .where(
+            UserLearningProgress.topic_id == topic_id,
+            UserLearningProgress.is_completed.is_(False)
+        )
+    )
+    if user_ids is not None:
+        stmt = stmt.where(UserLearningProgress.user_id.in_(user_ids))
+    
+    delivered = []
+    for user_id, version, day, content_id in db.execute(stmt).all():
+        advanced = db.execute(
+            update(UserLearningProgress)
+            .where(
+                UserLearningProgress.user_id == user_id,
+                UserLearningProgress.topic_id == topic_id,
+                UserLearningProgress.current_day == day
+            )
+            .values(
+                current_day=day + 1,
+                is_completed=day >= total_days.get(version, default_days),
+                updated_at=datetime.now()
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if advanced:
+            link_topic_entries(db, user_id, topic_id)  # the lesson that was just delivered
+            delivered.append((user_id, content_id))
+    
+    if delivered:
+        # Like a fetch: the learners' feed validators change and the scheduler sees the topic as fresh
+        db.query(Topic).filter(Topic.id == topic_id).update(
+            {"last_fetched": datetime.now()}, synchronize_session=False
+        )
+        refresh_completion(db, topic_id)
+    return delivered
+
+
+def refresh_completion(db: Session, topic_id: int):
+    """topics.is_completed: no learner is still working through the topic"""
+    db.execute(
+        update(Topic)
+        .where(Topic.id == topic_id)
+        .values(is_completed=~exists().where(
+            UserLearningProgress.topic_id == topic_id,
+            UserLearningProgress.is_completed.is_(False)
+        ))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def progress_by_topic(db: Session, user_id: int) -> Dict[int, Tuple[int, bool]]:
+    """A user's (current_day, is_completed) per learning topic"""
+    rows = db.execute(
+        select(UserLearningProgress.topic_id, UserLearningProgress.current_day, UserLearningProgress.is_completed)
+        .where(UserLearningProgress.user_id == user_id)
+    )
+    return {topic_id: (current_day, is_completed) for topic_id, current_day, is_completed in rows}
+
+
+def adopt_legacy_lessons(db: Session) -> int:
+    """
+    Databases from before the lesson store: register existing lessons (by
+    their "Learning Day N/T" source) and start every subscriber at the
+    topic's shared day, so nobody loses progress or sees a lesson twice
+    
+    Returns:
+        Number of lessons registered
+    """
+    adopted = 0
+    topics = db.query(Topic.id, Topic.curriculum_version, Topic.current_day, Topic.is_completed).filter(
+        Topic.topic_type == "learning"
+    ).all()
+    for topic in topics:
+        days = set()
+        rows = db.execute(
+            select(ContentPool.id, ContentPool.source)
+            .where(ContentPool.topic_id == topic.id)
+            .order_by(ContentPool.fetched_at, ContentPool.id)
+        )
+        for content_id, source in rows:
+            match = LEGACY_SOURCE.match(source or "")
+            if match is None or int(match.group(1)) in days:
+                continue  # not a lesson, or a duplicate of a day (the first one is kept)
+            days.add(int(match.group(1)))
+            db.add(LearningLesson(
+                topic_id=topic.id, curriculum_version=topic.curriculum_version,
+                day=int(match.group(1)), content_id=content_id
+            ))
+        adopted += len(days)
+        
+        db.execute(insert(UserLearningProgress).from_select(
+            ["user_id", "topic_id", "curriculum_version", "current_day", "is_completed"],
+            select(
+                user_topics.c.user_id, literal(topic.id), literal(topic.curriculum_version),
+                literal(topic.current_day or 1), literal(bool(topic.is_completed))
+            ).where(user_topics.c.topic_id == topic.id)
+        ))
+    db.flush()
+    return adopted
@@ -0,0 +1,74 @@
+"""
+Look-ahead lesson prefetch
+An off-peak job (LEARNING_PREFETCH_HOURS) keeps the next
+LEARNING_PREFETCH_DAYS lessons of every active learner in the lesson store,
+so advancing a day - the scheduler's delivery or a learner's own refresh -
+is a DB read instead of a wait for generation.
+
+It is a low-priority lane: its own job, LEARNING_PREFETCH_CONCURRENCY topics
+at a time, at most LEARNING_PREFETCH_MAX_LESSONS lessons per run (nearest
+days first), and failures are left to the regular fetch. Learners who
+completed their plan, or haven't refreshed it for LEARNING_INACTIVE_DAYS,
+get nothing ahead; their next lesson is still generated when it is due.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from app import config
+from app.learning.lessons import LessonKey, plan_days
+from app.models import LearningCurriculum, LearningLesson, Topic, UserLearningProgress
+
+
+def prefetch_plan(db: Session, now: Optional[datetime] = None, limit: Optional[int] = None) -> Dict[int, List[LessonKey]]:
+    """
+    Lessons to generate ahead of active learners
+    
+    Returns:
+        Dictionary of topic ID -> (curriculum_version, day) keys, nearest days first
+    """
+    if config.LEARNING_PREFETCH_DAYS <= 0:
+        return {}
+    idle_since = (now or datetime.now()) - timedelta(days=config.LEARNING_INACTIVE_DAYS)
+    learners = db.execute(
+        select(
+            UserLearningProgress.topic_id,
+            UserLearningProgress.curriculum_version,
+            UserLearningProgress.current_day,
+            func.coalesce(LearningCurriculum.total_days, Topic.learning_period_days)
+        )
+        .join(Topic, Topic.id == UserLearningProgress.topic_id)
+        .outerjoin(LearningCurriculum, and_(
+            LearningCurriculum.topic_id == UserLearningProgress.topic_id,
+            LearningCurriculum.curriculum_version == UserLearningProgress.curriculum_version
+        ))
+        .where(
+            UserLearningProgress.is_completed.is_(False),
+            func.coalesce(UserLearningProgress.last_active_at, UserLearningProgress.started_at) >= idle_since
+        )
+    ).all()
+    
+    wanted: Dict[int, Set[LessonKey]] = {}
+    for topic_id, version, day, total_days in learners:
+        last_day = min(day + config.LEARNING_PREFETCH_DAYS - 1, plan_days(total_days))
+        wanted.setdefault(topic_id, set()).update((version, ahead) for ahead in range(day, last_day + 1))
+    if not wanted:
+        return {}
+    
+    stored: Set[Tuple[int, int, int]] = set(db.execute(
+        select(LearningLesson.topic_id, LearningLesson.curriculum_version, LearningLesson.day)
+        .where(LearningLesson.topic_id.in_(list(wanted)))
+    ).tuples())
+    missing = sorted(
+        (day, topic_id, version)
+        for topic_id, keys in wanted.items()
+        for version, day in keys
+        if (topic_id, version, day) not in stored
+    )[:limit or config.LEARNING_PREFETCH_MAX_LESSONS]
+    
+    plan: Dict[int, List[LessonKey]] = {}
+    for day, topic_id, version in missing:
+        plan.setdefault(topic_id, []).append((version, day))
+    return plan
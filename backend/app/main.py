@@ -4,11 +4,15 @@ Main FastAPI application for AI Sutra
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 
-from app.database import init_db
+from app.database import init_db, dispose_async_engines
 from app.api.routes import users, onboarding, feed, saved, settings, scheduler
 from app.scheduler.scheduler import start_scheduler, stop_scheduler
-from app.api.routes import users, onboarding, feed, saved, settings, scheduler, topics
+from app.ingest.writer import start_ingest_writer, stop_ingest_writer
+from app.api.compression import CompressionMiddleware
+from app.search.vectors import catch_up_vector_index
+from app.api.routes import users, onboarding, feed, saved, settings, scheduler, topics, content, search
 
 
 
@@ -21,6 +25,13 @@ async def lifespan(app: FastAPI):
     init_db()
     print("✅ Database initialized")
     
+    # Single writer for ingest (SQLite only by default)
+    if await start_ingest_writer():
+        print("✅ Ingest writer started")
+    
+    # Related-content vectors: embed what was ingested while the index was offline
+    catch_up = asyncio.create_task(asyncio.to_thread(catch_up_vector_index))
+    
     # Start scheduler
     print("📅 Starting scheduler...")
     start_scheduler()
@@ -32,6 +43,9 @@ async def lifespan(app: FastAPI):
     print("👋 Shutting down AI Sutra API...")
     stop_scheduler()
     print("✅ Scheduler stopped")
+    await catch_up
+    await stop_ingest_writer()
+    await dispose_async_engines()
 
 
 # Create FastAPI app
@@ -56,12 +70,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses (gzip, plus brotli / zstd when installed)
+app.add_middleware(CompressionMiddleware)
+
 
 # Include routers
 app.include_router(users.router, prefix="/api")
 app.include_router(onboarding.router, prefix="/api")
 app.include_router(feed.router, prefix="/api")
 app.include_router(saved.router, prefix="/api")
+app.include_router(content.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
 app.include_router(settings.router, prefix="/api")
 app.include_router(scheduler.router, prefix="/api")  # NEW: Scheduler routes
 app.include_router(topics.router, prefix="/api/topics", tags=["topics"])
@@ -1,10 +1,12 @@
 """
 Database models for AI Sutra
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Time, Table, Boolean
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, ForeignKey, JSON, Time, Table, Boolean, Index, UniqueConstraint
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.search.index import attach_search_index
 from datetime import datetime
 
 
@@ -19,12 +21,15 @@ class User(Base):
     username = Column(String(50), unique=True)  # NEW
     password = Column(String(255))  # NEW (plain text for dev)
     created_at = Column(DateTime, default=datetime.utcnow)
+    saved_count = Column(Integer, nullable=False, default=0, server_default="0")  # maintained on save / unsave
+    feed_changed_at = Column(DateTime(timezone=True), nullable=True)  # last save / unsave re-ranked the feed (feed validators)
     
     # Relationships
     interests = relationship("UserInterest", back_populates="user")
     topics = relationship("Topic", secondary="user_topics", back_populates="users")
     saved_content = relationship("SavedContent", back_populates="user")
     settings = relationship("UserSettings", back_populates="user", uselist=False)
+    feed_entries = relationship("UserFeedEntry", cascade="all, delete-orphan")
 
 
 # User interests (natural language input)
@@ -49,6 +54,7 @@ class Topic(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     topic_name = Column(String(100), unique=True, nullable=False, index=True)
+    normalized_name = Column(String(100))  # canonical spelling, see app/topics.py
     description = Column(Text)
     agent_config = Column(JSON)  # Store worker agent configuration
     feed_source = Column(String(20), default="internet")  # "internet" or "ai"
@@ -56,12 +62,25 @@ class Topic(Base):
     learning_period_days = Column(Integer, default=None)  # NEW: Total days for learning plan
     current_day = Column(Integer, default=1)  # NEW: Current day progress (1, 2, 3...)
     is_completed = Column(Boolean, default=False)  # NEW: Track if learning plan is complete
+    curriculum_version = Column(Integer, nullable=False, default=1, server_default="1")  # learning_lessons key
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     last_fetched = Column(DateTime(timezone=True), nullable=True)
+    content_removed_at = Column(DateTime(timezone=True), nullable=True)  # retention last deleted content (feed validators)
+    subscriber_count = Column(Integer, nullable=False, default=0, server_default="0")  # maintained on link / unlink
+    novelty_ewma = Column(Float, nullable=True)  # smoothed share of new URLs per fetch (app/scheduler/refresh.py)
+    refresh_factor = Column(Float, nullable=False, default=1.0, server_default="1")  # scales the tier interval
+    
+    __table_args__ = (
+        # One topic per canonical name and kind (app/topics.py); NULL periods compare equal
+        Index("ix_topics_kind_normalized_name", "normalized_name", "topic_type", "feed_source",
+              func.coalesce(learning_period_days, 0), unique=True),
+        Index("ix_topics_subscriber_count", "subscriber_count"),  # fetch tiers
+    )
     
     # Relationships
     users = relationship("User", secondary="user_topics", back_populates="topics")
     content = relationship("ContentPool", back_populates="topic", cascade="all, delete-orphan")
+    fetch_retry = relationship("TopicFetchRetry", back_populates="topic", uselist=False, cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Topic(id={self.id}, name={self.topic_name}, type={self.topic_type})>"
@@ -90,6 +109,13 @@ class ContentPool(Base):
     image_url = Column(Text)
     source = Column(String(255))
     fetched_at = Column(DateTime(timezone=True), server_default=func.now())
+    save_count = Column(Integer, nullable=False, default=0, server_default="0")  # maintained on save / unsave
+    rank_score = Column(Float, nullable=False, default=0.0, server_default="0")  # see app/feed/ranking.py
+    
+    __table_args__ = (
+        Index("ix_content_pool_topic_fetched", "topic_id", "fetched_at"),  # cleanup / tombstones by age
+        Index("ix_content_pool_topic_url", "topic_id", "url"),  # duplicate check at ingest
+    )
     
     # Relationships
     topic = relationship("Topic", back_populates="content")
@@ -99,6 +125,10 @@ class ContentPool(Base):
         return f"<ContentPool(id={self.id}, title={self.title[:30]})>"
 
 
+# Full-text index over title / summary / content (FTS5 or tsvector, see app/search/index.py)
+attach_search_index(ContentPool.__table__)
+
+
 # Saved content (user bookmarks)
 class SavedContent(Base):
     __tablename__ = "saved_content"
@@ -106,7 +136,16 @@ class SavedContent(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     content_id = Column(Integer, ForeignKey("content_pool.id"), nullable=False)
-    saved_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Second precision on SQLite (like CURRENT_TIMESTAMP), so keyset cursors compare equal to stored values
+    saved_at = Column(
+        DateTime(timezone=True).with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite"),
+        server_default=func.now()
+    )
+    
+    __table_args__ = (
+        Index("ix_saved_content_user_saved", "user_id", "saved_at"),  # keyset pages on (saved_at, id)
+        Index("ix_saved_content_content", "content_id"),  # save counts per item
+    )
     
     # Relationships
     user = relationship("User", back_populates="saved_content")
@@ -116,6 +155,103 @@ class SavedContent(Base):
         return f"<SavedContent(user_id={self.user_id}, content_id={self.content_id})>"
 
 
+# Fetch retry queue (failed topic fetches waiting for another attempt)
+class TopicFetchRetry(Base):
+    __tablename__ = "topic_fetch_retries"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    topic_id = Column(Integer, ForeignKey("topics.id"), unique=True, nullable=False, index=True)
+    status = Column(String(20), default="pending", index=True)  # "pending" or "dead"
+    error_kind = Column(String(20))  # "rate_limit", "overloaded", "timeout", "network", "parse", "auth", "unknown"
+    last_error = Column(Text)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    first_failed_at = Column(DateTime(timezone=True), default=datetime.now)
+    updated_at = Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
+    
+    # Relationships
+    topic = relationship("Topic", back_populates="fetch_retry")
+    
+    def __repr__(self):
+        return f"<TopicFetchRetry(topic_id={self.topic_id}, status={self.status}, attempts={self.attempts})>"
+
+
+# Learning lessons (generated once per topic, curriculum version and day, shared by every learner)
+class LearningLesson(Base):
+    __tablename__ = "learning_lessons"
+    
+    id = Column(Integer, primary_key=True)
+    topic_id = Column(Integer, ForeignKey("topics.id"), nullable=False)
+    curriculum_version = Column(Integer, nullable=False)
+    day = Column(Integer, nullable=False)
+    content_id = Column(Integer, ForeignKey("content_pool.id"), nullable=False, index=True)  # the lesson body
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("topic_id", "curriculum_version", "day", name="uq_learning_lessons_key"),
+    )
+    
+    # Relationships
+    content = relationship("ContentPool")
+    
+    def __repr__(self):
+        return f"<LearningLesson(topic_id={self.topic_id}, version={self.curriculum_version}, day={self.day})>"
+
+
+# Lease on generating a lesson (one fetch generates each day, the others wait for it)
+class LearningLessonClaim(Base):
+    __tablename__ = "learning_lesson_claims"
+    
+    topic_id = Column(Integer, ForeignKey("topics.id"), primary_key=True)
+    curriculum_version = Column(Integer, primary_key=True)
+    day = Column(Integer, primary_key=True)
+    owner = Column(String(32), nullable=False)  # token of the fetch generating the lesson
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # another fetch may take over after this
+    
+    def __repr__(self):
+        return f"<LearningLessonClaim(topic_id={self.topic_id}, version={self.curriculum_version}, day={self.day}, owner={self.owner})>"
+
+
+# Curriculum outline of a learning topic, planned once per curriculum version
+class LearningCurriculum(Base):
+    __tablename__ = "learning_curricula"
+    
+    id = Column(Integer, primary_key=True)
+    topic_id = Column(Integer, ForeignKey("topics.id"), nullable=False)
+    curriculum_version = Column(Integer, nullable=False)
+    total_days = Column(Integer, nullable=False)
+    outline = Column(JSON, nullable=False)  # [{"day", "title", "objectives"}, ...], see app/learning/curriculum.py
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("topic_id", "curriculum_version", name="uq_learning_curricula_key"),
+    )
+    
+    def __repr__(self):
+        return f"<LearningCurriculum(topic_id={self.topic_id}, version={self.curriculum_version}, days={self.total_days})>"
+
+
+# Per-user progress through a learning topic
+class UserLearningProgress(Base):
+    __tablename__ = "user_learning_progress"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    topic_id = Column(Integer, ForeignKey("topics.id"), primary_key=True)
+    curriculum_version = Column(Integer, nullable=False, default=1)  # pinned when the learner starts
+    current_day = Column(Integer, nullable=False, default=1)  # next lesson to deliver
+    is_completed = Column(Boolean, nullable=False, default=False)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
+    last_active_at = Column(DateTime(timezone=True), nullable=True)  # learner's last own refresh (prefetch skips idle learners)
+    
+    __table_args__ = (
+        Index("ix_user_learning_progress_topic", "topic_id", "is_completed"),  # a topic's active learners
+    )
+    
+    def __repr__(self):
+        return f"<UserLearningProgress(user_id={self.user_id}, topic_id={self.topic_id}, day={self.current_day})>"
+
+
 # User settings
 class UserSettings(Base):
     __tablename__ = "user_settings"
@@ -129,4 +265,69 @@ class UserSettings(Base):
     user = relationship("User", back_populates="settings")
     
     def __repr__(self):
-        return f"<UserSettings(user_id={self.user_id}, frequency={self.periodic_frequency})>"
\ No newline at end of file
+        return f"<UserSettings(user_id={self.user_id}, frequency={self.periodic_frequency})>"
+
+
+# Materialized feed (one row per content item of each subscribed topic)
+class UserFeedEntry(Base):
+    __tablename__ = "user_feed_entries"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    topic_id = Column(Integer, ForeignKey("topics.id"), nullable=False)
+    content_id = Column(Integer, ForeignKey("content_pool.id"), nullable=False, index=True)
+    fetched_at = Column(DateTime(timezone=True))  # copied from content_pool for the range scan
+    score = Column(Float, nullable=False, default=0.0, server_default="0")  # item rank_score + reader's affinity
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "content_id", name="uq_user_feed_entries_user_content"),
+        Index("ix_user_feed_entries_user_fetched", "user_id", "fetched_at"),
+        Index("ix_user_feed_entries_user_id", "user_id", "id"),  # delta sync: entries after a cursor
+    )
+    
+    def __repr__(self):
+        return f"<UserFeedEntry(user_id={self.user_id}, content_id={self.content_id})>"
+
+
+# Feed tombstones (items / topics removed from feeds, for delta sync clients)
+class FeedTombstone(Base):
+    __tablename__ = "feed_tombstones"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=True)  # NULL = every follower of the topic
+    topic_id = Column(Integer, nullable=False)  # no FKs: the rows they point to are gone
+    content_id = Column(Integer, nullable=True)  # NULL = the whole topic was removed
+    removed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_feed_tombstones_user_id", "user_id", "id"),
+        Index("ix_feed_tombstones_topic_id", "topic_id", "id"),
+    )
+    
+    def __repr__(self):
+        return f"<FeedTombstone(user_id={self.user_id}, topic_id={self.topic_id}, content_id={self.content_id})>"
+
+
+# Per-source item and save totals (source quality priors for ranking)
+class SourceStats(Base):
+    __tablename__ = "source_stats"
+    
+    source = Column(String(255), primary_key=True)
+    items = Column(Integer, nullable=False, default=0)
+    saves = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<SourceStats(source={self.source}, items={self.items}, saves={self.saves})>"
+
+
+# How much a user saves from each source (personal ranking boost)
+class UserSourceAffinity(Base):
+    __tablename__ = "user_source_affinity"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    source = Column(String(255), primary_key=True)
+    saves = Column(Integer, nullable=False, default=0)
+    weight = Column(Float, nullable=False, default=0.0)  # score boost for this source's items
+    
+    def __repr__(self):
+        return f"<UserSourceAffinity(user_id={self.user_id}, source={self.source}, saves={self.saves})>"
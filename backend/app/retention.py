@@ -0,0 +1,200 @@
+"""
+Content retention
+Each topic type keeps its content for its own period (retention_policies):
+feed topics RETENTION_FEED_DAYS, learning topics forever - their lessons
+are served to every later learner. Items someone saved are pinned whatever
+their age, and are removed by a later run once nobody has them saved.
+
+apply_retention() deletes in small id-range chunks (RETENTION_BATCH_SIZE
+rows, one short transaction each), so ingest never waits long for SQLite's
+write lock. Every chunk is set-based: it tombstones the expired items for
+delta sync, deletes their feed entries and then the rows themselves (the
+search index follows through its triggers); the policy is re-checked in
+every statement, so an item saved meanwhile is kept. Afterwards the vector
+index forgets the removed items, the affected topics' content_removed_at is
+stamped (so their feeds' ETag and Last-Modified change, see feed/cache.py)
+and their cached feeds are dropped.
+
+source_stats is left alone: it counts what each source delivered over time,
+and the ranking priors are rates over that history.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import LargeBinary, and_, cast, delete, exists, false, func, insert, or_, select, text, update
+from sqlalchemy.orm import Session
+
+from app import config
+from app.database import session_scope
+from app.feed.cache import get_feed_cache
+from app.feed.changes import lock_feed_writes
+from app.models import ContentPool, FeedTombstone, LearningLesson, SavedContent, Topic, UserFeedEntry
+from app.search.vectors import get_vector_index
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+_TEXT_COLUMNS = ("title", "summary", "content", "url", "image_url", "source")
+
+
+def retention_policies(feed_days: Optional[int] = None) -> Dict[str, Optional[int]]:
+    """Days each topic type keeps its content (None = forever); types without a policy follow "feed" """
+    return {
+        "feed": config.RETENTION_FEED_DAYS if feed_days is None else feed_days,
+        "learning": None,
+    }
+
+
+def _past_retention(policies: Dict[str, Optional[int]], now: datetime):
+    """Content older than its topic type's retention period (saved or not)"""
+    others = [topic_type for topic_type in policies if topic_type != "feed"]
+    clauses = []
+    for topic_type, days in policies.items():
+        if days is None:
+            continue
+        if topic_type == "feed":
+            of_type = or_(Topic.topic_type.is_(None), Topic.topic_type.notin_(others))
+        else:
+            of_type = Topic.topic_type == topic_type
+        clauses.append(and_(
+            ContentPool.topic_id.in_(select(Topic.id).where(of_type)),
+            ContentPool.fetched_at < now - timedelta(days=days)
+        ))
+    return or_(*clauses) if clauses else false()
+
+
+def _payload_bytes(db: Session):
+    """Stored size of a content row's text columns"""
+    if db.get_bind().dialect.name == "postgresql":
+        size = func.octet_length
+    else:
+        size = lambda column: func.length(cast(column, LargeBinary))
+    return sum(func.coalesce(size(getattr(ContentPool, column)), 0) for column in _TEXT_COLUMNS)
+
+
+def _delete_chunk(db: Session, ids: List[int], expired) -> Dict[str, int]:
+    """Remove one chunk of expired content (ids come from the same policy, re-checked here)"""
+    in_range = and_(ContentPool.id.between(ids[0], ids[-1]), expired)
+    rows, size = db.execute(
+        select(func.count(ContentPool.id), func.coalesce(func.sum(_payload_bytes(db)), 0)).where(in_range)
+    ).one()
+    
+    # Tombstones first: delta sync tells clients which items disappeared
+    lock_feed_writes(db)
+    db.execute(insert(FeedTombstone).from_select(
+        ["topic_id", "content_id"],
+        select(ContentPool.topic_id, ContentPool.id).where(in_range)
+    ))
+    entries = db.execute(
+        delete(UserFeedEntry).where(UserFeedEntry.content_id.in_(select(ContentPool.id).where(in_range)))
+    ).rowcount
+    db.execute(delete(ContentPool).where(in_range).execution_options(synchronize_session=False))
+    return {"rows": rows, "entries": entries, "bytes": int(size)}
+
+
+def apply_retention(
+    session_factory=None,
+    feed_days: Optional[int] = None,
+    topic_ids: Optional[List[int]] = None,
+    batch_size: Optional[int] = None,
+    now: Optional[datetime] = None
+) -> Dict[str, int]:
+    """
+    Delete content past its retention period, chunk by chunk
+    
+    Args:
+        session_factory: Session factory (default: SessionLocal)
+        feed_days: Override RETENTION_FEED_DAYS
+        topic_ids: Only these topics (default: all)
+        batch_size: Rows per transaction (default: RETENTION_BATCH_SIZE)
+    
+    Returns:
+        {"rows", "entries", "bytes", "pinned", "vacuumed_bytes"}: content rows
+        and feed entries deleted, text bytes they held, saved items kept past
+        retention, file bytes released by the incremental vacuum
+    """
+    now = now or datetime.now()
+    batch_size = batch_size or config.RETENTION_BATCH_SIZE
+    past_retention = _past_retention(retention_policies(feed_days), now)
+    if topic_ids is not None:
+        past_retention = and_(past_retention, ContentPool.topic_id.in_(topic_ids))
+    saved = exists().where(SavedContent.content_id == ContentPool.id)
+    expired = and_(
+        past_retention,
+        ~saved,
+        ~exists().where(LearningLesson.content_id == ContentPool.id)
+    )
+    
+    report = {"rows": 0, "entries": 0, "bytes": 0, "pinned": 0, "vacuumed_bytes": 0}
+    removed_topics = set()
+    after = 0
+    while True:
+        with session_scope(session_factory) as db:
+            ids = db.execute(
+                select(ContentPool.id).where(ContentPool.id > after, expired).order_by(ContentPool.id).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            removed_topics.update(db.execute(
+                select(ContentPool.topic_id).where(ContentPool.id.in_(ids)).distinct()
+            ).scalars())
+            for key, value in _delete_chunk(db, ids, expired).items():
+                report[key] += value
+            kept = set(db.execute(select(ContentPool.id).where(ContentPool.id.in_(ids))).scalars())
+        get_vector_index().remove([content_id for content_id in ids if content_id not in kept])
+        after = ids[-1]
+    
+    with session_scope(session_factory) as db:
+        report["pinned"] = db.execute(select(func.count(ContentPool.id)).where(past_retention, saved)).scalar()
+        tombstones = delete(FeedTombstone).where(
+            FeedTombstone.removed_at < now - timedelta(days=config.FEED_TOMBSTONE_DAYS)
+        )
+        if topic_ids is not None:
+            tombstones = tombstones.where(FeedTombstone.topic_id.in_(topic_ids))
+        db.execute(tombstones)
+        if removed_topics:
+            # Clients holding these feeds must not get a 304 for the deleted items
+            db.execute(
+                update(Topic)
+                .where(Topic.id.in_(removed_topics))
+                .values(content_removed_at=datetime.now())
+                .execution_options(synchronize_session=False)
+            )
+    
+    for topic_id in removed_topics:
+        get_feed_cache().invalidate_topic(topic_id)
+    if report["rows"] and config.RETENTION_VACUUM_PAGES > 0:
+        report["vacuumed_bytes"] = incremental_vacuum(session_factory, config.RETENTION_VACUUM_PAGES)
+    
+    metrics.incr("retention.rows_deleted", report["rows"])
+    metrics.incr("retention.bytes_reclaimed", report["bytes"])
+    logger.info(
+        f"🗑️ Retention removed {report['rows']} items ({report['bytes'] / 1024:.0f} KiB) "
+        f"and {report['entries']} feed entries; {report['pinned']} saved items kept"
+    )
+    return report
+
+
+def incremental_vacuum(session_factory=None, pages: int = 0) -> int:
+    """
+    SQLite: return up to `pages` free pages (0 = all) to the OS
+    Only databases with auto_vacuum = INCREMENTAL can; on others freed pages
+    are reused by later inserts and nothing is released.
+    
+    Returns:
+        Bytes released
+    """
+    with session_scope(session_factory) as db:
+        if db.get_bind().dialect.name != "sqlite":
+            return 0
+        if db.execute(text("PRAGMA auto_vacuum")).scalar() != 2:
+            logger.info("🗜️ auto_vacuum isn't INCREMENTAL - freed pages stay in the file for reuse")
+            return 0
+        page_size = db.execute(text("PRAGMA page_size")).scalar()
+        free_before = db.execute(text("PRAGMA freelist_count")).scalar()
+        # Each step of the pragma frees one page; executescript runs it to the end
+        db.connection().connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+        released = (free_before - db.execute(text("PRAGMA freelist_count")).scalar()) * page_size
+    metrics.incr("retention.bytes_vacuumed", released)
+    return released
@@ -0,0 +1,72 @@
+"""
+Saved content bookkeeping
+users.saved_count is maintained in the same transaction as every save /
+unsave, so the saved list's total is a primary-key read instead of a count
+over all of the user's bookmarks. The same transaction refreshes the feed
+ranking scores that depend on saves and stamps users.feed_changed_at, so
+the saver's feed validators change (record_save).
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.feed.ranking import apply_save
+from app.models import ContentPool, SavedContent, User
+
+
+def saved_count_update(user_id: int, delta: int):
+    """UPDATE statement moving a user's saved_count by delta (run it in the save/unsave transaction)"""
+    return (
+        update(User)
+        .where(User.id == user_id)
+        .values(saved_count=User.saved_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def record_save(db: Session, user_id: int, content_id: int, delta: int):
+    """
+    Bookkeeping for one save (delta=1) or unsave (delta=-1): the user's
+    saved_count, the item's save count and the ranking scores built on them
+    Drop the user's cached feeds once it commits (FeedCache.invalidate_user).
+    """
+    db.execute(saved_count_update(user_id, delta).values(feed_changed_at=datetime.now()))
+    apply_save(db, user_id, content_id, delta)
+
+
+def unsave_topic(db: Session, topic_id: int) -> List[int]:
+    """
+    Remove every bookmark of a topic's content (the topic is being deleted),
+    with the same bookkeeping as an unsave
+    
+    Returns:
+        Users who lost bookmarks (drop their cached feeds once it commits)
+    """
+    topic_content = select(ContentPool.id).where(ContentPool.topic_id == topic_id)
+    saves = db.execute(
+        select(SavedContent.user_id, SavedContent.content_id).where(SavedContent.content_id.in_(topic_content))
+    ).all()
+    for user_id, content_id in saves:
+        record_save(db, user_id, content_id, -1)
+    db.execute(delete(SavedContent).where(SavedContent.content_id.in_(topic_content)))
+    return sorted({user_id for user_id, _ in saves})
+
+
+def recount_saved(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recompute saved_count from saved_content (all users, or one user)
+    
+    Returns:
+        Number of users updated
+    """
+    count = (
+        select(func.count(SavedContent.id))
+        .where(SavedContent.user_id == User.id)
+        .scalar_subquery()
+    )
+    stmt = update(User).values(saved_count=count).execution_options(synchronize_session=False)
+    if user_id is not None:
+        stmt = stmt.where(User.id == user_id)
+    return db.execute(stmt).rowcount
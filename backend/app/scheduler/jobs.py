@@ -6,9 +6,12 @@ import asyncio
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 
-from app.database import SessionLocal
+from app.database import SessionLocal, session_scope
 from app.agents.worker_agent import WorkerAgentManager
-from app.models import Topic
+from app.learning.prefetch import prefetch_plan
+from app.scheduler.retry_queue import get_due_retries
+from app.scheduler.tiers import due_topic_ids, subscribed_topic_ids
+from app.utils import metrics
 
 
 def get_db():
@@ -22,112 +25,172 @@ def get_db():
         db.close()
 
 
-async def fetch_all_topics_job():
+async def fetch_all_topics_job(due_only: bool = True):
     """
-    Scheduled job to fetch content for all topics
-    Runs daily to refresh content pool
+    Scheduled job to fetch content for topics
+    Polled every FETCH_POLL_MINUTES; only topics whose tier says they are
+    due are fetched (due_only=False: every topic with subscribers).
+    Orphaned topics are never fetched.
     """
+    # Get topic IDs (the session is closed before any API call)
+    with session_scope() as db:
+        topic_ids = due_topic_ids(db) if due_only else subscribed_topic_ids(db)
+    
+    if not topic_ids:
+        if not due_only:
+            print("⚠️ No subscribed topics to fetch")
+        return
+    
     print(f"\n{'='*60}")
     print(f"🔄 Starting scheduled content fetch at {datetime.now()}")
     print(f"{'='*60}\n")
     
-    db = SessionLocal()
     try:
-        # Get all topics
-        topics = db.query(Topic).all()
+        print(f"📋 Found {len(topic_ids)} topics to refresh")
         
-        if not topics:
-            print("⚠️ No topics found to fetch")
-            return
+        # Fetch concurrently; FETCH_CONCURRENCY keeps us under the API rate limits
+        # and rate-limited topics go to the retry queue
+        manager = WorkerAgentManager()
+        results = await manager.fetch_topics(topic_ids, max_items_per_topic=5)
         
-        print(f"📋 Found {len(topics)} topics to refresh")
-        
-        # Initialize manager
-        manager = WorkerAgentManager(db)
-        
-        # Fetch content for all topics with delays to avoid rate limits
-        results = {}
-        for i, topic in enumerate(topics):
-            # Add delay between topics (except first one)
-            if i > 0:
-                delay = 15  # 15 seconds between topics
-                print(f"⏳ Waiting {delay} seconds before next topic...")
-                await asyncio.sleep(delay)
-            
-            try:
-                print(f"\n🔍 Fetching: {topic.topic_name}")
-                content = await manager.fetch_topic_by_name(
-                    topic.topic_name, 
-                    max_items=5
-                )
-                
-                results[topic.topic_name] = {
-                    "success": True,
-                    "items": len(content) if content else 0
-                }
-                print(f"✅ {topic.topic_name}: Fetched {len(content) if content else 0} items")
-                
-            except Exception as e:
-                results[topic.topic_name] = {
-                    "success": False,
-                    "error": str(e)
-                }
-                print(f"❌ {topic.topic_name}: Error - {str(e)}")
+        for topic_name, result in results.items():
+            if result.get("success", False):
+                print(f"✅ {topic_name}: Fetched {result['items_fetched']} items")
+            elif "error_kind" in result:
+                outcome = "dead-lettered" if result["dead_lettered"] else "queued for retry"
+                print(f"❌ {topic_name}: {result['error_kind']} error, {outcome} - {result['error']}")
+            else:
+                print(f"❌ {topic_name}: Error - {result['error']}")
         
         # Summary
         print(f"\n{'='*60}")
         print(f"📊 Content fetch summary:")
         successful = sum(1 for r in results.values() if r.get("success", False))
-        total_items = sum(r.get("items", 0) for r in results.values())
-        print(f"   ✅ Successful: {successful}/{len(topics)} topics")
+        timed_out = [name for name, r in results.items() if r.get("timed_out", False)]
+        total_items = sum(r.get("items_fetched", 0) for r in results.values())
+        print(f"   ✅ Successful: {successful}/{len(topic_ids)} topics")
+        print(f"   ⏱️ Timed out: {len(timed_out)} topics {timed_out if timed_out else ''}")
         print(f"   📰 Total items fetched: {total_items}")
         print(f"   ⏰ Completed at: {datetime.now()}")
+        
+        metrics.set_gauge("fetch_run.last", {
+            "finished_at": datetime.now().isoformat(),
+            "topics": len(topic_ids),
+            "succeeded": successful,
+            "failed": len(topic_ids) - successful,
+            "timed_out": timed_out,
+            "items_fetched": total_items
+        })
         print(f"{'='*60}\n")
         
     except Exception as e:
         print(f"❌ Error in scheduled fetch job: {e}")
         import traceback
         traceback.print_exc()
-    finally:
-        db.close()
 
 
-def fetch_all_topics_job_sync():
+def fetch_all_topics_job_sync(due_only: bool = True):
     """
     Synchronous wrapper for async fetch job
     Required by APScheduler
     """
-    asyncio.run(fetch_all_topics_job())
+    asyncio.run(fetch_all_topics_job(due_only))
+
+
+async def process_retry_queue_job():
+    """
+    Scheduled job to retry failed topic fetches whose backoff has elapsed
+    Each failure pushes the topic further back (or dead-letters it).
+    """
+    try:
+        with session_scope() as db:
+            retry_topic_ids = [retry.topic_id for retry in get_due_retries(db) if retry.topic.subscriber_count > 0]
+        
+        if not retry_topic_ids:
+            return
+        
+        print(f"\n🔁 Retrying {len(retry_topic_ids)} failed topic fetches at {datetime.now()}")
+        
+        manager = WorkerAgentManager()
+        results = await manager.fetch_topics(retry_topic_ids, max_items_per_topic=5)
+        
+        for topic_name, result in results.items():
+            if result.get("success", False):
+                print(f"✅ Retry succeeded for {topic_name}: {result['items_fetched']} items")
+            elif "error_kind" in result:
+                outcome = "dead-lettered" if result["dead_lettered"] else "rescheduled"
+                print(f"❌ Retry failed for {topic_name} ({result['error_kind']}), {outcome}")
+            else:
+                print(f"❌ Retry failed for {topic_name}: {result['error']}")
+        
+    except Exception as e:
+        print(f"❌ Error in retry queue job: {e}")
 
 
-async def cleanup_old_content_job():
+def process_retry_queue_job_sync():
+    """
+    Synchronous wrapper for async retry job
     """
-    Scheduled job to cleanup old content
-    Removes content older than 7 days
+    asyncio.run(process_retry_queue_job())
+
+
+async def prefetch_lessons_job():
+    """
+    Off-peak job generating lessons ahead of active learners (low-priority
+    lane, see app/learning/prefetch.py)
+    """
+    try:
+        with session_scope() as db:
+            plan = prefetch_plan(db)
+        
+        if not plan:
+            return
+        
+        print(f"\n📚 Prefetching {sum(len(keys) for keys in plan.values())} lessons for {len(plan)} learning topics at {datetime.now()}")
+        
+        manager = WorkerAgentManager()
+        results = await manager.prefetch_lessons(plan)
+        
+        for topic_name, stored in results.items():
+            print(f"✅ {topic_name}: {stored} lessons ready ahead")
+        
+    except Exception as e:
+        print(f"❌ Error in lesson prefetch job: {e}")
+
+
+def prefetch_lessons_job_sync():
+    """
+    Synchronous wrapper for async prefetch job
+    """
+    asyncio.run(prefetch_lessons_job())
+
+
+def cleanup_old_content_job():
+    """
+    Scheduled job applying the content retention policies
+    Feed content older than RETENTION_FEED_DAYS goes; lessons and saved items stay
+    (see app/retention.py)
     """
     print(f"\n🧹 Starting content cleanup at {datetime.now()}")
     
-    db = SessionLocal()
     try:
-        manager = WorkerAgentManager(db)
-        
-        # Cleanup content older than 7 days
-        days_to_keep = 7
-        deleted = await manager.cleanup_all_old_content(days=days_to_keep)
+        manager = WorkerAgentManager()
+        report = manager.cleanup_all_old_content()
         
-        print(f"✅ Cleaned up {deleted} old content items (older than {days_to_keep} days)")
+        print(f"✅ Cleaned up {report['rows']} old content items ({report['bytes'] / 1024:.0f} KiB, "
+              f"{report['entries']} feed entries); {report['pinned']} saved items kept")
+        if report["vacuumed_bytes"]:
+            print(f"🗜️ Released {report['vacuumed_bytes'] / 1024:.0f} KiB of free pages")
         
     except Exception as e:
         print(f"❌ Error in cleanup job: {e}")
-    finally:
-        db.close()
 
 
 def cleanup_old_content_job_sync():
     """
-    Synchronous wrapper for async cleanup job
+    Scheduled entry point for the cleanup job (the deletes are synchronous)
     """
-    asyncio.run(cleanup_old_content_job())
+    cleanup_old_content_job()
 
 
 # Test function to manually trigger jobs
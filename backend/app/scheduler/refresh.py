@@ -0,0 +1,69 @@
+"""
+Adaptive per-topic refresh interval
+Every ingest of linked items (internet feeds) after a topic's first fetch
+is an observation: the novelty ratio is the share of fetched URLs the
+topic didn't already have.
+topics.novelty_ewma smooths it (weight REFRESH_NOVELTY_ALPHA) and an AIMD
+controller moves topics.refresh_factor, which scales the tier interval:
+- novelty above REFRESH_NOVELTY_HIGH: factor x REFRESH_FACTOR_DECREASE
+  (fetch sooner - react fast when a topic is busy)
+- novelty below REFRESH_NOVELTY_LOW: factor + REFRESH_FACTOR_STEP
+  (back off gradually from topics returning the same URLs)
+- in between: unchanged
+The factor stays within [REFRESH_FACTOR_MIN, REFRESH_FACTOR_MAX].
+
+Batches without URLs (AI-generated items, lessons) carry no duplicate
+signal, so those topics keep factor 1.0 - their tier interval.
+"""
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import config
+from app.models import Topic
+from app.utils import metrics
+
+
+def next_factor(novelty_ewma: Optional[float], factor: float, fetched: int, new: int) -> Tuple[float, float]:
+    """
+    Fold one fetch into the novelty EWMA and adjust the refresh factor
+    
+    Args:
+        novelty_ewma: Smoothed novelty so far (None before the first observation)
+        factor: Current refresh factor
+        fetched: Linked items the fetch returned
+        new: How many of them were not duplicates
+    
+    Returns:
+        (novelty_ewma, refresh_factor)
+    """
+    ratio = new / fetched if fetched else 0.0
+    alpha = config.REFRESH_NOVELTY_ALPHA
+    ewma = ratio if novelty_ewma is None else alpha * ratio + (1 - alpha) * novelty_ewma
+    if ewma > config.REFRESH_NOVELTY_HIGH:
+        factor *= config.REFRESH_FACTOR_DECREASE
+    elif ewma < config.REFRESH_NOVELTY_LOW:
+        factor += config.REFRESH_FACTOR_STEP
+    return ewma, min(max(factor, config.REFRESH_FACTOR_MIN), config.REFRESH_FACTOR_MAX)
+
+
+def record_novelty(db: Session, topic_id: int, fetched: int, new: int) -> Optional[float]:
+    """
+    Update a topic's novelty and refresh factor after an ingest (in the
+    ingest transaction)
+    
+    Returns:
+        The new refresh factor, None when there was nothing to observe
+    """
+    if not fetched:
+        return None
+    current = db.query(Topic.novelty_ewma, Topic.refresh_factor, Topic.last_fetched).filter(Topic.id == topic_id).first()
+    if current is None or current.last_fetched is None:
+        return None  # a first fetch is all new by definition
+    ewma, factor = next_factor(current.novelty_ewma, current.refresh_factor or 1.0, fetched, new)
+    db.query(Topic).filter(Topic.id == topic_id).update(
+        {"novelty_ewma": ewma, "refresh_factor": factor}, synchronize_session=False
+    )
+    metrics.incr("refresh.items_fetched", fetched)
+    metrics.incr("refresh.items_new", new)
+    return factor
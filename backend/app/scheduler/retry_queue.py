@@ -0,0 +1,163 @@
+"""
+Retry queue for failed topic fetches
+Failed fetches are retried with exponential backoff; topics that keep failing
+(or fail in a way retrying cannot fix) are dead-lettered until replayed.
+"""
+import asyncio
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import anthropic
+from sqlalchemy.orm import Session
+
+from app import config
+from app.models import TopicFetchRetry
+from app.utils.claude_client import ContentParseError
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How a class of errors is retried"""
+    max_attempts: int
+    base_delay_seconds: int
+    max_delay_seconds: int
+
+
+# Retry policy per error kind. Auth errors are dead-lettered immediately:
+# retrying with the same API key only burns attempts.
+ERROR_POLICIES = {
+    "rate_limit": RetryPolicy(config.RETRY_MAX_ATTEMPTS, config.RETRY_BASE_DELAY_SECONDS * 2, config.RETRY_MAX_DELAY_SECONDS),
+    "overloaded": RetryPolicy(config.RETRY_MAX_ATTEMPTS, config.RETRY_BASE_DELAY_SECONDS, config.RETRY_MAX_DELAY_SECONDS),
+    "timeout": RetryPolicy(config.RETRY_MAX_ATTEMPTS, config.RETRY_BASE_DELAY_SECONDS, config.RETRY_MAX_DELAY_SECONDS),
+    "network": RetryPolicy(config.RETRY_MAX_ATTEMPTS, config.RETRY_BASE_DELAY_SECONDS, config.RETRY_MAX_DELAY_SECONDS),
+    "parse": RetryPolicy(config.RETRY_PARSE_MAX_ATTEMPTS, config.RETRY_BASE_DELAY_SECONDS, config.RETRY_MAX_DELAY_SECONDS),
+    "auth": RetryPolicy(0, 0, 0),
+    "unknown": RetryPolicy(3, config.RETRY_BASE_DELAY_SECONDS, config.RETRY_MAX_DELAY_SECONDS),
+}
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Map an exception raised during a fetch to a retry error kind
+    
+    Args:
+        error: Exception raised by the Claude client or the worker
+    
+    Returns:
+        One of the keys of ERROR_POLICIES
+    """
+    if isinstance(error, (anthropic.AuthenticationError, anthropic.PermissionDeniedError)):
+        return "auth"
+    if isinstance(error, anthropic.RateLimitError):
+        return "rate_limit"
+    if isinstance(error, (anthropic.APITimeoutError, asyncio.TimeoutError)):
+        return "timeout"
+    if isinstance(error, anthropic.APIConnectionError):
+        return "network"
+    if isinstance(error, anthropic.APIStatusError):
+        # 529 is Anthropic's "overloaded"; other 5xx are treated the same way
+        if error.status_code == 529 or error.status_code >= 500:
+            return "overloaded"
+        return "unknown"
+    if isinstance(error, ContentParseError):
+        return "parse"
+    return "unknown"
+
+
+def compute_backoff(policy: RetryPolicy, attempts: int) -> timedelta:
+    """
+    Exponential backoff with jitter for the given attempt number (1-based)
+    """
+    delay = min(policy.max_delay_seconds, policy.base_delay_seconds * (2 ** (attempts - 1)))
+    # +/- 10% jitter so topics that failed together don't retry together
+    delay = delay * random.uniform(0.9, 1.1)
+    return timedelta(seconds=delay)
+
+
+def record_failure(db: Session, topic_id: int, error: BaseException) -> TopicFetchRetry:
+    """
+    Record a failed fetch and schedule the next attempt (or dead-letter it)
+    Does not commit - the caller owns the transaction.
+    
+    Args:
+        db: Database session
+        topic_id: Topic that failed
+        error: Exception raised by the fetch
+    
+    Returns:
+        The updated TopicFetchRetry row
+    """
+    kind = classify_error(error)
+    policy = ERROR_POLICIES[kind]
+    now = datetime.now()
+    
+    retry = db.query(TopicFetchRetry).filter(TopicFetchRetry.topic_id == topic_id).first()
+    if not retry:
+        retry = TopicFetchRetry(topic_id=topic_id, attempts=0, first_failed_at=now)
+        db.add(retry)
+    
+    retry.attempts = (retry.attempts or 0) + 1
+    retry.error_kind = kind
+    retry.last_error = f"{type(error).__name__}: {error}"[:2000]
+    retry.updated_at = now
+    
+    if retry.attempts > policy.max_attempts:
+        retry.status = "dead"
+        retry.next_attempt_at = None
+    else:
+        retry.status = "pending"
+        retry.next_attempt_at = now + compute_backoff(policy, retry.attempts)
+    
+    return retry
+
+
+def clear_retry(db: Session, topic_id: int) -> None:
+    """
+    Remove a topic from the retry queue after a successful fetch
+    Does not commit - the caller owns the transaction.
+    """
+    db.query(TopicFetchRetry).filter(TopicFetchRetry.topic_id == topic_id).delete()
+
+
+def get_due_retries(db: Session, now: Optional[datetime] = None) -> List[TopicFetchRetry]:
+    """Get pending retries whose next attempt is due"""
+    now = now or datetime.now()
+    return (
+        db.query(TopicFetchRetry)
+        .filter(
+            TopicFetchRetry.status == "pending",
+            TopicFetchRetry.next_attempt_at <= now
+        )
+        .order_by(TopicFetchRetry.next_attempt_at)
+        .all()
+    )
+
+
+def list_retries(db: Session, status: Optional[str] = None) -> List[TopicFetchRetry]:
+    """List retry queue entries, optionally filtered by status"""
+    query = db.query(TopicFetchRetry)
+    if status:
+        query = query.filter(TopicFetchRetry.status == status)
+    return query.order_by(TopicFetchRetry.updated_at.desc()).all()
+
+
+def replay(db: Session, topic_id: int) -> Optional[TopicFetchRetry]:
+    """
+    Put a (dead-lettered) topic back on the queue for an immediate attempt
+    Attempts are reset so the topic gets a full retry budget again.
+    Does not commit - the caller owns the transaction.
+    
+    Returns:
+        The requeued row, or None if the topic is not in the retry queue
+    """
+    retry = db.query(TopicFetchRetry).filter(TopicFetchRetry.topic_id == topic_id).first()
+    if not retry:
+        return None
+    
+    retry.status = "pending"
+    retry.attempts = 0
+    retry.next_attempt_at = datetime.now()
+    retry.updated_at = datetime.now()
+    return retry
@@ -4,9 +4,16 @@ Manages periodic content fetching and maintenance tasks
 """
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime
 
-from app.scheduler.jobs import fetch_all_topics_job_sync, cleanup_old_content_job_sync
+from app import config
+from app.scheduler.jobs import (
+    fetch_all_topics_job_sync,
+    cleanup_old_content_job_sync,
+    process_retry_queue_job_sync,
+    prefetch_lessons_job_sync,
+)
 
 
 class ContentScheduler:
@@ -23,15 +30,16 @@ class ContentScheduler:
         """
         Start all scheduled jobs
         """
-        # Job 1: Fetch all topics daily at 6:00 AM
+        # Job 1: Fetch topics that are due for their tier (hot / warm / cold; orphaned never)
         self.scheduler.add_job(
             fetch_all_topics_job_sync,
-            CronTrigger(hour=6, minute=0),  # Every day at 6:00 AM
+            IntervalTrigger(minutes=config.FETCH_POLL_MINUTES),
             id="fetch_all_topics",
-            name="Fetch all topics content",
-            replace_existing=True
+            name="Fetch due topics content",
+            replace_existing=True,
+            max_instances=1
         )
-        print("✅ Scheduled: Daily content fetch at 6:00 AM")
+        print(f"✅ Scheduled: Tiered content fetch, polled every {config.FETCH_POLL_MINUTES} minutes")
         
         # Job 2: Cleanup old content daily at 2:00 AM
         self.scheduler.add_job(
@@ -43,15 +51,27 @@ class ContentScheduler:
         )
         print("✅ Scheduled: Daily cleanup at 2:00 AM")
         
-        # Job 3: Additional fetch at 6:00 PM (evening update)
+        # Job 3: Retry failed topic fetches once their backoff has elapsed
         self.scheduler.add_job(
-            fetch_all_topics_job_sync,
-            CronTrigger(hour=18, minute=0),  # Every day at 6:00 PM
-            id="fetch_all_topics_evening",
-            name="Fetch all topics content (evening)",
-            replace_existing=True
+            process_retry_queue_job_sync,
+            IntervalTrigger(minutes=config.RETRY_POLL_MINUTES),
+            id="process_retry_queue",
+            name="Retry failed topic fetches",
+            replace_existing=True,
+            max_instances=1
+        )
+        print(f"✅ Scheduled: Retry queue every {config.RETRY_POLL_MINUTES} minutes")
+        
+        # Job 4: Generate lessons ahead of active learners, hourly during off-peak hours
+        self.scheduler.add_job(
+            prefetch_lessons_job_sync,
+            CronTrigger(hour=config.LEARNING_PREFETCH_HOURS, minute=15),
+            id="prefetch_lessons",
+            name="Prefetch learning lessons",
+            replace_existing=True,
+            max_instances=1
         )
-        print("✅ Scheduled: Evening content fetch at 6:00 PM")
+        print(f"✅ Scheduled: Lesson prefetch hourly during hours {config.LEARNING_PREFETCH_HOURS}")
         
         print(f"📅 Scheduler started with {len(self.scheduler.get_jobs())} jobs")
         self.print_jobs()
@@ -84,7 +104,7 @@ class ContentScheduler:
         Useful for testing or manual refresh
         """
         print("🚀 Manually triggering content fetch...")
-        fetch_all_topics_job_sync()
+        fetch_all_topics_job_sync(due_only=False)
     
     def trigger_cleanup_now(self):
         """
@@ -0,0 +1,171 @@
+"""
+Popularity-aware fetch tiers
+A topic's tier comes from its maintained subscriber_count (see
+app/subscriptions.py):
+- hot:      >= TIER_HOT_SUBSCRIBERS       refreshed every TIER_HOT_INTERVAL_HOURS
+- warm:     >= TIER_WARM_SUBSCRIBERS      every TIER_WARM_INTERVAL_HOURS
+- cold:     at least one subscriber       every TIER_COLD_INTERVAL_HOURS
+- orphaned: no subscribers                never fetched
+Each topic's interval is its tier interval times its adaptive
+refresh_factor (see refresh.py). Learning topics produce one lesson per
+fetch, so they are due at most once a day whatever their tier, and
+completed plans are never due.
+
+The fetch job polls every FETCH_POLL_MINUTES and fetches the topics that
+are due (never fetched, or last fetched at least one interval ago), hot
+topics first. SQL narrows the candidates using the shortest possible
+interval (REFRESH_FACTOR_MIN); each candidate's own factor is applied in
+Python, so no dialect-specific date arithmetic is needed.
+
+Topics on the retry queue (a pending or dead-lettered TopicFetchRetry row,
+see retry_queue.py) are never due here: a failed fetch leaves last_fetched
+untouched, so the tier poll would otherwise bypass the backoff and refetch
+dead-lettered topics forever. process_retry_queue_job owns them until a
+fetch succeeds and clears the row.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, case, exists, false, func, or_, select
+from sqlalchemy.orm import Session
+
+from app import config
+from app.models import Topic, TopicFetchRetry
+
+TIERS = ("hot", "warm", "cold", "orphaned")
+
+LEARNING_INTERVAL = timedelta(days=1)
+
+
+def tier_for(subscriber_count: int) -> str:
+    """Tier of a topic with this many subscribers"""
+    if subscriber_count >= config.TIER_HOT_SUBSCRIBERS:
+        return "hot"
+    if subscriber_count >= config.TIER_WARM_SUBSCRIBERS:
+        return "warm"
+    return "cold" if subscriber_count > 0 else "orphaned"
+
+
+def tier_interval(tier: str) -> Optional[timedelta]:
+    """Refresh interval of a tier (None: never fetched)"""
+    hours = {
+        "hot": config.TIER_HOT_INTERVAL_HOURS,
+        "warm": config.TIER_WARM_INTERVAL_HOURS,
+        "cold": config.TIER_COLD_INTERVAL_HOURS,
+    }.get(tier)
+    return timedelta(hours=hours) if hours is not None else None
+
+
+def _tier_range(tier: str):
+    """subscriber_count filter for a tier (uses ix_topics_subscriber_count)"""
+    count = Topic.subscriber_count
+    return {
+        "hot": count >= config.TIER_HOT_SUBSCRIBERS,
+        "warm": and_(count >= config.TIER_WARM_SUBSCRIBERS, count < config.TIER_HOT_SUBSCRIBERS),
+        "cold": and_(count > 0, count < config.TIER_WARM_SUBSCRIBERS),
+        "orphaned": count <= 0,
+    }[tier]
+
+
+def tier_case():
+    """SQL expression naming each topic's tier"""
+    count = Topic.subscriber_count
+    return case(
+        (count >= config.TIER_HOT_SUBSCRIBERS, "hot"),
+        (count >= config.TIER_WARM_SUBSCRIBERS, "warm"),
+        (count > 0, "cold"),
+        else_="orphaned"
+    )
+
+
+def topic_interval(tier: str, topic_type: str, refresh_factor: Optional[float]) -> Optional[timedelta]:
+    """Refresh interval of one topic (None: never fetched)"""
+    interval = tier_interval(tier)
+    if interval is None:
+        return None
+    interval = interval * (refresh_factor or 1.0)
+    return max(interval, LEARNING_INTERVAL) if topic_type == "learning" else interval
+
+
+def _not_retrying():
+    """Filter for topics without a retry queue entry (pending or dead)"""
+    return ~exists().where(TopicFetchRetry.topic_id == Topic.id)
+
+
+def _candidates(tier: str, now: datetime):
+    """Filter for a tier's topics that may be due (shortest possible interval)"""
+    interval = tier_interval(tier)
+    if interval is None:
+        return false()
+    shortest = interval * min(config.REFRESH_FACTOR_MIN, 1.0)
+    return and_(
+        _tier_range(tier),
+        or_(Topic.last_fetched.is_(None), Topic.last_fetched <= now - min(shortest, LEARNING_INTERVAL)),
+        or_(Topic.topic_type != "learning", Topic.is_completed.is_not(True)),
+    )
+
+
+def _due_rows(db: Session, now: datetime) -> list:
+    """(id, tier, refresh interval) of due topics, most subscribed first"""
+    rows = db.execute(
+        select(Topic.id, Topic.subscriber_count, Topic.last_fetched, Topic.topic_type, Topic.refresh_factor)
+        .where(or_(*(_candidates(tier, now) for tier in TIERS)), _not_retrying())
+        .order_by(Topic.subscriber_count.desc(), Topic.id)
+    ).all()
+    due = []
+    for row in rows:
+        tier = tier_for(row.subscriber_count)
+        interval = topic_interval(tier, row.topic_type, row.refresh_factor)
+        if interval is not None and (row.last_fetched is None or row.last_fetched <= now - interval):
+            due.append((row.id, tier, interval))
+    return due
+
+
+def due_topic_ids(db: Session, now: Optional[datetime] = None) -> List[int]:
+    """Topics due for a refresh, most subscribed first"""
+    return [topic_id for topic_id, _, _ in _due_rows(db, now or datetime.now())]
+
+
+def subscribed_topic_ids(db: Session) -> List[int]:
+    """Every topic that isn't orphaned or on the retry queue, most subscribed first (manual full refresh)"""
+    return [
+        topic_id for (topic_id,) in db.execute(
+            select(Topic.id)
+            .where(Topic.subscriber_count > 0, _not_retrying())
+            .order_by(Topic.subscriber_count.desc(), Topic.id)
+        )
+    ]
+
+
+def tier_distribution(db: Session, now: Optional[datetime] = None) -> Dict[str, dict]:
+    """
+    Topics, subscribers, base and average adaptive refresh interval, and
+    topics due right now, per tier
+    """
+    now = now or datetime.now()
+    tier = tier_case().label("tier")
+    rows = db.execute(
+        select(
+            tier,
+            func.count(Topic.id),
+            func.coalesce(func.sum(Topic.subscriber_count), 0),
+            func.avg(Topic.refresh_factor)
+        )
+        .group_by(tier)
+    ).all()
+    counts = {name: (topics, subscribers, factor) for name, topics, subscribers, factor in rows}
+    due = Counter(tier_name for _, tier_name, _ in _due_rows(db, now))
+    
+    distribution = {}
+    for name in TIERS:
+        topics, subscribers, factor = counts.get(name, (0, 0, None))
+        interval = tier_interval(name)
+        distribution[name] = {
+            "topics": topics,
+            "subscribers": subscribers,
+            "interval_hours": interval.total_seconds() / 3600 if interval else None,
+            "avg_refresh_factor": round(factor, 3) if factor is not None and interval else None,
+            "due": due[name],
+        }
+    return distribution
@@ -2,7 +2,8 @@
 Pydantic schemas for request/response validation
 """
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Optional, List, Union
+from typing_extensions import TypedDict
 from datetime import datetime, time
 
 
@@ -120,13 +121,48 @@ class ContentResponse(ContentBase):
         from_attributes = True
 
 
+class ContentSummaryResponse(BaseModel):
+    """Schema for content in list views (?view=summary): everything but the full body"""
+    id: int
+    topic_id: int
+    title: str
+    summary: Optional[str] = None
+    url: Optional[str] = None
+    image_url: Optional[str] = None
+    source: Optional[str] = None
+    fetched_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+# Row schemas for the fast list path (app/api/views.py): validated as plain
+# dicts with a list-level TypeAdapter, then serialized with orjson
+
+class ContentSummaryRow(TypedDict):
+    """Content columns in list views (?view=summary)"""
+    id: int
+    topic_id: int
+    title: str
+    summary: Optional[str]
+    url: Optional[str]
+    image_url: Optional[str]
+    source: Optional[str]
+    fetched_at: datetime
+
+
+class ContentRow(ContentSummaryRow):
+    """Content columns including the full body"""
+    content: Optional[str]
+
+
 # ============= FEED SCHEMAS =============
 
 class TopicFeed(BaseModel):
     """Schema for topic with its content"""
     topic_name: str
     topic_id: int
-    items: List[ContentResponse]
+    items: List[Union[ContentResponse, ContentSummaryResponse]]
 
 
 class FeedResponse(BaseModel):
@@ -136,6 +172,36 @@ class FeedResponse(BaseModel):
     topics: List[TopicFeed]
 
 
+class FeedHistoryItem(ContentResponse):
+    """Schema for a feed history item (content plus its topic name)"""
+    topic_name: str
+
+
+class FeedHistorySummaryItem(ContentSummaryResponse):
+    """Schema for a feed history item without the full body (?view=summary)"""
+    topic_name: str
+
+
+class FeedHistoryResponse(BaseModel):
+    """Schema for one page of a user's multi-day feed history"""
+    user_id: int
+    days: int
+    items: List[Union[FeedHistoryItem, FeedHistorySummaryItem]]
+    has_more: bool
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next page
+
+
+class FeedChangesResponse(BaseModel):
+    """Schema for feed delta sync (changes since a cursor)"""
+    user_id: int
+    cursor: str  # pass as ?since= on the next poll
+    reset: bool  # True: cursor missing/expired, reload the full feed
+    has_more: bool  # True: poll again right away
+    topics: List[TopicFeed]  # added items, grouped by topic
+    removed_items: List[int]  # content IDs to drop
+    removed_topics: List[int]  # topic IDs to drop entirely
+
+
 # ============= SAVED CONTENT SCHEMAS =============
 
 class SaveContentRequest(BaseModel):
@@ -156,6 +222,53 @@ class SavedContentResponse(BaseModel):
         from_attributes = True
 
 
+# ============= SEARCH SCHEMAS =============
+
+class SearchResultItem(ContentSummaryResponse):
+    """Schema for a search hit: content without the body, plus a highlighted snippet"""
+    topic_name: str
+    snippet: str  # matched terms wrapped in <mark>
+    score: float  # higher is better
+
+
+class SearchResponse(BaseModel):
+    """Schema for one page of search results"""
+    user_id: int
+    query: str
+    items: List[SearchResultItem]
+    has_more: bool
+    next_offset: Optional[int] = None  # pass as ?offset= for the next page
+
+
+class RelatedItem(ContentSummaryResponse):
+    """Schema for a related item (any topic), most similar first"""
+    topic_name: str
+    score: float  # cosine similarity, 0-1
+
+
+class RelatedContentResponse(BaseModel):
+    """Schema for items related to one content item"""
+    content_id: int
+    items: List[RelatedItem]
+
+
+# ============= RETRY QUEUE SCHEMAS =============
+
+class FetchRetryResponse(BaseModel):
+    """Schema for a failed topic fetch waiting in the retry queue"""
+    topic_id: int
+    status: str  # "pending" or "dead"
+    error_kind: Optional[str] = None
+    last_error: Optional[str] = None
+    attempts: int
+    next_attempt_at: Optional[datetime] = None
+    first_failed_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
 # ============= SETTINGS SCHEMAS =============
 
 class UserSettingsBase(BaseModel):
@@ -0,0 +1,4 @@
+"""
+Search package for AI Sutra
+Full-text index over the content pool
+"""
@@ -0,0 +1,179 @@
+"""
+Full-text search over the content pool
+SQLite: an external-content FTS5 table (content_search) over
+content_pool.title / summary / content. It stores only the inverted index;
+snippets read the text back from content_pool. Triggers on content_pool keep
+it in sync inside the writing transaction, so every path that adds or
+removes content - ingest batches, cleanup, topic deletion - updates the
+index without further bookkeeping.
+
+Postgres: a generated tsvector column (title weighted over summary over
+content) with a GIN index - maintained by Postgres itself.
+
+Both are created with content_pool (after_create) and, for databases that
+predate them, by ensure_search_index() at startup, which also backfills.
+
+search_content() ranks with BM25 on SQLite (title x10, summary x4) and
+ts_rank_cd on Postgres, restricted to the user's topics and saved items.
+Ranking runs first over row IDs; snippets are built only for the page.
+"""
+import re
+from typing import List
+
+from sqlalchemy import DDL, DateTime, Float, event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+SEARCH_TABLE = "content_search"
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        title, summary, content,
+        content='content_pool', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS content_search_insert AFTER INSERT ON content_pool BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS content_search_delete AFTER DELETE ON content_pool BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS content_search_update AFTER UPDATE OF title, summary, content ON content_pool BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+        INSERT INTO {SEARCH_TABLE}(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END""",
+]
+
+_POSTGRES_DDL = [
+    """ALTER TABLE content_pool ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'C')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_content_pool_search ON content_pool USING GIN (search_vector)",
+]
+
+# Restrict matches to content in the user's topics or saved by the user
+_USER_SCOPE = """(
+    c.topic_id IN (SELECT topic_id FROM user_topics WHERE user_id = :user_id)
+    OR c.id IN (SELECT content_id FROM saved_content WHERE user_id = :user_id)
+)"""
+
+_SQLITE_SEARCH = text(f"""
+    WITH ranked AS (
+        SELECT s.rowid AS id, bm25({SEARCH_TABLE}, 10.0, 4.0, 1.0) AS rank
+        FROM {SEARCH_TABLE} s JOIN content_pool c ON c.id = s.rowid
+        WHERE {SEARCH_TABLE} MATCH :match AND {_USER_SCOPE}
+        ORDER BY rank, s.rowid DESC
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT c.id, c.topic_id, c.title, c.summary, c.url, c.image_url, c.source, c.fetched_at,
+           t.topic_name, -ranked.rank AS score,
+           snippet({SEARCH_TABLE}, -1, '<mark>', '</mark>', '…', 24) AS snippet
+    FROM ranked
+    JOIN {SEARCH_TABLE} ON {SEARCH_TABLE}.rowid = ranked.id
+    JOIN content_pool c ON c.id = ranked.id
+    JOIN topics t ON t.id = c.topic_id
+    WHERE {SEARCH_TABLE} MATCH :match
+    ORDER BY ranked.rank, ranked.id DESC
+""").columns(fetched_at=DateTime(timezone=True), score=Float)
+
+_POSTGRES_SEARCH = text(f"""
+    WITH query AS (SELECT websearch_to_tsquery('english', :query) AS q),
+    ranked AS (
+        SELECT c.id, ts_rank_cd(c.search_vector, query.q) AS score
+        FROM content_pool c, query
+        WHERE c.search_vector @@ query.q AND {_USER_SCOPE}
+        ORDER BY score DESC, c.id DESC
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT c.id, c.topic_id, c.title, c.summary, c.url, c.image_url, c.source, c.fetched_at,
+           t.topic_name, ranked.score,
+           ts_headline('english', coalesce(c.content, c.summary, c.title), query.q,
+                       'StartSel=<mark>, StopSel=</mark>, MaxFragments=1, MaxWords=24, MinWords=8') AS snippet
+    FROM ranked
+    JOIN content_pool c ON c.id = ranked.id
+    JOIN topics t ON t.id = c.topic_id
+    CROSS JOIN query
+    ORDER BY ranked.score DESC, ranked.id DESC
+""").columns(fetched_at=DateTime(timezone=True), score=Float)
+
+
+def _install(target, connection: Connection, **kw):
+    """after_create hook: build the index objects with content_pool"""
+    statements = {"sqlite": _SQLITE_DDL, "postgresql": _POSTGRES_DDL}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.execute(DDL(statement))
+
+
+def attach_search_index(content_table):
+    """Create the search index whenever content_pool is created (called from models)"""
+    event.listen(content_table, "after_create", _install)
+
+
+def ensure_search_index(engine: Engine) -> bool:
+    """
+    Create the search index on a database that predates it, and backfill it
+    
+    Returns:
+        True if the index was created
+    """
+    dialect = engine.dialect.name
+    inspector = inspect(engine)
+    if dialect == "sqlite":
+        exists = inspector.has_table(SEARCH_TABLE)
+    elif dialect == "postgresql":
+        exists = "search_vector" in {c["name"] for c in inspector.get_columns("content_pool")}
+    else:
+        return False
+    if exists:
+        return False
+    
+    with engine.begin() as conn:
+        _install(None, conn)
+        if dialect == "sqlite":  # the generated column fills itself on Postgres
+            conn.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"))
+    return True
+
+
+def rebuild_search_index(db: Session):
+    """Rebuild the SQLite index from content_pool (after bulk loads with triggers off, or to repair)"""
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"))
+
+
+def to_match_query(query: str) -> str:
+    """
+    Turn free text into a safe FTS5 query: every word must match, the last
+    one as a prefix (search-as-you-type). FTS5 operators and quotes in the
+    input are treated as plain text.
+    
+    Returns:
+        The MATCH expression, or "" if the input has no words
+    """
+    words = re.findall(r"\w+", query.lower())
+    if not words:
+        return ""
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+
+def search_content(db: Session, user_id: int, query: str, limit: int, offset: int = 0) -> List[dict]:
+    """
+    Ranked matches for `query` among the user's topics and saved items
+    
+    Returns:
+        Row mappings (summary content columns, topic_name, score, snippet),
+        best first; up to `limit` rows starting at `offset`
+    """
+    params = {"user_id": user_id, "limit": limit, "offset": offset}
+    if db.get_bind().dialect.name == "postgresql":
+        return db.execute(_POSTGRES_SEARCH, {**params, "query": query}).mappings().all()
+    
+    match = to_match_query(query)
+    if not match:
+        return []
+    return db.execute(_SQLITE_SEARCH, {**params, "match": match}).mappings().all()
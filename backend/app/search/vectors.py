@@ -0,0 +1,312 @@
+"""
+Local vector index for related content
+Items are embedded without API calls: a signed hashing vectorizer maps
+words (title counted twice, stopwords dropped, sublinear term frequency)
+into VECTOR_DIM float32 dimensions, L2-normalized so a dot product is the
+cosine similarity.
+
+Vectors live in a memory-mapped float32 matrix (vectors.f32) with the
+matching ContentPool ids (ids.i64) in VECTOR_INDEX_DIR. New content is
+appended by an after-commit ingest hook, from the batch itself - no
+database read. At startup catch_up_vector_index() embeds anything the index
+hasn't seen (everything, the first time).
+
+Top-k is brute force: one matrix product for a batch of query vectors over
+every row, then argpartition. At 64 dimensions a 1M-item matrix is 256 MB
+and a query scans it in ~35 ms on one core (bench_related.py). Deleted
+content stays in the matrix until remove() or a rebuild; callers drop ids
+that no longer exist, so over-fetch a little.
+"""
+import json
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app import config
+from app.ingest.batch import IngestBatch
+from app.ingest.hooks import register_after_commit
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both
+but by can could did do does doing down during each few for from further had has have having he her here hers
+him his how i if in into is it its itself just me more most my no nor not now of off on once only or other our
+ours out over own same she should so some such than that the their theirs them then there these they this
+those through to too under until up very was we were what when where which while who whom why will with would
+you your yours
+""".split())
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+@lru_cache(maxsize=200_000)
+def _feature(word: str, dim: int) -> Tuple[int, float]:
+    """Stable (bucket, sign) for a word - crc32, so every process agrees"""
+    h = zlib.crc32(word.encode())
+    return h % dim, (1.0 if h & 0x80000000 else -1.0)
+
+
+def vectorize(title: Optional[str], summary: Optional[str], content: Optional[str], dim: int = None) -> np.ndarray:
+    """Embed one item as a unit-length float32 vector (all zeros if it has no words)"""
+    dim = dim or config.VECTOR_DIM
+    counts = Counter()
+    for text, weight in ((title, 2), (summary, 1), (content, 1)):
+        for word in _WORD.findall((text or "").lower()):
+            if word not in STOPWORDS and len(word) > 1:
+                counts[word] += weight
+    
+    row = [0.0] * dim
+    for word, count in counts.items():
+        bucket, sign = _feature(word, dim)
+        row[bucket] += sign * (1.0 + math.log(count))
+    vector = np.asarray(row, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+
+def vectorize_many(items: Iterable[dict], dim: int = None) -> np.ndarray:
+    """Embed items (dicts with title / summary / content) as an (n, dim) matrix"""
+    dim = dim or config.VECTOR_DIM
+    rows = [vectorize(item.get("title"), item.get("summary"), item.get("content"), dim) for item in items]
+    return np.vstack(rows) if rows else np.zeros((0, dim), dtype=np.float32)
+
+
+class VectorIndex:
+    """
+    Append-only float32 matrix of item vectors plus their ContentPool ids,
+    memory-mapped from `directory`
+    """
+    
+    def __init__(self, directory: str, dim: int):
+        self.directory = directory
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+        self._ids: Optional[np.memmap] = None
+        self._count = 0
+        self._last_id = 0
+        self._sorted = True
+        self._order: Optional[np.ndarray] = None  # argsort of ids when they arrived out of order
+        self._open()
+    
+    @property
+    def count(self) -> int:
+        return self._count
+    
+    @property
+    def last_id(self) -> int:
+        """Highest content id indexed (0 when empty)"""
+        return self._last_id
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+    
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        meta = {}
+        if os.path.exists(self._path("meta.json")):
+            with open(self._path("meta.json")) as f:
+                meta = json.load(f)
+        if meta.get("dim") != self.dim:  # new index, or built with another dimension
+            meta = {"dim": self.dim, "count": 0}
+            for name in ("vectors.f32", "ids.i64"):
+                with open(self._path(name), "wb"):
+                    pass
+        self._count = meta["count"]
+        self._map(max(self._count, 1024))
+        ids = self._ids[:self._count]
+        self._sorted = bool(np.all(ids[1:] > ids[:-1]))
+        self._last_id = int(ids.max()) if self._count else 0
+    
+    def _map(self, capacity: int):
+        """(Re)map both files with room for `capacity` rows, growing them if needed"""
+        for name, row_bytes in (("vectors.f32", 4 * self.dim), ("ids.i64", 8)):
+            with open(self._path(name), "r+b") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() < capacity * row_bytes:
+                    f.truncate(capacity * row_bytes)
+        self._vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._ids = np.memmap(self._path("ids.i64"), dtype=np.int64, mode="r+", shape=(capacity,))
+    
+    def _save_meta(self):
+        tmp = self._path("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"dim": self.dim, "count": self._count}, f)
+        os.replace(tmp, self._path("meta.json"))
+    
+    def _positions(self, ids: np.ndarray) -> np.ndarray:
+        """Matrix row of each id, -1 where the id isn't indexed"""
+        stored = self._ids[:self._count]
+        if not self._sorted and self._order is None:
+            self._order = np.argsort(stored, kind="stable")
+        keys = stored if self._sorted else stored[self._order]
+        positions = np.minimum(np.searchsorted(keys, ids), max(len(keys) - 1, 0))
+        found = keys[positions] == ids if len(keys) else np.zeros(len(ids), dtype=bool)
+        rows = positions if self._sorted else self._order[positions]
+        return np.where(found, rows, -1)
+    
+    def add(self, ids: Sequence[int], vectors: np.ndarray) -> int:
+        """
+        Append vectors for new content ids (ids already indexed are skipped)
+        
+        Returns:
+            Rows appended
+        """
+        with self._lock:
+            ids = np.asarray(ids, dtype=np.int64)
+            new = self._positions(ids) < 0
+            ids, vectors = ids[new], vectors[new]
+            if not len(ids):
+                return 0
+            end = self._count + len(ids)
+            if end > len(self._ids):
+                self._vectors.flush()
+                self._ids.flush()
+                self._map(max(end, 2 * len(self._ids)))
+            if ids.min() <= self._last_id or np.any(ids[1:] <= ids[:-1]):
+                self._sorted = False
+            self._last_id = max(self._last_id, int(ids.max()))
+            self._vectors[self._count:end] = vectors
+            self._ids[self._count:end] = ids
+            self._count = end
+            self._order = None
+            self._vectors.flush()
+            self._ids.flush()
+            self._save_meta()
+        metrics.incr("vector_index.rows_added", len(ids))
+        metrics.set_gauge("vector_index.rows", self._count)
+        return len(ids)
+    
+    def remove(self, ids: Sequence[int]):
+        """Zero the vectors of deleted content so it never matches"""
+        with self._lock:
+            rows = self._positions(np.asarray(ids, dtype=np.int64))
+            rows = rows[rows >= 0]
+            if len(rows):
+                self._vectors[rows] = 0
+                self._vectors.flush()
+    
+    def vector_for(self, content_id: int) -> Optional[np.ndarray]:
+        """Stored vector of an item, None if it isn't indexed"""
+        with self._lock:
+            row = int(self._positions(np.asarray([content_id], dtype=np.int64))[0])
+            return np.array(self._vectors[row]) if row >= 0 else None
+    
+    def top_k(self, queries: np.ndarray, k: int, exclude: Sequence[int] = ()) -> List[List[Tuple[int, float]]]:
+        """
+        Batched cosine top-k: one matrix product for all query vectors
+        
+        Args:
+            queries: (n, dim) unit vectors
+            k: results per query
+            exclude: per query, a content id to leave out (the item itself)
+        
+        Returns:
+            Per query, up to k (content_id, score) pairs with score > 0, best first
+        """
+        count = self._count
+        if not count or not len(queries):
+            return [[] for _ in range(len(queries))]
+        ids = self._ids[:count]
+        scores = np.asarray(queries, dtype=np.float32) @ self._vectors[:count].T  # (n, count)
+        
+        results = []
+        take = min(k + 1, count)
+        for query, row_scores in enumerate(scores):
+            top = np.argpartition(row_scores, count - take)[count - take:]
+            top = top[np.argsort(row_scores[top])[::-1]]
+            skip = exclude[query] if query < len(exclude) else None
+            results.append([
+                (int(ids[row]), float(row_scores[row])) for row in top
+                if row_scores[row] > 0 and ids[row] != skip
+            ][:k])
+        metrics.incr("vector_index.queries", len(results))
+        return results
+    
+    def related(self, content_ids: Sequence[int], k: int, fallback: Dict[int, np.ndarray] = None) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        Top-k related items for each content id
+        Ids missing from the index use their vector from `fallback` (embedded
+        by the caller), or get no results.
+        """
+        fallback = fallback or {}
+        queries, known = [], []
+        for content_id in content_ids:
+            vector = self.vector_for(content_id)
+            if vector is None:
+                vector = fallback.get(content_id)
+            if vector is not None:
+                queries.append(vector)
+                known.append(content_id)
+        matrix = np.vstack(queries) if queries else np.zeros((0, self.dim), dtype=np.float32)
+        found = dict(zip(known, self.top_k(matrix, k, exclude=known)))
+        return {content_id: found.get(content_id, []) for content_id in content_ids}
+
+
+_index: Optional[VectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_vector_index() -> VectorIndex:
+    """Process-wide index (opened on first use)"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = VectorIndex(config.VECTOR_INDEX_DIR, config.VECTOR_DIM)
+        return _index
+
+
+def set_vector_index(index: Optional[VectorIndex]) -> Optional[VectorIndex]:
+    """Swap the process-wide index (tests, rebuilds); returns the previous one"""
+    global _index
+    with _index_lock:
+        previous, _index = _index, index
+        return previous
+
+
+def catch_up_vector_index(session_factory=None, chunk: int = 5000) -> int:
+    """
+    Embed content the index hasn't seen (ids above its last id)
+    
+    Returns:
+        Rows added
+    """
+    from app.database import session_scope
+    from app.models import ContentPool
+    
+    index = get_vector_index()
+    after, added = index.last_id, 0
+    while True:
+        with session_scope(session_factory) as db:
+            rows = (
+                db.query(ContentPool.id, ContentPool.title, ContentPool.summary, ContentPool.content)
+                .filter(ContentPool.id > after)
+                .order_by(ContentPool.id)
+                .limit(chunk)
+                .all()
+            )
+        if not rows:
+            break
+        added += index.add([row.id for row in rows], vectorize_many(row._asdict() for row in rows))
+        after = rows[-1].id
+    if added:
+        logger.info(f"🧭 Vector index caught up ({added} items)")
+    return added
+
+
+def _index_on_ingest(batch: IngestBatch, content_ids: List[int]):
+    if content_ids:
+        get_vector_index().add(content_ids, vectorize_many(batch.items))
+
+
+register_after_commit(_index_on_ingest)
@@ -0,0 +1,113 @@
+"""
+User <-> topic subscriptions
+Single place that links and unlinks topics, so everything derived from
+user_topics (the materialized feed, topics.subscriber_count, learning
+progress) is updated in the same transaction, and the user's cached feed
+payloads are dropped.
+"""
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Topic, user_topics
+from app.feed.cache import get_feed_cache
+from app.feed.entries import link_topic_entries, unlink_topic_entries
+from app.learning.lessons import start_learning, stop_learning
+
+
+def is_linked(db: Session, user_id: int, topic_id: int) -> bool:
+    """Whether the user follows the topic"""
+    return db.query(user_topics).filter(
+        user_topics.c.user_id == user_id,
+        user_topics.c.topic_id == topic_id
+    ).first() is not None
+
+
+def link_user_topic(db: Session, user_id: int, topic_id: int) -> bool:
+    """
+    Link a topic to a user and add its content to their feed
+    Does not commit - the caller owns the transaction.
+    
+    Returns:
+        True if a new link was created, False if it already existed
+    """
+    if is_linked(db, user_id, topic_id):
+        return False
+    
+    db.execute(user_topics.insert().values(user_id=user_id, topic_id=topic_id))
+    db.execute(subscriber_count_update([topic_id], 1))
+    if db.query(Topic.topic_type).filter(Topic.id == topic_id).scalar() == "learning":
+        start_learning(db, user_id, topic_id)
+    link_topic_entries(db, user_id, topic_id)
+    get_feed_cache().invalidate_user(user_id)
+    return True
+
+
+def unlink_user_topic(db: Session, user_id: int, topic_id: int) -> bool:
+    """
+    Unlink a topic from a user and remove its content from their feed
+    Does not commit - the caller owns the transaction.
+    
+    Returns:
+        True if a link was removed
+    """
+    result = db.execute(user_topics.delete().where(
+        (user_topics.c.user_id == user_id) &
+        (user_topics.c.topic_id == topic_id)
+    ))
+    if result.rowcount:
+        db.execute(subscriber_count_update([topic_id], -1))
+        stop_learning(db, user_id, [topic_id])
+    unlink_topic_entries(db, user_id, topic_id)
+    get_feed_cache().invalidate_user(user_id)
+    return result.rowcount > 0
+
+
+def unlink_all_topics(db: Session, user_id: int) -> int:
+    """
+    Remove all of a user's subscriptions when the user is deleted (their feed
+    entries go with the user, so no tombstones are written)
+    Does not commit - the caller owns the transaction.
+    
+    Returns:
+        Number of links removed
+    """
+    topic_ids = [topic_id for (topic_id,) in db.execute(
+        select(user_topics.c.topic_id).where(user_topics.c.user_id == user_id)
+    )]
+    if topic_ids:
+        db.execute(user_topics.delete().where(user_topics.c.user_id == user_id))
+        db.execute(subscriber_count_update(topic_ids, -1))
+        stop_learning(db, user_id, topic_ids)
+    get_feed_cache().invalidate_user(user_id)
+    return len(topic_ids)
+
+
+def subscriber_count_update(topic_ids: list, delta: int):
+    """UPDATE statement moving topics' subscriber_count by delta (run it in the link/unlink transaction)"""
+    return (
+        update(Topic)
+        .where(Topic.id.in_(topic_ids))
+        .values(subscriber_count=Topic.subscriber_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recount_subscribers(db: Session, topic_id: Optional[int] = None) -> int:
+    """
+    Recompute subscriber_count from user_topics (all topics, or one topic)
+    
+    Returns:
+        Number of topics updated
+    """
+    count = (
+        select(func.count())
+        .select_from(user_topics)
+        .where(user_topics.c.topic_id == Topic.id)
+        .scalar_subquery()
+    )
+    stmt = update(Topic).values(subscriber_count=count).execution_options(synchronize_session=False)
+    if topic_id is not None:
+        stmt = stmt.where(Topic.id == topic_id)
+    return db.execute(stmt).rowcount
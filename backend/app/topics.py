@@ -0,0 +1,185 @@
+"""
+Topic canonicalization
+"AI News", "ai news!" and "Latest AI news" are one fetch stream. Topics
+carry a normalized name (case, accents, punctuation and whitespace folded),
+unique among topics of the same kind (type, feed source, learning period),
+so exact variants can't be created twice. A new name is also compared with
+existing topics of that kind by its content words:
+- equal word sets (after dropping filler like "latest" or "learn") match outright
+- otherwise TF-IDF cosine over the topic table, matching at TOPIC_MATCH_THRESHOLD
+A near-match is linked instead of getting its own daily fetches.
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import config
+from app.models import Topic
+
+# Words that don't change what a topic fetches
+FILLER = frozenset("""
+a about all an and any around best daily for from get i in into latest me my need new of on or recent the to
+today todays update updates want what with learn learning
+""".split())
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_topic_name(name: str) -> str:
+    """Canonical spelling of a topic name: 'Latest  AI-News!' -> 'latest ai news'"""
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    return " ".join(_NON_WORD.sub(" ", text).replace("_", " ").split())
+
+
+def _stem(word: str) -> str:
+    """Fold simple plurals ('prices' -> 'price', 'companies' -> 'company'); leaves short words and '-ss' alone"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def topic_terms(name: str) -> FrozenSet[str]:
+    """Content words of a topic name (normalized, filler dropped, plurals folded)"""
+    words = normalize_topic_name(name).split()
+    terms = frozenset(_stem(word) for word in words if word not in FILLER)
+    # A name made only of filler keeps its words rather than matching everything
+    return terms or frozenset(_stem(word) for word in words)
+
+
+class TopicMatcher:
+    """Token-set and TF-IDF similarity between a topic name and a set of existing topics"""
+    
+    def __init__(self, names: Dict[int, str]):
+        self.terms = {topic_id: topic_terms(name) for topic_id, name in names.items()}
+        df = Counter(term for terms in self.terms.values() for term in terms)
+        n = len(self.terms)
+        self.idf = {term: math.log((n + 1) / (count + 1)) + 1 for term, count in df.items()}
+        self._default_idf = math.log(n + 1) + 1  # unseen term
+        self.vectors = {topic_id: self._vector(terms) for topic_id, terms in self.terms.items()}
+    
+    def _vector(self, terms: Iterable[str]) -> Dict[str, float]:
+        weights = {term: self.idf.get(term, self._default_idf) for term in terms}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {term: w / norm for term, w in weights.items()}
+    
+    def similarity(self, terms: FrozenSet[str], topic_id: int) -> float:
+        """1.0 for equal word sets, else TF-IDF cosine"""
+        if not terms:
+            return 0.0
+        if terms == self.terms[topic_id]:
+            return 1.0
+        query, other = self._vector(terms), self.vectors[topic_id]
+        return sum(weight * other.get(term, 0.0) for term, weight in query.items())
+    
+    def best(self, name: str, threshold: float = None) -> Optional[Tuple[int, float]]:
+        """Most similar topic id and its score, if it reaches the threshold"""
+        threshold = config.TOPIC_MATCH_THRESHOLD if threshold is None else threshold
+        terms = topic_terms(name)
+        scored = [(self.similarity(terms, topic_id), -topic_id) for topic_id in self.terms]
+        if not scored:
+            return None
+        score, negative_id = max(scored)
+        return (-negative_id, score) if score >= threshold else None
+
+
+def _same_kind(topic_type: str, feed_source: Optional[str], learning_period: Optional[int]):
+    """Filter for topics that fetch the same way (only those can share a stream)"""
+    clauses = [Topic.topic_type == topic_type]
+    if feed_source is not None:
+        clauses.append(Topic.feed_source == feed_source)
+    if topic_type == "learning":
+        clauses.append(Topic.learning_period_days.is_(None) if learning_period is None
+                       else Topic.learning_period_days == learning_period)
+    return clauses
+
+
+def _kind_key(topic: Topic) -> tuple:
+    """(type, feed source, learning period) of an existing topic"""
+    return (topic.topic_type, topic.feed_source,
+            topic.learning_period_days if topic.topic_type == "learning" else None)
+
+
+def find_matching_topic(
+    db: Session,
+    name: str,
+    topic_type: str = "feed",
+    feed_source: Optional[str] = None,
+    learning_period: Optional[int] = None
+) -> Optional[Tuple[Topic, float]]:
+    """
+    Existing topic of the same kind that a new topic named `name` would duplicate
+    
+    Returns:
+        (topic, similarity) - 1.0 for the same normalized name - or None
+    """
+    same_kind = _same_kind(topic_type, feed_source, learning_period)
+    exact = db.execute(
+        select(Topic).where(Topic.normalized_name == normalize_topic_name(name), *same_kind)
+    ).scalars().first()
+    if exact is not None:
+        return exact, 1.0
+    
+    names = dict(db.execute(
+        select(Topic.id, Topic.topic_name).where(*same_kind)
+    ).all())
+    match = TopicMatcher(names).best(name)
+    if match is None:
+        return None
+    topic_id, score = match
+    return db.get(Topic, topic_id), score
+
+
+def assign_normalized_names(db: Session) -> int:
+    """
+    Backfill topics.normalized_name in id order; a topic whose name
+    normalizes like an older one of the same kind keeps NULL (see duplicate_groups)
+    
+    Returns:
+        Number of topics updated
+    """
+    taken = {
+        (topic.normalized_name, *_kind_key(topic))
+        for topic in db.execute(select(Topic).where(Topic.normalized_name.is_not(None))).scalars()
+    }
+    updated = 0
+    for topic in db.execute(select(Topic).where(Topic.normalized_name.is_(None)).order_by(Topic.id)).scalars():
+        key = (normalize_topic_name(topic.topic_name), *_kind_key(topic))
+        if key[0] and key not in taken:
+            topic.normalized_name = key[0]
+            taken.add(key)
+            updated += 1
+    db.flush()
+    return updated
+
+
+def duplicate_groups(db: Session, threshold: float = None) -> List[List[Topic]]:
+    """
+    Existing topics that would have been linked instead of created: groups of
+    the same kind whose names match, oldest topic first
+    """
+    kinds: Dict[tuple, List[Topic]] = {}
+    for topic in db.execute(select(Topic).order_by(Topic.id)).scalars():
+        kinds.setdefault(_kind_key(topic), []).append(topic)
+    
+    groups = []
+    for topics in kinds.values():
+        # Replay creation in id order: each topic joins the first earlier topic it matches
+        canonical: Dict[int, List[Topic]] = {}
+        seen: Dict[int, str] = {}
+        for topic in topics:
+            match = TopicMatcher(seen).best(topic.topic_name, threshold) if seen else None
+            if match is None:
+                seen[topic.id] = topic.topic_name
+                canonical[topic.id] = [topic]
+            else:
+                canonical[match[0]].append(topic)
+        groups += [group for group in canonical.values() if len(group) > 1]
+    return groups
@@ -3,15 +3,25 @@ Claude API client wrapper for AI Sutra
 Optimized for web search and real-time content fetching
 """
 import os
-from typing import List, Dict, Optional
-from anthropic import Anthropic
+import json
+import asyncio
+import weakref
+from typing import Any, List, Dict, Optional
+import httpx
+from anthropic import AsyncAnthropic
 from dotenv import load_dotenv
 import logging
 
+from app import config
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 
+class ContentParseError(ValueError):
+    """Raised when Claude answered but the payload was not the JSON we asked for"""
+
+
 class ClaudeClient:
     """
     Wrapper for Anthropic Claude API
@@ -23,8 +33,17 @@ class ClaudeClient:
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
         
-        # Initialize Anthropic client
-        self.client = Anthropic(api_key=api_key)
+        # Initialize Anthropic client (async, so calls can be cancelled by deadlines)
+        self.client = AsyncAnthropic(
+            api_key=api_key,
+            max_retries=config.CLAUDE_MAX_RETRIES,
+            http_client=httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    config.CLAUDE_READ_TIMEOUT_SECONDS,
+                    connect=config.CLAUDE_CONNECT_TIMEOUT_SECONDS
+                )
+            )
+        )
         
         # Use Claude Sonnet 4 for web search capability
         self.model = "claude-sonnet-4-20250514"
@@ -77,7 +96,7 @@ Rules:
 - Start response with [ and end with ]"""
 
         try:
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=4000,
                 messages=[{"role": "user", "content": prompt}],
@@ -98,10 +117,9 @@ Rules:
             return content_items[:max_items]
             
         except Exception as e:
+            # Let the caller decide whether to retry (see app/scheduler/retry_queue.py)
             logger.error(f"❌ Error fetching content for {topic_name}: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
+            raise
     
     async def generate_ai_content(
         self,
@@ -154,7 +172,7 @@ Guidelines:
 Return ONLY the JSON object. No markdown, no backticks, no explanations."""
 
         try:
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=4000,
                 messages=[{"role": "user", "content": prompt}],
@@ -167,20 +185,7 @@ Return ONLY the JSON object. No markdown, no backticks, no explanations."""
             # Extract text from response
             result_text = self._extract_text_from_response(response)
             
-            # Parse JSON
-            import json
-            
-            # Clean text
-            result_text = result_text.strip()
-            if result_text.startswith("```json"):
-                result_text = result_text[7:]
-            elif result_text.startswith("```"):
-                result_text = result_text[3:]
-            if result_text.endswith("```"):
-                result_text = result_text[:-3]
-            result_text = result_text.strip()
-            
-            ai_content = json.loads(result_text)
+            ai_content = self._parse_json_object(result_text)
             
             logger.info(f"✅ Generated AI content: {ai_content.get('title', 'Untitled')}")
             
@@ -188,9 +193,7 @@ Return ONLY the JSON object. No markdown, no backticks, no explanations."""
             
         except Exception as e:
             logger.error(f"❌ Error generating AI content: {e}")
-            import traceback
-            traceback.print_exc()
-            return {}
+            raise
     
     async def generate_learning_content(
         self,
@@ -198,7 +201,8 @@ Return ONLY the JSON object. No markdown, no backticks, no explanations."""
         description: str,
         current_day: int,
         total_days: int,
-        previous_context: str
+        previous_context: str,
+        day_plan: Optional[Dict[str, Any]] = None
     ) -> Dict[str, str]:
         """
         Generate structured learning content - day-by-day curriculum
@@ -209,17 +213,23 @@ Return ONLY the JSON object. No markdown, no backticks, no explanations."""
             current_day: Current day number (1, 2, 3...)
             total_days: Total days in the learning plan
             previous_context: Summary of previous lessons
+            day_plan: This day's curriculum outline entry (title, objectives), if planned
             
         Returns:
             Dictionary with title, summary, and content
         """
         
+        plan_section = ""
+        if day_plan:
+            objectives = "\n".join(f"- {objective}" for objective in day_plan.get("objectives", []))
+            plan_section = f"Today's planned topic: {day_plan.get('title', '')}\n{objectives}\n\n"
+        
         prompt = f"""You are creating a structured learning curriculum for: {topic_name}
 
 Learning Goal: {description}
 Current Progress: Day {current_day} of {total_days}
 
-{previous_context}
+{plan_section}{previous_context}
 
 Your task: Create a comprehensive, structured lesson for Day {current_day}.
 
@@ -252,7 +262,7 @@ Minimum 500 words for the content section.
 Return ONLY the JSON object. No markdown, no backticks, no explanations."""
 
         try:
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=4000,
                 messages=[{"role": "user", "content": prompt}]
@@ -261,20 +271,7 @@ Return ONLY the JSON object. No markdown, no backticks, no explanations."""
             # Extract text from response
             result_text = self._extract_text_from_response(response)
             
-            # Parse JSON
-            import json
-            
-            # Clean text
-            result_text = result_text.strip()
-            if result_text.startswith("```json"):
-                result_text = result_text[7:]
-            elif result_text.startswith("```"):
-                result_text = result_text[3:]
-            if result_text.endswith("```"):
-                result_text = result_text[:-3]
-            result_text = result_text.strip()
-            
-            learning_content = json.loads(result_text)
+            learning_content = self._parse_json_object(result_text)
             
             logger.info(f"✅ Generated learning content: {learning_content.get('title', 'Untitled')}")
             
@@ -282,13 +279,78 @@ Return ONLY the JSON object. No markdown, no backticks, no explanations."""
             
         except Exception as e:
             logger.error(f"❌ Error generating learning content: {e}")
-            import traceback
-            traceback.print_exc()
-            return {}
+            raise
     
     
     
     
+    async def plan_curriculum(
+        self,
+        topic_name: str,
+        description: str,
+        total_days: int,
+        first_day: int = 1,
+        last_day: Optional[int] = None,
+        covered: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        Plan a window of a learning curriculum: a short outline of each of
+        its days (long plans are outlined window by window)
+        
+        Args:
+            topic_name: Name of the learning topic
+            description: Additional details/goals
+            total_days: Total days in the learning plan
+            first_day: First day of the window
+            last_day: Last day of the window (default: the end of the plan)
+            covered: What the days before the window cover
+            
+        Returns:
+            List of {"day", "title", "objectives"} dictionaries
+        """
+        last_day = last_day or total_days
+        days = last_day - first_day + 1
+        if first_day == 1 and last_day == total_days:
+            scope = f"Outline the whole course, one entry per day, from Day 1 to Day {total_days}."
+        else:
+            scope = f"Outline Days {first_day} to {last_day} of the course, one entry per day."
+        covered_section = f"{covered}\n" if first_day > 1 and covered else ""
+        
+        prompt = f"""You are planning a {total_days}-day structured learning curriculum for: {topic_name}
+
+Learning Goal: {description}
+
+{covered_section}Your task: {scope}
+Each day builds on the previous ones; the course starts from the basics and ends with a wrap-up or project.
+
+CRITICAL: Return ONLY a valid JSON array with exactly {days} entries in this format:
+[
+  {{"day": {first_day}, "title": "Specific topic for the day", "objectives": ["What the learner will be able to do", "..."]}}
+]
+
+Keep each title under 10 words and give 2-4 short objectives per day.
+
+Return ONLY the JSON array. No markdown, no backticks, no explanations."""
+
+        try:
+            response = await self.client.messages.create(
+                model=self.model,
+                max_tokens=min(8000, 500 + 120 * days),
+                messages=[{"role": "user", "content": prompt}]
+            )
+            
+            result_text = self._extract_text_from_response(response)
+            
+            outline = self._parse_json_response(result_text)
+            
+            logger.info(f"✅ Planned curriculum: days {first_day}-{last_day} of {topic_name} ({len(outline)} entries)")
+            
+            return outline
+        
+        except Exception as e:
+            logger.error(f"❌ Error planning curriculum: {e}")
+            raise
+    
     def _extract_text_from_response(self, response) -> str:
         """
         Extract text content from Claude API response
@@ -314,16 +376,10 @@ Return ONLY the JSON object. No markdown, no backticks, no explanations."""
         
         return result_text.strip()
     
-    def _parse_json_response(self, text: str) -> List[Dict[str, str]]:
-        """
-        Parse JSON from text, handling markdown code blocks and formatting
-        """
-        import json
-        
-        # Clean up text
+    def _strip_code_fences(self, text: str) -> str:
+        """Remove markdown code blocks around a JSON payload if present"""
         text = text.strip()
         
-        # Remove markdown code blocks if present
         if text.startswith("```json"):
             text = text[7:]
         elif text.startswith("```"):
@@ -332,30 +388,59 @@ Return ONLY the JSON object. No markdown, no backticks, no explanations."""
         if text.endswith("```"):
             text = text[:-3]
         
-        text = text.strip()
+        return text.strip()
+    
+    def _load_json(self, text: str):
+        """
+        Parse JSON from text, handling markdown code blocks and formatting
+        
+        Raises:
+            ContentParseError: If the text is not valid JSON
+        """
+        text = self._strip_code_fences(text)
         
-        # Try to parse JSON
         try:
-            data = json.loads(text)
-            
-            # Ensure it's a list
-            if isinstance(data, list):
-                return data
-            elif isinstance(data, dict):
-                return [data]
-            else:
-                logger.warning(f"⚠️ Unexpected data type: {type(data)}")
-                return []
-                
+            return json.loads(text)
         except json.JSONDecodeError as e:
             logger.error(f"❌ JSON parsing error: {e}")
             logger.error(f"Raw text (first 300 chars): {text[:300]}...")
-            return []
+            raise ContentParseError(f"Invalid JSON in Claude response: {e}") from e
+    
+    def _parse_json_response(self, text: str) -> List[Dict[str, str]]:
+        """
+        Parse a JSON array of content items from text
+        
+        Raises:
+            ContentParseError: If the text is not a JSON list or object
+        """
+        data = self._load_json(text)
+        
+        # Ensure it's a list
+        if isinstance(data, list):
+            return data
+        elif isinstance(data, dict):
+            return [data]
+        
+        raise ContentParseError(f"Unexpected data type in Claude response: {type(data).__name__}")
+    
+    def _parse_json_object(self, text: str) -> Dict[str, str]:
+        """
+        Parse a single JSON object (title/summary/content) from text
+        
+        Raises:
+            ContentParseError: If the text is not a JSON object
+        """
+        data = self._load_json(text)
+        
+        if not isinstance(data, dict):
+            raise ContentParseError(f"Expected a JSON object, got {type(data).__name__}")
+        
+        return data
     
     async def test_connection(self) -> bool:
         """Test if Claude API connection is working"""
         try:
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=100,
                 messages=[{"role": "user", "content": "Say 'hello' if you can read this."}]
@@ -367,13 +452,25 @@ Return ONLY the JSON object. No markdown, no backticks, no explanations."""
             return False
 
 
-# Singleton instance
+# One instance per event loop: the async HTTP connection pool is bound to the
+# loop it was first used on, and scheduler jobs each run in their own loop.
+_claude_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ClaudeClient]" = weakref.WeakKeyDictionary()
 _claude_client: Optional[ClaudeClient] = None
 
 
 def get_claude_client() -> ClaudeClient:
-    """Get or create Claude client instance (singleton pattern)"""
+    """Get or create Claude client instance (singleton per event loop)"""
     global _claude_client
-    if _claude_client is None:
-        _claude_client = ClaudeClient()
-    return _claude_client
\ No newline at end of file
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Not inside a loop (e.g. sync scripts) - fall back to a process-wide instance
+        if _claude_client is None:
+            _claude_client = ClaudeClient()
+        return _claude_client
+    
+    client = _claude_clients.get(loop)
+    if client is None:
+        client = ClaudeClient()
+        _claude_clients[loop] = client
+    return client
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""
+In-process metrics for AI Sutra
+Simple thread-safe counters and gauges, exposed via /api/scheduler/metrics
+"""
+import threading
+from typing import Any, Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_gauges: Dict[str, Any] = {}
+
+
+def incr(name: str, value: float = 1) -> None:
+    """Increment a counter"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def set_gauge(name: str, value: Any) -> None:
+    """Set a gauge to its latest value"""
+    with _lock:
+        _gauges[name] = value
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Get a copy of all counters and gauges"""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges)
+        }
+
+
+def reset() -> None:
+    """Clear all metrics (used by tests)"""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
@@ -0,0 +1,41 @@
+"""
+Keyset (cursor) pagination helpers
+Lists ordered newest first by (timestamp, id) page with
+`WHERE (ts, id) < (cursor_ts, cursor_id)` instead of OFFSET, so every page is
+an index range scan no matter how deep the client scrolls.
+"""
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Opaque cursor for the last row of a page"""
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    """Parse a cursor; raises ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        timestamp, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {token!r}") from e
+
+
+def before_cursor(timestamp_column, id_column, cursor: Optional[str]):
+    """
+    Filter for rows after the cursor in (timestamp desc, id desc) order
+    Returns None when there is no cursor (first page).
+    """
+    if cursor is None:
+        return None
+    timestamp, row_id = decode_cursor(cursor)
+    return or_(
+        timestamp_column < timestamp,
+        and_(timestamp_column == timestamp, id_column < row_id)
+    )
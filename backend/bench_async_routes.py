@@ -0,0 +1,187 @@
+"""
+Benchmark: GET /api/feed on the threadpool (sync Session) vs AsyncSession
+Drives both handlers in-process with many concurrent clients through ASGI.
+
+The threadpool baseline gets one pooled connection per client. With the
+profile's pool (5 + 10 overflow) it deadlocks at this concurrency: a sync
+endpoint also validates its response in the threadpool while its session
+still holds a connection, so requests queued for a worker thread keep their
+connections while every worker thread waits for one.
+
+Usage:
+    python bench_async_routes.py [--clients 200] [--requests 2000] [--users 100]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import Base, session_scope
+from app.db_routing import get_async_replica_db
+from app.db_profiles import get_profile, build_engine, build_async_engine
+from app.models import User, Topic, ContentPool, user_topics
+from app.feed.entries import rebuild
+from app.schemas import FeedResponse, TopicFeed, ContentResponse
+from app.api.routes import feed
+
+
+def make_database(users: int, topics: int = 40, per_topic: int = 20):
+    """Fresh SQLite file with users, subscriptions and today's content"""
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_async.db')}"
+    engine = build_engine(url, get_profile())
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    rng = random.Random(7)
+    now = datetime.now()
+    with session_scope(session_factory) as db:
+        db.add_all([Topic(topic_name=f"Bench Topic {i}") for i in range(topics)])
+        db.add_all([User(email=f"bench{i}@example.com", name=f"Bench {i}") for i in range(users)])
+        db.flush()
+        topic_ids = [t.id for t in db.query(Topic).all()]
+        user_ids = [u.id for u in db.query(User).all()]
+        db.execute(insert(user_topics), [
+            {"user_id": uid, "topic_id": tid} for uid in user_ids for tid in rng.sample(topic_ids, 5)
+        ])
+        db.execute(insert(ContentPool), [
+            {"topic_id": tid, "title": f"Article {tid}-{i}", "summary": "Summary. " * 10,
+             "url": f"https://example.com/{tid}/{i}", "source": "Bench", "fetched_at": now - timedelta(minutes=i)}
+            for tid in topic_ids for i in range(per_topic)
+        ])
+        rebuild(db)  # materialized feed for the seeded subscriptions
+    return url, engine, user_ids
+
+
+def threadpool_app(url: str, clients: int):
+    """The previous design: sync `def` handler with a sync Session, run in the threadpool"""
+    engine = build_engine(url, replace(get_profile(), pool_size=clients, max_overflow=0), read_only=True)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    app = FastAPI()
+    
+    @app.get("/api/feed/{user_id}", response_model=FeedResponse)
+    def get_user_feed(user_id: int, db: Session = Depends(get_db)):
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        target_date = datetime.now()
+        topic_feeds = []
+        for topic in user.topics:
+            content_items = (
+                db.query(ContentPool)
+                .filter(
+                    ContentPool.topic_id == topic.id,
+                    ContentPool.fetched_at >= target_date.replace(hour=0, minute=0, second=0),
+                    ContentPool.fetched_at <= target_date.replace(hour=23, minute=59, second=59)
+                )
+                .order_by(ContentPool.fetched_at.desc())
+                .limit(10)
+                .all()
+            )
+            if content_items:
+                topic_feeds.append(TopicFeed(
+                    topic_name=topic.topic_name,
+                    topic_id=topic.id,
+                    items=[ContentResponse.model_validate(item) for item in content_items]
+                ))
+        return FeedResponse(user_id=user_id, date=target_date, topics=topic_feeds)
+    
+    return app, engine
+
+
+def async_app(url: str):
+    """The AsyncSession route from app.api.routes.feed"""
+    async_engine = build_async_engine(url, get_profile(), read_only=True)
+    async_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    
+    async def override_read_db(user_id: int):
+        async with async_factory() as db:
+            yield db
+    
+    app = FastAPI()
+    app.include_router(feed.router, prefix="/api")
+    app.dependency_overrides[get_async_replica_db] = override_read_db
+    return app, async_engine
+
+
+async def drive(app: FastAPI, user_ids, clients: int, requests: int):
+    """`clients` concurrent clients issuing `requests` feed requests in total"""
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)  # count 500s as errors
+    
+    async def client(seed):
+        nonlocal errors
+        rng = random.Random(seed)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            for _ in remaining:
+                start = time.perf_counter()
+                response = await http.get(f"/api/feed/{rng.choice(user_ids)}")
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def report(label, latencies, errors, elapsed):
+    p95 = statistics.quantiles(latencies, n=20)[-1]
+    print(f"\n{label}")
+    print(f"   Throughput:      {len(latencies) / elapsed:,.0f} req/s")
+    print(f"   p50 / p95:       {statistics.median(latencies) * 1000:.1f} / {p95 * 1000:.1f} ms")
+    print(f"   Errors:          {errors}")
+
+
+async def main_async(args):
+    url, engine, user_ids = make_database(args.users)
+    
+    engine.dispose()
+    
+    app, sync_engine = threadpool_app(url, args.clients)
+    report("Threadpool + sync Session (before)", *await drive(app, user_ids, args.clients, args.requests))
+    sync_engine.dispose()
+    
+    app, async_engine = async_app(url)
+    report("AsyncSession (after)", *await drive(app, user_ids, args.clients, args.requests))
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async route benchmark")
+    parser.add_argument("--clients", type=int, default=200, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests per design")
+    parser.add_argument("--users", type=int, default=100, help="Seeded users")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print(f"GET /api/feed: {args.clients} concurrent clients, {args.requests} requests (DB_PROFILE={get_profile().name})")
+    print("=" * 60)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: bytes on the wire and CPU cost of response compression
+Renders real feed, history and saved payloads (~550-word bodies) and, for
+each encoding, reports the compressed size and the time to compress. Then
+replays the feed through CompressionMiddleware to show what the
+compressed-body cache saves on repeat requests for an unchanged ETag.
+
+Usage:
+    python bench_compression.py [--requests 200] [--users 20] [--words 550]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api.compression import CompressionMiddleware, available_encoders
+from app.api.routes import feed, saved
+from app.db_profiles import get_profile, build_async_engine
+from app.db_routing import get_async_replica_db
+from app.feed.cache import get_feed_cache
+from app.utils import metrics
+from bench_content_views import make_database
+
+
+def timed(fn, rounds: int = 20) -> float:
+    """Median milliseconds per call"""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+async def main_async(args):
+    url, user_ids = make_database(args.users, args.words)
+    async_engine = build_async_engine(url, get_profile(), read_only=True)
+    async_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    
+    async def override_read_db(user_id: int):
+        async with async_factory() as db:
+            yield db
+    
+    app = FastAPI()
+    app.include_router(feed.router, prefix="/api")
+    app.include_router(saved.router, prefix="/api")
+    app.dependency_overrides[get_async_replica_db] = override_read_db
+    encoders = available_encoders()
+    user_id = user_ids[0]
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for label, path in [
+            ("Feed (today), full", f"/api/feed/{user_id}"),
+            ("Feed (today), summary", f"/api/feed/{user_id}?view=summary"),
+            ("Feed history (50), full", f"/api/feed/{user_id}/history"),
+            ("Saved (50), summary", f"/api/saved/{user_id}?view=summary"),
+        ]:
+            body = (await http.get(path, headers={"Accept-Encoding": "identity"})).content
+            print(f"\n{label}: {len(body) / 1024:.1f} KiB uncompressed")
+            for name, encode in encoders.items():
+                size = len(encode(body))
+                print(f"   {name:5s} {size / 1024:8.1f} KiB  ({100 * (1 - size / len(body)):4.1f}% smaller)"
+                      f"   {timed(lambda: encode(body)):6.2f} ms CPU")
+    
+    # Repeat feed requests: the feed cache serves the same ETag, so only the first compresses
+    get_feed_cache().clear()
+    compressed_app = CompressionMiddleware(app)
+    rng = random.Random(5)
+    paths = [f"/api/feed/{rng.choice(user_ids)}" for _ in range(args.requests)]
+    print(f"\nCompressed-body cache over {args.requests} feed requests ({len(set(paths))} distinct feeds)")
+    for cached in (False, True):
+        compressed_app.cache.clear()
+        metrics.reset()
+        transport = httpx.ASGITransport(app=compressed_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            for path in paths:
+                if not cached:
+                    compressed_app.cache.clear()
+                response = await http.get(path, headers={"Accept-Encoding": "br, gzip"})
+                assert response.status_code == 200, response.text
+        counters = metrics.snapshot()["counters"]
+        print(f"   cache {'on ' if cached else 'off'}: {counters.get('compression.cpu_ms', 0):8.1f} ms compressing, "
+              f"{counters.get('compression.cache_hits', 0):4.0f} hits, "
+              f"{counters['compression.bytes_in'] / 1024:.0f} KiB -> {counters['compression.bytes_out'] / 1024:.0f} KiB on the wire")
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response compression benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="Feed requests for the cache run")
+    parser.add_argument("--users", type=int, default=20, help="Seeded users")
+    parser.add_argument("--words", type=int, default=550, help="Words per content body")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print(f"Response compression ({', '.join(available_encoders())}; {args.words}-word bodies)")
+    print("=" * 60)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark: list payloads with ?view=full vs ?view=summary
+Seeds users following topics whose items carry ~550-word bodies (like AI
+reports and lessons), then measures response size and latency of the feed,
+feed history and saved lists in both views. The feed cache is disabled so
+every request renders.
+
+Usage:
+    python bench_content_views.py [--requests 200] [--users 20] [--words 550]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import Base, session_scope
+from app.db_routing import get_async_replica_db
+from app.db_profiles import get_profile, build_engine, build_async_engine
+from app.feed.cache import get_feed_cache
+from app.feed.entries import rebuild
+from app.models import User, Topic, ContentPool, SavedContent, user_topics
+from app.saves import recount_saved
+from app.api.routes import feed, saved
+
+WORDS = "model training data learning network layer token attention gradient vector".split()
+
+
+def make_database(users: int, words: int, topics: int = 20, per_topic: int = 10, days: int = 7):
+    """Fresh SQLite file: 5 topics per user, `per_topic` items per topic per day, 50 saved items per user"""
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_views.db')}"
+    engine = build_engine(url, get_profile())
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    rng = random.Random(7)
+    now = datetime.now()
+    with session_scope(session_factory) as db:
+        db.add_all([Topic(topic_name=f"Bench Topic {i}") for i in range(topics)])
+        db.add_all([User(email=f"views{i}@example.com") for i in range(users)])
+        db.flush()
+        topic_ids = [t.id for t in db.query(Topic).all()]
+        user_ids = [u.id for u in db.query(User).all()]
+        db.execute(insert(user_topics), [
+            {"user_id": uid, "topic_id": tid} for uid in user_ids for tid in rng.sample(topic_ids, 5)
+        ])
+        db.execute(insert(ContentPool), [
+            {"topic_id": tid, "title": f"Lesson {tid}-{day}-{i}", "summary": "A two sentence summary. " * 2,
+             "content": " ".join(rng.choice(WORDS) for _ in range(words)),
+             "source": "AI Generated", "fetched_at": now - timedelta(days=day, minutes=i)}
+            for tid in topic_ids for day in range(days) for i in range(per_topic)
+        ])
+        content_ids = [cid for (cid,) in db.query(ContentPool.id).all()]
+        db.execute(insert(SavedContent), [
+            {"user_id": uid, "content_id": cid} for uid in user_ids for cid in rng.sample(content_ids, 50)
+        ])
+        rebuild(db)
+        recount_saved(db)
+    engine.dispose()
+    return url, user_ids
+
+
+async def measure(http, paths):
+    """Mean payload bytes and p50 / p95 latency over the given paths"""
+    sizes, latencies = [], []
+    for path in paths:
+        start = time.perf_counter()
+        response = await http.get(path)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+        sizes.append(len(response.content))
+    return statistics.mean(sizes), statistics.median(latencies), statistics.quantiles(latencies, n=20)[-1]
+
+
+async def main_async(args):
+    url, user_ids = make_database(args.users, args.words)
+    async_engine = build_async_engine(url, get_profile(), read_only=True)
+    async_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    
+    async def override_read_db(user_id: int):
+        async with async_factory() as db:
+            yield db
+    
+    app = FastAPI()
+    app.include_router(feed.router, prefix="/api")
+    app.include_router(saved.router, prefix="/api")
+    app.dependency_overrides[get_async_replica_db] = override_read_db
+    get_feed_cache().max_bytes = 0  # measure rendering, not the cache
+    
+    rng = random.Random(11)
+    endpoints = {
+        "Feed (today)": "/api/feed/{}?view={}",
+        "Feed history (7 days, 50)": "/api/feed/{}/history?view={}",
+        "Saved (50)": "/api/saved/{}?view={}",
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for label, template in endpoints.items():
+            users = [rng.choice(user_ids) for _ in range(args.requests)]
+            full = await measure(http, [template.format(uid, "full") for uid in users])
+            summary = await measure(http, [template.format(uid, "summary") for uid in users])
+            print(f"\n{label}")
+            print(f"   full:     {full[0] / 1024:8.1f} KiB   p50 {full[1] * 1000:6.1f} ms   p95 {full[2] * 1000:6.1f} ms")
+            print(f"   summary:  {summary[0] / 1024:8.1f} KiB   p50 {summary[1] * 1000:6.1f} ms   p95 {summary[2] * 1000:6.1f} ms")
+            print(f"   payload:  {100 * (1 - summary[0] / full[0]):.0f}% smaller")
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content view (full vs summary) benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and view")
+    parser.add_argument("--users", type=int, default=20, help="Seeded users")
+    parser.add_argument("--words", type=int, default=550, help="Words per content body")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print(f"List payloads, full vs summary ({args.words}-word bodies, DB_PROFILE={get_profile().name})")
+    print("=" * 60)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
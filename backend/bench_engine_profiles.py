@@ -0,0 +1,164 @@
+"""
+Benchmark: database engine profiles on the feed and ingest paths
+Runs feed reads (the GET /api/feed queries) from several threads while an
+ingest thread keeps committing ContentPool batches, once per engine profile.
+
+Usage:
+    python bench_engine_profiles.py [--readers 8] [--seconds 5] [--users 100] [--topics 40]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, session_scope
+from app.db_profiles import PROFILES, build_engine
+from app.models import User, Topic, ContentPool, UserFeedEntry, user_topics
+from app.feed.entries import rebuild
+from app.ingest.batch import IngestBatch, persist_batch
+
+
+def read_feed(db, user_id: int):
+    """The GET /api/feed queries: user, then today's materialized feed entries"""
+    db.get(User, user_id)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return (
+        db.query(ContentPool, Topic.topic_name)
+        .join(UserFeedEntry, UserFeedEntry.content_id == ContentPool.id)
+        .join(Topic, Topic.id == UserFeedEntry.topic_id)
+        .filter(UserFeedEntry.user_id == user_id, UserFeedEntry.fetched_at >= today)
+        .order_by(UserFeedEntry.fetched_at.desc())
+        .all()
+    )
+
+
+def make_database(profile, users: int, topics: int, days: int = 14, per_day: int = 10):
+    """Fresh SQLite file seeded with users, subscriptions and two weeks of content"""
+    path = os.path.join(tempfile.mkdtemp(), "bench_profiles.db")
+    url = f"sqlite:///{path}"
+    engine = build_engine(url, profile)
+    read_engine = build_engine(url, profile, read_only=True)
+    Base.metadata.create_all(bind=engine)
+    write_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    read_factory = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+    
+    rng = random.Random(42)
+    now = datetime.now()
+    with session_scope(write_factory) as db:
+        db.add_all([Topic(topic_name=f"Bench Topic {i}") for i in range(topics)])
+        db.add_all([User(email=f"bench{i}@example.com", name=f"Bench {i}") for i in range(users)])
+        db.flush()
+        topic_ids = [t.id for t in db.query(Topic).all()]
+        user_ids = [u.id for u in db.query(User).all()]
+        
+        db.execute(insert(user_topics), [
+            {"user_id": uid, "topic_id": tid}
+            for uid in user_ids
+            for tid in rng.sample(topic_ids, min(8, len(topic_ids)))
+        ])
+        db.execute(insert(ContentPool), [
+            {
+                "topic_id": tid,
+                "title": f"Article {tid}-{d}-{i}",
+                "summary": "A short two sentence summary of the article. " * 2,
+                "content": "Body text. " * 80,
+                "url": f"https://example.com/{tid}/{d}/{i}",
+                "source": "Bench",
+                "fetched_at": now - timedelta(days=d, minutes=i)
+            }
+            for tid in topic_ids for d in range(days) for i in range(per_day)
+        ])
+        rebuild(db)
+    return engine, read_engine, write_factory, read_factory, topic_ids, user_ids
+
+
+def run_profile(profile, readers: int, seconds: float, users: int, topics: int):
+    engine, read_engine, write_factory, read_factory, topic_ids, user_ids = make_database(profile, users, topics)
+    stop = threading.Event()
+    latencies, read_errors = [], []
+    ingest = {"rows": 0, "errors": 0}
+    
+    def reader(seed):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            db = read_factory()
+            start = time.perf_counter()
+            try:
+                read_feed(db, rng.choice(user_ids))
+                latencies.append(time.perf_counter() - start)
+            except OperationalError as e:
+                read_errors.append(e)
+            finally:
+                db.close()
+    
+    def writer():
+        n = 0
+        while not stop.is_set():
+            now = datetime.now()
+            batch = IngestBatch(
+                topic_id=topic_ids[n % len(topic_ids)],
+                items=[
+                    {"title": f"Fresh {n}-{i}", "summary": "s", "content": "Body text. " * 80,
+                     "url": f"https://example.com/fresh/{n}/{i}", "source": "Bench", "fetched_at": now}
+                    for i in range(5)
+                ],
+                topic_updates={"last_fetched": now}
+            )
+            try:
+                with session_scope(write_factory) as db:
+                    ingest["rows"] += len(persist_batch(db, batch))
+            except OperationalError:
+                ingest["errors"] += 1
+            n += 1
+    
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    
+    read_engine.dispose()
+    engine.dispose()
+    return latencies, read_errors, ingest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine profile benchmark")
+    parser.add_argument("--readers", type=int, default=8, help="Concurrent feed readers")
+    parser.add_argument("--seconds", type=float, default=5, help="Duration per profile")
+    parser.add_argument("--users", type=int, default=100, help="Seeded users")
+    parser.add_argument("--topics", type=int, default=40, help="Seeded topics")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print(f"Engine profiles: {args.readers} feed readers + 1 ingest writer, {args.seconds:.0f}s each")
+    print("=" * 60)
+    
+    for name, profile in PROFILES.items():
+        latencies, read_errors, ingest = run_profile(profile, args.readers, args.seconds, args.users, args.topics)
+        print(f"\n{name}")
+        if latencies:
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+            print(f"   Feed requests:   {len(latencies) / args.seconds:,.0f} req/s")
+            print(f"   Feed p50 / p95:  {statistics.median(latencies) * 1000:.1f} / {p95 * 1000:.1f} ms")
+        print(f"   Feed errors:     {len(read_errors)}")
+        print(f"   Ingest:          {ingest['rows'] / args.seconds:,.0f} rows/s")
+        print(f"   Ingest errors:   {ingest['errors']}")
+
+
+if __name__ == "__main__":
+    main()
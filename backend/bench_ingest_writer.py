@@ -0,0 +1,135 @@
+"""
+Benchmark: ingest throughput with and without the single writer
+Simulates concurrent topic fetches committing ContentPool batches to SQLite.
+
+Usage:
+    python bench_ingest_writer.py [--workers 16] [--batches 50] [--items 5]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import asyncio
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, session_scope
+from app.models import Topic, ContentPool
+from app.ingest.batch import IngestBatch, persist_batch
+from app.ingest.writer import IngestWriter
+
+
+def make_database(workers: int):
+    """Fresh SQLite file with one topic per worker"""
+    path = os.path.join(tempfile.mkdtemp(), "bench_ingest.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with session_scope(session_factory) as db:
+        db.add_all([Topic(topic_name=f"Bench Topic {i}") for i in range(workers)])
+        db.flush()
+        topic_ids = [t.id for t in db.query(Topic).order_by(Topic.id).all()]
+    return engine, session_factory, topic_ids
+
+
+def make_batch(topic_id: int, items: int, n: int) -> IngestBatch:
+    now = datetime.now()
+    return IngestBatch(
+        topic_id=topic_id,
+        items=[
+            {
+                "title": f"Benchmark article {n}-{i}",
+                "summary": "A short two sentence summary of the article. " * 2,
+                "content": "Body text. " * 80,
+                "url": f"https://example.com/{topic_id}/{n}/{i}",
+                "source": "Bench",
+                "fetched_at": now
+            }
+            for i in range(items)
+        ],
+        topic_updates={"last_fetched": now}
+    )
+
+
+def bench_direct(workers: int, batches: int, items: int):
+    """Before: every worker thread commits its own batches"""
+    engine, session_factory, topic_ids = make_database(workers)
+    errors = []
+
+    def worker(topic_id):
+        for n in range(batches):
+            try:
+                with session_scope(session_factory) as db:
+                    persist_batch(db, make_batch(topic_id, items, n))
+            except OperationalError as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(tid,)) for tid in topic_ids]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    with session_scope(session_factory) as db:
+        rows = db.query(ContentPool).count()
+    engine.dispose()
+    return rows, elapsed, len(errors)
+
+
+def bench_writer(workers: int, batches: int, items: int):
+    """After: workers hand batches to one group-committing writer"""
+    engine, session_factory, topic_ids = make_database(workers)
+
+    async def run():
+        writer = IngestWriter(session_factory)
+        await writer.start()
+
+        async def worker(topic_id):
+            for n in range(batches):
+                await writer.submit(make_batch(topic_id, items, n))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(tid) for tid in topic_ids))
+        elapsed = time.perf_counter() - start
+        await writer.stop()
+        return elapsed
+
+    elapsed = asyncio.run(run())
+    with session_scope(session_factory) as db:
+        rows = db.query(ContentPool).count()
+    engine.dispose()
+    return rows, elapsed, 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest throughput benchmark")
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent topic fetches")
+    parser.add_argument("--batches", type=int, default=50, help="Batches per worker")
+    parser.add_argument("--items", type=int, default=5, help="Content rows per batch")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Ingest benchmark: {args.workers} workers x {args.batches} batches x {args.items} rows")
+    print("=" * 60)
+
+    for label, bench in (("Direct commits (before)", bench_direct), ("Single writer (after)", bench_writer)):
+        rows, elapsed, errors = bench(args.workers, args.batches, args.items)
+        print(f"\n{label}")
+        print(f"   Rows stored:     {rows}")
+        print(f"   Elapsed:         {elapsed:.2f}s")
+        print(f"   Throughput:      {rows / elapsed:,.0f} rows/s")
+        print(f"   'locked' errors: {errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Simulation: fixed twice-daily fetches vs the adaptive refresh controller
+Each topic publishes items at its own rate (Poisson); a fetch is one API
+call that returns the newest `--window` items. Items that are pushed out of
+the window between two fetches are missed. The adaptive run starts every
+topic at the same 12h interval and lets next_factor() (the controller used
+at ingest) scale it from the observed novelty.
+
+Usage:
+    python bench_refresh.py [--days 30] [--window 5] [--base-hours 12]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import bisect
+import random
+
+from app.scheduler.refresh import next_factor
+
+# (name, new items per hour)
+TOPICS = [
+    ("Stock markets", 2.0),
+    ("AI news", 0.5),
+    ("Cricket", 0.2),
+    ("Gardening", 0.02),
+    ("Bible verses", 0.005),
+]
+
+
+def simulate(rate: float, days: int, window: int, base_hours: float, adaptive: bool, seed: int) -> dict:
+    rng = random.Random(seed)
+    hours = days * 24
+    arrivals, t = [], 0.0
+    while True:
+        t += rng.expovariate(rate)
+        if t >= hours:
+            break
+        arrivals.append(t)
+    
+    seen, calls, captured = 0, 0, 0  # items published up to the last fetch
+    ewma, factor = None, 1.0
+    now = 0.0
+    while now < hours:
+        published = bisect.bisect_right(arrivals, now)
+        returned = min(window, published)
+        new = min(published - seen, returned)
+        calls += 1
+        captured += new
+        seen = published
+        if adaptive and returned and calls > 1:  # like record_novelty, the first fetch isn't an observation
+            ewma, factor = next_factor(ewma, factor, returned, new)
+        now += base_hours * (factor if adaptive else 1.0)
+    return {"calls": calls, "captured": captured, "published": len(arrivals)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Adaptive refresh interval simulation")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--window", type=int, default=5, help="Items a fetch returns")
+    parser.add_argument("--base-hours", type=float, default=12.0, help="Fixed / starting interval")
+    args = parser.parse_args()
+    
+    print("=" * 72)
+    print(f"{args.days} days, fetch returns the newest {args.window} items, base interval {args.base_hours}h")
+    print("=" * 72)
+    print(f"{'topic':<15}{'items':>7}{'fixed calls':>13}{'captured':>10}{'adaptive calls':>16}{'captured':>10}")
+    totals = {"fixed": [0, 0], "adaptive": [0, 0]}
+    for i, (name, rate) in enumerate(TOPICS):
+        fixed = simulate(rate, args.days, args.window, args.base_hours, False, i)
+        adaptive = simulate(rate, args.days, args.window, args.base_hours, True, i)
+        for key, result in (("fixed", fixed), ("adaptive", adaptive)):
+            totals[key][0] += result["calls"]
+            totals[key][1] += result["captured"]
+        print(f"{name:<15}{fixed['published']:>7}{fixed['calls']:>13}{fixed['captured']:>10}"
+              f"{adaptive['calls']:>16}{adaptive['captured']:>10}")
+    print(f"{'total':<15}{'':>7}{totals['fixed'][0]:>13}{totals['fixed'][1]:>10}"
+          f"{totals['adaptive'][0]:>16}{totals['adaptive'][1]:>10}")
+    for key, (calls, captured) in totals.items():
+        print(f"   {key:<9} {captured / calls:5.2f} new items per call")
+
+
+if __name__ == "__main__":
+    main()
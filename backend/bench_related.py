@@ -0,0 +1,96 @@
+"""
+Benchmark: related-content vector index at 1M items, one core
+1. Embedding throughput of the hashing vectorizer (synthetic ~550-word items)
+2. Appending 1M vectors to the memory-mapped matrix in ingest-sized batches
+3. Top-k latency: single queries (what GET /api/content/{id}/related does)
+   and batched queries (one matrix product for many ids)
+
+The matrix is filled with the embedded items plus noise, so the embedding
+step doesn't dominate the run.
+
+Usage:
+    python bench_related.py [--items 1000000] [--embed 20000] [--queries 200] [--dim 64]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from app.search.vectors import VectorIndex, vectorize_many
+
+WORDS = ("model training data learning network layer token attention gradient vector protein genome "
+         "market inflation rate policy rust memory borrow async python pandas query index cache").split()
+
+
+def percentiles(samples: list) -> str:
+    p95 = statistics.quantiles(samples, n=20)[-1]
+    return f"p50 {statistics.median(samples) * 1000:6.2f} ms   p95 {p95 * 1000:6.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Related-content vector index benchmark")
+    parser.add_argument("--items", type=int, default=1_000_000, help="Vectors in the index")
+    parser.add_argument("--embed", type=int, default=20000, help="Items to embed for the throughput test")
+    parser.add_argument("--queries", type=int, default=200, help="Timed top-k queries")
+    parser.add_argument("--dim", type=int, default=64, help="Vector dimensions")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    args = parser.parse_args()
+    rng = random.Random(3)
+    
+    print("=" * 60)
+    print(f"Related-content index: {args.items:,} items x {args.dim} dims float32")
+    print("=" * 60)
+    
+    # 1. Embedding
+    items = [
+        {"title": " ".join(rng.choices(WORDS, k=6)), "summary": " ".join(rng.choices(WORDS, k=20)),
+         "content": " ".join(rng.choices(WORDS, k=550))}
+        for _ in range(args.embed)
+    ]
+    started = time.perf_counter()
+    embedded = vectorize_many(items, args.dim)
+    seconds = time.perf_counter() - started
+    print(f"\nEmbedding:   {args.embed / seconds:9,.0f} items/s   ({seconds * 1000 / args.embed:.2f} ms per item)")
+    
+    # 2. Appending (1,000-item batches, like ingest groups)
+    index = VectorIndex(tempfile.mkdtemp(), args.dim)
+    noise = np.random.default_rng(1)
+    started = time.perf_counter()
+    for start in range(0, args.items, 100_000):
+        n = min(100_000, args.items - start)
+        chunk = embedded[noise.integers(0, len(embedded), n)] + noise.normal(0, 0.05, (n, args.dim)).astype(np.float32)
+        chunk /= np.linalg.norm(chunk, axis=1, keepdims=True)
+        for offset in range(0, n, 1000):
+            ids = np.arange(start + offset + 1, start + min(offset + 1000, n) + 1)
+            index.add(ids, chunk[offset:offset + 1000])
+    seconds = time.perf_counter() - started
+    size = os.path.getsize(os.path.join(index.directory, "vectors.f32"))
+    print(f"Appending:   {args.items / seconds:9,.0f} items/s   (matrix file {size / 2 ** 20:.0f} MiB)")
+    
+    # 3. Queries
+    ids = [rng.randint(1, args.items) for _ in range(args.queries)]
+    index.related(ids[:3], args.k)  # warm the page cache
+    single = []
+    for content_id in ids:
+        started = time.perf_counter()
+        result = index.related([content_id], args.k)[content_id]
+        single.append(time.perf_counter() - started)
+        assert len(result) == args.k
+    print(f"\nSingle query (top {args.k}):       {percentiles(single)}")
+    for batch in (8, 32):
+        started = time.perf_counter()
+        for i in range(0, len(ids), batch):
+            index.related(ids[i:i + batch], args.k)
+        per_query = (time.perf_counter() - started) / len(ids)
+        print(f"Batched x{batch:<3d} per query:       {per_query * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
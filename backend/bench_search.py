@@ -0,0 +1,171 @@
+"""
+Benchmark: full-text indexing and search at 1M content rows (SQLite FTS5)
+1. Incremental: insert rows in ingest-sized batches with the sync triggers
+   on (what the ingest path pays per row)
+2. Bulk: same rows with the triggers dropped, then one 'rebuild' (what
+   ensure_search_index pays to backfill an existing database)
+3. Query latency of search_content (BM25 + snippets, scoped to one user's
+   topics and saved items) against the LIKE '%word%' scan it replaces
+
+Usage:
+    python bench_search.py [--rows 1000000] [--words 40] [--batch 5000] [--queries 200]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import itertools
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, session_scope
+from app.db_profiles import get_profile, build_engine
+from app.models import User, Topic, ContentPool, SavedContent, user_topics
+from app.search.index import SEARCH_TABLE, rebuild_search_index, search_content
+
+TOPICS = 50
+
+
+def make_vocabulary(size: int, rng: random.Random) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def make_database(name: str):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), name)}"
+    engine = build_engine(url, get_profile())
+    Base.metadata.create_all(bind=engine)
+    with session_scope(sessionmaker(bind=engine)) as db:
+        db.add_all([Topic(topic_name=f"Search Topic {i}") for i in range(TOPICS)])
+        user = User(email="search-bench@example.com")
+        db.add(user)
+        db.flush()
+        db.execute(insert(user_topics), [{"user_id": user.id, "topic_id": tid} for tid in range(1, 6)])
+    return url, engine
+
+
+def generate_rows(rows: int, words: int, vocabulary: list, seed: int):
+    """Yield content_pool rows; word frequencies follow a Zipf-like curve"""
+    rng = random.Random(seed)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    now = datetime.now()
+    for i in range(rows):
+        body = rng.choices(vocabulary, cum_weights=cum_weights, k=words)
+        yield {
+            "topic_id": i % TOPICS + 1,
+            "title": " ".join(body[:6]),
+            "summary": " ".join(body[6:18]),
+            "content": " ".join(body),
+            "fetched_at": now,
+        }
+
+
+def load(engine, rows: int, words: int, batch: int, vocabulary: list) -> float:
+    """Insert all rows in `batch`-sized transactions; returns seconds"""
+    started = time.perf_counter()
+    buffer = []
+    with engine.connect() as conn:
+        for row in generate_rows(rows, words, vocabulary, seed=1):
+            buffer.append(row)
+            if len(buffer) == batch:
+                with conn.begin():
+                    conn.execute(insert(ContentPool), buffer)
+                buffer = []
+        if buffer:
+            with conn.begin():
+                conn.execute(insert(ContentPool), buffer)
+    return time.perf_counter() - started
+
+
+def index_bytes(engine) -> int:
+    """Pages used by the FTS5 shadow tables"""
+    with engine.connect() as conn:
+        page_size = conn.execute(text("PRAGMA page_size")).scalar()
+        try:
+            pages = conn.execute(text(
+                f"SELECT sum(pgsize) FROM dbstat WHERE name LIKE '{SEARCH_TABLE}_%'"
+            )).scalar()
+            return pages or 0
+        except Exception:  # dbstat not compiled in: estimate from the data table
+            blocks = conn.execute(text(f"SELECT count(*) FROM {SEARCH_TABLE}_data")).scalar()
+            return blocks * page_size
+
+
+def percentiles(samples: list) -> str:
+    p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) >= 2 else samples[0]
+    return f"p50 {statistics.median(samples) * 1000:7.2f} ms   p95 {p95 * 1000:7.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search indexing benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Content rows to index")
+    parser.add_argument("--words", type=int, default=40, help="Words per content body")
+    parser.add_argument("--batch", type=int, default=5000, help="Rows per insert transaction")
+    parser.add_argument("--queries", type=int, default=200, help="Search queries to time")
+    args = parser.parse_args()
+    rng = random.Random(7)
+    vocabulary = make_vocabulary(20000, rng)
+    
+    print("=" * 60)
+    print(f"FTS5 indexing, {args.rows:,} rows x {args.words} words (DB_PROFILE={get_profile().name})")
+    print("=" * 60)
+    
+    # 1. Incremental: triggers index each row inside its insert transaction
+    _, engine = make_database("bench_search.db")
+    seconds = load(engine, args.rows, args.words, args.batch, vocabulary)
+    print(f"\nIncremental (triggers on):  {seconds:7.1f} s   {args.rows / seconds:9,.0f} rows/s")
+    print(f"   index size:              {index_bytes(engine) / 2 ** 20:7.1f} MiB")
+    
+    # 2. Bulk: plain inserts, then one rebuild
+    _, bulk_engine = make_database("bench_search_bulk.db")
+    with bulk_engine.begin() as conn:
+        for trigger in ("insert", "delete", "update"):
+            conn.execute(text(f"DROP TRIGGER content_search_{trigger}"))
+    plain = load(bulk_engine, args.rows, args.words, args.batch, vocabulary)
+    started = time.perf_counter()
+    with session_scope(sessionmaker(bind=bulk_engine)) as db:
+        rebuild_search_index(db)
+    rebuild = time.perf_counter() - started
+    print(f"Plain inserts (no index):   {plain:7.1f} s   {args.rows / plain:9,.0f} rows/s")
+    print(f"Rebuild:                    {rebuild:7.1f} s   {args.rows / rebuild:9,.0f} rows/s")
+    print(f"   index overhead on ingest: {100 * (seconds - plain) / plain:.0f}%")
+    bulk_engine.dispose()
+    
+    # 3. Queries for one user (5 of 50 topics followed, 100 saved items)
+    session_factory = sessionmaker(bind=engine)
+    with session_scope(session_factory) as db:
+        db.execute(insert(SavedContent), [
+            {"user_id": 1, "content_id": cid} for cid in rng.sample(range(1, args.rows + 1), 100)
+        ])
+    terms = [" ".join(rng.sample(vocabulary[50:5000], 2)) for _ in range(args.queries)]
+    fts, hits = [], []
+    with session_scope(session_factory) as db:
+        for query in terms:
+            started = time.perf_counter()
+            hits.append(len(search_content(db, 1, query, 20)))
+            fts.append(time.perf_counter() - started)
+        like = []
+        for query in terms[:5]:
+            first, second = query.split()
+            started = time.perf_counter()
+            db.execute(text(
+                "SELECT id FROM content_pool WHERE (title LIKE :a OR summary LIKE :a OR content LIKE :a) "
+                "AND (title LIKE :b OR summary LIKE :b OR content LIKE :b) "
+                "AND topic_id IN (SELECT topic_id FROM user_topics WHERE user_id = 1) LIMIT 20"
+            ), {"a": f"%{first}%", "b": f"%{second}%"}).all()
+            like.append(time.perf_counter() - started)
+    print(f"\nSearch, 2-word queries ({statistics.mean(hits):.1f} hits of max 20 on average)")
+    print(f"   FTS5 + BM25 + snippets:  {percentiles(fts)}")
+    print(f"   LIKE '%word%' scan:      {percentiles(like)}   ({len(like)} queries)")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Micro-benchmark: serialization cost per 1,000 items for the hot list endpoints
+Before: ORM rows, per-row model_validate, response models, then the encoder
+each endpoint used (model_dump_json / FastAPI's response_model pass /
+jsonable_encoder) and stdlib json.
+After: Core rows, one list-level TypeAdapter call, orjson (app/api/views.py).
+
+Rows are fetched once up front; only rows -> bytes is timed.
+
+Usage:
+    python bench_serialization.py [--items 1000] [--rounds 20] [--words 550] [--view full]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.orm import defer, sessionmaker
+
+from app.database import Base, session_scope
+from app.db_profiles import get_profile, build_engine
+from app.models import User, Topic, ContentPool, SavedContent
+from app.api.views import content_columns, render_feed, validate_content_rows
+from app.schemas import (
+    ContentResponse, ContentSummaryResponse, FeedResponse, TopicFeed,
+    FeedHistoryItem, FeedHistorySummaryItem, FeedHistoryResponse
+)
+
+WORDS = "model training data learning network layer token attention gradient vector".split()
+
+
+def seed(items: int, words: int):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_serialization.db')}"
+    engine = build_engine(url, get_profile())
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    rng = random.Random(3)
+    now = datetime.now()
+    with session_scope(session_factory) as db:
+        user = User(email="serialize@example.com")
+        db.add_all([user] + [Topic(topic_name=f"Serialize {i}") for i in range(10)])
+        db.flush()
+        topic_ids = [t.id for t in db.query(Topic).all()]
+        db.execute(insert(ContentPool), [
+            {"topic_id": topic_ids[i % 10], "title": f"Item {i}", "summary": "A two sentence summary. " * 2,
+             "content": " ".join(rng.choice(WORDS) for _ in range(words)), "url": f"https://example.com/{i}",
+             "source": "Bench", "fetched_at": now - timedelta(seconds=i)}
+            for i in range(items)
+        ])
+        db.execute(insert(SavedContent), [
+            {"user_id": user.id, "content_id": cid} for (cid,) in db.query(ContentPool.id).all()
+        ])
+    return session_factory
+
+
+def timed(fn, rounds: int) -> float:
+    """Median milliseconds per call"""
+    fn()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List serialization micro-benchmark")
+    parser.add_argument("--items", type=int, default=1000, help="Items per response")
+    parser.add_argument("--rounds", type=int, default=20, help="Timed rounds")
+    parser.add_argument("--words", type=int, default=550, help="Words per content body")
+    parser.add_argument("--view", choices=["full", "summary"], default="full")
+    args = parser.parse_args()
+    view = args.view
+    schema = ContentSummaryResponse if view == "summary" else ContentResponse
+    history_schema = FeedHistorySummaryItem if view == "summary" else FeedHistoryItem
+    options = [defer(ContentPool.content)] if view == "summary" else []
+    history_adapter = TypeAdapter(FeedHistoryResponse)
+    
+    session_factory = seed(args.items, args.words)
+    db = session_factory()
+    orm_rows = db.execute(
+        select(ContentPool, Topic.topic_name).options(*options).join(Topic, Topic.id == ContentPool.topic_id)
+    ).all()
+    saved_rows = db.execute(
+        select(SavedContent, ContentPool).options(*options).join(ContentPool, ContentPool.id == SavedContent.content_id)
+    ).all()
+    core_rows = db.execute(
+        select(*content_columns(view), Topic.topic_name).join(Topic, Topic.id == ContentPool.topic_id)
+    ).mappings().all()
+    core_saved = db.execute(
+        select(SavedContent.id.label("saved_id"), SavedContent.saved_at, *content_columns(view))
+        .join(ContentPool, ContentPool.id == SavedContent.content_id)
+    ).mappings().all()
+    for row in orm_rows:  # load everything before timing
+        row.ContentPool.title
+    now = datetime.now()
+    
+    def feed_before():
+        topic_feeds = {}
+        for item, topic_name in orm_rows:
+            topic_feed = topic_feeds.get(item.topic_id)
+            if topic_feed is None:
+                topic_feed = topic_feeds[item.topic_id] = TopicFeed(topic_name=topic_name, topic_id=item.topic_id, items=[])
+            topic_feed.items.append(schema.model_validate(item))
+        return FeedResponse(user_id=1, date=now, topics=list(topic_feeds.values())).model_dump_json().encode()
+    
+    def history_before():
+        response = FeedHistoryResponse(user_id=1, days=7, has_more=False, items=[
+            history_schema(**schema.model_validate(row.ContentPool).model_dump(), topic_name=row.topic_name)
+            for row in orm_rows
+        ])
+        return json.dumps(history_adapter.dump_python(response, mode="json")).encode()  # response_model pass
+    
+    def saved_before():
+        items = [{"id": s.id, "saved_at": s.saved_at, "content": schema.model_validate(c)} for s, c in saved_rows]
+        return json.dumps(jsonable_encoder({"user_id": 1, "total_saved": len(items), "items": items})).encode()
+    
+    def history_after():
+        items = validate_content_rows(core_rows, view)
+        for row, item in zip(core_rows, items):
+            item["topic_name"] = row["topic_name"]
+        return orjson.dumps({"user_id": 1, "days": 7, "items": items, "has_more": False, "next_cursor": None})
+    
+    def saved_after():
+        items = [
+            {"id": row["saved_id"], "saved_at": row["saved_at"], "content": content}
+            for row, content in zip(core_saved, validate_content_rows(core_saved, view))
+        ]
+        return orjson.dumps({"user_id": 1, "total_saved": len(items), "items": items})
+    
+    print("=" * 60)
+    print(f"Serialization per {args.items} items (view={view}, {args.words}-word bodies)")
+    print("=" * 60)
+    per_1k = 1000 / args.items
+    for label, before, after in [
+        ("GET /api/feed/{id}", feed_before, lambda: render_feed(1, now, core_rows, view)),
+        ("GET /api/feed/{id}/history", history_before, history_after),
+        ("GET /api/saved/{id}", saved_before, saved_after),
+    ]:
+        assert json.loads(before()) and json.loads(after())
+        b, a = timed(before, args.rounds) * per_1k, timed(after, args.rounds) * per_1k
+        print(f"\n{label}")
+        print(f"   before:  {b:7.2f} ms / 1k items")
+        print(f"   after:   {a:7.2f} ms / 1k items   ({b / a:.1f}x faster)")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
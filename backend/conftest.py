@@ -0,0 +1,55 @@
+"""
+Shared test fixtures
+Each test gets its own temporary SQLite file with every table created,
+opened with the development engine profile - no API key needed.
+
+The __main__ runners of the test files call make_database() themselves.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+
+import pytest
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.db_profiles import PROFILES, build_engine
+
+
+@dataclass
+class TempDatabase:
+    url: str
+    engine: Engine
+    session_factory: sessionmaker
+
+
+def make_database(directory: Optional[str] = None, incremental_vacuum: bool = False) -> TempDatabase:
+    """
+    Fresh SQLite database in a directory (default: a new temporary one)
+    incremental_vacuum: create it with auto_vacuum = INCREMENTAL (retention tests)
+    """
+    url = f"sqlite:///{os.path.join(directory or tempfile.mkdtemp(), 'test.db')}"
+    engine = build_engine(url, PROFILES["development"])
+    if incremental_vacuum:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")  # before the first table
+    Base.metadata.create_all(bind=engine)
+    return TempDatabase(url, engine, sessionmaker(autocommit=False, autoflush=False, bind=engine))
+
+
+@pytest.fixture
+def database(tmp_path) -> TempDatabase:
+    db = make_database(str(tmp_path))
+    yield db
+    db.engine.dispose()
+
+
+@pytest.fixture
+def session_factory(database) -> sessionmaker:
+    return database.session_factory
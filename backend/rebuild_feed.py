@@ -0,0 +1,47 @@
+"""
+Check or rebuild the materialized feed (user_feed_entries)
+
+Usage:
+    python rebuild_feed.py --check            # report drift, exit 1 if inconsistent
+    python rebuild_feed.py [--user-id 42]     # rebuild all users (or one), then check
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+
+from app.database import init_db, session_scope
+from app.feed.entries import check_consistency, rebuild
+
+
+def print_report(report: dict) -> bool:
+    consistent = report["missing"] == 0 and report["stale"] == 0
+    print(f"   Expected entries: {report['expected']}")
+    print(f"   Stored entries:   {report['actual']}")
+    print(f"   Missing:          {report['missing']}")
+    print(f"   Stale:            {report['stale']}")
+    print("✅ Consistent" if consistent else "❌ Inconsistent - run without --check to rebuild")
+    return consistent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check or rebuild user_feed_entries")
+    parser.add_argument("--check", action="store_true", help="Only report drift")
+    parser.add_argument("--user-id", type=int, default=None, help="Limit to one user")
+    args = parser.parse_args()
+    
+    init_db()
+    
+    if not args.check:
+        with session_scope() as db:
+            rows = rebuild(db, user_id=args.user_id)
+        print(f"🔁 Rebuilt {rows} feed entries")
+    
+    with session_scope() as db:
+        report = check_consistency(db, user_id=args.user_id)
+    sys.exit(0 if print_report(report) else 1)
+
+
+if __name__ == "__main__":
+    main()
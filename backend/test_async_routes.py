@@ -0,0 +1,128 @@
+"""
+Test the AsyncSession routes (feed, saved, settings, topics)
+Uses a temporary SQLite file through aiosqlite - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import Base, get_async_db
+from app.db_routing import ReplicaRouter, set_replica_router
+from app.db_profiles import PROFILES, build_engine, build_async_engine
+from app.models import User, Topic, ContentPool, user_topics
+from app.subscriptions import link_user_topic
+from app.api.routes import feed, saved, settings, topics
+
+
+def _make_client():
+    """Routers on a bare app (no lifespan/scheduler), wired to a temp database"""
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'async_routes.db')}"
+    profile = PROFILES["production"]
+    engine = build_engine(url, profile)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    
+    async_factory = async_sessionmaker(build_async_engine(url, profile), expire_on_commit=False)
+    async_read_factory = async_sessionmaker(build_async_engine(url, profile, read_only=True), expire_on_commit=False)
+    
+    async def override_db():
+        async with async_factory() as db:
+            yield db
+    
+    app = FastAPI()
+    for module in (feed, saved, settings):
+        app.include_router(module.router, prefix="/api")
+    app.include_router(topics.router, prefix="/api/topics")
+    app.dependency_overrides[get_async_db] = override_db
+    set_replica_router(ReplicaRouter(primary=sessionmaker(bind=engine), async_primary=async_read_factory))
+    return TestClient(app), session_factory
+
+
+def _seed(session_factory):
+    db = session_factory()
+    user = User(email="async@example.com", name="Async User")
+    topic = Topic(topic_name="Async Topic", agent_config={"topic_name": "Async Topic"})
+    db.add_all([user, topic])
+    db.flush()
+    db.add_all([
+        ContentPool(topic_id=topic.id, title=f"Item {i}", summary="s", fetched_at=datetime.now())
+        for i in range(3)
+    ])
+    db.flush()
+    link_user_topic(db, user.id, topic.id)
+    db.commit()
+    ids = (user.id, topic.id, db.query(ContentPool.id).first()[0])
+    db.close()
+    return ids
+
+
+def test_feed_and_saved_routes():
+    print("\n1. Testing feed and saved routes on AsyncSession...")
+    client, session_factory = _make_client()
+    with client:
+        user_id, topic_id, content_id = _seed(session_factory)
+        
+        response = client.get(f"/api/feed/{user_id}")
+        assert response.status_code == 200, response.text
+        topic_feeds = response.json()["topics"]
+        assert len(topic_feeds) == 1 and len(topic_feeds[0]["items"]) == 3
+        print("✅ GET /api/feed returns today's items")
+        
+        assert client.get("/api/feed/9999").status_code == 404
+        
+        response = client.post("/api/saved/", json={"user_id": user_id, "content_id": content_id})
+        assert response.status_code == 201, response.text
+        saved_id = response.json()["saved_id"]
+        assert client.post("/api/saved/", json={"user_id": user_id, "content_id": content_id}).status_code == 400
+        
+        response = client.get(f"/api/saved/{user_id}")
+        assert response.json()["total_saved"] == 1
+        assert response.json()["items"][0]["content"]["id"] == content_id
+        print("✅ Save, duplicate check and saved list work")
+        
+        assert client.delete(f"/api/saved/{saved_id}").status_code == 204
+        assert client.get(f"/api/saved/{user_id}").json()["total_saved"] == 0
+        print("✅ Unsave works")
+
+
+def test_settings_and_topics_routes():
+    print("\n2. Testing settings and topics routes on AsyncSession...")
+    client, session_factory = _make_client()
+    with client:
+        user_id, topic_id, content_id = _seed(session_factory)
+        
+        response = client.get(f"/api/settings/{user_id}")
+        assert response.status_code == 200 and response.json()["periodic_frequency"] == "daily"
+        response = client.put(f"/api/settings/{user_id}", json={
+            "periodic_frequency": "weekly", "preferred_languages": ["en", "hi"], "delivery_time": "07:30:00"
+        })
+        assert response.status_code == 200 and response.json()["periodic_frequency"] == "weekly"
+        print("✅ Settings created with defaults and updated")
+        
+        response = client.put(f"/api/topics/{topic_id}", json={"description": "Updated"})
+        assert response.status_code == 200, response.text
+        
+        assert client.delete(f"/api/topics/{topic_id}").status_code == 200
+        db = session_factory()
+        assert db.get(Topic, topic_id) is None
+        assert db.query(ContentPool).count() == 0
+        assert db.query(user_topics).count() == 0
+        db.close()
+        print("✅ Topic updated, then deleted with its content and subscriptions")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Async Routes")
+    print("=" * 60)
+    test_feed_and_saved_routes()
+    test_settings_and_topics_routes()
+    print("\n🎉 Async route tests passed!")
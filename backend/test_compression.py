@@ -0,0 +1,79 @@
+"""
+Test the response compression middleware
+No database or API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.api.compression import CompressionMiddleware, available_encoders, negotiate
+from app.utils import metrics
+
+BODY = b'{"content": "' + b"A long lesson body. " * 500 + b'"}'
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    
+    @app.get("/big")
+    def big():
+        return Response(BODY, media_type="application/json", headers={"ETag": 'W/"v1"'})
+    
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+    
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" + b"\x00" * 4096, media_type="image/png")
+    
+    return app
+
+
+def test_negotiation():
+    print("\n1. Testing Accept-Encoding negotiation...")
+    supported = ["br", "zstd", "gzip"]
+    assert negotiate("gzip, deflate, br", supported) == "br", "Server preference breaks ties"
+    assert negotiate("gzip;q=1.0, br;q=0.5", supported) == "gzip", "Higher q-value wins"
+    assert negotiate("br;q=0, *", supported) == "zstd"
+    assert negotiate("identity", supported) is None
+    assert negotiate("", supported) is None
+    print("✅ q-values, wildcards and server preference handled")
+
+
+def test_compressed_responses_and_cache():
+    print("\n2. Testing compressed responses...")
+    metrics.reset()
+    with TestClient(make_app()) as client:
+        for encoding in available_encoders():
+            response = client.get("/big", headers={"Accept-Encoding": encoding})
+            assert response.headers["Content-Encoding"] == encoding
+            assert "Accept-Encoding" in response.headers["Vary"]
+            # httpx decodes the body itself; Content-Length is the size on the wire
+            assert int(response.headers["Content-Length"]) < len(BODY) / 10
+            assert response.content == BODY
+            print(f"✅ {encoding}: {len(BODY)} -> {response.headers['Content-Length']} bytes")
+        
+        client.get("/big", headers={"Accept-Encoding": "br"})
+        assert metrics.snapshot()["counters"]["compression.cache_hits"] == 1
+        print("✅ Unchanged ETag reuses the compressed body")
+        
+        small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+        plain = client.get("/big", headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in small.headers and "Content-Encoding" not in image.headers
+        assert "Content-Encoding" not in plain.headers and plain.content == BODY
+        print("✅ Small bodies, binary types and identity clients are left alone")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Response Compression")
+    print("=" * 60)
+    test_negotiation()
+    test_compressed_responses_and_cache()
+    print("\n🎉 Compression tests passed!")
@@ -0,0 +1,112 @@
+"""
+Test ?view=summary list projections and GET /api/content/{id}
+Uses a temporary SQLite file - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import Base, get_async_read_db, session_scope
+from app.db_profiles import PROFILES, build_engine, build_async_engine
+from app.db_routing import ReplicaRouter, set_replica_router
+from app.feed.cache import get_feed_cache
+from app.models import User, Topic, ContentPool, SavedContent
+from app.saves import recount_saved
+from app.subscriptions import link_user_topic
+from app.api.routes import content, feed, saved
+from app.api.views import render_feed
+from app.schemas import FeedResponse
+
+BODY = "A long lesson body. " * 200
+
+
+def test_summary_views_and_content_route():
+    print("\n1. Testing summary projections and the content route...")
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'content_views.db')}"
+    profile = PROFILES["development"]
+    engine = build_engine(url, profile)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_factory = async_sessionmaker(build_async_engine(url, profile), expire_on_commit=False)
+    
+    async def override_read_db():
+        async with async_factory() as db:
+            yield db
+    
+    app = FastAPI()
+    for module in (feed, saved, content):
+        app.include_router(module.router, prefix="/api")
+    app.dependency_overrides[get_async_read_db] = override_read_db
+    previous = set_replica_router(ReplicaRouter(primary=session_factory, async_primary=async_factory))
+    
+    with session_scope(session_factory) as db:
+        user, topic = User(email="views@example.com"), Topic(topic_name="Views")
+        db.add_all([user, topic])
+        db.flush()
+        item = ContentPool(topic_id=topic.id, title="Lesson", summary="Short", content=BODY, fetched_at=datetime.now())
+        db.add(item)
+        db.flush()
+        link_user_topic(db, user.id, topic.id)
+        db.add(SavedContent(user_id=user.id, content_id=item.id))
+        db.flush()
+        recount_saved(db)
+        user_id, content_id = user.id, item.id
+    
+    get_feed_cache().clear()
+    try:
+        with TestClient(app) as client:
+            full = client.get(f"/api/feed/{user_id}")
+            summary = client.get(f"/api/feed/{user_id}", params={"view": "summary"})
+            assert full.json()["topics"][0]["items"][0]["content"] == BODY
+            summary_item = summary.json()["topics"][0]["items"][0]
+            assert "content" not in summary_item and summary_item["summary"] == "Short"
+            assert summary.headers["ETag"] != full.headers["ETag"], "Views are cached separately"
+            assert len(summary.content) < len(full.content) / 10
+            print(f"✅ Feed: {len(full.content)} bytes full, {len(summary.content)} bytes summary")
+            
+            history = client.get(f"/api/feed/{user_id}/history", params={"view": "summary"}).json()
+            assert "content" not in history["items"][0] and history["items"][0]["topic_name"] == "Views"
+            saved_item = client.get(f"/api/saved/{user_id}", params={"view": "summary"}).json()["items"][0]
+            assert "content" not in saved_item["content"]
+            assert client.get(f"/api/feed/{user_id}", params={"view": "compact"}).status_code == 422
+            print("✅ History and saved lists leave the body out too")
+            
+            body = client.get(f"/api/content/{content_id}").json()
+            assert body["content"] == BODY and body["id"] == content_id
+            assert client.get("/api/content/9999").status_code == 404
+            print("✅ GET /api/content/{id} returns the full body")
+    finally:
+        get_feed_cache().clear()
+        set_replica_router(previous)
+
+
+def test_fast_path_matches_response_schema():
+    print("\n2. Testing the orjson fast path against FeedResponse...")
+    now = datetime.now()
+    rows = [
+        {"id": i, "topic_id": i % 2, "title": f"T{i}", "summary": None, "url": None, "image_url": None,
+         "source": None, "fetched_at": now, "content": BODY, "topic_name": f"Topic {i % 2}"}
+        for i in range(4)
+    ]
+    feed_response = FeedResponse.model_validate_json(render_feed(7, now, rows, "full"))
+    assert [len(t.items) for t in feed_response.topics] == [2, 2]
+    assert feed_response.topics[1].topic_name == "Topic 1" and feed_response.topics[0].items[0].content == BODY
+    assert "content" not in render_feed(7, now, rows, "summary").decode()
+    print("✅ Rendered bytes parse as FeedResponse")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Content Views")
+    print("=" * 60)
+    test_summary_views_and_content_route()
+    test_fast_path_matches_response_schema()
+    print("\n🎉 Content view tests passed!")
@@ -0,0 +1,87 @@
+"""
+Test database engine profiles
+Uses temporary SQLite files - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.db_profiles import PROFILES, build_engine, engine_kwargs, get_profile
+from app.models import Topic
+
+
+def _url():
+    return f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'profile_test.db')}"
+
+
+def test_production_pragmas():
+    print("\n1. Testing the production profile applies SQLite pragmas...")
+    engine = build_engine(_url(), PROFILES["production"])
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar().lower() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -64 * 1024
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 10000
+    assert engine.echo is False
+    print("✅ WAL, synchronous=NORMAL, cache_size and busy_timeout set; SQL echo off")
+    engine.dispose()
+
+
+def test_read_only_engine_rejects_writes():
+    print("\n2. Testing the read-only engine rejects writes...")
+    url = _url()
+    engine = build_engine(url, PROFILES["production"])
+    read_engine = build_engine(url, PROFILES["production"], read_only=True)
+    Base.metadata.create_all(bind=engine)
+    
+    db = sessionmaker(bind=engine)()
+    db.add(Topic(topic_name="Written"))
+    db.commit()
+    db.close()
+    
+    read_db = sessionmaker(bind=read_engine)()
+    assert read_db.query(Topic).count() == 1
+    read_db.add(Topic(topic_name="Not allowed"))
+    try:
+        read_db.commit()
+        raise AssertionError("Write through the read-only engine should fail")
+    except OperationalError:
+        read_db.rollback()
+    finally:
+        read_db.close()
+    print("✅ Reads work, writes fail on the read-only engine")
+
+
+def test_env_overrides_and_postgres_options():
+    print("\n3. Testing env overrides and Postgres connection options...")
+    os.environ["SQL_ECHO"] = "true"
+    os.environ["DB_POOL_SIZE"] = "3"
+    try:
+        profile = get_profile("production")
+    finally:
+        del os.environ["SQL_ECHO"]
+        del os.environ["DB_POOL_SIZE"]
+    assert profile.echo is True and profile.pool_size == 3
+    
+    kwargs = engine_kwargs("postgresql://u:p@localhost/ai_sutra", PROFILES["production"], read_only=True)
+    assert kwargs["pool_pre_ping"] is True and kwargs["pool_size"] == 10
+    options = kwargs["connect_args"]["options"]
+    assert "statement_timeout=15000" in options and "default_transaction_read_only=on" in options
+    print(f"✅ Postgres options: {options}")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Database Engine Profiles")
+    print("=" * 60)
+    test_production_pragmas()
+    test_read_only_engine_rejects_writes()
+    test_env_overrides_and_postgres_options()
+    print("\n🎉 Engine profile tests passed!")
@@ -0,0 +1,120 @@
+"""
+Test the feed response cache (LRU, invalidation, ETag / 304)
+Uses a temporary SQLite file - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import tempfile
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import Base, get_async_db
+from app.db_profiles import PROFILES, build_engine, build_async_engine
+from app.db_routing import ReplicaRouter, set_replica_router
+from app.feed.cache import FeedCache, compute_validators, get_feed_cache
+from app.ingest.batch import IngestBatch
+from app.ingest.writer import write_batch
+from app.models import User, Topic
+from app.subscriptions import link_user_topic
+from app.api.routes import feed
+
+
+def test_lru_cap_and_invalidation():
+    print("\n1. Testing the byte cap and precise invalidation...")
+    cache = FeedCache(max_bytes=250)
+    validators = {
+        1: compute_validators(1, "2024-01-01", [(10, None)]),
+        2: compute_validators(2, "2024-01-01", [(10, None), (20, None)]),
+        3: compute_validators(3, "2024-01-01", [(20, None)]),
+    }
+    for user_id, v in validators.items():
+        cache.put((user_id, "2024-01-01"), b"x" * 100, v)
+    
+    assert cache.stats()["bytes"] == 200 and cache.get((1, "2024-01-01"), validators[1]) is None
+    assert cache.get((2, "2024-01-01"), validators[2]) is not None
+    print("✅ Least recently used feed evicted at the cap")
+    
+    assert cache.invalidate_topic(10) == 1, "Only user 2 is cached and follows topic 10"
+    assert cache.get((3, "2024-01-01"), validators[3]) is not None
+    assert cache.invalidate_user(3) == 1 and cache.stats()["entries"] == 0
+    print("✅ Topic and user invalidation drop only the affected feeds")
+    
+    fetched = compute_validators(3, "2024-01-01", [(20, datetime(2024, 1, 1, 8))])
+    cache.put((3, "2024-01-01"), b"old", validators[3])
+    assert cache.get((3, "2024-01-01"), fetched) is None, "Stale ETag must miss"
+    print("✅ An entry rendered for older validators is never served")
+
+
+def test_etag_304_and_ingest_invalidation():
+    print("\n2. Testing conditional GETs and ingest invalidation...")
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'feed_cache.db')}"
+    profile = PROFILES["development"]
+    engine = build_engine(url, profile)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    async_factory = async_sessionmaker(build_async_engine(url, profile), expire_on_commit=False)
+    
+    async def override_db():
+        async with async_factory() as db:
+            yield db
+    
+    app = FastAPI()
+    app.include_router(feed.router, prefix="/api")
+    app.dependency_overrides[get_async_db] = override_db
+    previous = set_replica_router(ReplicaRouter(primary=session_factory, async_primary=async_factory))
+    
+    db = session_factory()
+    user, topic = User(email="cache@example.com"), Topic(topic_name="Cache")
+    db.add_all([user, topic])
+    db.flush()
+    link_user_topic(db, user.id, topic.id)
+    db.commit()
+    user_id, topic_id = user.id, topic.id
+    db.close()
+    
+    def ingest(title):
+        now = datetime.now()
+        batch = IngestBatch(topic_id, [{"title": title, "summary": "s", "fetched_at": now}], {"last_fetched": now})
+        asyncio.run(write_batch(batch, session_factory))
+    
+    cache = get_feed_cache()
+    cache.clear()
+    try:
+        with TestClient(app) as client:
+            ingest("First")
+            first = client.get(f"/api/feed/{user_id}")
+            assert first.status_code == 200 and "ETag" in first.headers and "Last-Modified" in first.headers
+            assert cache.stats()["entries"] == 1
+            
+            again = client.get(f"/api/feed/{user_id}", headers={"If-None-Match": first.headers["ETag"]})
+            assert again.status_code == 304 and again.content == b""
+            since = client.get(f"/api/feed/{user_id}", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+            assert since.status_code == 304
+            assert client.get(f"/api/feed/{user_id}").content == first.content
+            print("✅ Unchanged feed answers 304 and is served from the cache")
+            
+            ingest("Second")
+            assert cache.stats()["entries"] == 0, "Ingest of the user's topic drops the cached feed"
+            changed = client.get(f"/api/feed/{user_id}", headers={"If-None-Match": first.headers["ETag"]})
+            assert changed.status_code == 200 and changed.headers["ETag"] != first.headers["ETag"]
+            assert len(changed.json()["topics"][0]["items"]) == 2
+            print("✅ New content invalidates the cache and the ETag")
+    finally:
+        cache.clear()
+        set_replica_router(previous)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Feed Cache")
+    print("=" * 60)
+    test_lru_cap_and_invalidation()
+    test_etag_304_and_ingest_invalidation()
+    print("\n🎉 Feed cache tests passed!")
@@ -0,0 +1,155 @@
+"""
+Test feed delta sync (GET /api/feed/{user_id}/changes)
+Uses a temporary SQLite file - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import session_scope
+from app.db_profiles import PROFILES, build_async_engine
+from app.db_routing import ReplicaRouter, set_replica_router
+from app.agents.worker_agent import WorkerAgent
+from app.feed.changes import feed_write_lock, read_changes
+from app.ingest.batch import IngestBatch, persist_batch
+from app.models import User, Topic
+from app.subscriptions import link_user_topic, unlink_user_topic
+from app.api.routes import feed
+
+
+def _ingest(session_factory, topic_id, n, fetched_at=None):
+    fetched_at = fetched_at or datetime.now()
+    with session_scope(session_factory) as db:
+        return persist_batch(db, IngestBatch(
+            topic_id=topic_id,
+            items=[{"title": f"Item {i}", "summary": "s", "fetched_at": fetched_at} for i in range(n)]
+        ))
+
+
+def _changes(session_factory, user_id, since, limit=200):
+    with session_scope(session_factory) as db:
+        changes = read_changes(db, user_id, since, limit)
+        return changes, [item.id for item, _ in changes.items]
+
+
+def test_additions_and_tombstones(database):
+    print("\n1. Testing additions, paging and tombstones...")
+    engine, session_factory = database.engine, database.session_factory
+    with session_scope(session_factory) as db:
+        user, ai, rust = User(email="delta@example.com"), Topic(topic_name="AI"), Topic(topic_name="Rust")
+        db.add_all([user, ai, rust])
+        db.flush()
+        link_user_topic(db, user.id, ai.id)
+        user_id, ai_id, rust_id = user.id, ai.id, rust.id
+    old_ids = _ingest(session_factory, ai_id, 2, datetime.now() - timedelta(days=30))
+    
+    start, _ = _changes(session_factory, user_id, None)
+    assert start.reset and not start.items
+    cursor = start.cursor.encode()
+    
+    new_ids = _ingest(session_factory, ai_id, 3)
+    _ingest(session_factory, rust_id, 4)  # not followed
+    changes, ids = _changes(session_factory, user_id, cursor, limit=2)
+    assert ids == new_ids[:2] and changes.has_more
+    changes, ids = _changes(session_factory, user_id, changes.cursor.encode(), limit=2)
+    assert ids == new_ids[2:] and not changes.has_more
+    cursor = changes.cursor.encode()
+    assert _changes(session_factory, user_id, cursor)[1] == []
+    print("✅ Only new content after the cursor, paged with has_more")
+    
+    with session_scope(session_factory) as db:
+        link_user_topic(db, user_id, rust_id)
+    changes, ids = _changes(session_factory, user_id, cursor)
+    assert len(ids) == 4, "Linking a topic delivers its backfill"
+    cursor = changes.cursor.encode()
+    
+    WorkerAgent(ai_id, session_factory).cleanup_old_content(days_to_keep=7)
+    with session_scope(session_factory) as db:
+        unlink_user_topic(db, user_id, rust_id)
+    changes, ids = _changes(session_factory, user_id, cursor)
+    assert ids == [] and sorted(changes.removed_items) == sorted(old_ids) and changes.removed_topics == [rust_id]
+    print("✅ Cleanup and unlink produce item and topic tombstones")
+    
+    with engine.connect() as conn:
+        plan = conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM user_feed_entries WHERE user_id = 1 AND id > 5 ORDER BY id"
+        )).fetchall()
+    assert any("ix_user_feed_entries_user_id" in row[-1] for row in plan), plan
+    print("✅ Additions are a range scan on (user_id, id)")
+
+
+def test_changes_route(database):
+    print("\n2. Testing the changes route...")
+    url, session_factory = database.url, database.session_factory
+    async_factory = async_sessionmaker(build_async_engine(url, PROFILES["development"]), expire_on_commit=False)
+    previous = set_replica_router(ReplicaRouter(primary=session_factory, async_primary=async_factory))
+    app = FastAPI()
+    app.include_router(feed.router, prefix="/api")
+    
+    with session_scope(session_factory) as db:
+        user, topic = User(email="route@example.com"), Topic(topic_name="Route")
+        db.add_all([user, topic])
+        db.flush()
+        link_user_topic(db, user.id, topic.id)
+        user_id, topic_id = user.id, topic.id
+    
+    try:
+        with TestClient(app) as client:
+            start = client.get(f"/api/feed/{user_id}/changes").json()
+            assert start["reset"] is True
+            _ingest(session_factory, topic_id, 2)
+            body = client.get(f"/api/feed/{user_id}/changes", params={"since": start["cursor"]}).json()
+            assert body["reset"] is False and len(body["topics"][0]["items"]) == 2
+            assert client.get(f"/api/feed/{user_id}/changes", params={"since": "bogus"}).status_code == 400
+            assert client.get("/api/feed/9999/changes").status_code == 404
+            print("✅ Cursor round trip over HTTP, bad cursors rejected")
+    finally:
+        set_replica_router(previous)
+
+
+def test_cursor_waits_for_writers(session_factory):
+    print("\n3. Testing the cursor never moves past an uncommitted write...")
+    with session_scope(session_factory) as db:
+        user, topic = User(email="order@example.com"), Topic(topic_name="Order")
+        db.add_all([user, topic])
+        db.flush()
+        link_user_topic(db, user.id, topic.id)
+        user_id, topic_id = user.id, topic.id
+    start, _ = _changes(session_factory, user_id, None)
+    
+    # SQLite: the open transaction holds the write lock, so no later id can commit before it
+    writer = session_factory()
+    ids = persist_batch(writer, IngestBatch(topic_id=topic_id, items=[{"title": "Pending", "summary": "s"}]))
+    changes, seen = _changes(session_factory, user_id, start.cursor.encode())
+    assert seen == [] and changes.cursor.entry_id == start.cursor.entry_id, "Cursor held at the last committed entry"
+    writer.commit()
+    writer.close()
+    assert _changes(session_factory, user_id, changes.cursor.encode())[1] == ids
+    print("✅ An entry committed after a poll is delivered by the next one")
+    
+    # Postgres: feed writers serialize on an advisory lock held until commit
+    assert feed_write_lock("sqlite") is None
+    stmt = str(feed_write_lock("postgresql").compile(dialect=postgresql.dialect()))
+    assert "pg_advisory_xact_lock" in stmt, stmt
+    print("✅ Postgres feed writers take the transaction-level advisory lock")
+
+
+if __name__ == "__main__":
+    from conftest import make_database
+    
+    print("=" * 60)
+    print("Testing Feed Delta Sync")
+    print("=" * 60)
+    test_additions_and_tombstones(make_database())
+    test_changes_route(make_database())
+    test_cursor_waits_for_writers(make_database().session_factory)
+    print("\n🎉 Feed delta sync tests passed!")
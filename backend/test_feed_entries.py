@@ -0,0 +1,127 @@
+"""
+Test the materialized feed (user_feed_entries)
+Uses a temporary SQLite file - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import asyncio
+from datetime import datetime, timedelta
+
+from app.database import session_scope
+from app.models import User, Topic, ContentPool, UserFeedEntry
+from app.agents.worker_agent import WorkerAgent
+from app.feed.entries import check_consistency, rebuild
+from app.ingest.batch import IngestBatch, persist_batch
+from app.ingest.writer import IngestWriter
+from app.subscriptions import link_user_topic, unlink_user_topic
+
+
+def _batch(topic_id, n, fetched_at=None):
+    fetched_at = fetched_at or datetime.now()
+    return IngestBatch(
+        topic_id=topic_id,
+        items=[{"title": f"Item {i}", "summary": "s", "fetched_at": fetched_at} for i in range(n)],
+        topic_updates={"last_fetched": fetched_at}
+    )
+
+
+def _assert_consistent(session_factory, label):
+    with session_scope(session_factory) as db:
+        report = check_consistency(db)
+    assert report["missing"] == 0 and report["stale"] == 0, f"{label}: {report}"
+    return report
+
+
+def test_incremental_maintenance(session_factory):
+    print("\n1. Testing entries follow ingest, link, unlink and cleanup...")
+    with session_scope(session_factory) as db:
+        alice, bob = User(email="alice@example.com"), User(email="bob@example.com")
+        ai, rust = Topic(topic_name="AI"), Topic(topic_name="Rust")
+        db.add_all([alice, bob, ai, rust])
+        db.flush()
+        ids = {"alice": alice.id, "bob": bob.id, "ai": ai.id, "rust": rust.id}
+        link_user_topic(db, alice.id, ai.id)
+        link_user_topic(db, bob.id, ai.id)
+        link_user_topic(db, bob.id, rust.id)
+    
+    with session_scope(session_factory) as db:
+        persist_batch(db, _batch(ids["ai"], 3))
+        persist_batch(db, _batch(ids["rust"], 2))
+        persist_batch(db, _batch(ids["rust"], 2, datetime.now() - timedelta(days=30)))
+        assert db.query(UserFeedEntry).filter(UserFeedEntry.user_id == ids["alice"]).count() == 3
+        assert db.query(UserFeedEntry).filter(UserFeedEntry.user_id == ids["bob"]).count() == 7
+    _assert_consistent(session_factory, "after ingest")
+    print("✅ Ingest fans new content out to every subscriber")
+    
+    with session_scope(session_factory) as db:
+        assert link_user_topic(db, ids["alice"], ids["rust"])
+        assert not link_user_topic(db, ids["alice"], ids["rust"]), "Second link is a no-op"
+        assert db.query(UserFeedEntry).filter(UserFeedEntry.user_id == ids["alice"]).count() == 7
+        assert unlink_user_topic(db, ids["bob"], ids["ai"])
+        assert db.query(UserFeedEntry).filter(UserFeedEntry.user_id == ids["bob"]).count() == 4
+    _assert_consistent(session_factory, "after link/unlink")
+    print("✅ Linking backfills a topic's content, unlinking removes it")
+    
+    WorkerAgent(ids["rust"], session_factory).cleanup_old_content(days_to_keep=7)
+    with session_scope(session_factory) as db:
+        assert db.query(ContentPool).filter(ContentPool.topic_id == ids["rust"]).count() == 2
+    report = _assert_consistent(session_factory, "after cleanup")
+    print(f"✅ Cleanup removes expired entries ({report['actual']} entries left, consistent)")
+
+
+def test_writer_path_materializes(session_factory):
+    print("\n2. Testing group-committed batches are materialized...")
+    with session_scope(session_factory) as db:
+        user, topic = User(email="writer@example.com"), Topic(topic_name="Writer")
+        db.add_all([user, topic])
+        db.flush()
+        link_user_topic(db, user.id, topic.id)
+        topic_id = topic.id
+    
+    async def scenario():
+        writer = IngestWriter(session_factory, flush_interval_ms=50)
+        await writer.start()
+        await asyncio.gather(*(writer.submit(_batch(topic_id, 2)) for _ in range(5)))
+        await writer.stop()
+    
+    asyncio.run(scenario())
+    report = _assert_consistent(session_factory, "writer")
+    assert report["actual"] == 10
+    print("✅ 10 entries written by the single writer")
+
+
+def test_check_detects_drift_and_rebuild_fixes_it(session_factory):
+    print("\n3. Testing the consistency check and rebuild...")
+    with session_scope(session_factory) as db:
+        user, topic = User(email="drift@example.com"), Topic(topic_name="Drift")
+        db.add_all([user, topic])
+        db.flush()
+        link_user_topic(db, user.id, topic.id)
+        persist_batch(db, _batch(topic.id, 4))
+    
+    with session_scope(session_factory) as db:
+        db.query(UserFeedEntry).filter(UserFeedEntry.id == db.query(UserFeedEntry.id).first()[0]).delete()
+        db.query(UserFeedEntry).update({"fetched_at": datetime(2000, 1, 1)})
+        report = check_consistency(db)
+    assert report["missing"] == 4 and report["stale"] == 3, report
+    print(f"✅ Drift detected: {report}")
+    
+    with session_scope(session_factory) as db:
+        assert rebuild(db) == 4
+    _assert_consistent(session_factory, "after rebuild")
+    print("✅ Rebuild restores a consistent table")
+
+
+if __name__ == "__main__":
+    from conftest import make_database
+    
+    print("=" * 60)
+    print("Testing Materialized Feed")
+    print("=" * 60)
+    test_incremental_maintenance(make_database().session_factory)
+    test_writer_path_materializes(make_database().session_factory)
+    test_check_detects_drift_and_rebuild_fixes_it(make_database().session_factory)
+    print("\n🎉 Materialized feed tests passed!")
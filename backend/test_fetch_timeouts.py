@@ -0,0 +1,79 @@
+"""
+Test per-topic fetch deadlines
+Uses a fake Claude client that hangs - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import config
+from app.database import Base
+from app.models import Topic, ContentPool, TopicFetchRetry
+from app.agents.worker_agent import WorkerAgent, TopicFetchError
+from app.utils import metrics
+
+
+class HangingClient:
+    """Fake Claude client whose web search never returns"""
+
+    async def fetch_content_for_topic(self, topic_name, description="", max_items=5):
+        await asyncio.sleep(3600)
+        return []
+
+
+async def _fetch_with_hanging_client(session_factory, topic_id):
+    worker = WorkerAgent(topic_id, session_factory)
+    worker.claude_client = HangingClient()
+    return await worker.fetch_content()
+
+
+def test_topic_deadline():
+    print("\n1. Testing a hung fetch is cut off by the per-topic deadline...")
+    # One shared in-memory database: the worker's DB steps run in threads
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+
+    topic = Topic(topic_name="Slow Topic", feed_source="internet", topic_type="feed")
+    db.add(topic)
+    db.commit()
+
+    metrics.reset()
+    original_timeout = config.TOPIC_FETCH_TIMEOUT_SECONDS
+    config.TOPIC_FETCH_TIMEOUT_SECONDS = 0.2
+    try:
+        asyncio.run(_fetch_with_hanging_client(session_factory, topic.id))
+        raise AssertionError("Fetch should have timed out")
+    except TopicFetchError as e:
+        assert e.timed_out, f"Expected a timeout, got {e.error_kind}"
+        print(f"✅ Fetch timed out ({e.error_kind})")
+    finally:
+        config.TOPIC_FETCH_TIMEOUT_SECONDS = original_timeout
+
+    db.refresh(topic)
+    assert topic.last_fetched is None, "Timed-out topic must not look fresh"
+    assert db.query(ContentPool).count() == 0
+    retry = db.query(TopicFetchRetry).filter(TopicFetchRetry.topic_id == topic.id).first()
+    assert retry is not None and retry.error_kind == "timeout"
+    print("✅ No partial content stored, topic queued for retry")
+
+    counters = metrics.snapshot()["counters"]
+    assert counters.get("topic_fetch.timed_out") == 1
+    print(f"✅ Metrics: {counters}")
+    db.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Topic Fetch Deadlines")
+    print("=" * 60)
+    test_topic_deadline()
+    print("\n🎉 Deadline tests passed!")
@@ -0,0 +1,258 @@
+"""
+Test content ingestion (fetch phase / write phase split)
+Uses a fake Claude client and a temporary SQLite file - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import asyncio
+import threading
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app.models import Topic, ContentPool
+from app.agents.worker_agent import WorkerAgent
+from app.ingest.batch import IngestBatch
+from app.ingest.writer import IngestWriter
+from app.scheduler.refresh import next_factor
+from app.utils import metrics
+from app.utils.claude_client import get_claude_client
+
+
+class RecordingClient:
+    """Fake Claude client that records how many DB connections are checked out mid-call"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.checked_out_during_call = None
+
+    async def fetch_content_for_topic(self, topic_name, description="", max_items=5):
+        await asyncio.sleep(0.01)
+        self.checked_out_during_call = self.engine.pool.checkedout()
+        return [
+            {"title": f"{topic_name} item {i}", "summary": "s", "url": f"https://example.com/{i}", "source": "Example"}
+            for i in range(max_items)
+        ]
+
+
+def test_no_session_held_during_fetch(database):
+    print("\n1. Testing no DB connection is held across the API call...")
+    engine, session_factory = database.engine, database.session_factory
+
+    db = session_factory()
+    topic = Topic(topic_name="Ingest Topic", feed_source="internet", topic_type="feed")
+    db.add(topic)
+    db.commit()
+    topic_id = topic.id
+    db.close()
+
+    worker = WorkerAgent(topic_id, session_factory)
+    client = RecordingClient(engine)
+    worker.claude_client = client
+
+    items = asyncio.run(worker.fetch_content(max_items=3))
+
+    assert client.checked_out_during_call == 0, f"{client.checked_out_during_call} connections held during API call"
+    print("✅ 0 connections checked out during the API call")
+
+    assert len(items) == 3
+    db = session_factory()
+    assert db.query(ContentPool).filter(ContentPool.topic_id == topic_id).count() == 3
+    assert db.get(Topic, topic_id).last_fetched is not None
+    db.close()
+    print("✅ Write phase stored 3 items and stamped last_fetched")
+
+
+def _batch(topic_id, n, label):
+    now = datetime.now()
+    return IngestBatch(
+        topic_id=topic_id,
+        items=[{"title": f"{label} {i}", "summary": "s", "fetched_at": now} for i in range(n)],
+        topic_updates={"last_fetched": now}
+    )
+
+
+def test_writer_group_commits(session_factory):
+    print("\n2. Testing the single writer group-commits concurrent batches...")
+    db = session_factory()
+    topics = [Topic(topic_name=f"Writer Topic {i}") for i in range(4)]
+    db.add_all(topics)
+    db.commit()
+    topic_ids = [t.id for t in topics]
+    db.close()
+
+    async def scenario():
+        writer = IngestWriter(session_factory, max_items=1000, flush_interval_ms=50)
+        await writer.start()
+
+        # 20 coroutines on the writer's loop...
+        local = [writer.submit(_batch(topic_ids[i % 4], 5, f"local {i}")) for i in range(20)]
+
+        # ...plus 2 threads with their own event loops (like scheduler jobs)
+        thread_results = []
+
+        def submit_from_thread(i):
+            thread_results.append(asyncio.run(writer.submit(_batch(topic_ids[i], 5, f"thread {i}"))))
+
+        threads = [threading.Thread(target=submit_from_thread, args=(i,)) for i in range(2)]
+        for t in threads:
+            t.start()
+        local_results = await asyncio.gather(*local)
+        await asyncio.to_thread(lambda: [t.join() for t in threads])
+
+        await writer.stop()
+        return local_results + thread_results
+
+    metrics.reset()
+    results = asyncio.run(scenario())
+
+    assert len(results) == 22 and all(len(ids) == 5 for ids in results)
+    all_ids = [i for ids in results for i in ids]
+    assert len(set(all_ids)) == 110
+    print(f"✅ 22 callers got their 110 inserted IDs back")
+
+    counters = metrics.snapshot()["counters"]
+    assert counters["ingest_writer.rows"] == 110
+    assert counters["ingest_writer.groups"] < 22, "Batches should have been grouped"
+    print(f"✅ Committed in {int(counters['ingest_writer.groups'])} transactions")
+
+    db = session_factory()
+    assert db.query(ContentPool).count() == 110
+    db.close()
+
+
+def test_writer_isolates_bad_batch(session_factory):
+    print("\n3. Testing a failing batch only fails its own caller...")
+    db = session_factory()
+    topic = Topic(topic_name="Writer Topic")
+    db.add(topic)
+    db.commit()
+    topic_id = topic.id
+    db.close()
+
+    async def scenario():
+        writer = IngestWriter(session_factory, flush_interval_ms=50)
+        await writer.start()
+        good = writer.submit(_batch(topic_id, 3, "good"))
+        bad = writer.submit(IngestBatch(topic_id=topic_id, items=[{"title": None}]))  # title is NOT NULL
+        results = await asyncio.gather(good, bad, return_exceptions=True)
+        await writer.stop()
+        return results
+
+    good, bad = asyncio.run(scenario())
+    assert isinstance(good, list) and len(good) == 3
+    assert isinstance(bad, Exception)
+    print(f"✅ Good batch committed, bad batch failed with {type(bad).__name__}")
+
+
+def test_db_work_off_event_loop(database):
+    print("\n4. Testing a fetch does its DB work off the event loop...")
+    engine, session_factory = database.engine, database.session_factory
+    
+    db = session_factory()
+    topic = Topic(topic_name="Loop Topic", feed_source="internet", topic_type="feed")
+    db.add(topic)
+    db.commit()
+    topic_id = topic.id
+    db.close()
+    
+    checkout_threads = set()
+    event.listen(engine, "checkout", lambda *args: checkout_threads.add(threading.get_ident()))
+    
+    async def scenario():
+        worker = await WorkerAgent.create(topic_id, session_factory)
+        worker.claude_client = RecordingClient(engine)
+        items = await worker.fetch_content(max_items=2)
+        return threading.get_ident(), items
+    
+    loop_thread, items = asyncio.run(scenario())
+    assert len(items) == 2
+    assert checkout_threads and loop_thread not in checkout_threads, "A DB session was opened on the event loop"
+    print(f"✅ {len(items)} items stored; connections checked out from {len(checkout_threads)} worker threads, none on the loop")
+
+
+def test_writer_dedups_group_and_retries_untrimmed(session_factory):
+    print("\n5. Testing one group dedups a topic's batches and retries them as fetched...")
+    db = session_factory()
+    topic = Topic(topic_name="Dedup Topic", last_fetched=datetime.now())
+    db.add(topic)
+    db.commit()
+    topic_id = topic.id
+    db.add(ContentPool(topic_id=topic_id, title="Known", url="https://example.com/known"))
+    db.commit()
+    db.close()
+    
+    def linked(label, paths):
+        return IngestBatch(topic_id=topic_id, items=[
+            {"title": f"{label} {path}", "summary": "s", "url": f"https://example.com/{path}"} for path in paths
+        ])
+    
+    async def commit_together(*batches):
+        writer = IngestWriter(session_factory, flush_interval_ms=50)
+        await writer.start()
+        results = await asyncio.gather(*(writer.submit(batch) for batch in batches), return_exceptions=True)
+        await writer.stop()
+        return results
+    
+    metrics.reset()
+    one, other = asyncio.run(commit_together(linked("one", ["same", "c"]), linked("other", ["same/", "d"])))
+    assert len(one) == 2 and len(other) == 1 and metrics.snapshot()["counters"]["ingest_writer.groups"] == 1
+    print("✅ A URL in two batches of one group is stored once")
+    
+    first, second = linked("first", ["known", "shared", "a"]), linked("second", ["shared", "b"])
+    bad = IngestBatch(topic_id=topic_id, items=[{"title": None}])  # fails the group, forcing the retry
+    metrics.reset()
+    first_ids, second_ids, bad = asyncio.run(commit_together(first, second, bad))
+    assert isinstance(bad, Exception) and metrics.snapshot()["counters"]["ingest_writer.groups"] == 2
+    assert len(first_ids) == 2 and len(second_ids) == 1, (first_ids, second_ids)
+    assert [item["url"] for item in second.items] == ["https://example.com/b"], "Batch trimmed to what was inserted"
+    
+    db = session_factory()
+    assert db.query(ContentPool).filter(ContentPool.url == "https://example.com/shared").count() == 1
+    # Novelty as fetched: 2/1 and 2/2 for the first group, then 3 linked / 2 new and
+    # 2 linked / 1 new (shared came from the first batch)
+    ewma, factor = next_factor(None, 1.0, 2, 2)
+    for fetched, new in ((2, 1), (3, 2), (2, 1)):
+        ewma, factor = next_factor(ewma, factor, fetched, new)
+    topic = db.get(Topic, topic_id)
+    assert abs(topic.novelty_ewma - ewma) < 1e-9 and abs(topic.refresh_factor - factor) < 1e-9
+    db.close()
+    print("✅ Shared URL stored once; the retry saw the batches as fetched")
+
+
+def test_worker_uses_its_loops_client(session_factory):
+    print("\n6. Testing workers built off the loop use that loop's Claude client...")
+    db = session_factory()
+    topic = Topic(topic_name="Client Topic")
+    db.add(topic)
+    db.commit()
+    topic_id = topic.id
+    db.close()
+    
+    async def resolve():
+        worker = await WorkerAgent.create(topic_id, session_factory)
+        return worker.claude_client, get_claude_client()
+    
+    first, first_loop = asyncio.run(resolve())
+    second, second_loop = asyncio.run(resolve())
+    assert first is first_loop and second is second_loop, "The worker's client belongs to its event loop"
+    assert first is not second, "Each event loop gets its own HTTP pool"
+    print("✅ Two event loops, two clients")
+
+
+if __name__ == "__main__":
+    from conftest import make_database
+    
+    print("=" * 60)
+    print("Testing Content Ingestion")
+    print("=" * 60)
+    test_no_session_held_during_fetch(make_database())
+    test_writer_group_commits(make_database().session_factory)
+    test_writer_isolates_bad_batch(make_database().session_factory)
+    test_db_work_off_event_loop(make_database())
+    test_writer_dedups_group_and_retries_untrimmed(make_database().session_factory)
+    test_worker_uses_its_loops_client(make_database().session_factory)
+    print("\n🎉 Ingestion tests passed!")
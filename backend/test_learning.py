@@ -0,0 +1,350 @@
+"""
+Test the shared lesson store, per-learner progress, curriculum outlines,
+the look-ahead lesson prefetch and lesson generation claims
+Uses a fake Claude client and a temporary SQLite file - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import get_async_db, session_scope
+from app.db_profiles import PROFILES, build_async_engine
+from app.db_routing import get_replica_db
+from app import config
+from app.models import ContentPool, LearningCurriculum, LearningLesson, LearningLessonClaim, Topic, User, UserFeedEntry, UserLearningProgress, user_topics
+from app.agents.worker_agent import WorkerAgent
+from app.feed.entries import check_consistency, rebuild
+from app.learning.lessons import adopt_legacy_lessons
+from app.learning.prefetch import prefetch_plan
+from app.utils.claude_client import ContentParseError
+from app.subscriptions import link_user_topic
+from app.api.routes import onboarding, topics
+
+
+class LessonClient:
+    """Fake Claude client that records the curricula it planned and the days it generated"""
+    
+    def __init__(self):
+        self.days = Counter()
+        self.plans = []
+        self.windows = []
+        self.prompts = {}
+    
+    async def plan_curriculum(self, topic_name, description, total_days, first_day=1, last_day=None, covered=""):
+        last_day = last_day or total_days
+        self.plans.append(total_days)
+        self.windows.append((first_day, last_day))
+        return [{"day": day, "title": f"Topic {day}", "objectives": [f"Goal {day}"]} for day in range(first_day, last_day + 1)]
+    
+    async def generate_learning_content(self, topic_name, description, current_day, total_days, previous_context, day_plan=None):
+        self.days[current_day] += 1
+        self.prompts[(total_days, current_day)] = (previous_context, day_plan)
+        return {"title": f"Day {current_day}: {topic_name}", "summary": f"Lesson {current_day}", "content": "..."}
+
+
+class SlowLessonClient(LessonClient):
+    """Fake client whose lessons take a while, so concurrent fetches overlap"""
+    
+    async def generate_learning_content(self, *args, **kwargs):
+        await asyncio.sleep(0.05)
+        return await super().generate_learning_content(*args, **kwargs)
+
+
+class BrokenPlanClient(LessonClient):
+    """Fake client whose curriculum outlines never parse"""
+    
+    async def plan_curriculum(self, *args, **kwargs):
+        raise ContentParseError("Unterminated string")
+
+
+def _fetch(session_factory, topic_id, client, learner_id=None):
+    worker = WorkerAgent(topic_id, session_factory)
+    worker.claude_client = client
+    return asyncio.run(worker.fetch_content(learner_id=learner_id))
+
+
+def _lesson_days(db, user_id):
+    return sorted(
+        day for (day,) in db.query(LearningLesson.day)
+        .join(UserFeedEntry, UserFeedEntry.content_id == LearningLesson.content_id)
+        .filter(UserFeedEntry.user_id == user_id)
+    )
+
+
+def test_lessons_shared_across_learners(session_factory):
+    print("\n1. Testing each day is generated once and served to every learner...")
+    client = LessonClient()
+    with session_scope(session_factory) as db:
+        alice, bob = User(email="alice@example.com"), User(email="bob@example.com")
+        topic = Topic(topic_name="Learn Python", topic_type="learning", learning_period_days=3, current_day=1)
+        db.add_all([alice, bob, topic])
+        db.flush()
+        alice_id, bob_id, topic_id = alice.id, bob.id, topic.id
+        link_user_topic(db, alice_id, topic_id)
+    
+    assert [item.title for item in _fetch(session_factory, topic_id, client)] == ["Day 1: Learn Python"]
+    _fetch(session_factory, topic_id, client)
+    
+    # Bob starts later: day 1 is handed over from the store on subscribing
+    with session_scope(session_factory) as db:
+        link_user_topic(db, bob_id, topic_id)
+        assert _lesson_days(db, bob_id) == [1]
+    
+    _fetch(session_factory, topic_id, client)  # Alice: day 3 (generated), Bob: day 2 (stored)
+    assert client.days == {1: 1, 2: 1, 3: 1}, client.days
+    delivered = _fetch(session_factory, topic_id, client, learner_id=bob_id)
+    assert [item.title for item in delivered] == ["Day 3: Learn Python"] and sum(client.days.values()) == 3
+    
+    with session_scope(session_factory) as db:
+        assert _lesson_days(db, alice_id) == [1, 2, 3] and _lesson_days(db, bob_id) == [1, 2, 3]
+        progress = {row.user_id: (row.current_day, row.is_completed) for row in db.query(UserLearningProgress)}
+        assert progress == {alice_id: (4, True), bob_id: (4, True)}, progress
+        topic = db.get(Topic, topic_id)
+        assert topic.is_completed and topic.current_day == 4
+        assert db.query(ContentPool).count() == 3
+        consistency = check_consistency(db)
+        assert consistency["missing"] == 0 and consistency["stale"] == 0, consistency
+    print(f"✅ 3 days, 2 learners, {sum(client.days.values())} generations")
+
+
+def test_legacy_lessons_and_user_progress(session_factory):
+    print("\n2. Testing existing lessons are adopted and progress is per user...")
+    with session_scope(session_factory) as db:
+        user = User(email="learner@example.com")
+        topic = Topic(topic_name="Learn Rust", topic_type="learning", learning_period_days=5, current_day=3)
+        db.add_all([user, topic])
+        db.flush()
+        user_id, topic_id = user.id, topic.id
+        db.add_all([
+            ContentPool(topic_id=topic_id, title=f"Day {day}", source=f"Learning Day {day}/5")
+            for day in (1, 2, 2)
+        ])
+        db.execute(user_topics.insert().values(user_id=user_id, topic_id=topic_id))
+        db.flush()
+        assert adopt_legacy_lessons(db) == 2, "The repeated day 2 is not a second lesson"
+        rebuild(db)
+        consistency = check_consistency(db)
+        assert consistency["expected"] == 3 and consistency["missing"] == 0 and consistency["stale"] == 0, consistency
+    
+    app = FastAPI()
+    app.include_router(onboarding.router, prefix="/api")
+    
+    def override_replica_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    app.dependency_overrides[get_replica_db] = override_replica_db
+    with TestClient(app) as client:
+        topics = client.get(f"/api/onboarding/{user_id}/topics").json()["topics"]
+    assert topics[0]["current_day"] == 3 and topics[0]["is_completed"] is False
+    print("✅ Legacy lessons registered, learner continues at day 3")
+
+
+def test_curriculum_outline(database):
+    print("\n3. Testing lessons follow an outline planned once per curriculum version...")
+    url, session_factory = database.url, database.session_factory
+    client = LessonClient()
+    with session_scope(session_factory) as db:
+        early, late = User(email="early@example.com"), User(email="late@example.com")
+        topic = Topic(topic_name="Learn Go", topic_type="learning", learning_period_days=4, current_day=1)
+        db.add_all([early, late, topic])
+        db.flush()
+        early_id, late_id, topic_id = early.id, late.id, topic.id
+        link_user_topic(db, early_id, topic_id)
+    
+    for _ in range(3):
+        _fetch(session_factory, topic_id, client)
+    assert client.plans == [4], "One planning call for the whole curriculum"
+    context, plan = client.prompts[(4, 3)]
+    assert plan["title"] == "Topic 3" and "Day 1: Topic 1" in context and "Day 2: Topic 2" in context
+    assert client.prompts[(4, 1)][0] == "This is the first day of learning."
+    
+    # A new plan length starts curriculum version 2; the early learner finishes version 1
+    async_factory = async_sessionmaker(build_async_engine(url, PROFILES["development"]), expire_on_commit=False)
+    
+    async def override_db():
+        async with async_factory() as db:
+            yield db
+    
+    app = FastAPI()
+    app.include_router(topics.router, prefix="/api/topics")
+    app.dependency_overrides[get_async_db] = override_db
+    with TestClient(app) as http:
+        assert http.put(f"/api/topics/{topic_id}", json={"learning_period_days": 2}).status_code == 200
+    with session_scope(session_factory) as db:
+        link_user_topic(db, late_id, topic_id)
+    
+    _fetch(session_factory, topic_id, client)  # version 1 day 4 and version 2 day 1, in parallel
+    assert client.plans == [4, 2] and (4, 4) in client.prompts and (2, 1) in client.prompts
+    with session_scope(session_factory) as db:
+        keys = {(lesson.curriculum_version, lesson.day) for lesson in db.query(LearningLesson)}
+        assert keys == {(1, 1), (1, 2), (1, 3), (1, 4), (2, 1)}, keys
+        progress = {row.user_id: (row.curriculum_version, row.current_day, row.is_completed) for row in db.query(UserLearningProgress)}
+        assert progress == {early_id: (1, 5, True), late_id: (2, 2, False)}, progress
+    print(f"✅ {len(client.plans)} plans, {sum(client.days.values())} lessons, prompts carry only the day's outline entry")
+
+
+def test_prefetch_ahead_of_active_learners(session_factory):
+    print("\n4. Testing upcoming lessons are prefetched for active learners only...")
+    client = LessonClient()
+    with session_scope(session_factory) as db:
+        active, idle = User(email="active@example.com"), User(email="idle@example.com")
+        busy = Topic(topic_name="Learn SQL", topic_type="learning", learning_period_days=4, current_day=1)
+        quiet = Topic(topic_name="Learn Haskell", topic_type="learning", learning_period_days=4, current_day=1)
+        db.add_all([active, idle, busy, quiet])
+        db.flush()
+        active_id, idle_id, busy_id, quiet_id = active.id, idle.id, busy.id, quiet.id
+        link_user_topic(db, active_id, busy_id)
+        link_user_topic(db, idle_id, quiet_id)
+        month_ago = datetime.now() - timedelta(days=30)
+        db.query(UserLearningProgress).filter(UserLearningProgress.user_id == idle_id).update(
+            {"started_at": month_ago, "last_active_at": month_ago}, synchronize_session=False
+        )
+    
+    with session_scope(session_factory) as db:
+        plan = prefetch_plan(db)
+        assert plan == {busy_id: [(1, 1), (1, 2)]}, plan
+        assert prefetch_plan(db, limit=1) == {busy_id: [(1, 1)]}
+    
+    worker = WorkerAgent(busy_id, session_factory)
+    worker.claude_client = client
+    assert asyncio.run(worker.prefetch_lessons(plan[busy_id])) == 2
+    with session_scope(session_factory) as db:
+        # Stored ahead, not delivered: the feed and the topic's freshness are untouched
+        assert db.get(Topic, busy_id).last_fetched is None and _lesson_days(db, active_id) == []
+    
+    delivered = _fetch(session_factory, busy_id, client, learner_id=active_id)
+    assert [item.title for item in delivered] == ["Day 1: Learn SQL"] and client.days == {1: 1, 2: 1}, client.days
+    with session_scope(session_factory) as db:
+        assert prefetch_plan(db) == {busy_id: [(1, 3)]}, "The buffer slides with the learner"
+    print(f"✅ {sum(client.days.values())} lessons prefetched, day 1 delivered without a generation call")
+
+
+def test_concurrent_fetches_generate_each_day_once(session_factory):
+    print("\n5. Testing concurrent fetches claim each day and wait for its one generation...")
+    client = SlowLessonClient()
+    with session_scope(session_factory) as db:
+        users = [User(email=f"learner{i}@example.com") for i in range(3)]
+        topic = Topic(topic_name="Learn C", topic_type="learning", learning_period_days=3, current_day=1)
+        db.add_all(users + [topic])
+        db.flush()
+        user_ids, topic_id = [user.id for user in users], topic.id
+        for user_id in user_ids:
+            link_user_topic(db, user_id, topic_id)
+    
+    def worker():
+        agent = WorkerAgent(topic_id, session_factory)
+        agent.claude_client = client
+        return agent
+    
+    async def refresh_together():
+        # The scheduler twice and every learner's own refresh, all at once
+        fetches = [worker().fetch_content() for _ in range(2)]
+        fetches += [worker().fetch_content(learner_id=user_id) for user_id in user_ids]
+        return await asyncio.gather(*fetches)
+    
+    poll_seconds = config.LEARNING_CLAIM_POLL_SECONDS
+    config.LEARNING_CLAIM_POLL_SECONDS = 0.01
+    try:
+        asyncio.run(refresh_together())
+        assert client.days == {1: 1} and client.plans == [3], (client.days, client.plans)
+        with session_scope(session_factory) as db:
+            assert all(_lesson_days(db, user_id) == [1] for user_id in user_ids)
+            assert {row.current_day for row in db.query(UserLearningProgress)} == {2}
+            assert db.query(LearningLessonClaim).count() == 0, "Claims are released after the write"
+            
+            # A fetch that died holding day 2: its claim is taken over once the lease ran out
+            db.add(LearningLessonClaim(
+                topic_id=topic_id, curriculum_version=1, day=2, owner="crashed",
+                expires_at=datetime.now() - timedelta(seconds=1)
+            ))
+        asyncio.run(refresh_together())
+    finally:
+        config.LEARNING_CLAIM_POLL_SECONDS = poll_seconds
+    
+    assert client.days == {1: 1, 2: 1}, client.days
+    with session_scope(session_factory) as db:
+        assert all(_lesson_days(db, user_id) == [1, 2] for user_id in user_ids)
+        assert db.query(LearningLesson).count() == 2 and db.query(LearningLessonClaim).count() == 0
+    print(f"✅ 5 concurrent fetches per day, {sum(client.days.values())} generations for 2 days")
+
+
+def test_long_plans_outlined_in_windows(database):
+    print("\n6. Testing long plans are outlined window by window and survive planning failures...")
+    url, session_factory = database.url, database.session_factory
+    client = LessonClient()
+    with session_scope(session_factory) as db:
+        user = User(email="year@example.com")
+        topic = Topic(topic_name="Learn Mandarin", topic_type="learning", learning_period_days=1000, current_day=1)
+        db.add_all([user, topic])
+        db.flush()
+        user_id, topic_id = user.id, topic.id
+        link_user_topic(db, user_id, topic_id)
+    
+    _fetch(session_factory, topic_id, client)
+    assert client.plans == [config.LEARNING_MAX_DAYS], "Stored lengths beyond the maximum are cut"
+    assert client.windows == [(1, config.LEARNING_PLAN_WINDOW_DAYS)], client.windows
+    
+    # Day 31 needs the next window, which is added to the same outline
+    with session_scope(session_factory) as db:
+        db.query(UserLearningProgress).filter(UserLearningProgress.user_id == user_id).update({"current_day": 31})
+    _fetch(session_factory, topic_id, client)
+    assert client.windows[-1] == (31, 60)
+    with session_scope(session_factory) as db:
+        outline = db.query(LearningCurriculum).filter(LearningCurriculum.topic_id == topic_id).one().outline
+        assert [entry["day"] for entry in outline] == list(range(1, 61))
+    
+    # A plan that can't be outlined still gets its lessons, summarized from the stored ones
+    broken = BrokenPlanClient()
+    with session_scope(session_factory) as db:
+        db.query(UserLearningProgress).filter(UserLearningProgress.user_id == user_id).update({"current_day": 61})
+    delivered = _fetch(session_factory, topic_id, broken, learner_id=user_id)
+    assert [item.title for item in delivered] == ["Day 61: Learn Mandarin"]
+    context, plan = broken.prompts[(config.LEARNING_MAX_DAYS, 61)]
+    assert plan is None and "Day 60: Topic 60" in context
+    _fetch(session_factory, topic_id, broken, learner_id=user_id)
+    context, plan = broken.prompts[(config.LEARNING_MAX_DAYS, 62)]
+    assert plan is None and "Day 61: Day 61: Learn Mandarin" in context, "Unplanned days are summarized by their lesson titles"
+    
+    # Plan lengths are validated where they are set
+    async_factory = async_sessionmaker(build_async_engine(url, PROFILES["development"]), expire_on_commit=False)
+    
+    async def override_db():
+        async with async_factory() as db:
+            yield db
+    
+    app = FastAPI()
+    app.include_router(topics.router, prefix="/api/topics")
+    app.dependency_overrides[get_async_db] = override_db
+    with TestClient(app) as http:
+        assert http.put(f"/api/topics/{topic_id}", json={"learning_period_days": 5000}).status_code == 422
+        assert http.put(f"/api/topics/{topic_id}", json={"learning_period_days": "30"}).status_code == 422
+        assert http.put(f"/api/topics/{topic_id}", json={"learning_period_days": 180}).status_code == 200
+    print(f"✅ {len(client.windows)} windows of {config.LEARNING_PLAN_WINDOW_DAYS} days, failed planning falls back to lesson titles")
+
+
+if __name__ == "__main__":
+    from conftest import make_database
+    
+    print("=" * 60)
+    print("Testing Learning Lessons")
+    print("=" * 60)
+    test_lessons_shared_across_learners(make_database().session_factory)
+    test_legacy_lessons_and_user_progress(make_database().session_factory)
+    test_curriculum_outline(make_database())
+    test_prefetch_ahead_of_active_learners(make_database().session_factory)
+    test_concurrent_fetches_generate_each_day_once(make_database().session_factory)
+    test_long_plans_outlined_in_windows(make_database())
+    print("\n🎉 Learning lesson tests passed!")
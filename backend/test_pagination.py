@@ -0,0 +1,172 @@
+"""
+Test keyset pagination (saved content, feed history) and the saved counter
+(including bookmarks of a deleted topic)
+Uses a temporary SQLite file - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app import config
+from app.database import Base, get_async_db, session_scope
+from app.db_profiles import PROFILES, build_engine, build_async_engine
+from app.db_routing import ReplicaRouter, set_replica_router
+from app.models import User, Topic, ContentPool, SavedContent, UserSourceAffinity
+from app.saves import recount_saved
+from app.search.vectors import VectorIndex, set_vector_index, vectorize_many
+from app.subscriptions import link_user_topic
+from app.api.routes import feed, saved, topics
+
+
+def _make_client():
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'pagination.db')}"
+    profile = PROFILES["development"]
+    engine = build_engine(url, profile)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_factory = async_sessionmaker(build_async_engine(url, profile), expire_on_commit=False)
+    
+    async def override_db():
+        async with async_factory() as db:
+            yield db
+    
+    app = FastAPI()
+    app.include_router(feed.router, prefix="/api")
+    app.include_router(saved.router, prefix="/api")
+    app.include_router(topics.router, prefix="/api/topics")
+    app.dependency_overrides[get_async_db] = override_db
+    previous = set_replica_router(ReplicaRouter(primary=session_factory, async_primary=async_factory))
+    return TestClient(app), session_factory, previous
+
+
+def _walk(client, url, params):
+    """Follow next_cursor to the end; returns all item IDs in order"""
+    ids, cursor = [], None
+    while True:
+        body = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        ids += [item["id"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        assert body["has_more"] == (cursor is not None)
+        if cursor is None:
+            return ids, body
+
+
+def test_saved_pages_and_counter():
+    print("\n1. Testing saved content keyset pages and counter...")
+    client, session_factory, previous = _make_client()
+    try:
+        with session_scope(session_factory) as db:
+            user, topic = User(email="pages@example.com"), Topic(topic_name="Pages")
+            db.add_all([user, topic])
+            db.flush()
+            contents = [ContentPool(topic_id=topic.id, title=f"Item {i}", fetched_at=datetime.now()) for i in range(12)]
+            db.add_all(contents)
+            db.flush()
+            # Ties on saved_at: the id breaks them
+            same_second = datetime(2024, 5, 1, 12, 0, 0)
+            db.add_all([
+                SavedContent(user_id=user.id, content_id=c.id, saved_at=same_second - timedelta(minutes=i // 4))
+                for i, c in enumerate(contents[:10])
+            ])
+            db.flush()
+            recount_saved(db)
+            user_id, spare_ids = user.id, [c.id for c in contents[10:]]
+        
+        with client:
+            ids, last = _walk(client, f"/api/saved/{user_id}", {"limit": 3})
+            with session_scope(session_factory) as db:
+                expected = [row.id for row in db.query(SavedContent.id).order_by(
+                    SavedContent.saved_at.desc(), SavedContent.id.desc()
+                )]
+            assert ids == expected and len(ids) == 10 and last["total_saved"] == 10
+            print("✅ 10 bookmarks in pages of 3, no gaps or repeats across saved_at ties")
+            
+            for content_id in spare_ids:
+                assert client.post("/api/saved/", json={"user_id": user_id, "content_id": content_id}).status_code == 201
+            first = client.get(f"/api/saved/{user_id}", params={"limit": 2}).json()
+            assert first["total_saved"] == 12 and {i["content"]["id"] for i in first["items"]} == set(spare_ids)
+            assert client.delete(f"/api/saved/{first['items'][0]['id']}").status_code == 204
+            assert client.get(f"/api/saved/{user_id}").json()["total_saved"] == 11
+            assert client.get(f"/api/saved/{user_id}", params={"cursor": "nope"}).status_code == 400
+            print("✅ Counter follows save / unsave")
+    finally:
+        set_replica_router(previous)
+
+
+def test_feed_history_pages():
+    print("\n2. Testing multi-day feed history pages...")
+    client, session_factory, previous = _make_client()
+    try:
+        with session_scope(session_factory) as db:
+            user, topic = User(email="history@example.com"), Topic(topic_name="History")
+            db.add_all([user, topic])
+            db.flush()
+            now = datetime.now()
+            db.add_all([
+                ContentPool(topic_id=topic.id, title=f"Day {day} #{i}", fetched_at=now - timedelta(days=day))
+                for day in range(10) for i in range(2)
+            ])
+            db.flush()
+            link_user_topic(db, user.id, topic.id)
+            user_id = user.id
+        
+        with client:
+            ids, last = _walk(client, f"/api/feed/{user_id}/history", {"days": 3, "limit": 4})
+            assert len(ids) == 6 and len(set(ids)) == 6 and last["items"][0]["topic_name"] == "History"
+            print("✅ 3 days of history (6 items) in pages of 4")
+    finally:
+        set_replica_router(previous)
+
+
+def test_deleted_topic_drops_bookmarks():
+    print("\n3. Testing deleting a topic removes its bookmarks and vectors...")
+    client, session_factory, previous = _make_client()
+    index = VectorIndex(tempfile.mkdtemp(), config.VECTOR_DIM)
+    previous_index = set_vector_index(index)
+    try:
+        with session_scope(session_factory) as db:
+            user = User(email="bookmarks@example.com")
+            doomed, kept = Topic(topic_name="Doomed"), Topic(topic_name="Kept")
+            db.add_all([user, doomed, kept])
+            db.flush()
+            contents = [ContentPool(topic_id=topic.id, title=f"{topic.topic_name} {i}", source="blog")
+                        for i, topic in enumerate((doomed, doomed, kept))]
+            db.add_all(contents)
+            db.flush()
+            user_id, doomed_id = user.id, doomed.id
+            content_ids = [c.id for c in contents]
+            index.add(content_ids, vectorize_many({"title": c.title} for c in contents))
+        
+        with client:
+            for content_id in content_ids:
+                assert client.post("/api/saved/", json={"user_id": user_id, "content_id": content_id}).status_code == 201
+            assert client.delete(f"/api/topics/{doomed_id}").status_code == 200
+            body = client.get(f"/api/saved/{user_id}").json()
+            assert body["total_saved"] == 1 and [i["content"]["id"] for i in body["items"]] == content_ids[2:], body
+        with session_scope(session_factory) as db:
+            assert db.query(SavedContent).count() == 1
+            assert db.get(UserSourceAffinity, (user_id, "blog")).saves == 1, "Affinity forgets the deleted saves"
+        assert not any(index.vector_for(content_id).any() for content_id in content_ids[:2])
+        assert index.vector_for(content_ids[2]).any()
+    finally:
+        set_vector_index(previous_index)
+        set_replica_router(previous)
+    print("✅ Bookmarks, saved_count and vectors of the deleted topic removed")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Keyset Pagination")
+    print("=" * 60)
+    test_saved_pages_and_counter()
+    test_feed_history_pages()
+    test_deleted_topic_drops_bookmarks()
+    print("\n🎉 Pagination tests passed!")
@@ -0,0 +1,231 @@
+"""
+Test feed ranking scores, their incremental refresh on save / unsave, and
+duplicate URLs at ingest and in the feed
+Uses a temporary SQLite file - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import math
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import Base, get_async_db, session_scope
+from app.db_profiles import PROFILES, build_engine, build_async_engine
+from app.db_routing import ReplicaRouter, set_replica_router
+from app.feed.cache import get_feed_cache
+from app.feed.ranking import rescore_all
+from app.ingest.batch import IngestBatch, persist_batch
+from app.models import User, Topic, ContentPool, SavedContent, UserFeedEntry, SourceStats, UserSourceAffinity
+from app.saves import record_save
+from app.subscriptions import link_user_topic
+from app.api.routes import feed, saved
+
+
+def _make_factories():
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'ranking.db')}"
+    profile = PROFILES["development"]
+    engine = build_engine(url, profile)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    return session_factory, async_sessionmaker(build_async_engine(url, profile), expire_on_commit=False)
+
+
+def _entry_scores(db, user_id):
+    return {
+        entry.content_id: entry.score
+        for entry in db.query(UserFeedEntry).filter(UserFeedEntry.user_id == user_id)
+    }
+
+
+def _assert_entries_match_content(db):
+    """Every entry's score is its item's rank_score plus the reader's source affinity"""
+    for entry in db.query(UserFeedEntry):
+        item = db.get(ContentPool, entry.content_id)
+        affinity = db.get(UserSourceAffinity, (entry.user_id, item.source))
+        expected = item.rank_score + (affinity.weight if affinity else 0.0)
+        assert abs(entry.score - expected) < 1e-6, (entry.content_id, entry.score, expected)
+
+
+def test_ingest_drops_known_urls():
+    print("\n1. Testing duplicate URLs are dropped at ingest...")
+    session_factory, _ = _make_factories()
+    with session_scope(session_factory) as db:
+        topic = Topic(topic_name="AI")
+        db.add(topic)
+        db.flush()
+        topic_id = topic.id
+        first = persist_batch(db, IngestBatch(topic_id, [
+            {"title": "A", "url": "https://example.com/a"},
+            {"title": "B", "url": "https://example.com/b"},
+        ]))
+        batch = IngestBatch(topic_id, [
+            {"title": "A again", "url": " https://example.com/a/ "},
+            {"title": "C", "url": "https://example.com/c"},
+            {"title": "C twice", "url": "https://example.com/c/"},
+            {"title": "No link", "url": None},
+            {"title": "No link either"},
+        ])
+        second = persist_batch(db, batch)
+        titles = [item["title"] for item in batch.items]
+        assert len(first) == 2 and len(second) == 3 and titles == ["C", "No link", "No link either"]
+        assert db.query(ContentPool).count() == 5
+        
+        other = Topic(topic_name="Research")
+        db.add(other)
+        db.flush()
+        assert len(persist_batch(db, IngestBatch(other.id, [{"title": "A", "url": "https://example.com/a"}]))) == 1, \
+            "Duplicates are per topic"
+    print(f"✅ Second fetch kept {titles}")
+
+
+def test_scores_follow_saves():
+    print("\n2. Testing precomputed scores and incremental refresh...")
+    session_factory, _ = _make_factories()
+    now = datetime.now()
+    with session_scope(session_factory) as db:
+        alice, bob, topic = User(email="alice@example.com"), User(email="bob@example.com"), Topic(topic_name="AI")
+        db.add_all([alice, bob, topic])
+        db.flush()
+        ids = {"alice": alice.id, "bob": bob.id, "topic": topic.id}
+        link_user_topic(db, alice.id, topic.id)
+        link_user_topic(db, bob.id, topic.id)
+        content = persist_batch(db, IngestBatch(topic.id, [
+            {"title": "Old blog post", "source": "blog", "fetched_at": now - timedelta(hours=48)},
+            {"title": "New blog post", "source": "blog", "fetched_at": now},
+            {"title": "New paper", "source": "arxiv", "fetched_at": now - timedelta(minutes=1)},
+        ]))
+        old, new, paper = content
+        scores = {item.id: item.rank_score for item in db.query(ContentPool)}
+        assert scores[new] > scores[paper] > scores[old], "Newer first while nothing is saved"
+        assert abs(scores[new] - scores[old] - 2 * math.log(2)) < 1e-3, "48 hours is two half-lives"
+        assert db.get(SourceStats, "blog").items == 2
+        _assert_entries_match_content(db)
+    print("✅ Recency scores set at ingest (half-life 24h)")
+    
+    with session_scope(session_factory) as db:
+        record_save(db, ids["alice"], old, 1)
+        record_save(db, ids["bob"], old, 1)
+    with session_scope(session_factory) as db:
+        item = db.get(ContentPool, old)
+        assert item.save_count == 2 and db.get(SourceStats, "blog").saves == 2
+        alice_scores, bob_scores = _entry_scores(db, ids["alice"]), _entry_scores(db, ids["bob"])
+        assert alice_scores[old] > scores[old], "Saves lift the item for every reader"
+        assert alice_scores[new] > alice_scores[paper], "The saver's affinity lifts the source's other items"
+        assert alice_scores[new] - scores[new] == bob_scores[new] - scores[new] > 0
+        _assert_entries_match_content(db)
+    print("✅ Saves refresh the item, its entries and the saver's source affinity")
+    
+    with session_scope(session_factory) as db:
+        record_save(db, ids["bob"], old, -1)
+        record_save(db, ids["alice"], old, -1)
+    with session_scope(session_factory) as db:
+        restored = {item.id: item.rank_score for item in db.query(ContentPool)}
+        assert all(abs(restored[i] - scores[i]) < 1e-9 for i in content), "Unsave undoes a save"
+        assert all(abs(score - restored[i]) < 1e-9 for i, score in _entry_scores(db, ids["alice"]).items())
+        
+        record_save(db, ids["alice"], paper, 1)
+        incremental = _entry_scores(db, ids["alice"])
+        # The row the route inserts; rescore_all recounts from saved_content
+        db.add(SavedContent(user_id=ids["alice"], content_id=paper))
+        db.flush()
+        assert rescore_all(db) == 3
+        _assert_entries_match_content(db)
+        rescored = _entry_scores(db, ids["alice"])
+        assert sorted(incremental, key=incremental.get) == sorted(rescored, key=rescored.get)
+    print("✅ Unsave restores the scores; rescore_all agrees with incremental updates")
+
+
+def test_feed_ranked_and_deduplicated():
+    print("\n3. Testing the feed route orders by score and drops repeated URLs...")
+    session_factory, async_factory = _make_factories()
+    
+    async def override_db():
+        async with async_factory() as db:
+            yield db
+    
+    app = FastAPI()
+    for module in (feed, saved):
+        app.include_router(module.router, prefix="/api")
+    app.dependency_overrides[get_async_db] = override_db
+    previous = set_replica_router(ReplicaRouter(primary=session_factory, async_primary=async_factory))
+    get_feed_cache().clear()
+    now = datetime.now().replace(hour=12)
+    try:
+        with session_scope(session_factory) as db:
+            user, ai, research = User(email="feed@example.com"), Topic(topic_name="AI"), Topic(topic_name="Research")
+            db.add_all([user, ai, research])
+            db.flush()
+            user_id = user.id
+            link_user_topic(db, user.id, ai.id)
+            link_user_topic(db, user.id, research.id)
+            morning, noon = persist_batch(db, IngestBatch(ai.id, [
+                {"title": "Morning", "url": "https://example.com/morning", "source": "blog", "fetched_at": now - timedelta(hours=3)},
+                {"title": "Noon", "url": "https://example.com/noon", "source": "blog", "fetched_at": now},
+            ]))
+            persist_batch(db, IngestBatch(research.id, [
+                {"title": "Noon (cross-posted)", "url": "https://example.com/noon/", "source": "news",
+                 "fetched_at": now - timedelta(minutes=5)},
+            ]))
+        
+        with TestClient(app) as client:
+            date = now.strftime("%Y-%m-%d")
+            response = client.get(f"/api/feed/{user_id}", params={"date": date})
+            titles = [item["title"] for topic in response.json()["topics"] for item in topic["items"]]
+            assert titles == ["Noon", "Morning"], titles
+            etag = response.headers["etag"]
+            
+            assert client.post("/api/saved/", json={"user_id": user_id, "content_id": morning}).status_code == 201
+            response = client.get(f"/api/feed/{user_id}", params={"date": date}, headers={"If-None-Match": etag})
+            assert response.status_code == 200 and response.headers["etag"] != etag, "A save changes the saver's ETag"
+            titles = [item["title"] for topic in response.json()["topics"] for item in topic["items"]]
+            assert titles == ["Morning", "Noon"], "The cached payload was dropped"
+    finally:
+        set_replica_router(previous)
+    print(f"✅ Saved item moved up, cross-posted copy dropped: {titles}")
+
+
+def test_concurrent_first_saves():
+    print("\n4. Testing concurrent first saves from a new source...")
+    session_factory, _ = _make_factories()
+    with session_scope(session_factory) as db:
+        user, topic = User(email="racer@example.com"), Topic(topic_name="Zines")
+        db.add_all([user, topic])
+        db.flush()
+        user_id = user.id
+        link_user_topic(db, user_id, topic.id)
+        content = persist_batch(db, IngestBatch(topic.id, [{"title": f"Zine {i}", "source": "zine"} for i in range(6)]))
+        db.query(SourceStats).delete()  # the source's first counters come from the saves below
+    
+    def save(content_id):
+        with session_scope(session_factory) as db:
+            record_save(db, user_id, content_id, 1)
+    
+    threads = [threading.Thread(target=save, args=(content_id,)) for content_id in content]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with session_scope(session_factory) as db:
+        assert db.get(SourceStats, "zine").saves == 6
+        assert db.get(UserSourceAffinity, (user_id, "zine")).saves == 6
+        _assert_entries_match_content(db)
+    print("✅ Six concurrent saves, one source row and one affinity row, no lost counts")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Feed Ranking")
+    print("=" * 60)
+    test_ingest_drops_known_urls()
+    test_scores_follow_saves()
+    test_feed_ranked_and_deduplicated()
+    test_concurrent_first_saves()
+    print("\n🎉 Feed ranking tests passed!")
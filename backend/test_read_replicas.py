@@ -0,0 +1,122 @@
+"""
+Test read-replica routing with read-your-writes stickiness
+Uses two temporary SQLite files as primary and (lagging) replica - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import shutil
+import tempfile
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import Base, get_async_db
+from app.db_profiles import PROFILES, build_engine, build_async_engine
+from app.db_routing import ReplicaRouter, set_replica_router
+from app.models import User, Topic, ContentPool
+from app.api.routes import saved
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+def test_router_round_robin_and_stickiness():
+    print("\n1. Testing replica selection and stickiness window...")
+    clock = FakeClock()
+    router = ReplicaRouter(
+        primary="primary", async_primary="async primary",
+        replicas=["replica 1", "replica 2"], async_replicas=["async replica 1", "async replica 2"],
+        sticky_seconds=5, clock=clock
+    )
+    
+    assert [router.session_factory(1) for _ in range(3)] == ["replica 1", "replica 2", "replica 1"]
+    print("✅ Reads rotate across replicas")
+    
+    router.record_write(1)
+    assert router.session_factory(1) == "primary"
+    assert router.async_session_factory(1) == "async primary"
+    assert router.session_factory(2) in ("replica 1", "replica 2"), "Other users are not pinned"
+    clock.now += 5
+    assert router.session_factory(1) != "primary"
+    print("✅ A writer reads from the primary until the window passes")
+    
+    assert ReplicaRouter(primary="primary", async_primary="async primary").session_factory(1) == "primary"
+    print("✅ Without replicas everything reads from the primary")
+
+
+def test_read_your_writes_with_two_sqlite_files():
+    print("\n2. Testing saved items with a lagging replica file...")
+    directory = tempfile.mkdtemp()
+    primary_url = f"sqlite:///{os.path.join(directory, 'primary.db')}"
+    replica_path = os.path.join(directory, "replica.db")
+    profile = PROFILES["development"]
+    
+    engine = build_engine(primary_url, profile)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    user = User(email="replica@example.com", name="Replica User")
+    topic = Topic(topic_name="Replica Topic")
+    db.add_all([user, topic])
+    db.flush()
+    content = ContentPool(topic_id=topic.id, title="Item", summary="s", fetched_at=datetime.now())
+    db.add(content)
+    db.commit()
+    user_id, content_id = user.id, content.id
+    db.close()
+    engine.dispose()
+    
+    # Replica = snapshot of the primary; it never sees later writes (maximum lag)
+    shutil.copy(os.path.join(directory, "primary.db"), replica_path)
+    replica_url = f"sqlite:///{replica_path}"
+    
+    async_primary = async_sessionmaker(build_async_engine(primary_url, profile), expire_on_commit=False)
+    clock = FakeClock()
+    router = ReplicaRouter(
+        primary=sessionmaker(bind=build_engine(primary_url, profile, read_only=True)),
+        async_primary=async_sessionmaker(build_async_engine(primary_url, profile, read_only=True)),
+        replicas=[sessionmaker(bind=build_engine(replica_url, profile, read_only=True))],
+        async_replicas=[async_sessionmaker(build_async_engine(replica_url, profile, read_only=True))],
+        sticky_seconds=10, clock=clock
+    )
+    previous = set_replica_router(router)
+    
+    async def override_db():
+        async with async_primary() as session:
+            yield session
+    
+    app = FastAPI()
+    app.include_router(saved.router, prefix="/api")
+    app.dependency_overrides[get_async_db] = override_db
+    
+    try:
+        with TestClient(app) as client:
+            response = client.post("/api/saved/", json={"user_id": user_id, "content_id": content_id})
+            assert response.status_code == 201, response.text
+            
+            assert client.get(f"/api/saved/{user_id}").json()["total_saved"] == 1
+            print("✅ Right after saving, the user reads their write from the primary")
+            
+            clock.now += 11
+            assert client.get(f"/api/saved/{user_id}").json()["total_saved"] == 0
+            print("✅ After the window, reads go to the (stale) replica")
+    finally:
+        set_replica_router(previous)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Read-Replica Routing")
+    print("=" * 60)
+    test_router_round_robin_and_stickiness()
+    test_read_your_writes_with_two_sqlite_files()
+    print("\n🎉 Replica routing tests passed!")
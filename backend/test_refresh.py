@@ -0,0 +1,79 @@
+"""
+Test the adaptive refresh interval: novelty tracking at ingest, the AIMD
+controller and the scheduler honouring each topic's factor
+Uses a temporary SQLite file - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+
+from app import config
+from app.database import session_scope
+from app.ingest.batch import IngestBatch, persist_batch
+from app.models import Topic
+from app.scheduler.refresh import next_factor
+from app.scheduler.tiers import due_topic_ids
+
+
+def test_controller():
+    print("\n1. Testing the AIMD controller...")
+    ewma, factor = next_factor(None, 1.0, 5, 5)
+    assert ewma == 1.0 and factor == config.REFRESH_FACTOR_DECREASE, "All new: fetch sooner"
+    ewma, factor = next_factor(None, 1.0, 5, 0)
+    assert ewma == 0.0 and factor == 1.0 + config.REFRESH_FACTOR_STEP, "Nothing new: back off"
+    assert next_factor(0.5, 1.5, 4, 2)[1] == 1.5, "Middling novelty keeps the interval"
+    
+    ewma, factor = None, 1.0
+    for _ in range(50):
+        ewma, factor = next_factor(ewma, factor, 5, 0)
+    assert factor == config.REFRESH_FACTOR_MAX
+    for _ in range(50):
+        ewma, factor = next_factor(ewma, factor, 5, 5)
+    assert factor == config.REFRESH_FACTOR_MIN
+    print("✅ Multiplicative decrease on novelty, additive increase without, within bounds")
+
+
+def test_ingest_and_scheduler(session_factory):
+    print("\n2. Testing novelty at ingest drives the schedule...")
+    with session_scope(session_factory) as db:
+        busy, quiet, generated = (Topic(topic_name=name, subscriber_count=1) for name in ("Busy", "Quiet", "Generated"))
+        db.add_all([busy, quiet, generated])
+        db.flush()
+        ids = {"busy": busy.id, "quiet": quiet.id, "generated": generated.id}
+    
+    for fetch in range(3):
+        with session_scope(session_factory) as db:
+            updates = {"last_fetched": datetime.now()}
+            persist_batch(db, IngestBatch(ids["busy"], [{"title": "x", "url": f"https://busy/{fetch}/{i}"} for i in range(5)], updates))
+            persist_batch(db, IngestBatch(ids["quiet"], [{"title": "x", "url": f"https://quiet/{i}"} for i in range(5)], updates))
+            persist_batch(db, IngestBatch(ids["generated"], [{"title": f"Reading {fetch}", "url": None}], updates))
+    
+    with session_scope(session_factory) as db:
+        topics = {name: db.get(Topic, topic_id) for name, topic_id in ids.items()}
+        assert topics["busy"].novelty_ewma == 1.0 and topics["busy"].refresh_factor < 1.0
+        assert topics["quiet"].novelty_ewma == 0.0 and topics["quiet"].refresh_factor > 1.0, "First fetch not counted"
+        assert topics["generated"].novelty_ewma is None and topics["generated"].refresh_factor == 1.0
+        factors = {name: topic.refresh_factor for name, topic in topics.items()}
+        
+        fetched_at = datetime.now() - timedelta(hours=config.TIER_COLD_INTERVAL_HOURS)
+        db.query(Topic).update({"last_fetched": fetched_at})
+        db.flush()
+        due = due_topic_ids(db, fetched_at + timedelta(hours=config.TIER_COLD_INTERVAL_HOURS * 0.5))
+        assert due == [ids["busy"]], due
+        due = due_topic_ids(db, fetched_at + timedelta(hours=config.TIER_COLD_INTERVAL_HOURS * 1.01))
+        assert due == [ids["busy"], ids["generated"]], due
+        assert ids["quiet"] in due_topic_ids(db, fetched_at + timedelta(hours=config.TIER_COLD_INTERVAL_HOURS * factors["quiet"]))
+    print(f"✅ Refresh factors after 3 fetches: {factors}")
+
+
+if __name__ == "__main__":
+    from conftest import make_database
+    
+    print("=" * 60)
+    print("Testing Adaptive Refresh")
+    print("=" * 60)
+    test_controller()
+    test_ingest_and_scheduler(make_database().session_factory)
+    print("\n🎉 Adaptive refresh tests passed!")
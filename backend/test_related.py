@@ -0,0 +1,120 @@
+"""
+Test the local vector index and GET /api/content/{id}/related
+Uses a temporary SQLite file and index directory - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import tempfile
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import Base, get_async_read_db, session_scope
+from app.db_profiles import PROFILES, build_engine, build_async_engine
+from app.ingest.batch import IngestBatch
+from app.ingest.writer import write_batch
+from app.models import Topic, ContentPool
+from app.search.vectors import VectorIndex, set_vector_index, vectorize
+from app.api.routes import content
+
+
+def _unit(dim, seed):
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_vectorizer():
+    print("\n1. Testing the hashing vectorizer...")
+    a = vectorize("Transformer attention", "Self-attention in transformers", "Attention heads and layers")
+    b = vectorize("Attention heads explained", "How transformer attention works", None)
+    c = vectorize("Sourdough baking", "Bread starter tips", "Flour, water and time")
+    assert abs(float(np.linalg.norm(a)) - 1) < 1e-5 and a.dtype == np.float32
+    assert float(a @ b) > 0.5 > float(a @ c), (float(a @ b), float(a @ c))
+    assert np.array_equal(a, vectorize("Transformer attention", "Self-attention in transformers", "Attention heads and layers"))
+    assert not vectorize("the and of", None, None).any(), "Stopwords only: zero vector"
+    print(f"✅ Related texts score {float(a @ b):.2f}, unrelated {float(a @ c):.2f}")
+
+
+def test_index_storage():
+    print("\n2. Testing the memory-mapped index...")
+    directory = tempfile.mkdtemp()
+    index = VectorIndex(directory, 16)
+    vectors = np.vstack([_unit(16, i) for i in range(3000)])
+    assert index.add(range(1, 3001), vectors) == 3000, "Grows past the initial capacity"
+    assert index.add([5, 3001], np.vstack([vectors[0], _unit(16, 9)])) == 1, "Known ids are skipped"
+    assert index.add([2], vectors[:1]) == 0 and index.last_id == 3001
+    
+    top = index.top_k(vectors[[9, 99]], 5, exclude=[10, 100])
+    assert [len(hits) for hits in top] == [5, 5]
+    assert 10 not in [i for i, _ in top[0]] and top[0][0][1] >= top[0][-1][1]
+    print("✅ Batched top-k, self excluded, best first")
+    
+    reopened = VectorIndex(directory, 16)
+    assert reopened.count == 3001 and np.allclose(reopened.vector_for(42), vectors[41])
+    reopened.remove([42])
+    assert 42 not in [i for i, _ in reopened.top_k(vectors[41:42], 3)[0]]
+    assert VectorIndex(directory, 32).count == 0, "A different dimension starts over"
+    print("✅ Reopens from disk, removed rows never match")
+
+
+def test_ingest_hook_and_route():
+    print("\n3. Testing ingest indexing and the related route...")
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'related.db')}"
+    profile = PROFILES["development"]
+    engine = build_engine(url, profile)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    async_factory = async_sessionmaker(build_async_engine(url, profile), expire_on_commit=False)
+    
+    async def override_read_db():
+        async with async_factory() as db:
+            yield db
+    
+    app = FastAPI()
+    app.include_router(content.router, prefix="/api")
+    app.dependency_overrides[get_async_read_db] = override_read_db
+    previous = set_vector_index(VectorIndex(tempfile.mkdtemp(), 64))
+    try:
+        with session_scope(session_factory) as db:
+            ai, research = Topic(topic_name="AI"), Topic(topic_name="Research")
+            db.add_all([ai, research])
+            db.flush()
+            ai_id, research_id = ai.id, research.id
+        items = [
+            (ai_id, "Transformer attention explained", "How self-attention works in transformers"),
+            (research_id, "New attention paper", "Sparse attention for long transformer contexts"),
+            (research_id, "Protein folding", "Structure prediction from sequences"),
+            (ai_id, "Attention heads in transformers", "What individual attention heads learn"),
+        ]
+        ids = []
+        for topic_id, title, summary in items:
+            ids += asyncio.run(write_batch(IngestBatch(topic_id, [{"title": title, "summary": summary}]), session_factory))
+        with session_scope(session_factory) as db:
+            db.query(ContentPool).filter(ContentPool.id == ids[3]).delete()
+        
+        with TestClient(app) as client:
+            related = client.get(f"/api/content/{ids[0]}/related").json()
+            related_ids = [item["id"] for item in related["items"]]
+            assert related_ids[0] == ids[1], "Closest item comes from another topic"
+            assert ids[0] not in related_ids and ids[3] not in related_ids, "Self and deleted items left out"
+            assert related["items"][0]["topic_name"] == "Research" and "content" not in related["items"][0]
+            assert client.get("/api/content/9999/related").status_code == 404
+            print(f"✅ Related to '{items[0][1]}': {[item['title'] for item in related['items']]}")
+    finally:
+        set_vector_index(previous)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Related Content")
+    print("=" * 60)
+    test_vectorizer()
+    test_index_storage()
+    test_ingest_hook_and_route()
+    print("\n🎉 Related content tests passed!")
@@ -0,0 +1,116 @@
+"""
+Test the content retention policies: chunked deletes, pinned saves and
+lessons, tombstones, vector index cleanup and the incremental vacuum
+Uses a temporary SQLite file - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import config
+from app.database import session_scope
+from app.models import ContentPool, FeedTombstone, LearningLesson, SavedContent, Topic, User, UserFeedEntry
+from app.agents.worker_agent import WorkerAgentManager
+from app.feed.cache import changed_at, compute_validators
+from app.feed.entries import check_consistency
+from app.ingest.batch import IngestBatch
+from app.ingest.writer import write_batch
+from app.retention import apply_retention
+from app.search.vectors import VectorIndex, set_vector_index
+from app.subscriptions import link_user_topic
+from conftest import make_database
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """The shared fixture's database, created with auto_vacuum = INCREMENTAL"""
+    return make_database(str(tmp_path), incremental_vacuum=True).session_factory
+
+
+def _ingest(session_factory, topic_id, n, age_days=0):
+    fetched_at = datetime.now() - timedelta(days=age_days)
+    items = [
+        {"title": f"Story {age_days}-{i}", "summary": "s", "content": "word " * 2000, "fetched_at": fetched_at}
+        for i in range(n)
+    ]
+    return asyncio.run(write_batch(IngestBatch(topic_id, items), session_factory))
+
+
+def _validators(session_factory, user_id, topic_id):
+    with session_scope(session_factory) as db:
+        topic = db.get(Topic, topic_id)
+        return compute_validators(user_id, "today", [(topic_id, changed_at(topic.last_fetched, topic.content_removed_at))])
+
+
+def test_retention_policies(session_factory):
+    print("\n1. Testing feed content expires while saves and lessons are kept...")
+    index = VectorIndex(tempfile.mkdtemp(), config.VECTOR_DIM)
+    previous = set_vector_index(index)
+    vacuum_pages = config.RETENTION_VACUUM_PAGES
+    config.RETENTION_VACUUM_PAGES = 10000
+    try:
+        with session_scope(session_factory) as db:
+            user = User(email="reader@example.com")
+            news = Topic(topic_name="News", last_fetched=datetime.now() - timedelta(hours=1))
+            course = Topic(topic_name="Learn Go", topic_type="learning", learning_period_days=3)
+            db.add_all([user, news, course])
+            db.flush()
+            user_id, news_id, course_id = user.id, news.id, course.id
+            link_user_topic(db, user_id, news_id)
+        
+        old_ids = _ingest(session_factory, news_id, 5, age_days=30)
+        fresh_ids = _ingest(session_factory, news_id, 2)
+        lesson_id = _ingest(session_factory, course_id, 1, age_days=30)[0]
+        with session_scope(session_factory) as db:
+            db.add(LearningLesson(topic_id=course_id, curriculum_version=1, day=1, content_id=lesson_id))
+            db.add(SavedContent(user_id=user_id, content_id=old_ids[0]))
+        
+        before = _validators(session_factory, user_id, news_id)
+        report = apply_retention(session_factory, batch_size=2)
+        assert report["rows"] == 4 and report["entries"] == 4 and report["pinned"] == 1, report
+        assert report["bytes"] >= 4 * 10000, "Text payload of the deleted rows"
+        assert report["vacuumed_bytes"] > 0, "Freed pages are released"
+        with session_scope(session_factory) as db:
+            remaining = {content_id for (content_id,) in db.query(ContentPool.id)}
+            assert remaining == {old_ids[0], lesson_id, *fresh_ids}, remaining
+            assert db.query(SavedContent).count() == 1, "Bookmarks survive the cleanup"
+            tombstones = {row.content_id for row in db.query(FeedTombstone)}
+            assert tombstones == set(old_ids[1:]), tombstones
+            assert db.query(UserFeedEntry).count() == 3
+            consistency = check_consistency(db)
+            assert consistency["missing"] == 0 and consistency["stale"] == 0, consistency
+        assert not any(index.vector_for(content_id).any() for content_id in old_ids[1:])
+        assert index.vector_for(old_ids[0]).any() and index.vector_for(lesson_id).any()
+        print(f"✅ {report['rows']} rows, {report['bytes']} bytes reclaimed in chunks of 2; saved item and lesson kept")
+        
+        after = _validators(session_factory, user_id, news_id)
+        assert after.etag != before.etag and after.last_modified > before.last_modified, "No 304 for a feed that lost items"
+        with session_scope(session_factory) as db:
+            assert db.get(Topic, course_id).content_removed_at is None, "Nothing of the course was removed"
+        print("✅ Feeds that lost items get a new ETag and Last-Modified")
+        
+        # Once nobody has it saved, the pinned item goes too (the scheduled job's path)
+        with session_scope(session_factory) as db:
+            db.query(SavedContent).delete()
+        report = WorkerAgentManager(session_factory).cleanup_all_old_content()
+        assert report["rows"] == 1 and report["pinned"] == 0, report
+        assert WorkerAgentManager(session_factory).cleanup_all_old_content()["rows"] == 0, "Nothing left to expire"
+    finally:
+        config.RETENTION_VACUUM_PAGES = vacuum_pages
+        set_vector_index(previous)
+    print("✅ Unsaved items expire on the next run")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Content Retention")
+    print("=" * 60)
+    test_retention_policies(make_database(incremental_vacuum=True).session_factory)
+    print("\n🎉 Retention tests passed!")
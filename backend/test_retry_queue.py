@@ -0,0 +1,111 @@
+"""
+Test fetch retry queue (backoff, error classification, dead-lettering)
+Runs against an in-memory SQLite database - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+
+import httpx
+import anthropic
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Topic, TopicFetchRetry
+from app.scheduler import retry_queue
+from app.utils.claude_client import ContentParseError
+
+
+def _make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _status_error(cls, status_code):
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(status_code, request=request)
+    return cls(message=f"HTTP {status_code}", response=response, body=None)
+
+
+def test_classify_error():
+    print("\n1. Testing error classification...")
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+
+    cases = [
+        (_status_error(anthropic.RateLimitError, 429), "rate_limit"),
+        (_status_error(anthropic.InternalServerError, 529), "overloaded"),
+        (_status_error(anthropic.AuthenticationError, 401), "auth"),
+        (anthropic.APITimeoutError(request=request), "timeout"),
+        (anthropic.APIConnectionError(request=request), "network"),
+        (ContentParseError("bad json"), "parse"),
+        (RuntimeError("boom"), "unknown"),
+    ]
+    for error, expected in cases:
+        kind = retry_queue.classify_error(error)
+        assert kind == expected, f"{type(error).__name__}: expected {expected}, got {kind}"
+        print(f"✅ {type(error).__name__} -> {kind}")
+
+
+def test_backoff_and_dead_letter():
+    print("\n2. Testing exponential backoff and dead-lettering...")
+    db = _make_session()
+    topic = Topic(topic_name="Retry Topic")
+    db.add(topic)
+    db.commit()
+
+    policy = retry_queue.ERROR_POLICIES["parse"]
+    previous_delay = timedelta(0)
+    for attempt in range(1, policy.max_attempts + 1):
+        retry = retry_queue.record_failure(db, topic.id, ContentParseError("bad json"))
+        db.commit()
+        assert retry.status == "pending"
+        delay = retry.next_attempt_at - datetime.now()
+        assert delay > previous_delay * 0.8, "Backoff should grow with every attempt"
+        previous_delay = delay
+        print(f"✅ Attempt {attempt}: retry in ~{int(delay.total_seconds())}s")
+
+    retry = retry_queue.record_failure(db, topic.id, ContentParseError("bad json"))
+    db.commit()
+    assert retry.status == "dead"
+    assert retry.next_attempt_at is None
+    print(f"✅ Dead-lettered after {retry.attempts} attempts")
+
+    retry = retry_queue.replay(db, topic.id)
+    db.commit()
+    assert retry.status == "pending" and retry.attempts == 0
+    assert [r.topic_id for r in retry_queue.get_due_retries(db)] == [topic.id]
+    print("✅ Replay requeued the topic for an immediate attempt")
+
+    retry_queue.clear_retry(db, topic.id)
+    db.commit()
+    assert db.query(TopicFetchRetry).count() == 0
+    print("✅ Success cleared the retry entry")
+    db.close()
+
+
+def test_auth_errors_are_not_retried():
+    print("\n3. Testing auth errors go straight to the dead-letter state...")
+    db = _make_session()
+    topic = Topic(topic_name="Auth Topic")
+    db.add(topic)
+    db.commit()
+
+    retry = retry_queue.record_failure(db, topic.id, _status_error(anthropic.AuthenticationError, 401))
+    db.commit()
+    assert retry.status == "dead" and retry.attempts == 1
+    print("✅ Auth failure dead-lettered on first attempt")
+    db.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Fetch Retry Queue")
+    print("=" * 60)
+    test_classify_error()
+    test_backoff_and_dead_letter()
+    test_auth_errors_are_not_retried()
+    print("\n🎉 Retry queue tests passed!")
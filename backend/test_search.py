@@ -0,0 +1,132 @@
+"""
+Test full-text search (FTS5 index sync and GET /api/search)
+Uses a temporary SQLite file - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import session_scope
+from app.db_profiles import PROFILES, build_async_engine
+from app.db_routing import ReplicaRouter, set_replica_router
+from app.agents.worker_agent import WorkerAgent
+from app.ingest.batch import IngestBatch, persist_batch
+from app.models import User, Topic, SavedContent
+from app.search.index import ensure_search_index, search_content, to_match_query
+from app.subscriptions import link_user_topic
+from app.api.routes import search
+
+
+def _seed(session_factory):
+    """User following AI (not Rust), with one Rust item saved"""
+    with session_scope(session_factory) as db:
+        user, ai, rust = User(email="search@example.com"), Topic(topic_name="AI"), Topic(topic_name="Rust")
+        db.add_all([user, ai, rust])
+        db.flush()
+        link_user_topic(db, user.id, ai.id)
+        ids = {"user": user.id, "ai": ai.id, "rust": rust.id}
+    
+    old = datetime.now() - timedelta(days=30)
+    with session_scope(session_factory) as db:
+        ids["old"] = persist_batch(db, IngestBatch(topic_id=ids["ai"], items=[
+            {"title": "Transformers explained", "summary": "Attention basics", "content": "Old attention notes", "fetched_at": old}
+        ]))[0]
+        ids["ai_items"] = persist_batch(db, IngestBatch(topic_id=ids["ai"], items=[
+            {"title": "Attention is all you need", "summary": "The transformer paper", "content": "Self-attention layers..."},
+            {"title": "Scaling laws", "summary": "Compute and data", "content": "Loss falls with attention to compute budgets"},
+        ]))
+        rust_items = persist_batch(db, IngestBatch(topic_id=ids["rust"], items=[
+            {"title": "Borrow checker", "summary": "Lifetimes", "content": "Ownership rules need attention"},
+            {"title": "Async Rust", "summary": "Tokio attention", "content": "Futures and executors"},
+        ]))
+        db.add(SavedContent(user_id=ids["user"], content_id=rust_items[0]))
+        ids["saved"] = rust_items[0]
+    return ids
+
+
+def _hits(session_factory, user_id, query, limit=20):
+    with session_scope(session_factory) as db:
+        return search_content(db, user_id, query, limit)
+
+
+def test_index_sync_and_ranking(database):
+    print("\n1. Testing index sync, scope and ranking...")
+    engine, session_factory = database.engine, database.session_factory
+    ids = _seed(session_factory)
+    
+    hits = _hits(session_factory, ids["user"], "attention")
+    hit_ids = [hit["id"] for hit in hits]
+    assert set(hit_ids) == {ids["old"], *ids["ai_items"], ids["saved"]}, "Followed topics plus saved items only"
+    assert hit_ids[0] == ids["ai_items"][0], "A title match outranks a body match"
+    assert hits[0]["score"] >= hits[-1]["score"]
+    assert "<mark>" in hits[0]["snippet"] and hits[0]["topic_name"] == "AI"
+    assert [h["id"] for h in _hits(session_factory, ids["user"], "transform")] == [ids["old"], ids["ai_items"][0]], \
+        "Porter stemming plus prefix on the last word"
+    print("✅ Ingested rows are searchable, ranked, scoped and highlighted")
+    
+    assert _hits(session_factory, ids["user"], 'attention" (') != [], "Operators are plain text"
+    assert to_match_query("?!") == "" and _hits(session_factory, ids["user"], "?!") == []
+    print("✅ Query syntax in user input can't break the MATCH")
+    
+    WorkerAgent(ids["ai"], session_factory).cleanup_old_content(days_to_keep=7)
+    assert ids["old"] not in [h["id"] for h in _hits(session_factory, ids["user"], "attention")]
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO content_search(content_search) VALUES ('integrity-check')"))
+    print("✅ Cleanup removes rows from the index (integrity check passes)")
+
+
+def test_backfill_existing_database(database):
+    print("\n2. Testing backfill of a database without the index...")
+    engine, session_factory = database.engine, database.session_factory
+    with engine.begin() as conn:
+        for trigger in ("insert", "delete", "update"):
+            conn.execute(text(f"DROP TRIGGER content_search_{trigger}"))
+        conn.execute(text("DROP TABLE content_search"))
+    ids = _seed(session_factory)
+    
+    assert ensure_search_index(engine) is True
+    assert ensure_search_index(engine) is False, "Second start is a no-op"
+    assert len(_hits(session_factory, ids["user"], "attention")) == 4
+    print("✅ ensure_search_index creates and backfills the index once")
+
+
+def test_search_route(database):
+    print("\n3. Testing GET /api/search...")
+    url, session_factory = database.url, database.session_factory
+    ids = _seed(session_factory)
+    async_factory = async_sessionmaker(build_async_engine(url, PROFILES["development"]), expire_on_commit=False)
+    app = FastAPI()
+    app.include_router(search.router, prefix="/api")
+    previous = set_replica_router(ReplicaRouter(primary=session_factory, async_primary=async_factory))
+    try:
+        with TestClient(app) as client:
+            page = client.get("/api/search", params={"user_id": ids["user"], "q": "attention", "limit": 3}).json()
+            assert len(page["items"]) == 3 and page["has_more"] and page["next_offset"] == 3
+            assert "content" not in page["items"][0] and "<mark>" in page["items"][0]["snippet"]
+            rest = client.get("/api/search", params={"user_id": ids["user"], "q": "attention", "offset": 3}).json()
+            assert len(rest["items"]) == 1 and not rest["has_more"]
+            assert client.get("/api/search", params={"user_id": 999, "q": "attention"}).status_code == 404
+            assert client.get("/api/search", params={"user_id": ids["user"], "q": ""}).status_code == 422
+            print("✅ Paged results with snippets, 404 for unknown users")
+    finally:
+        set_replica_router(previous)
+
+
+if __name__ == "__main__":
+    from conftest import make_database
+    
+    print("=" * 60)
+    print("Testing Full-Text Search")
+    print("=" * 60)
+    test_index_sync_and_ranking(make_database())
+    test_backfill_existing_database(make_database())
+    test_search_route(make_database())
+    print("\n🎉 Search tests passed!")
@@ -0,0 +1,131 @@
+"""
+Test topic subscriber counts and popularity-aware fetch tiers
+Uses a temporary SQLite file - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import config
+from app.database import get_read_db, session_scope
+from app.models import User, Topic, TopicFetchRetry
+from app.scheduler.tiers import due_topic_ids, subscribed_topic_ids, tier_for
+from app.subscriptions import link_user_topic, recount_subscribers, unlink_all_topics, unlink_user_topic
+from app.api.routes import scheduler
+
+
+def _counts(db):
+    return {topic.topic_name: topic.subscriber_count for topic in db.query(Topic).order_by(Topic.id)}
+
+
+def test_subscriber_counts(session_factory):
+    print("\n1. Testing subscriber_count follows link / unlink...")
+    with session_scope(session_factory) as db:
+        users = [User(email=f"user{i}@example.com") for i in range(3)]
+        ai, rust = Topic(topic_name="AI"), Topic(topic_name="Rust")
+        db.add_all(users + [ai, rust])
+        db.flush()
+        user_ids, ai_id, rust_id = [user.id for user in users], ai.id, rust.id
+        for user_id in user_ids:
+            link_user_topic(db, user_id, ai_id)
+        link_user_topic(db, user_ids[0], ai_id)  # already linked: no double count
+        link_user_topic(db, user_ids[0], rust_id)
+    
+    with session_scope(session_factory) as db:
+        assert _counts(db) == {"AI": 3, "Rust": 1}
+        assert unlink_user_topic(db, user_ids[1], ai_id)
+        assert not unlink_user_topic(db, user_ids[1], ai_id), "Unlinking twice doesn't decrement twice"
+        assert unlink_all_topics(db, user_ids[0]) == 2
+        assert _counts(db) == {"AI": 1, "Rust": 0}
+        
+        db.query(Topic).update({"subscriber_count": 42})
+        recount_subscribers(db)
+        assert _counts(db) == {"AI": 1, "Rust": 0}, "Recount matches the incremental counts"
+    print("✅ Counts maintained transactionally and match a full recount")
+
+
+def test_tiers_and_due_topics(session_factory):
+    print("\n2. Testing tier assignment and due topics...")
+    assert [tier_for(n) for n in (config.TIER_HOT_SUBSCRIBERS, config.TIER_WARM_SUBSCRIBERS, 1, 0)] == \
+        ["hot", "warm", "cold", "orphaned"]
+    
+    now = datetime.now()
+    with session_scope(session_factory) as db:
+        topics = {
+            "hot": Topic(topic_name="Hot", subscriber_count=config.TIER_HOT_SUBSCRIBERS, last_fetched=now - timedelta(hours=5)),
+            "warm": Topic(topic_name="Warm", subscriber_count=config.TIER_WARM_SUBSCRIBERS, last_fetched=now - timedelta(hours=5)),
+            "cold": Topic(topic_name="Cold", subscriber_count=1, last_fetched=now - timedelta(hours=25)),
+            "new": Topic(topic_name="New", subscriber_count=1, last_fetched=None),
+            "orphaned": Topic(topic_name="Orphaned", subscriber_count=0, last_fetched=None),
+            "lesson": Topic(topic_name="Lesson", topic_type="learning", subscriber_count=config.TIER_HOT_SUBSCRIBERS,
+                            last_fetched=now - timedelta(hours=5), is_completed=False),
+            "done": Topic(topic_name="Done", topic_type="learning", subscriber_count=1,
+                          last_fetched=now - timedelta(days=3), is_completed=True),
+        }
+        db.add_all(topics.values())
+        db.flush()
+        ids = {name: topic.id for name, topic in topics.items()}
+        
+        due = due_topic_ids(db, now)
+        assert due == [ids["hot"], ids["cold"], ids["new"]], due
+        assert ids["warm"] in due_topic_ids(db, now + timedelta(hours=8)), "Warm waits its 12h interval"
+        assert ids["lesson"] in due_topic_ids(db, now + timedelta(hours=19)), "Learning topics are due daily"
+        assert ids["orphaned"] not in due_topic_ids(db, now + timedelta(days=30))
+        assert ids["orphaned"] not in subscribed_topic_ids(db) and ids["hot"] == subscribed_topic_ids(db)[0]
+    print("✅ Hot first, warm waits 12h, learning daily, orphaned never")
+    
+    app = FastAPI()
+    app.include_router(scheduler.router, prefix="/api")
+    
+    def override_read_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    app.dependency_overrides[get_read_db] = override_read_db
+    with TestClient(app) as client:
+        body = client.get("/api/scheduler/tiers").json()
+    tiers = body["tiers"]
+    assert body["total_topics"] == 7
+    assert {name: tier["topics"] for name, tier in tiers.items()} == {"hot": 2, "warm": 1, "cold": 3, "orphaned": 1}
+    assert tiers["hot"]["due"] == 1 and tiers["orphaned"]["interval_hours"] is None
+    print(f"✅ GET /api/scheduler/tiers: {({name: tier['topics'] for name, tier in tiers.items()})}")
+
+
+def test_retry_queue_topics_not_due(session_factory):
+    print("\n3. Testing topics on the retry queue are left to it...")
+    now = datetime.now()
+    with session_scope(session_factory) as db:
+        dead, pending, healthy = (Topic(topic_name=name, subscriber_count=1, last_fetched=now - timedelta(days=2))
+                                  for name in ("Dead", "Pending", "Healthy"))
+        db.add_all([dead, pending, healthy])
+        db.flush()
+        db.add_all([
+            TopicFetchRetry(topic_id=dead.id, status="dead", error_kind="auth", attempts=1),
+            TopicFetchRetry(topic_id=pending.id, status="pending", error_kind="timeout", attempts=1,
+                            next_attempt_at=now + timedelta(minutes=5)),
+        ])
+        db.flush()
+        
+        assert due_topic_ids(db, now) == [healthy.id], "Dead-lettered and backing-off topics are not due"
+        assert subscribed_topic_ids(db) == [healthy.id]
+    print("✅ Dead-lettered and pending topics skipped by the tier poll")
+
+
+if __name__ == "__main__":
+    from conftest import make_database
+    
+    print("=" * 60)
+    print("Testing Fetch Tiers")
+    print("=" * 60)
+    test_subscriber_counts(make_database().session_factory)
+    test_tiers_and_due_topics(make_database().session_factory)
+    test_retry_queue_topics_not_due(make_database().session_factory)
+    print("\n🎉 Fetch tier tests passed!")
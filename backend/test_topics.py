@@ -0,0 +1,127 @@
+"""
+Test topic canonicalization: normalized names, similarity matching at
+onboarding and the duplicate report
+Uses a temporary SQLite file - no API key needed
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app.database import get_db, session_scope
+from app.db_routing import ReplicaRouter, set_replica_router
+from app.models import User, Topic, user_topics
+from app.topics import TopicMatcher, duplicate_groups, normalize_topic_name, topic_terms
+from app.api.routes import onboarding
+
+
+def test_normalization_and_matching():
+    print("\n1. Testing normalization and similarity...")
+    assert normalize_topic_name("  AI   News! ") == normalize_topic_name("ai-news") == "ai news"
+    assert normalize_topic_name("Café Culture") == "cafe culture"
+    assert topic_terms("Latest AI news") == topic_terms("AI News") == frozenset({"ai", "news"})
+    assert topic_terms("Stock Prices") == frozenset({"stock", "price"})
+    
+    matcher = TopicMatcher({1: "AI News", 2: "Rust programming", 3: "Stock Prices of Indian IT companies", 4: "Cricket"})
+    assert matcher.best("Latest AI news") == (1, 1.0)
+    assert matcher.best("Programming in Rust") == (2, 1.0)
+    assert matcher.best("Indian IT company stock prices today") == (3, 1.0)
+    assert matcher.best("Indian IT companies stock")[0] == 3, "TF-IDF near-match"
+    assert matcher.best("tcs stock prices") is None, "Sharing two words isn't the same stream"
+    assert matcher.best("AI policy") is None
+    print("✅ Case, punctuation, filler words and plurals folded; unrelated names kept apart")
+
+
+def test_onboarding_links_near_matches(session_factory):
+    print("\n2. Testing onboarding links near-identical topics...")
+    
+    def override_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    app = FastAPI()
+    app.include_router(onboarding.router, prefix="/api")
+    app.dependency_overrides[get_db] = override_db
+    previous = set_replica_router(ReplicaRouter(primary=session_factory, async_primary=None))
+    try:
+        with session_scope(session_factory) as db:
+            users = [User(email=f"user{i}@example.com") for i in range(4)]
+            db.add_all(users)
+            db.flush()
+            user_ids = [user.id for user in users]
+        
+        def onboard(user_id, interests):
+            response = client.post("/api/onboarding/", json={"user_id": user_id, "interests": interests})
+            assert response.status_code == 200, response.text
+            return response.json()
+        
+        with TestClient(app) as client:
+            created = onboard(user_ids[0], "AI News. Topic Type: feed")
+            assert len(created["topics_added"]) == 1
+            for user_id, name in zip(user_ids[1:], ["ai news", "Latest AI news!"]):
+                linked = onboard(user_id, f"{name}. Topic Type: feed")
+                assert linked["topics_added"] == [] and linked["topics_linked"] == ["AI News"], linked
+            assert onboard(user_ids[3], "Latest AI news. Topic Type: learning. Learning Period: 30 days")["topics_added"], \
+                "A learning plan is a different stream"
+            assert onboard(user_ids[3], "ai news!. Topic Type: learning. Learning Period: 14 days")["topics_added"], \
+                "The same canonical name in another kind is a different stream"
+            assert onboard(user_ids[3], "AI Policy. Topic Type: feed")["topics_added"]
+        
+        with session_scope(session_factory) as db:
+            assert db.query(Topic).count() == 4
+            ai_news = db.query(Topic).filter(Topic.normalized_name == "ai news", Topic.topic_type == "feed").one()
+            assert db.query(user_topics).filter(user_topics.c.topic_id == ai_news.id).count() == 3
+    finally:
+        set_replica_router(previous)
+    print("✅ 'ai news' and 'Latest AI news!' linked to 'AI News'")
+
+
+def test_unique_normalized_name_and_report(session_factory):
+    print("\n3. Testing the unique index (per kind) and the duplicate report...")
+    with pytest.raises(IntegrityError):
+        with session_scope(session_factory) as db:
+            db.add_all([
+                Topic(topic_name="AI News", normalized_name=normalize_topic_name("AI News")),
+                Topic(topic_name="ai news", normalized_name=normalize_topic_name("ai news")),
+            ])
+    with session_scope(session_factory) as db:
+        db.add_all([
+            Topic(topic_name="AI News", normalized_name="ai news", topic_type="feed", feed_source="internet"),
+            Topic(topic_name="ai news!", normalized_name="ai news", topic_type="feed", feed_source="ai"),
+            Topic(topic_name="AI news", normalized_name="ai news", topic_type="learning", feed_source="ai",
+                  learning_period_days=30),
+        ])
+    with pytest.raises(IntegrityError):
+        with session_scope(session_factory) as db:
+            db.add(Topic(topic_name="AI-News", normalized_name="ai news", topic_type="feed", feed_source="internet"))
+    with session_scope(session_factory) as db:
+        db.query(Topic).delete()
+    
+    with session_scope(session_factory) as db:
+        for name, kind in [("Need to Learn Kannada", "learning"), ("Price of Onion", "feed"),
+                           ("Learn Kannada", "learning"), ("onion prices", "feed"), ("Astrology", "feed")]:
+            db.add(Topic(topic_name=name, topic_type=kind, feed_source="ai",
+                         learning_period_days=30 if kind == "learning" else None))
+    with session_scope(session_factory) as db:
+        groups = [[topic.topic_name for topic in group] for group in duplicate_groups(db)]
+    assert groups == [["Need to Learn Kannada", "Learn Kannada"], ["Price of Onion", "onion prices"]], groups
+    print(f"✅ Report groups: {groups}")
+
+
+if __name__ == "__main__":
+    from conftest import make_database
+    
+    print("=" * 60)
+    print("Testing Topic Canonicalization")
+    print("=" * 60)
+    test_normalization_and_matching()
+    test_onboarding_links_near_matches(make_database().session_factory)
+    test_unique_normalized_name_and_report(make_database().session_factory)
+    print("\n🎉 Topic canonicalization tests passed!")
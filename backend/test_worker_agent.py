@@ -51,7 +51,7 @@ async def main():
         # Test single worker agent
         if topics:
             print(f"\n2. Testing single Worker Agent for: {topics[0].topic_name}")
-            worker = WorkerAgent(db, topics[0].id)
+            worker = WorkerAgent(topics[0].id)
             
             print("   Fetching content... (this will fail without API credits)")
             content = await worker.fetch_content(max_items=3)
@@ -70,7 +70,7 @@ async def main():
         
         # Test Worker Agent Manager
         print("\n4. Testing Worker Agent Manager...")
-        manager = WorkerAgentManager(db)
+        manager = WorkerAgentManager()
         
         print("   Fetching for all topics... (will fail without API credits)")
         results = await manager.fetch_all_topics(max_items_per_topic=2)
@@ -0,0 +1,61 @@
+"""
+Report near-duplicate topics and the fetch calls canonicalization saves
+Each topic costs one API call per scheduled fetch, as often as its tier
+interval scaled by its adaptive refresh factor allows (app/scheduler/tiers.py;
+orphaned topics aren't fetched). Topics that would now be linked to an older
+match are calls saved.
+
+Usage:
+    python topic_report.py [--threshold 0.85] [--fetches-per-day N]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+from datetime import timedelta
+
+from app import config
+from app.database import init_db, session_scope
+from app.models import Topic
+from app.scheduler.tiers import tier_for, topic_interval
+from app.topics import duplicate_groups
+
+
+def fetches_per_day(topic: Topic) -> float:
+    """Scheduled fetches a day of one topic at its current tier and refresh factor"""
+    interval = topic_interval(tier_for(topic.subscriber_count or 0), topic.topic_type, topic.refresh_factor)
+    return timedelta(days=1) / interval if interval else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Near-duplicate topics and estimated calls saved")
+    parser.add_argument("--threshold", type=float, default=config.TOPIC_MATCH_THRESHOLD, help="Match similarity")
+    parser.add_argument("--fetches-per-day", type=float, default=None,
+                        help="Scheduled fetches per topic per day (default: each topic's tier schedule)")
+    args = parser.parse_args()
+    
+    init_db()
+    
+    with session_scope() as db:
+        total = db.query(Topic).count()
+        groups = duplicate_groups(db, args.threshold)
+        print(f"\n📋 {total} topics, {len(groups)} near-duplicate groups (threshold {args.threshold})")
+        for group in groups:
+            canonical, duplicates = group[0], group[1:]
+            print(f"   #{canonical.id} '{canonical.topic_name}' ({canonical.topic_type}) <- "
+                  + ", ".join(f"#{topic.id} '{topic.topic_name}'" for topic in duplicates))
+        
+        per_day = sum(
+            fetches_per_day(topic) if args.fetches_per_day is None else args.fetches_per_day
+            for group in groups for topic in group[1:]
+        )
+    
+    redundant = sum(len(group) - 1 for group in groups)
+    share = redundant / total if total else 0.0
+    print(f"\n📊 Redundant topics: {redundant} ({share:.0%} of the table)")
+    print(f"   Calls saved: {per_day:.1f}/day, {per_day * 30:.0f}/month")
+
+
+if __name__ == "__main__":
+    main()
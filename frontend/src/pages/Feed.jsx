@@ -39,7 +39,7 @@ function Feed() {
       }
       
       // Load feed
-      const feedData = await getUserFeed(userId);
+      const feedData = await getUserFeed(userId, null, 'summary');
       setFeed(feedData);
     } catch (err) {
       console.error('Failed to load:', err);
@@ -57,7 +57,7 @@ function Feed() {
       await refreshTopicFeed(userId, selectedTopic.id);
       
       // Reload feed
-      const feedData = await getUserFeed(userId);
+      const feedData = await getUserFeed(userId, null, 'summary');
       setFeed(feedData);
     } catch (err) {
       console.error('Failed to fetch:', err);
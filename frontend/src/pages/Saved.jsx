@@ -8,6 +8,8 @@ function Saved() {
   const navigate = useNavigate();
   const [saved, setSaved] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [total, setTotal] = useState(0);
 
   const userId = localStorage.getItem('userId');
 
@@ -19,10 +21,12 @@ function Saved() {
     loadSaved();
   }, [userId, navigate]);
 
-  const loadSaved = async () => {
+  const loadSaved = async (cursor = null) => {
     try {
-      const data = await getSavedContent(userId);
-      setSaved(data.items);
+      const data = await getSavedContent(userId, cursor);
+      setSaved(cursor ? [...saved, ...data.items] : data.items);
+      setNextCursor(data.next_cursor);
+      setTotal(data.total_saved);
     } catch (err) {
       console.error('Failed to load saved content:', err);
     } finally {
@@ -34,6 +38,7 @@ function Saved() {
     try {
       await unsaveContent(savedId);
       setSaved(saved.filter(item => item.id !== savedId));
+      setTotal(total - 1);
     } catch (err) {
       console.error('Failed to unsave content:', err);
     }
@@ -53,7 +58,9 @@ function Saved() {
       <Navbar />
       
       <div className="max-w-7xl mx-auto px-4 py-8">
-        <h1 className="text-3xl font-bold text-gray-900 mb-8">Saved Content</h1>
+        <h1 className="text-3xl font-bold text-gray-900 mb-8">
+          Saved Content {total > 0 && <span className="text-gray-500 text-xl">({total})</span>}
+        </h1>
 
         {saved.length === 0 ? (
           <div className="text-center py-12">
@@ -96,6 +103,14 @@ function Saved() {
             ))}
           </div>
         )}
+
+        {nextCursor && (
+          <div className="text-center mt-8">
+            <button onClick={() => loadSaved(nextCursor)} className="btn-primary">
+              Load more
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -35,9 +35,34 @@ export const getUserTopics = async (userId) => {
 };
 
 // Feed
-export const getUserFeed = async (userId, date = null) => {
-  const url = date ? `/feed/${userId}?date=${date}` : `/feed/${userId}`;
-  const response = await api.get(url);
+// view = 'summary' leaves out each item's full body (load it with getContent)
+export const getUserFeed = async (userId, date = null, view = 'full') => {
+  const params = date ? { date, view } : { view };
+  const response = await api.get(`/feed/${userId}`, { params });
+  return response.data;
+};
+
+// Content
+export const getContent = async (contentId) => {
+  const response = await api.get(`/content/${contentId}`);
+  return response.data;
+};
+
+// Full-text search over the user's topics and saved items (pass next_offset for the next page)
+export const searchContent = async (userId, q, offset = 0) => {
+  const response = await api.get('/search', { params: { user_id: userId, q, offset } });
+  return response.data;
+};
+
+// Feed history over the last `days` days (pass next_cursor for the next page)
+export const getFeedHistory = async (userId, days = 7, cursor = null) => {
+  const response = await api.get(`/feed/${userId}/history`, { params: cursor ? { days, cursor } : { days } });
+  return response.data;
+};
+
+// Feed changes since a cursor (omit `since` to get the current cursor)
+export const getFeedChanges = async (userId, since = null) => {
+  const response = await api.get(`/feed/${userId}/changes`, { params: since ? { since } : {} });
   return response.data;
 };
 
@@ -75,8 +100,8 @@ export const saveContent = async (userId, contentId) => {
   return response.data;
 };
 
-export const getSavedContent = async (userId) => {
-  const response = await api.get(`/saved/${userId}`);
+export const getSavedContent = async (userId, cursor = null, view = 'summary') => {
+  const response = await api.get(`/saved/${userId}`, { params: cursor ? { cursor, view } : { view } });
   return response.data;
 };
 